@@ -7,43 +7,113 @@ cryptographic code by analyzing assembly output for variable-time instructions.
 
 from .analyzer import (
     DANGEROUS_INSTRUCTIONS,
+    OPTIMIZATION_LEVELS,
     AnalysisReport,
     AssemblyParser,
     ClangCompiler,
+    CompileCommand,
     Compiler,
     GCCCompiler,
     GoCompiler,
+    MatrixReport,
+    NDJSONWriter,
     OutputFormat,
+    ReportWriter,
     RustCompiler,
+    SARIFWriter,
     Severity,
     Violation,
+    analyze_archive,
     analyze_assembly,
+    analyze_binary,
+    analyze_compile_commands,
+    analyze_crate,
+    analyze_csharp_project,
+    analyze_dotnet_assemblies,
+    analyze_jvm_module,
+    analyze_many,
+    analyze_matrix,
     analyze_source,
+    analyze_sweep,
+    demangle_symbols,
+    detect_binary_arch,
+    detect_binary_kind,
     detect_language,
+    find_sources,
+    format_matrix,
     format_report,
+    format_reports,
+    function_baseline,
     get_compiler,
+    get_parser,
     get_native_arch,
+    is_csharp_project,
+    is_dotnet_assembly,
+    jvm_module_languages,
+    load_compile_commands,
+    load_reports,
     normalize_arch,
+    probe_cross_targets,
 )
+from .cache import AnalysisCache
+from .profiling import Profiler
+from .server import AnalysisServer, serve
+from .toolchains import ToolchainRegistry, get_registry
 
 __version__ = "0.1.0"
 __all__ = [
     "DANGEROUS_INSTRUCTIONS",
+    "OPTIMIZATION_LEVELS",
+    "AnalysisCache",
     "AnalysisReport",
+    "AnalysisServer",
     "AssemblyParser",
     "ClangCompiler",
+    "CompileCommand",
     "Compiler",
     "GCCCompiler",
     "GoCompiler",
+    "MatrixReport",
+    "NDJSONWriter",
     "OutputFormat",
+    "Profiler",
+    "ReportWriter",
     "RustCompiler",
+    "SARIFWriter",
     "Severity",
+    "ToolchainRegistry",
     "Violation",
+    "analyze_archive",
     "analyze_assembly",
+    "analyze_binary",
+    "analyze_compile_commands",
+    "analyze_crate",
+    "analyze_csharp_project",
+    "analyze_dotnet_assemblies",
+    "analyze_jvm_module",
+    "analyze_many",
+    "analyze_matrix",
     "analyze_source",
+    "analyze_sweep",
+    "demangle_symbols",
+    "detect_binary_arch",
+    "detect_binary_kind",
     "detect_language",
+    "find_sources",
+    "format_matrix",
     "format_report",
+    "format_reports",
+    "function_baseline",
     "get_compiler",
     "get_native_arch",
+    "get_parser",
+    "get_registry",
+    "is_csharp_project",
+    "is_dotnet_assembly",
+    "jvm_module_languages",
+    "load_compile_commands",
+    "load_reports",
     "normalize_arch",
+    "probe_cross_targets",
+    "serve",
 ]
@@ -27,19 +27,41 @@ Examples:
 
     # Analyze with warnings enabled (shows conditional branches)
     python ct_analyzer/analyzer.py --warnings crypto.c
+
+    # Analyze every source file under a directory on a worker pool
+    python ct_analyzer/analyzer.py scan src/crypto
 """
 
 import argparse
+import dataclasses
+import functools
+import hashlib
+import io
+import itertools
 import json
+import mmap
 import os
 import re
+import shlex
 import subprocess
 import sys
 import tempfile
+import urllib.parse
+import zipfile
+from abc import ABC, abstractmethod
+from collections.abc import Callable, Iterable, Iterator
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
 from dataclasses import dataclass, field
 from enum import Enum
 from pathlib import Path
 
+try:
+    from .profiling import file_scope, phase, profiled, profiled_file
+    from .toolchains import default_cache_dir, get_registry
+except ImportError:
+    from profiling import file_scope, phase, profiled, profiled_file
+    from toolchains import default_cache_dir, get_registry
+
 
 class Severity(Enum):
     ERROR = "error"
@@ -50,11 +72,19 @@ class OutputFormat(Enum):
     TEXT = "text"
     JSON = "json"
     GITHUB = "github"
+    NDJSON = "ndjson"
+    SARIF = "sarif"
 
 
-@dataclass
+@dataclass(slots=True)
 class Violation:
-    """A detected constant-time violation."""
+    """A detected constant-time violation.
+
+    Large reports hold millions of these, so the class is slotted and the
+    strings shared between violations (function, file, mnemonic, reason)
+    are interned: each distinct value is stored once, however many
+    violations refer to it.
+    """
 
     function: str
     file: str
@@ -65,6 +95,12 @@ class Violation:
     reason: str
     severity: Severity
 
+    def __post_init__(self):
+        self.function = sys.intern(self.function)
+        self.file = sys.intern(self.file)
+        self.mnemonic = sys.intern(self.mnemonic)
+        self.reason = sys.intern(self.reason)
+
 
 @dataclass
 class AnalysisReport:
@@ -77,20 +113,128 @@ class AnalysisReport:
     total_functions: int
     total_instructions: int
     violations: list[Violation] = field(default_factory=list)
+    # Per-function {"name", "instructions", "hash", "line"} entries (compiled
+    # languages only) and whether warnings were collected; used by --since
+    functions: list[dict] = field(default_factory=list)
+    include_warnings: bool | None = None
+    # (violations list, its length, errors, warnings), see _counts
+    _severity_counts: tuple | None = field(default=None, init=False, repr=False, compare=False)
+
+    def _counts(self) -> tuple[int, int]:
+        """
+        Error and warning counts. They are cached until violations is
+        replaced or its length changes, so in-place edits that keep the
+        length must assign a new list.
+        """
+        cached = self._severity_counts
+        if cached is None or cached[0] is not self.violations or cached[1] != len(cached[0]):
+            errors = sum(1 for v in self.violations if v.severity is Severity.ERROR)
+            cached = (self.violations, len(self.violations), errors, len(self.violations) - errors)
+            self._severity_counts = cached
+        return cached[2:]
 
     @property
     def error_count(self) -> int:
-        return sum(1 for v in self.violations if v.severity == Severity.ERROR)
+        return self._counts()[0]
 
     @property
     def warning_count(self) -> int:
-        return sum(1 for v in self.violations if v.severity == Severity.WARNING)
+        return self._counts()[1]
 
     @property
     def passed(self) -> bool:
         return self.error_count == 0
 
 
+@dataclass
+class MatrixReport:
+    """Reports for one source analyzed under several variants of one setting.
+
+    dimension names the setting that varies ("architecture" or
+    "optimization"); variants lists its values in order. A variant that
+    failed to compile appears in errors instead of reports, and one with no
+    toolchain on this machine (a missing cross compiler) in unavailable; only
+    errors fail the matrix. baseline, when set, is the variant the others are
+    diffed against.
+    """
+
+    source_file: str
+    dimension: str
+    variants: list[str]
+    reports: dict[str, AnalysisReport] = field(default_factory=dict)
+    errors: dict[str, str] = field(default_factory=dict)
+    baseline: str | None = None
+    unavailable: dict[str, str] = field(default_factory=dict)
+
+    @property
+    def passed(self) -> bool:
+        return all(r.passed for r in self.reports.values()) and not self.errors
+
+    def violation_matrix(self) -> list[dict]:
+        """
+        Group violations by (function, mnemonic) across variants.
+
+        Returns one row per (function, mnemonic) in order of first appearance:
+        {"function", "mnemonic", "severity", "variants": {variant: count}}.
+        """
+        rows = {}
+        for variant in self.variants:
+            report = self.reports.get(variant)
+            if report is None:
+                continue
+            for v in report.violations:
+                row = rows.setdefault(
+                    (v.function, v.mnemonic),
+                    {
+                        "function": v.function,
+                        "mnemonic": v.mnemonic,
+                        "severity": v.severity,
+                        "variants": {},
+                    },
+                )
+                row["variants"][variant] = row["variants"].get(variant, 0) + 1
+                if v.severity == Severity.ERROR:
+                    row["severity"] = Severity.ERROR
+        return list(rows.values())
+
+    def diff(self, baseline: str | None = None) -> list[dict]:
+        """
+        Per-function differences against a baseline variant.
+
+        Returns one row per (function, mnemonic) whose count differs from the
+        baseline in some variant: {"function", "mnemonic", "severity",
+        "baseline" (count), "counts" ({variant: count} for every analyzed
+        variant), "deltas" ({variant: count - baseline} where they differ),
+        "introduced" (variants that have it and the baseline doesn't),
+        "removed" (variants that lack it and the baseline has it)}.
+        Variants that failed to analyze are left out.
+        """
+        baseline = baseline or self.baseline or self.variants[0]
+        if baseline not in self.reports:
+            return []
+
+        analyzed = [v for v in self.variants if v in self.reports and v != baseline]
+        rows = []
+        for row in self.violation_matrix():
+            base_count = row["variants"].get(baseline, 0)
+            counts = {v: row["variants"].get(v, 0) for v in analyzed}
+            deltas = {v: n - base_count for v, n in counts.items() if n != base_count}
+            if deltas:
+                rows.append(
+                    {
+                        "function": row["function"],
+                        "mnemonic": row["mnemonic"],
+                        "severity": row["severity"],
+                        "baseline": base_count,
+                        "counts": counts,
+                        "deltas": deltas,
+                        "introduced": [v for v in deltas if not base_count],
+                        "removed": [v for v in deltas if base_count and not counts[v]],
+                    }
+                )
+        return rows
+
+
 # Architecture-specific dangerous instructions
 # Based on research from Trail of Bits and the cryptocoding guidelines
 
@@ -430,10 +574,147 @@ def is_bytecode_language(language: str) -> bool:
 # Backward compatibility alias
 is_scripting_language = is_bytecode_language
 
+ELF_MAGIC = b"\x7fELF"
+AR_MAGIC = b"!<arch>\n"
+THIN_AR_MAGIC = b"!<thin>\n"
+
+# ELF e_machine values of the supported architectures
+_ELF_MACHINES = {
+    3: "i386",
+    21: "ppc64le",
+    22: "s390x",
+    40: "arm",
+    62: "x86_64",
+    183: "arm64",
+    243: "riscv64",
+}
+
+
+def detect_binary_kind(path: str) -> str | None:
+    """Detect "elf" (object file or shared library) or "archive" input, else None."""
+    try:
+        with open(path, "rb") as f:
+            magic = f.read(8)
+    except OSError:
+        return None
+    if magic.startswith(ELF_MAGIC):
+        return "elf"
+    if magic in (AR_MAGIC, THIN_AR_MAGIC):
+        return "archive"
+    return None
+
+
+def detect_binary_arch(binary_file: str) -> str | None:
+    """Architecture of an ELF file from its header, or None if unsupported."""
+    with open(binary_file, "rb") as f:
+        header = f.read(20)
+    if len(header) < 20 or not header.startswith(ELF_MAGIC):
+        return None
+    byteorder = "little" if header[5] == 1 else "big"
+    arch = _ELF_MACHINES.get(int.from_bytes(header[18:20], byteorder))
+    # Only little-endian 64-bit PowerPC is supported
+    if arch == "ppc64le" and byteorder != "little":
+        return None
+    return arch
+
+
+def _archive_members(archive_file: str) -> Iterator[tuple[str, bytes | str]]:
+    """
+    Iterate over the members of an ar archive (GNU, BSD or thin).
+
+    Yields (name, data) pairs in archive order. For thin archives, data is
+    the member's path instead of its contents. Symbol tables are skipped.
+    """
+    with open(archive_file, "rb") as f:
+        data = f.read()
+    thin = data.startswith(THIN_AR_MAGIC)
+    if not thin and not data.startswith(AR_MAGIC):
+        raise RuntimeError(f"Not an ar archive: {archive_file}")
+
+    long_names = b""
+    offset = len(AR_MAGIC)
+    while offset + 60 <= len(data):
+        header = data[offset : offset + 60]
+        offset += 60
+        name = header[:16].decode(errors="replace").rstrip()
+        size = int(header[48:58].decode().strip() or 0)
+
+        # Symbol tables ("/", "/SYM64/", "__.SYMDEF") and the long name table
+        # ("//") are stored even in thin archives; members are not
+        if name in ("/", "//", "/SYM64/") or name.startswith("__.SYMDEF"):
+            if name == "//":
+                long_names = data[offset : offset + size]
+            offset += size + (size & 1)
+            continue
+
+        if name.startswith("/") and name[1:].isdigit():
+            start = int(name[1:])
+            name = long_names[start : long_names.find(b"/\n", start)].decode(errors="replace")
+        elif name.startswith("#1/"):
+            # BSD: the name precedes the member data
+            length = int(name[3:])
+            name = data[offset : offset + length].decode(errors="replace").rstrip("\0")
+            offset += length
+            size -= length
+        else:
+            name = name.rstrip("/")
+
+        if thin:
+            yield name, str(Path(archive_file).parent / name)
+        else:
+            yield name, data[offset : offset + size]
+            offset += size + (size & 1)
+
+
+# Directories that hold build output, dependencies or VCS metadata rather than sources
+SCAN_SKIP_DIRS = {
+    "__pycache__",
+    "build",
+    "node_modules",
+    "target",
+    "vendor",
+    "venv",
+}
+
+# Headers are analyzed through the translation units that include them
+SCAN_SKIP_SUFFIXES = {".h", ".hpp", ".hxx"}
+
+
+def find_sources(directory: str) -> list[str]:
+    """
+    Find analyzable source files under a directory.
+
+    Hidden directories and the entries of SCAN_SKIP_DIRS are not descended into.
+    Returns paths in a stable, sorted order.
+    """
+    if not Path(directory).is_dir():
+        raise FileNotFoundError(f"Directory not found: {directory}")
+
+    sources = []
+    for root, dirs, files in os.walk(directory):
+        dirs[:] = sorted(d for d in dirs if d not in SCAN_SKIP_DIRS and not d.startswith("."))
+        for name in sorted(files):
+            if Path(name).suffix.lower() in SCAN_SKIP_SUFFIXES:
+                continue
+            path = os.path.join(root, name)
+            if detect_language(path) != "unknown":
+                sources.append(path)
+    return sources
+
 
 class Compiler:
     """Base class for compiler interfaces."""
 
+    # Source languages this compiler handles
+    languages: tuple[str, ...] = ()
+
+    # Arguments that make the compiler print its version
+    VERSION_ARGS = ["--version"]
+
+    # Flags that put each function in its own .text.<name> section, letting a
+    # function filter drop the other functions before they are parsed
+    FUNCTION_SECTIONS_FLAGS: list[str] = []
+
     def __init__(self, name: str, path: str | None = None):
         self.name = name
         self.path = path or name
@@ -450,21 +731,78 @@ class Compiler:
         raise NotImplementedError
 
     def is_available(self) -> bool:
-        """Check if the compiler is available on the system."""
-        try:
-            subprocess.run(
-                [self.path, "--version"],
-                capture_output=True,
-                check=True,
-            )
-            return True
-        except (subprocess.CalledProcessError, FileNotFoundError):
-            return False
+        """Check if the compiler is available on the system (probed once per binary)."""
+        return get_registry().is_available(self.path, self.VERSION_ARGS)
+
+    def version(self, arch: str | None = None) -> str:
+        """
+        Identify the compiler binary that builds for arch (default: this one)
+        and its version (used for cache keys).
+        """
+        return get_registry().version(self.path, self.VERSION_ARGS)
+
+    def target_unavailable(self, arch: str) -> str | None:
+        """
+        Why this compiler has no toolchain for arch (e.g. a missing cross
+        compiler), or None if it may build for it.
+        """
+        return None
+
+    def settings(self) -> dict:
+        """Instance options that change the generated assembly (used for cache keys)."""
+        return {}
+
+    def dependencies(
+        self,
+        source_file: str,
+        arch: str,
+        optimization: str,
+        extra_flags: list[str] | None = None,
+    ) -> list[str] | None:
+        """
+        Files compiling source_file reads, as the compiler lists them (used for
+        cache keys). None if they cannot be determined. By default only the
+        source file itself.
+        """
+        return [source_file]
+
+
+def _make_prerequisites(rules: str) -> list[str]:
+    """
+    The prerequisites of make rules, as `cc -M` and `rustc --emit=dep-info`
+    write them: "target: a.c b.h", continued with backslash-newline, with
+    spaces in paths escaped.
+    """
+    files = []
+    for line in rules.replace("\\\n", " ").splitlines():
+        if line.startswith("#"):
+            continue
+        _target, sep, prerequisites = line.partition(": ")
+        if not sep:
+            continue
+        for word in re.findall(r"(?:\\.|[^\s\\])+", prerequisites):
+            files.append(re.sub(r"\\(.)", r"\1", word.replace("$$", "$")))
+    return files
+
+
+def _cc_dependencies(cmd: list[str]) -> list[str] | None:
+    """Run a C compiler with -M and return the files its rule lists."""
+    try:
+        result = subprocess.run([*cmd, "-M"], capture_output=True, text=True, check=False)
+    except OSError:
+        return None
+    if result.returncode != 0:
+        return None
+    return _make_prerequisites(result.stdout)
 
 
 class GCCCompiler(Compiler):
     """GCC compiler interface."""
 
+    languages = ("c", "cpp")
+
+    FUNCTION_SECTIONS_FLAGS = ["-ffunction-sections"]
+
     ARCH_FLAGS = {
         "x86_64": ["-m64"],
         "i386": ["-m32"],
@@ -475,9 +813,65 @@ class GCCCompiler(Compiler):
         "s390x": ["-march=z13"],
     }
 
+    # A gcc builds for its own architecture only; other targets need the
+    # cross compiler named after the target triple (Debian's gcc-<triple>)
+    CROSS_PREFIXES = {
+        "x86_64": "x86_64-linux-gnu",
+        "i386": "i686-linux-gnu",
+        "arm64": "aarch64-linux-gnu",
+        "arm": "arm-linux-gnueabihf",
+        "riscv64": "riscv64-linux-gnu",
+        "ppc64le": "powerpc64le-linux-gnu",
+        "s390x": "s390x-linux-gnu",
+    }
+
     def __init__(self, path: str | None = None):
         super().__init__("gcc", path or "gcc")
 
+    def binary(self, arch: str) -> str:
+        """
+        The gcc that builds for arch: this one for the native architecture
+        (and i386 on x86_64, through -m32) or when its name already carries a
+        target triple, else the cross compiler with the triple prefixed to its
+        name ("gcc-12" -> "aarch64-linux-gnu-gcc-12", in the same directory).
+        """
+        arch = normalize_arch(arch)
+        native = get_native_arch()
+        directory, name = os.path.split(self.path)
+        if arch == native or (arch == "i386" and native == "x86_64"):
+            return self.path
+        if name.count("-") >= 2 and _TRIPLE_ARCH.match(name.split("-")[0]):
+            return self.path
+        prefix = self.CROSS_PREFIXES.get(arch)
+        return os.path.join(directory, f"{prefix}-{name}") if prefix else self.path
+
+    def version(self, arch: str | None = None) -> str:
+        binary = self.binary(arch) if arch else self.path
+        return get_registry().version(binary, self.VERSION_ARGS)
+
+    def target_unavailable(self, arch: str) -> str | None:
+        binary = self.binary(arch)
+        if binary != self.path and not get_registry().is_available(binary, self.VERSION_ARGS):
+            return f"No gcc cross compiler for {normalize_arch(arch)} ({binary} not found)"
+        return None
+
+    def _command(self, arch: str) -> list[str]:
+        """The compiler and target flags for arch."""
+        arch = normalize_arch(arch)
+        return [self.binary(arch), *self.ARCH_FLAGS.get(arch, [])]
+
+    def dependencies(
+        self,
+        source_file: str,
+        arch: str,
+        optimization: str,
+        extra_flags: list[str] | None = None,
+    ) -> list[str] | None:
+        return _cc_dependencies(
+            [*self._command(arch), f"-{optimization}", *(extra_flags or []), source_file]
+        )
+
+    @profiled("compile")
     def compile_to_assembly(
         self,
         source_file: str,
@@ -486,11 +880,10 @@ class GCCCompiler(Compiler):
         optimization: str,
         extra_flags: list[str] = None,
     ) -> tuple[bool, str]:
-        arch = normalize_arch(arch)
-        arch_flags = self.ARCH_FLAGS.get(arch, [])
+        compiler, *arch_flags = self._command(arch)
 
         cmd = [
-            self.path,
+            compiler,
             f"-{optimization}",
             "-S",  # Generate assembly
             "-fno-asynchronous-unwind-tables",  # Cleaner output
@@ -508,12 +901,16 @@ class GCCCompiler(Compiler):
                 return False, result.stderr
             return True, ""
         except FileNotFoundError:
-            return False, f"Compiler not found: {self.path}"
+            return False, f"Compiler not found: {compiler}"
 
 
 class ClangCompiler(Compiler):
     """Clang compiler interface."""
 
+    languages = ("c", "cpp")
+
+    FUNCTION_SECTIONS_FLAGS = ["-ffunction-sections"]
+
     ARCH_TARGETS = {
         "x86_64": "x86_64-unknown-linux-gnu",
         "i386": "i386-unknown-linux-gnu",
@@ -527,6 +924,25 @@ class ClangCompiler(Compiler):
     def __init__(self, path: str | None = None):
         super().__init__("clang", path or "clang")
 
+    def dependencies(
+        self,
+        source_file: str,
+        arch: str,
+        optimization: str,
+        extra_flags: list[str] | None = None,
+    ) -> list[str] | None:
+        target = self.ARCH_TARGETS.get(normalize_arch(arch))
+        return _cc_dependencies(
+            [
+                self.path,
+                f"-{optimization}",
+                *(["--target=" + target] if target else []),
+                *(extra_flags or []),
+                source_file,
+            ]
+        )
+
+    @profiled("compile")
     def compile_to_assembly(
         self,
         source_file: str,
@@ -560,7 +976,22 @@ class ClangCompiler(Compiler):
 
 
 class GoCompiler(Compiler):
-    """Go compiler interface."""
+    """
+    Go compiler interface.
+
+    Go sources are built into a binary (or a package archive) and disassembled
+    with `go tool objdump`. By default only the analyzed package's symbols are
+    disassembled; packages lists extra import paths (e.g. "crypto/subtle") to
+    include, and scope="binary" disassembles everything, including the runtime.
+    """
+
+    languages = ("go",)
+
+    VERSION_ARGS = ["version"]
+
+    # Symbol prefixes of the analyzed package: "main" for commands, and
+    # "command-line-arguments" for a non-main package built from files
+    LOCAL_PACKAGES = ("main", "command-line-arguments")
 
     ARCH_MAP = {
         "x86_64": "amd64",
@@ -572,20 +1003,63 @@ class GoCompiler(Compiler):
         "s390x": "s390x",
     }
 
-    def __init__(self, path: str | None = None):
+    def __init__(
+        self,
+        path: str | None = None,
+        scope: str = "package",
+        packages: list[str] | None = None,
+    ):
         super().__init__("go", path or "go")
+        if scope not in ("package", "binary"):
+            raise ValueError(f"Unknown Go scope: {scope} (expected 'package' or 'binary')")
+        self.scope = scope
+        self.packages = list(packages or [])
+
+    def settings(self) -> dict:
+        return {"scope": self.scope, "packages": self.packages}
+
+    # `go list -deps` template: the files of every package outside the
+    # standard library (covered by the Go version) and each module's go.mod
+    DEPENDENCIES_TEMPLATE = (
+        "{{if not .Standard}}"
+        "{{range .GoFiles}}{{$.Dir}}/{{.}}\n{{end}}"
+        "{{range .EmbedFiles}}{{$.Dir}}/{{.}}\n{{end}}"
+        "{{with .Module}}{{with .GoMod}}{{.}}\n{{end}}{{end}}"
+        "{{end}}"
+    )
 
-    def is_available(self) -> bool:
-        try:
-            subprocess.run(
-                [self.path, "version"],
-                capture_output=True,
-                check=True,
-            )
-            return True
-        except (subprocess.CalledProcessError, FileNotFoundError):
-            return False
+    def _environment(self, arch: str) -> dict[str, str]:
+        env = os.environ.copy()
+        env["GOOS"] = "linux"
+        env["GOARCH"] = self.ARCH_MAP.get(arch, arch)
+        env["CGO_ENABLED"] = "0"
+        return env
 
+    def dependencies(
+        self,
+        source_file: str,
+        arch: str,
+        optimization: str,
+        extra_flags: list[str] | None = None,
+    ) -> list[str] | None:
+        cmd = [self.path, "list", "-deps", "-f", self.DEPENDENCIES_TEMPLATE, source_file]
+        env = self._environment(normalize_arch(arch))
+        try:
+            result = subprocess.run(cmd, capture_output=True, text=True, env=env, check=False)
+        except OSError:
+            return None
+        if result.returncode != 0:
+            return None
+        return result.stdout.splitlines()
+
+    def symbol_filter(self) -> str | None:
+        """Regex for `go tool objdump -s`, or None to disassemble the whole binary."""
+        if self.scope == "binary":
+            return None
+        names = [*self.LOCAL_PACKAGES, *self.packages]
+        return r"^(" + "|".join(re.escape(name) for name in names) + r")\."
+
+    @profiled("compile")
     def compile_to_assembly(
         self,
         source_file: str,
@@ -594,18 +1068,12 @@ class GoCompiler(Compiler):
         optimization: str,
         extra_flags: list[str] = None,
     ) -> tuple[bool, str]:
-        arch = normalize_arch(arch)
-        goarch = self.ARCH_MAP.get(arch, arch)
+        env = self._environment(normalize_arch(arch))
 
         # For Go, we need to build a binary and then disassemble it
         with tempfile.TemporaryDirectory() as tmpdir:
             binary_path = os.path.join(tmpdir, "binary")
 
-            env = os.environ.copy()
-            env["GOOS"] = "linux"
-            env["GOARCH"] = goarch
-            env["CGO_ENABLED"] = "0"
-
             # Build command - use gcflags to control optimization
             gcflags = ""
             if optimization == "O0":
@@ -626,15 +1094,19 @@ class GoCompiler(Compiler):
                 if result.returncode != 0:
                     return False, result.stderr
 
-                # Now disassemble
-                disasm_cmd = [self.path, "tool", "objdump", binary_path]
-                result = subprocess.run(disasm_cmd, capture_output=True, text=True)
+                # Now disassemble, writing straight to the output file
+                disasm_cmd = [self.path, "tool", "objdump"]
+                symbol_filter = self.symbol_filter()
+                if symbol_filter:
+                    disasm_cmd.extend(["-s", symbol_filter])
+                disasm_cmd.append(binary_path)
+                with phase("disassemble"), open(output_file, "w") as f:
+                    result = subprocess.run(
+                        disasm_cmd, stdout=f, stderr=subprocess.PIPE, text=True
+                    )
                 if result.returncode != 0:
                     return False, result.stderr
 
-                with open(output_file, "w") as f:
-                    f.write(result.stdout)
-
                 return True, ""
             except FileNotFoundError:
                 return False, f"Go not found: {self.path}"
@@ -643,6 +1115,8 @@ class GoCompiler(Compiler):
 class RustCompiler(Compiler):
     """Rust compiler interface."""
 
+    languages = ("rust",)
+
     ARCH_TARGETS = {
         "x86_64": "x86_64-unknown-linux-gnu",
         "i386": "i686-unknown-linux-gnu",
@@ -653,9 +1127,45 @@ class RustCompiler(Compiler):
         "s390x": "s390x-unknown-linux-gnu",
     }
 
+    OPT_LEVELS = {
+        "O0": "0",
+        "O1": "1",
+        "O2": "2",
+        "O3": "3",
+        "Os": "s",
+        "Oz": "z",
+    }
+
     def __init__(self, path: str | None = None):
         super().__init__("rustc", path or "rustc")
 
+    def dependencies(
+        self,
+        source_file: str,
+        arch: str,
+        optimization: str,
+        extra_flags: list[str] | None = None,
+    ) -> list[str] | None:
+        target = self.ARCH_TARGETS.get(normalize_arch(arch))
+        with tempfile.TemporaryDirectory() as tmpdir:
+            dep_file = os.path.join(tmpdir, "deps.d")
+            cmd = [
+                self.path,
+                f"--emit=dep-info={dep_file}",
+                *(["--target", target] if target else []),
+                *(extra_flags or []),
+                source_file,
+            ]
+            try:
+                result = subprocess.run(cmd, capture_output=True, text=True, check=False)
+                if result.returncode != 0:
+                    return None
+                with open(dep_file) as f:
+                    return _make_prerequisites(f.read())
+            except OSError:
+                return None
+
+    @profiled("compile")
     def compile_to_assembly(
         self,
         source_file: str,
@@ -667,14 +1177,7 @@ class RustCompiler(Compiler):
         arch = normalize_arch(arch)
         target = self.ARCH_TARGETS.get(arch)
 
-        opt_level = {
-            "O0": "0",
-            "O1": "1",
-            "O2": "2",
-            "O3": "3",
-            "Os": "s",
-            "Oz": "z",
-        }.get(optimization, "2")
+        opt_level = self.OPT_LEVELS.get(optimization, "2")
 
         cmd = [
             self.path,
@@ -700,6 +1203,8 @@ class RustCompiler(Compiler):
 class SwiftCompiler(Compiler):
     """Swift compiler interface for iOS/macOS development."""
 
+    languages = ("swift",)
+
     ARCH_TARGETS = {
         "x86_64": "x86_64-apple-macosx10.15",
         "arm64": "arm64-apple-macosx11.0",
@@ -712,6 +1217,7 @@ class SwiftCompiler(Compiler):
     def __init__(self, path: str | None = None):
         super().__init__("swiftc", path or "swiftc")
 
+    @profiled("compile")
     def compile_to_assembly(
         self,
         source_file: str,
@@ -752,8 +1258,27 @@ class SwiftCompiler(Compiler):
             return False, f"Swift compiler not found: {self.path}"
 
 
-def get_compiler(name: str, language: str) -> Compiler:
-    """Get a compiler instance by name or detect from language."""
+# Shared compiler instances, keyed on (class, path)
+_COMPILERS: dict[tuple[type, str | None], Compiler] = {}
+
+
+def _shared_compiler(compiler_class: type, path: str | None = None) -> Compiler:
+    key = (compiler_class, path)
+    if key not in _COMPILERS:
+        _COMPILERS[key] = compiler_class(path) if path else compiler_class()
+    return _COMPILERS[key]
+
+
+def get_compiler(name: str | Compiler | None, language: str) -> Compiler:
+    """
+    Get a compiler by name or detect it from the language.
+
+    Named and auto-detected compilers are shared instances; Compiler instances
+    pass through unchanged.
+    """
+    if isinstance(name, Compiler):
+        return name
+
     compilers = {
         "gcc": GCCCompiler,
         "clang": ClangCompiler,
@@ -764,20 +1289,178 @@ def get_compiler(name: str, language: str) -> Compiler:
 
     if name:
         if name in compilers:
-            return compilers[name]()
+            return _shared_compiler(compilers[name])
         # Assume it's a path to a compiler
-        return ClangCompiler(name)
+        return _shared_compiler(ClangCompiler, name)
 
     # Auto-detect based on language
     if language == "go":
-        return GoCompiler()
+        return _shared_compiler(GoCompiler)
     elif language == "rust":
-        return RustCompiler()
+        return _shared_compiler(RustCompiler)
     elif language == "swift":
-        return SwiftCompiler()
+        return _shared_compiler(SwiftCompiler)
     else:
         # Default to clang for C/C++
-        return ClangCompiler()
+        return _shared_compiler(ClangCompiler)
+
+
+# Minimal programs used to check whether a compiler can target an architecture
+_TARGET_PROBES = {
+    "clang": ("probe.c", "int probe(int a, int b) { return a / b; }\n", []),
+    "gcc": ("probe.c", "int probe(int a, int b) { return a / b; }\n", []),
+    "rustc": (
+        "probe.rs",
+        "#![no_std]\npub fn probe(a: u32, b: u32) -> u32 { a / b }\n",
+        ["--crate-type=lib"],
+    ),
+    "go": ("probe.go", "package probe\n\nfunc Probe(a, b int) int { return a / b }\n", []),
+}
+
+
+@profiled("probe")
+def _probe_target(compiler: Compiler, arch: str) -> bool:
+    """Trial-compile a minimal program for arch and report whether it worked."""
+    filename, source, flags = _TARGET_PROBES[compiler.name]
+    with tempfile.TemporaryDirectory() as tmpdir:
+        source_file = os.path.join(tmpdir, filename)
+        with open(source_file, "w") as f:
+            f.write(source)
+        success, _ = compiler.compile_to_assembly(
+            source_file, os.path.join(tmpdir, "probe.s"), arch, "O2", flags
+        )
+        return success
+
+
+def probe_cross_targets(arches: list[str] | None = None) -> dict[str, list[str]]:
+    """
+    Find which compilers can actually build for each architecture on this machine.
+
+    Trial compilations run in parallel. Working targets are remembered by
+    the toolchain registry until the compiler binary changes; failed ones are
+    retried in the next process.
+
+    Returns:
+        Mapping of architecture to the names of the compilers that work for it
+    """
+    arches = arches or list(DANGEROUS_INSTRUCTIONS)
+    registry = get_registry()
+    compilers = [
+        _shared_compiler(cls) for cls in (ClangCompiler, GCCCompiler, RustCompiler, GoCompiler)
+    ]
+    available = [c for c in compilers if c.is_available()]
+    pairs = [(c, arch) for arch in arches for c in available]
+
+    def works(pair):
+        compiler, arch = pair
+        return registry.target_works(compiler.path, arch, lambda: _probe_target(compiler, arch))
+
+    with ThreadPoolExecutor(max_workers=min(8, len(pairs) or 1)) as pool:
+        results = list(pool.map(works, pairs))
+
+    targets = {arch: [] for arch in arches}
+    for (compiler, arch), ok in zip(pairs, results):
+        if ok:
+            targets[arch].append(compiler.name)
+    return targets
+
+
+# Precompiled line classifiers for AssemblyParser
+_FILE_LINE_COMMENT = re.compile(r"#\s*([^:]+):(\d+)")
+_LABEL = re.compile(r"([a-zA-Z_][\w.$]*):$")
+_GO_TEXT = re.compile(r"TEXT\s+([^\s(]+)\(SB\)")
+_TYPE_DIRECTIVE = re.compile(r"\.type\s+([a-zA-Z_][\w.$]*),\s*@function")
+_ADDRESS = re.compile(r"0x([0-9a-fA-F]+)")
+_LOCAL_LABEL = re.compile(r"\.L[A-Za-z_]*[0-9_]+")
+# Section switches; group 2 is the section name of ".section"/".pushsection"
+_SECTION_DIRECTIVE = re.compile(
+    r"\s*\.(section|pushsection|popsection|previous|text|data|bss)(?!\S)\s*([^\s,]*)"
+)
+# objdump -t entries: address, 7 flag columns, section, size and name
+_SYMBOL_TABLE_ENTRY = re.compile(
+    r"[0-9a-fA-F]+ (.{7}) (\S+)\s+[0-9a-fA-F]+\s+(?:\.hidden\s+)?(\S+)$"
+)
+# Function sections: .text.<name>, or .text.<kind>.<name> for hot/cold splits
+_FUNCTION_SECTION = re.compile(r"\.text\.(?:(?:unlikely|startup|hot|exit)\.)?(.+)")
+_HEX_DIGITS = "0123456789abcdefABCDEF"
+# What may follow raw bytes in a disassembly line: more bytes or a mnemonic.
+# Operands carry punctuation ("d0,", "%st", "(%rax)", "4(PC)").
+_BYTES_OR_MNEMONIC = re.compile(r"[0-9A-Fa-f]+|[A-Za-z][\w.]*")
+_OBJDUMP_SYMBOL = re.compile(r"[0-9a-fA-F]+ <([^>]+)>:$")
+
+# objdump -d output, rewritten by _objdump_lines
+_OBJDUMP_INSTRUCTION = re.compile(r"\s*([0-9a-fA-F]+):\s+(\S.*)")
+_OBJDUMP_SOURCE_LINE = re.compile(r"(?:; )?(\S[^:]*):(\d+)(?: \(discriminator \d+\))?$")
+_OBJDUMP_COMMENT = re.compile(r"\s+(?:#|//|;)\s.*$")
+_OBJDUMP_TARGET = re.compile(r"\b(?:0x)?[0-9a-fA-F]+ (<[^>]+>)")
+
+
+def _raw_bytes(parts: list[str], index: int, known: dict) -> bool:
+    """
+    Whether parts[index], a token after the start of an instruction line, is
+    raw bytes ("4889c8", "d503201f") rather than the mnemonic. Bytes come
+    whole, so a token of odd length ("add", "bcc") or one that is not hex is
+    a mnemonic, as is a known instruction. A hex token that starts with a
+    letter ("fadd", "adde") is a mnemonic when operands follow it, and bytes
+    when more bytes or a mnemonic do.
+    """
+    part = parts[index]
+    if len(part) % 2 or part.strip(_HEX_DIGITS) or part.lower() in known:
+        return False
+    if part[0].isdigit():
+        return True
+    if index + 1 == len(parts):
+        # A line of bytes alone continues the previous instruction
+        return len(part) == 2
+    return _BYTES_OR_MNEMONIC.fullmatch(parts[index + 1]) is not None
+
+
+def _iter_lines(source: str | bytes | Iterable) -> Iterator[str]:
+    """Iterate over the lines of a string, bytes, file object, mmap or line iterable."""
+    if isinstance(source, str):
+        # Split lazily so a large string is not duplicated as a list of lines
+        start = 0
+        while True:
+            end = source.find("\n", start)
+            if end < 0:
+                yield source[start:]
+                return
+            yield source[start:end]
+            start = end + 1
+    elif isinstance(source, (bytes, bytearray)):
+        yield from _iter_lines(io.BytesIO(source))
+    elif isinstance(source, mmap.mmap):
+        for raw in iter(source.readline, b""):
+            yield raw.decode(errors="replace")
+    else:
+        for line in source:
+            yield line.decode(errors="replace") if isinstance(line, bytes) else line
+
+
+def _objdump_lines(lines: Iterable[str]) -> Iterator[str]:
+    """
+    Rewrite `objdump -d` or `llvm-objdump -d` output into lines AssemblyParser reads.
+
+    - "   3:\tidiv %esi" becomes "0x3 idiv %esi"; trailing comments are dropped
+      and branch targets keep only their symbolic form ("<f+0x10>")
+    - "/path/file.c:12" (from --line-numbers) becomes "# /path/file.c:12"
+    - "0000000000000000 <symbol>:" is kept as the function start
+    - section headers, file banners and the like are dropped
+    """
+    for line in lines:
+        match = _OBJDUMP_INSTRUCTION.match(line)
+        if match:
+            instruction = _OBJDUMP_TARGET.sub(r"\1", _OBJDUMP_COMMENT.sub("", match.group(2)))
+            yield f"0x{match.group(1)} {instruction}"
+            continue
+
+        line = line.strip()
+        if line.endswith(">:"):
+            yield line
+            continue
+        match = _OBJDUMP_SOURCE_LINE.match(line)
+        if match:
+            yield f"# {match.group(1)}:{match.group(2)}"
 
 
 class AssemblyParser:
@@ -802,59 +1485,156 @@ class AssemblyParser:
             self.errors = arch_instructions.get("errors", {})
             self.warnings = arch_instructions.get("warnings", {})
 
+        # Merged lookup tables: mnemonic -> (severity, reason, reported mnemonic).
+        # Errors take precedence over warnings for a mnemonic listed in both.
+        self._error_table = {
+            m: (Severity.ERROR, reason, m.upper()) for m, reason in self.errors.items()
+        }
+        self._full_table = {
+            **{m: (Severity.WARNING, reason, m.upper()) for m, reason in self.warnings.items()},
+            **self._error_table,
+        }
+
     def parse(
-        self, assembly_text: str, include_warnings: bool = False
+        self,
+        assembly_text: str | Iterable,
+        include_warnings: bool = False,
+        previous: dict[str, list[dict]] | None = None,
+        function_filter: str | re.Pattern | None = None,
+        hash_functions: bool = False,
     ) -> tuple[list[dict], list[Violation]]:
         """
         Parse assembly text and detect violations.
+        Accepts the same inputs as iter_parse.
         Returns (functions, violations).
         """
         functions = []
         violations = []
+        for function, function_violations in self.iter_parse(
+            assembly_text, include_warnings, previous, function_filter, hash_functions
+        ):
+            if function is not None:
+                functions.append(function)
+            violations.extend(function_violations)
+        return functions, violations
 
+    def iter_parse(
+        self,
+        source: str | bytes | Iterable,
+        include_warnings: bool = False,
+        previous: dict[str, list[dict]] | None = None,
+        function_filter: str | re.Pattern | None = None,
+        hash_functions: bool = False,
+    ) -> Iterator[tuple[dict | None, list[Violation]]]:
+        """
+        Parse assembly incrementally, one function at a time.
+
+        source may be a string, bytes, a text or binary file object, an mmap
+        or any iterable of lines. Only the current function's state is held
+        in memory.
+
+        Yields (function, violations) each time a function ends. function is
+        {"name", "instructions", "line"}, where line is the first source line
+        seen in the function. Instructions that appear before the first
+        function are yielded with function=None (and only when they produced
+        violations).
+
+        hash_functions adds "hash", which identifies the normalized
+        instruction stream, to each function. Hashing costs time on every
+        instruction, so it is off unless a later run needs the hashes.
+
+        previous maps function names to entries from an earlier run (see
+        function_baseline), and implies hash_functions. A function whose
+        hash matches its entry is not classified again; the earlier
+        violations are carried forward, with line numbers shifted by how
+        far the function moved.
+
+        function_filter is a regex searched in function names. The
+        instructions of other functions are skipped without being hashed or
+        classified, and those functions are not yielded.
+        """
+        table = self._full_table if include_warnings else self._error_table
+        known = self._full_table
+        previous = previous or {}
+        hash_functions = hash_functions or bool(previous)
+        pattern = re.compile(function_filter) if function_filter else None
+        # Instructions before the first function belong to "<unknown>"
+        skipping = pattern is not None and not pattern.search("<unknown>")
+        occurrences = {}
         current_function = None
         current_file = None
         current_line = None
         instruction_count = 0
+        violations = []
+        digest = hashlib.sha256(self.arch.encode()) if hash_functions else None
+        first_line = None
+        baseline = None
+        pending = None
 
-        for line in assembly_text.split("\n"):
+        for line in _iter_lines(source):
             line = line.strip()
-
-            # Skip empty lines and comments
-            if not line or line.startswith("#") or line.startswith("//") or line.startswith(";"):
-                # Check for file/line info in comments
-                file_match = re.search(r"#\s*([^:]+):(\d+)", line)
-                if file_match:
-                    current_file = file_match.group(1)
-                    current_line = int(file_match.group(2))
+            if not line:
+                continue
+            first = line[0]
+
+            # Comments: "#", ";" and "//". They may carry file/line info.
+            if first == "#" or first == ";" or (first == "/" and line.startswith("//")):
+                if "#" in line:
+                    file_match = _FILE_LINE_COMMENT.search(line)
+                    if file_match:
+                        current_file = file_match.group(1)
+                        current_line = int(file_match.group(2))
                 continue
 
-            # Detect function start (various formats)
-            func_match = (
-                # GCC/Clang: function_name:
-                re.match(r"^([a-zA-Z_][a-zA-Z0-9_]*):$", line)
-                or
-                # Go objdump: TEXT symbol_name(SB) file
-                re.match(r"^TEXT\s+([^\s(]+)\(SB\)", line)
-                or
-                # With .type directive
-                re.match(r"\.type\s+([a-zA-Z_][a-zA-Z0-9_]*),\s*@function", line)
-            )
+            # Function starts, dispatched on the shape of the line:
+            # - ".type name, @function" (any other line starting with "." is a directive)
+            # - "name:" (GCC/Clang labels)
+            # - "TEXT symbol(SB) file" (Go objdump)
+            # - "0000000000001040 <symbol>:" (objdump)
+            if first == ".":
+                func_match = _TYPE_DIRECTIVE.match(line)
+                if func_match is None:
+                    continue
+            elif line[-1] == ":":
+                func_match = (
+                    _LABEL.match(line) or _GO_TEXT.match(line) or _OBJDUMP_SYMBOL.match(line)
+                )
+            elif first == "T":
+                func_match = _GO_TEXT.match(line)
+            else:
+                func_match = None
 
             if func_match:
-                if current_function:
-                    functions.append(
-                        {
-                            "name": current_function,
-                            "instructions": instruction_count,
-                        }
+                if not skipping:
+                    ended = self._end_function(
+                        table,
+                        current_function,
+                        instruction_count,
+                        digest,
+                        first_line,
+                        violations,
+                        baseline,
+                        pending,
                     )
+                    if ended is not None:
+                        yield ended
+
                 current_function = func_match.group(1)
+                skipping = pattern is not None and not pattern.search(current_function)
                 instruction_count = 0
+                violations = []
+                digest = hashlib.sha256(self.arch.encode()) if hash_functions else None
+                first_line = None
+
+                # Match repeated names to the earlier run's entries in order
+                occurrence = occurrences.get(current_function, 0)
+                occurrences[current_function] = occurrence + 1
+                candidates = previous.get(current_function, ())
+                baseline = candidates[occurrence] if occurrence < len(candidates) else None
+                pending = [] if baseline is not None else None
                 continue
 
-            # Skip directives
-            if line.startswith("."):
+            if skipping:
                 continue
 
             # Parse instruction
@@ -863,24 +1643,16 @@ class AssemblyParser:
             # - "   0x1234   mov %rax, %rbx"
             # - "   file:10   0x1234   aabbccdd   mov %rax, %rbx"
 
-            instruction = line
-            address = ""
-
-            # Extract address if present
-            addr_match = re.search(r"0x([0-9a-fA-F]+)", line)
-            if addr_match:
-                address = "0x" + addr_match.group(1)
-
-            # Extract mnemonic (first word-like token that's not an address or file ref)
-            parts = line.split()
+            # Extract mnemonic: the first token that's not an address, hex bytes
+            # or a file:line reference (see _raw_bytes for mnemonics spelled
+            # with hex letters)
             mnemonic = ""
-            for part in parts:
-                # Skip addresses, hex bytes, file references
-                if part.startswith("0x") or re.match(r"^[0-9a-fA-F]{2,}$", part):
+            parts = line.split()
+            for index, part in enumerate(parts):
+                if part.startswith("0x") or (index and _raw_bytes(parts, index, known)):
                     continue
-                if ":" in part and not part.endswith(":"):  # file:line reference
+                if ":" in part and not part.endswith(":"):
                     continue
-                # This should be the mnemonic
                 mnemonic = part.lower().rstrip(":")
                 break
 
@@ -889,54 +1661,266 @@ class AssemblyParser:
 
             instruction_count += 1
 
+            # Hash the instruction without its position: disassembly prefixes
+            # (addresses, raw bytes, file:line) and absolute addresses in
+            # operands are dropped, and local label numbers are erased
+            if digest is not None:
+                if index:
+                    normalized = _ADDRESS.sub("0x", " ".join(parts[index:]))
+                else:
+                    normalized = line
+                if ".L" in normalized:
+                    normalized = _LOCAL_LABEL.sub(".L", normalized)
+                digest.update(normalized.encode() + b"\n")
+            if first_line is None:
+                first_line = current_line
+
+            # Defer classification while the function may turn out unchanged
+            if pending is not None:
+                pending.append((line, current_file, current_line, mnemonic))
+                continue
+
             # Check for violations
-            if mnemonic in self.errors:
-                violations.append(
-                    Violation(
-                        function=current_function or "<unknown>",
-                        file=current_file or "",
-                        line=current_line,
-                        address=address,
-                        instruction=instruction,
-                        mnemonic=mnemonic.upper(),
-                        reason=self.errors[mnemonic],
-                        severity=Severity.ERROR,
-                    )
-                )
-            elif include_warnings and mnemonic in self.warnings:
+            entry = table.get(mnemonic)
+            if entry is not None:
                 violations.append(
-                    Violation(
-                        function=current_function or "<unknown>",
-                        file=current_file or "",
-                        line=current_line,
-                        address=address,
-                        instruction=instruction,
-                        mnemonic=mnemonic.upper(),
-                        reason=self.warnings[mnemonic],
-                        severity=Severity.WARNING,
-                    )
+                    self._violation(entry, current_function, current_file, current_line, line)
                 )
 
         # Don't forget the last function
-        if current_function:
-            functions.append(
-                {
-                    "name": current_function,
-                    "instructions": instruction_count,
-                }
+        if not skipping:
+            ended = self._end_function(
+                table,
+                current_function,
+                instruction_count,
+                digest,
+                first_line,
+                violations,
+                baseline,
+                pending,
             )
+            if ended is not None:
+                yield ended
+
+    @staticmethod
+    def _violation(
+        entry: tuple[Severity, str, str],
+        function: str | None,
+        file: str | None,
+        line_number: int | None,
+        line: str,
+    ) -> Violation:
+        # The address is only needed for reported instructions
+        addr_match = _ADDRESS.search(line)
+        severity, reason, reported = entry
+        return Violation(
+            function=function or "<unknown>",
+            file=file or "",
+            line=line_number,
+            address="0x" + addr_match.group(1) if addr_match else "",
+            instruction=line,
+            mnemonic=reported,
+            reason=reason,
+            severity=severity,
+        )
+
+    def _end_function(
+        self,
+        table: dict,
+        name: str | None,
+        instruction_count: int,
+        digest,
+        first_line: int | None,
+        violations: list[Violation],
+        baseline: dict | None,
+        pending: list | None,
+    ) -> tuple[dict | None, list[Violation]] | None:
+        """Finish the current function: resolve deferred classification and build its entry."""
+        if name is None:
+            return (None, violations) if violations else None
+
+        function_hash = digest.hexdigest() if digest is not None else None
+        if pending is not None:
+            if baseline["hash"] == function_hash:
+                delta = 0
+                if first_line is not None and baseline.get("line") is not None:
+                    delta = first_line - baseline["line"]
+                violations = [
+                    dataclasses.replace(v, line=v.line + delta if v.line is not None else None)
+                    for v in baseline["violations"]
+                ]
+            else:
+                for line, file, line_number, mnemonic in pending:
+                    entry = table.get(mnemonic)
+                    if entry is not None:
+                        violations.append(self._violation(entry, name, file, line_number, line))
+
+        function = {"name": name, "instructions": instruction_count}
+        if function_hash is not None:
+            function["hash"] = function_hash
+        function["line"] = first_line
+        return function, violations
+
+
+# Shared parsers, keyed on (arch, compiler). Parsers hold no per-parse state,
+# so one instance serves concurrent callers.
+_PARSERS: dict[tuple[str, str], AssemblyParser] = {}
+
+
+def get_parser(arch: str, compiler: str) -> AssemblyParser:
+    """Return the shared parser for an architecture, building its tables on first use."""
+    key = (arch, compiler)
+    if key not in _PARSERS:
+        _PARSERS[key] = AssemblyParser(arch, compiler)
+    return _PARSERS[key]
+
+
+def function_baseline(
+    previous: AnalysisReport | None, include_warnings: bool
+) -> dict[str, list[dict]]:
+    """
+    Index an earlier report for AssemblyParser.iter_parse(previous=...).
+
+    Returns {} when the earlier report cannot stand in for a fresh parse: it
+    has no function hashes, or it left out warnings that are now requested.
+    """
+    if previous is None or not previous.functions:
+        return {}
+    if include_warnings and previous.include_warnings is not True:
+        return {}
+
+    by_function = {}
+    for v in previous.violations:
+        if include_warnings or v.severity == Severity.ERROR:
+            by_function.setdefault(v.function, []).append(v)
+
+    # Entries are keyed by the assembly symbol, which differs from the
+    # reported name when symbols were demangled
+    baseline = {}
+    names = {}
+    sizes = {}
+    for function in previous.functions:
+        if "hash" not in function:
+            return {}
+        symbol = function.get("symbol", function["name"])
+        baseline.setdefault(symbol, []).append(
+            {"hash": function["hash"], "line": function.get("line"), "violations": []}
+        )
+        names[symbol] = function["name"]
+        sizes.setdefault(function["name"], []).append(function["instructions"])
+
+    # A symbol usually occurs twice (".type name, @function", then "name:")
+    # with only the last occurrence holding instructions; its violations
+    # belong there. Names with several non-empty bodies cannot be attributed
+    # and are always classified again.
+    for symbol, entries in list(baseline.items()):
+        name = names[symbol]
+        if sum(1 for size in sizes[name] if size) > 1:
+            del baseline[symbol]
+        else:
+            entries[-1]["violations"] = by_function.get(name, [])
+    return baseline
+
+
+def _mark_changes(functions: list[dict], previous: AnalysisReport) -> None:
+    """Label each function "unchanged", "changed" or "new" relative to an earlier report."""
+    hashes = {}
+    for function in previous.functions:
+        hashes.setdefault(function["name"], set()).add(function.get("hash"))
+    for function in functions:
+        if function["name"] not in hashes:
+            function["status"] = "new"
+        elif function.get("hash") in hashes[function["name"]]:
+            function["status"] = "unchanged"
+        else:
+            function["status"] = "changed"
+
+
+def _select_violations(
+    violations: list[Violation], include_warnings: bool, pattern: re.Pattern | None
+) -> list[Violation]:
+    """Drop warnings unless requested, and violations outside the function filter."""
+    if not include_warnings:
+        violations = [v for v in violations if v.severity == Severity.ERROR]
+    if pattern is not None:
+        violations = [v for v in violations if pattern.search(v.function)]
+    return violations
+
+
+def _emit_selected(
+    on_violations: Callable[[list[Violation]], None],
+    include_warnings: bool,
+    pattern: re.Pattern | None,
+    violations: list[Violation],
+) -> None:
+    """Hand on_violations the violations that _select_violations keeps, if any."""
+    selected = _select_violations(violations, include_warnings, pattern)
+    if selected:
+        on_violations(selected)
 
-        return functions, violations
+
+def _collect(
+    results: Iterable[tuple[dict | None, list[Violation]]],
+    on_violations: Callable[[list[Violation]], None] | None = None,
+) -> tuple[list[dict], list[Violation]]:
+    """
+    Gather the (function, violations) pairs of iter_parse. With
+    on_violations, each function's violations are passed to it as the
+    function ends instead of being returned.
+    """
+    functions = []
+    violations = []
+    for function, function_violations in results:
+        if function is not None:
+            functions.append(function)
+        if not function_violations:
+            continue
+        if on_violations is None:
+            violations.extend(function_violations)
+        else:
+            on_violations(function_violations)
+    return functions, violations
 
 
+def _function_sections(lines: Iterable[str], pattern: re.Pattern) -> Iterator[str]:
+    """
+    Drop the function sections (.text.<name>) of functions that do not match
+    pattern from assembly lines. Every other section is passed through, so
+    this only saves work when the compiler emitted one section per function.
+    """
+    keep = previous = True
+    stack = []
+    for line in lines:
+        match = _SECTION_DIRECTIVE.match(line)
+        if match:
+            directive, name = match.groups()
+            if directive == "previous":
+                keep, previous = previous, keep
+            elif directive == "popsection":
+                if stack:
+                    keep, previous = stack.pop()
+            else:
+                section = _FUNCTION_SECTION.fullmatch(name.strip('"'))
+                if directive == "pushsection":
+                    stack.append((keep, previous))
+                keep, previous = section is None or bool(pattern.search(section.group(1))), keep
+        if keep:
+            yield line
+
+
+@profiled_file
 def analyze_source(
     source_file: str,
     arch: str = None,
-    compiler: str = None,
+    compiler: str | Compiler = None,
     optimization: str = "O2",
     include_warnings: bool = False,
     function_filter: str = None,
     extra_flags: list[str] = None,
+    cache=None,
+    previous: AnalysisReport | None = None,
+    on_violations: Callable[[list[Violation]], None] | None = None,
+    hash_functions: bool = False,
 ) -> AnalysisReport:
     """
     Analyze a source file for constant-time violations.
@@ -944,11 +1928,21 @@ def analyze_source(
     Args:
         source_file: Path to the source file to analyze
         arch: Target architecture (default: native, ignored for scripting languages)
-        compiler: Compiler to use (default: auto-detect from language)
+        compiler: Compiler name or instance (default: auto-detect from language)
         optimization: Optimization level (default: O2, ignored for scripting languages)
         include_warnings: Include warning-level violations
         function_filter: Regex pattern to filter functions
         extra_flags: Extra flags to pass to the compiler (ignored for scripting languages)
+        cache: Optional AnalysisCache for compiled languages; a hit skips the
+            compiler and the parser
+        previous: Optional earlier report for the same file (compiled
+            languages); functions whose instructions did not change keep
+            their earlier results instead of being classified again
+        on_violations: Optional callback for streaming output. Each function's
+            violations are passed to it as soon as the parser finishes the
+            function, and the returned report's violations list is empty
+        hash_functions: Record a hash of each function's instructions in
+            report.functions, for a later --since run (implied by previous)
 
     Returns:
         AnalysisReport with results
@@ -977,7 +1971,7 @@ def analyze_source(
                 "typescript": "Node.js",
                 "python": "Python",
                 "ruby": "Ruby",
-                "java": "Java (javac/javap)",
+                "java": "Java (javac)",
                 "csharp": ".NET SDK",
                 "kotlin": "Kotlin (kotlinc)",
             }
@@ -986,11 +1980,16 @@ def analyze_source(
                 f"{runtime} is not available. Please install it to analyze {language} files."
             )
 
-        return analyzer.analyze(
+        report = analyzer.analyze(
             str(source_path.absolute()),
             include_warnings=include_warnings,
             function_filter=function_filter,
         )
+        if on_violations is not None:
+            if report.violations:
+                on_violations(report.violations)
+            report.violations = []
+        return report
 
     # Compiled languages use assembly analysis
     arch = normalize_arch(arch or get_native_arch())
@@ -999,7 +1998,103 @@ def analyze_source(
     if not compiler_obj.is_available():
         raise RuntimeError(f"Compiler not available: {compiler_obj.name}")
 
-    # Compile to assembly
+    if cache is not None:
+        with phase("read"):
+            cache_key = cache.key(str(source_path), compiler_obj, arch, optimization, extra_flags)
+            cached = cache.get(cache_key) if cache_key is not None else None
+    else:
+        cache_key = cached = None
+
+    pattern = re.compile(function_filter) if function_filter else None
+    if cached is not None:
+        _, functions, cached_violations = cached
+        violations = [_violation_from_dict(v) for v in cached_violations]
+    else:
+        emit = (
+            functools.partial(_emit_selected, on_violations, include_warnings, pattern)
+            if on_violations is not None
+            else None
+        )
+
+        # A previous report without warnings can only carry errors forward, so
+        # a run that uses it collects no warnings and cannot fill the cache
+        incremental = previous is not None and previous.functions
+        if incremental and not (include_warnings or previous.include_warnings):
+            cache = None
+
+        # A filtered run only parses the matching functions, so its results
+        # cannot be cached for later runs
+        if pattern is not None:
+            cache = None
+            extra_flags = [*(extra_flags or []), *compiler_obj.FUNCTION_SECTIONS_FLAGS]
+
+        # A cached entry must serve later runs with and without warnings,
+        # and with --since
+        functions, violations = _compile_and_parse(
+            compiler_obj,
+            source_path,
+            arch,
+            optimization,
+            extra_flags,
+            include_warnings or cache is not None,
+            cache,
+            cache_key,
+            previous,
+            emit,
+            pattern,
+            hash_functions or previous is not None or cache is not None,
+        )
+
+    with phase("filter"):
+        violations = _select_violations(violations, include_warnings, pattern)
+        if pattern is not None:
+            functions = [f for f in functions if pattern.search(f["name"])]
+
+    # Parsed violations were already handed on; cached ones are handed on now
+    if on_violations is not None:
+        if cached is not None and violations:
+            on_violations(violations)
+        violations = []
+
+    if previous is not None:
+        _mark_changes(functions, previous)
+
+    return AnalysisReport(
+        architecture=arch,
+        compiler=compiler_obj.name,
+        optimization=optimization,
+        source_file=str(source_file),
+        total_functions=len(functions),
+        total_instructions=sum(f["instructions"] for f in functions),
+        violations=violations,
+        functions=functions,
+        include_warnings=include_warnings,
+    )
+
+
+def _compile_and_parse(
+    compiler_obj: Compiler,
+    source_path: Path,
+    arch: str,
+    optimization: str,
+    extra_flags: list[str] | None,
+    include_warnings: bool,
+    cache=None,
+    cache_key: str | None = None,
+    previous: AnalysisReport | None = None,
+    on_violations: Callable[[list[Violation]], None] | None = None,
+    function_filter: re.Pattern | None = None,
+    hash_functions: bool = False,
+) -> tuple[list[dict], list[Violation]]:
+    """
+    Compile a source file to assembly and parse it. Returns (functions, violations).
+    When a cache is given, the assembly and the results are stored under cache_key.
+    Unchanged functions of a previous report are carried forward, not re-classified.
+    With on_violations, each function's violations are passed to it as the
+    parser yields them and are only kept if the cache needs them.
+    With function_filter, the sections and instructions of other functions
+    are skipped. hash_functions is passed on to the parser.
+    """
     with tempfile.NamedTemporaryFile(mode="w", suffix=".s", delete=False) as asm_file:
         asm_path = asm_file.name
 
@@ -1015,39 +2110,44 @@ def analyze_source(
         if not success:
             raise RuntimeError(f"Compilation failed: {error}")
 
-        with open(asm_path) as f:
-            assembly_text = f.read()
-
-        # Parse and analyze
-        parser = AssemblyParser(arch, compiler_obj.name)
-        functions, violations = parser.parse(assembly_text, include_warnings)
-
-        # Filter functions if requested
-        if function_filter:
-            pattern = re.compile(function_filter)
-            violations = [v for v in violations if pattern.search(v.function)]
-            functions = [f for f in functions if pattern.search(f["name"])]
-
-        return AnalysisReport(
-            architecture=arch,
-            compiler=compiler_obj.name,
-            optimization=optimization,
-            source_file=str(source_file),
-            total_functions=len(functions),
-            total_instructions=sum(f["instructions"] for f in functions),
-            violations=violations,
-        )
+        # Parse and analyze, streaming from the file
+        parser = get_parser(arch, compiler_obj.name)
+        baseline = function_baseline(previous, include_warnings)
+        functions = []
+        violations = []
+        with phase("parse"), open(asm_path, errors="replace") as f:
+            lines = f if function_filter is None else _function_sections(f, function_filter)
+            for function, function_violations in parser.iter_parse(
+                lines, include_warnings, baseline, function_filter, hash_functions
+            ):
+                if function is not None:
+                    functions.append(function)
+                if on_violations is not None and function_violations:
+                    on_violations(function_violations)
+                if on_violations is None or cache is not None:
+                    violations.extend(function_violations)
+
+        if cache is not None and cache_key is not None:
+            with phase("store"):
+                cache.put(
+                    cache_key, asm_path, functions, [_violation_to_dict(v) for v in violations]
+                )
+        return functions, violations
 
     finally:
         if os.path.exists(asm_path):
             os.unlink(asm_path)
 
 
+@profiled_file
 def analyze_assembly(
     assembly_file: str,
     arch: str,
     include_warnings: bool = False,
     function_filter: str = None,
+    previous: AnalysisReport | None = None,
+    on_violations: Callable[[list[Violation]], None] | None = None,
+    hash_functions: bool = False,
 ) -> AnalysisReport:
     """
     Analyze pre-compiled assembly for constant-time violations.
@@ -1057,22 +2157,30 @@ def analyze_assembly(
         arch: Target architecture
         include_warnings: Include warning-level violations
         function_filter: Regex pattern to filter functions
+        previous: Optional earlier report; unchanged functions keep their results
+        on_violations: Optional callback that receives each function's
+            violations as it is parsed, instead of the report (see analyze_source)
+        hash_functions: Record a hash of each function's instructions in
+            report.functions, for a later --since run (implied by previous)
 
     Returns:
         AnalysisReport with results
     """
     arch = normalize_arch(arch)
 
-    with open(assembly_file) as f:
-        assembly_text = f.read()
-
-    parser = AssemblyParser(arch, "unknown")
-    functions, violations = parser.parse(assembly_text, include_warnings)
+    parser = get_parser(arch, "unknown")
+    baseline = function_baseline(previous, include_warnings)
+    pattern = re.compile(function_filter) if function_filter else None
+    with phase("parse"), open(assembly_file, errors="replace") as f:
+        lines = f if pattern is None else _function_sections(f, pattern)
+        hash_functions = hash_functions or previous is not None
+        functions, violations = _collect(
+            parser.iter_parse(lines, include_warnings, baseline, pattern, hash_functions),
+            on_violations,
+        )
 
-    if function_filter:
-        pattern = re.compile(function_filter)
-        violations = [v for v in violations if pattern.search(v.function)]
-        functions = [f for f in functions if pattern.search(f["name"])]
+    if previous is not None:
+        _mark_changes(functions, previous)
 
     return AnalysisReport(
         architecture=arch,
@@ -1082,41 +2190,1540 @@ def analyze_assembly(
         total_functions=len(functions),
         total_instructions=sum(f["instructions"] for f in functions),
         violations=violations,
+        functions=functions,
+        include_warnings=include_warnings,
     )
 
 
-def format_report(report: AnalysisReport, format_type: OutputFormat) -> str:
-    """Format an analysis report for output."""
+@profiled("read")
+def _function_symbols(binary_file: str) -> list[str]:
+    """
+    Names of the functions defined in a binary's symbol table, read with
+    objdump -t. Empty for stripped binaries.
+    """
+    registry = get_registry()
+    tool = next((t for t in ("objdump", "llvm-objdump") if registry.is_available(t)), None)
+    if tool is None:
+        return []
+    result = subprocess.run(
+        [tool, "-t", binary_file], capture_output=True, text=True, errors="replace"
+    )
+    symbols = []
+    for line in result.stdout.splitlines():
+        match = _SYMBOL_TABLE_ENTRY.match(line)
+        if match and "F" in match.group(1) and match.group(2) != "*UND*":
+            symbols.append(match.group(3))
+    return symbols
 
-    if format_type == OutputFormat.JSON:
-        return json.dumps(
+
+def _objdump_command(binary_file: str, arch: str, symbols: list[str] | None = None) -> list[str]:
+    """
+    Disassembler command for a binary: GNU objdump for native code, llvm-objdump
+    (which handles every target) otherwise. --line-numbers is only requested
+    when the file has DWARF line information.
+
+    With symbols, only those functions are disassembled. GNU objdump honours
+    a single --disassemble=SYMBOL, so llvm-objdump is preferred for several;
+    without it the whole file is disassembled.
+    """
+    registry = get_registry()
+    tools = ["objdump", "llvm-objdump"]
+    if arch != get_native_arch() or (symbols and len(symbols) > 1):
+        tools.reverse()
+    tool = next((t for t in tools if registry.is_available(t)), None)
+    if tool is None:
+        raise RuntimeError("objdump or llvm-objdump is required to analyze binaries")
+
+    if not symbols:
+        command = [tool, "-d"]
+    elif tool == "llvm-objdump":
+        command = [tool, "--disassemble-symbols=" + ",".join(symbols)]
+    elif len(symbols) == 1:
+        command = [tool, "--disassemble=" + symbols[0]]
+    else:
+        command = [tool, "-d"]
+    command.append("--no-show-raw-insn")
+    with open(binary_file, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+        if data.find(b".debug_line") >= 0:
+            command.append("--line-numbers")
+    return [*command, binary_file]
+
+
+@profiled_file
+def analyze_binary(
+    binary_file: str,
+    arch: str = None,
+    include_warnings: bool = False,
+    function_filter: str = None,
+    previous: AnalysisReport | None = None,
+    on_violations: Callable[[list[Violation]], None] | None = None,
+    hash_functions: bool = False,
+) -> AnalysisReport:
+    """
+    Analyze an ELF object file or shared library for constant-time violations.
+
+    The file is disassembled with objdump or llvm-objdump and the output is
+    streamed into the parser. With debug information, violations carry the
+    source file and line.
+
+    Args:
+        binary_file: Path to the ELF file
+        arch: Target architecture (default: read from the ELF header)
+        include_warnings: Include warning-level violations
+        function_filter: Regex pattern to filter functions
+        previous: Optional earlier report; unchanged functions keep their results
+        on_violations: Optional callback that receives each function's
+            violations as it is disassembled, instead of the report (see analyze_source)
+        hash_functions: Record a hash of each function's instructions in
+            report.functions, for a later --since run (implied by previous)
+
+    Returns:
+        AnalysisReport with results
+    """
+    if not Path(binary_file).exists():
+        raise FileNotFoundError(f"Binary not found: {binary_file}")
+
+    detected = detect_binary_arch(binary_file)
+    if arch is None:
+        if detected is None:
+            raise RuntimeError(f"Cannot determine the architecture of {binary_file}; pass --arch")
+        arch = detected
+    arch = normalize_arch(arch)
+    if detected is not None and detected != arch:
+        raise RuntimeError(f"{binary_file} is built for {detected}, not {arch}")
+
+    # With a filter, only the matching symbols are disassembled. Stripped
+    # binaries have no symbol table and are disassembled in full.
+    pattern = re.compile(function_filter) if function_filter else None
+    symbols = None
+    if pattern is not None:
+        defined = _function_symbols(binary_file)
+        if defined:
+            symbols = [name for name in defined if pattern.search(name)]
+
+    command = _objdump_command(binary_file, arch, symbols)
+    parser = get_parser(arch, os.path.basename(command[0]))
+    baseline = function_baseline(previous, include_warnings)
+    hash_functions = hash_functions or previous is not None
+    if symbols == []:
+        functions, violations = [], []
+    else:
+        # stderr goes to a file so a chatty disassembler cannot block the pipe.
+        # Disassembly and parsing overlap, so they are one phase.
+        with phase("disassemble"), tempfile.TemporaryFile() as stderr:
+            with subprocess.Popen(
+                command, stdout=subprocess.PIPE, stderr=stderr, text=True, errors="replace"
+            ) as proc:
+                functions, violations = _collect(
+                    parser.iter_parse(
+                        _objdump_lines(proc.stdout),
+                        include_warnings,
+                        baseline,
+                        pattern,
+                        hash_functions,
+                    ),
+                    on_violations,
+                )
+            if proc.returncode != 0:
+                stderr.seek(0)
+                raise RuntimeError(f"Disassembly failed: {stderr.read().decode(errors='replace')}")
+
+    if previous is not None:
+        _mark_changes(functions, previous)
+
+    return AnalysisReport(
+        architecture=arch,
+        compiler=os.path.basename(command[0]),
+        optimization="unknown",
+        source_file=binary_file,
+        total_functions=len(functions),
+        total_instructions=sum(f["instructions"] for f in functions),
+        violations=violations,
+        functions=functions,
+        include_warnings=include_warnings,
+    )
+
+
+def _analyze_member(member_file: str, options: dict) -> tuple[str, AnalysisReport | None, str]:
+    """Worker entry point for analyze_archive. Returns (member label, report, error)."""
+    options = dict(options)
+    label = options.pop("label")
+    try:
+        with file_scope(label):
+            report = analyze_binary(member_file, **options)
+    except Exception as e:
+        # One malformed member is reported, not fatal to the archive
+        return label, None, str(e) or type(e).__name__
+    report.source_file = label
+    return label, report, ""
+
+
+def analyze_archive(
+    archive_file: str,
+    arch: str = None,
+    include_warnings: bool = False,
+    function_filter: str = None,
+    jobs: int | None = None,
+    previous: dict[str, AnalysisReport] | None = None,
+    on_result: Callable[[str, AnalysisReport | None, str], None] | None = None,
+    hash_functions: bool = False,
+) -> tuple[list[AnalysisReport], dict[str, str]]:
+    """
+    Analyze every object file in a static archive on a bounded process pool.
+
+    Members are reported as "archive.a(member.o)". Members that are not ELF
+    objects (LLVM bitcode, for instance) are reported as errors.
+
+    Args:
+        archive_file: Path to the .a archive
+        arch: Target architecture (default: read from each member's ELF header)
+        include_warnings: Include warning-level violations
+        function_filter: Regex pattern to filter functions
+        jobs: Number of worker processes (default: number of CPUs)
+        previous: Optional earlier reports keyed by member label (see load_reports)
+        on_result: Optional callback for streaming output; receives
+            (label, report, error) as soon as each member is finished,
+            with report None when it failed
+        hash_functions: Record a hash of each function's instructions in
+            report.functions, for a later --since run (implied by previous)
+
+    Returns:
+        (reports, errors) where reports are in archive order and errors maps
+        each failed member to its error message
+    """
+    if not Path(archive_file).exists():
+        raise FileNotFoundError(f"Archive not found: {archive_file}")
+
+    previous = previous or {}
+    options = {
+        "arch": arch,
+        "include_warnings": include_warnings,
+        "function_filter": function_filter,
+        "hash_functions": hash_functions,
+    }
+    with tempfile.TemporaryDirectory(prefix="ct-archive-") as tmpdir:
+        tasks = []
+        errors = {}
+        for index, (name, data) in enumerate(_archive_members(archive_file)):
+            label = f"{archive_file}({name})"
+            if isinstance(data, str):
+                member_file = data
+            else:
+                # Names may repeat within an archive; the index keeps the files apart
+                member_file = os.path.join(tmpdir, f"{index}-{os.path.basename(name)}")
+                with open(member_file, "wb") as f:
+                    f.write(data)
+            if detect_binary_kind(member_file) != "elf":
+                errors[label] = "Not an ELF object"
+                if on_result is not None:
+                    on_result(label, None, errors[label])
+                continue
+            tasks.append(
+                (member_file, {**options, "label": label, "previous": previous.get(label)})
+            )
+
+        results = _run_analyses(tasks, jobs, _analyze_member, on_result) if tasks else []
+
+    reports = [report for _, report, _ in results if report is not None]
+    errors.update({label: error for label, report, error in results if report is None})
+    return reports, errors
+
+
+@dataclass
+class CompileCommand:
+    """One entry of a compilation database (compile_commands.json)."""
+
+    directory: str
+    file: str
+    arguments: list[str]
+
+    @property
+    def source_path(self) -> str:
+        return os.path.normpath(os.path.join(self.directory, self.file))
+
+
+def load_compile_commands(path: str) -> list[CompileCommand]:
+    """
+    Read a compilation database. path may also be the directory holding
+    compile_commands.json. Entries that repeat the same compilation are dropped.
+    Raises RuntimeError if the file is not a compilation database.
+    """
+    if os.path.isdir(path):
+        path = os.path.join(path, "compile_commands.json")
+    with open(path) as f:
+        try:
+            entries = json.load(f)
+        except ValueError as e:
+            raise RuntimeError(f"Invalid compilation database {path}: {e}") from e
+
+    commands = []
+    seen = set()
+    try:
+        for entry in entries:
+            arguments = entry.get("arguments") or shlex.split(entry["command"])
+            command = CompileCommand(entry["directory"], entry["file"], arguments)
+            key = (command.directory, tuple(arguments))
+            if key not in seen:
+                seen.add(key)
+                commands.append(command)
+    except (AttributeError, KeyError, ValueError) as e:
+        raise RuntimeError(f"Invalid compilation database {path}: {e!r}") from e
+    return commands
+
+
+# Flags that select the output or write dependency files; replaced by "-S -o".
+# Those with a value are dropped both as "-o file" and joined as "-ofile".
+_COMPDB_DROP_FLAGS = {"-c", "-S", "-E", "-M", "-MM", "-MD", "-MMD", "-MP", "-MG"}
+_COMPDB_DROP_WITH_VALUE = ("-o", "-MF", "-MT", "-MQ")
+
+# First component of a target triple -> architecture
+_TRIPLE_ARCH = re.compile(
+    r"(?P<x86_64>x86_64|amd64)|(?P<i386>i[3-6]86)|(?P<arm64>aarch64|arm64)"
+    r"|(?P<arm>arm\w*)|(?P<riscv64>riscv64)|(?P<ppc64le>powerpc64le|ppc64le)|(?P<s390x>s390x)$"
+)
+
+
+def _compile_command_arch(arguments: list[str]) -> str | None:
+    """
+    Target architecture named by a compile command (--target, -m32, cross
+    prefix), or None if it names none. Raises ValueError for a --target
+    triple whose architecture is not supported.
+    """
+    triple = None
+    for i, arg in enumerate(arguments):
+        if arg.startswith("--target="):
+            triple = arg.split("=", 1)[1]
+        elif arg in ("-target", "--target") and i + 1 < len(arguments):
+            triple = arguments[i + 1]
+        elif arg == "-m32":
+            return "i386"
+    if triple is not None:
+        match = _TRIPLE_ARCH.match(triple.split("-")[0])
+        if match is None:
+            raise ValueError(f"Unsupported target architecture: {triple}")
+        return match.lastgroup
+
+    # Cross compilers are named after their triple: aarch64-linux-gnu-gcc. A
+    # name that only looks like one (a wrapper script) means the native target.
+    name = os.path.basename(arguments[0])
+    match = _TRIPLE_ARCH.match(name.split("-")[0]) if name.count("-") >= 2 else None
+    return match.lastgroup if match else None
+
+
+def _assembly_command(
+    arguments: list[str], source_file: str, output_file: str, extra_flags: Iterable[str] = ()
+) -> list[str]:
+    """
+    Rewrite a compile command to emit assembly: the output and dependency
+    flags are replaced by "-S -o output_file" (-E for preprocessed assembly
+    sources) and LTO is disabled so the output holds machine code. Every
+    other flag is kept as is, and extra_flags are added when compiling.
+    """
+    command = []
+    skip = False
+    for arg in arguments:
+        if skip:
+            skip = False
+        elif arg in _COMPDB_DROP_FLAGS:
+            pass
+        elif arg in _COMPDB_DROP_WITH_VALUE:
+            skip = True
+        elif arg.startswith(_COMPDB_DROP_WITH_VALUE):
+            pass
+        else:
+            command.append(arg)
+
+    if source_file.endswith(".S"):
+        return [*command, "-E", "-o", output_file]
+    return [*command, *extra_flags, "-S", "-fno-lto", "-o", output_file]
+
+
+def _compile_entry(
+    command: CompileCommand, output_file: str, extra_flags: Iterable[str] = ()
+) -> tuple[str | None, str | None, str]:
+    """
+    Produce the assembly of one database entry.
+    Returns (assembly_path, assembly_digest, error); .s sources are used as is.
+    """
+    source = command.source_path
+    if source.endswith(".s"):
+        output_file = source
+    else:
+        try:
+            with phase("compile", command.file):
+                result = subprocess.run(
+                    _assembly_command(command.arguments, command.file, output_file, extra_flags),
+                    cwd=command.directory,
+                    capture_output=True,
+                    text=True,
+                )
+        except OSError as e:
+            return None, None, str(e)
+        if result.returncode != 0:
+            return None, None, f"Compilation failed: {result.stderr}"
+
+    digest = hashlib.sha256()
+    try:
+        with open(output_file, "rb") as f:
+            for chunk in iter(lambda: f.read(1 << 20), b""):
+                digest.update(chunk)
+    except OSError as e:
+        return None, None, str(e)
+    return output_file, digest.hexdigest(), ""
+
+
+def _analyze_compiled(assembly_file: str, options: dict) -> tuple[str, AnalysisReport | None, str]:
+    """Worker entry point for analyze_compile_commands. Returns (source, report, error)."""
+    options = dict(options)
+    source_file = options.pop("source_file")
+    compiler = options.pop("compiler")
+    optimization = options.pop("optimization")
+    try:
+        with file_scope(source_file):
+            report = analyze_assembly(assembly_file, **options)
+    except Exception as e:
+        # One unparsable translation unit is reported, not fatal to the run
+        return source_file, None, str(e) or type(e).__name__
+    report.source_file = source_file
+    report.compiler = compiler
+    report.optimization = optimization
+    return source_file, report, ""
+
+
+def analyze_compile_commands(
+    database: str,
+    arch: str = None,
+    include_warnings: bool = False,
+    function_filter: str = None,
+    jobs: int | None = None,
+    previous: dict[str, AnalysisReport] | None = None,
+    on_result: Callable[[str, AnalysisReport | None, str], None] | None = None,
+    hash_functions: bool = False,
+) -> tuple[list[AnalysisReport], dict[str, str]]:
+    """
+    Analyze every translation unit of a compilation database.
+
+    Each entry is recompiled with its own flags (include paths, defines,
+    optimization level), with the output switched to assembly. Compilations
+    run concurrently; entries whose assembly is byte-for-byte identical to an
+    earlier entry's (the same file built twice, for instance) are parsed once.
+    A translation unit that fails to compile does not abort the run.
+
+    Args:
+        database: Path to compile_commands.json or the directory holding it
+        arch: Architecture of entries whose flags name no target (default: native)
+        include_warnings: Include warning-level violations
+        function_filter: Regex pattern to filter functions
+        jobs: Number of concurrent compilations and parser processes
+            (default: number of CPUs)
+        previous: Optional earlier reports keyed by source file (see load_reports)
+        on_result: Optional callback for streaming output; receives
+            (label, report, error) as soon as each entry is finished,
+            with report None when it failed
+        hash_functions: Record a hash of each function's instructions in
+            report.functions, for a later --since run (implied by previous)
+
+    Returns:
+        (reports, errors) where reports are in database order and errors maps
+        each failed source file to its error message
+    """
+    commands = load_compile_commands(database)
+    default_arch = normalize_arch(arch or get_native_arch())
+    previous = previous or {}
+    workers = jobs or os.cpu_count() or 1
+
+    with tempfile.TemporaryDirectory(prefix="ct-compdb-") as tmpdir:
+        outputs = [os.path.join(tmpdir, f"{i}.s") for i in range(len(commands))]
+        # With a filter, one section per function lets the parser drop the rest
+        flags = GCCCompiler.FUNCTION_SECTIONS_FLAGS if function_filter else []
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            compiled = list(
+                pool.map(_compile_entry, commands, outputs, itertools.repeat(flags))
+            )
+
+        errors = {}
+        tasks = []
+        labels = []
+        parsed = {}  # (digest, arch) -> label of the entry whose assembly is parsed
+        task_options = {}  # label of a parsed entry -> its options
+        copies = []  # (label, label of the entry with identical assembly)
+        variants = {}  # source -> distinct (digest, arch) keys seen for it
+        for command, (asm_path, digest, error) in zip(commands, compiled):
+            source = command.source_path
+            if asm_path is not None:
+                try:
+                    entry_arch = _compile_command_arch(command.arguments) or default_arch
+                except ValueError as e:
+                    asm_path, error = None, str(e)
+            if asm_path is None:
+                errors[source] = error
+                if on_result is not None:
+                    on_result(source, None, error)
+                continue
+            key = (digest, entry_arch)
+            seen = variants.setdefault(source, [])
+            if key in seen:
+                continue
+            seen.append(key)
+            # A file built with different flags (and assembly) is reported once per variant
+            label = source if len(seen) == 1 else f"{source} ({len(seen)})"
+            labels.append(label)
+
+            if key in parsed:
+                copies.append((label, parsed[key]))
+                if label in previous:
+                    # The copy is compared with its own earlier report
+                    task_options[parsed[key]]["hash_functions"] = True
+                continue
+            parsed[key] = label
+
+            optimization = next(
+                (a[1:] for a in reversed(command.arguments) if re.fullmatch(r"-O\w*", a)), "O0"
+            )
+            options = {
+                "source_file": label,
+                "compiler": os.path.basename(command.arguments[0]),
+                "optimization": optimization,
+                "arch": entry_arch,
+                "include_warnings": include_warnings,
+                "function_filter": function_filter,
+                "previous": previous.get(label),
+                "hash_functions": hash_functions,
+            }
+            task_options[label] = options
+            tasks.append((asm_path, options))
+
+        def copy_report(report, label):
+            # Statuses relative to the original's previous report are replaced
+            functions = [{k: v for k, v in f.items() if k != "status"} for f in report.functions]
+            if label in previous:
+                _mark_changes(functions, previous[label])
+            return dataclasses.replace(report, source_file=label, functions=functions)
+
+        def finished(label, report, error):
+            # Entries with identical assembly finish with the one that was parsed
+            on_result(label, report, error)
+            for copy, original in copies:
+                if original == label:
+                    if report is None:
+                        on_result(copy, None, error)
+                    else:
+                        on_result(copy, copy_report(report, copy), "")
+
+        results = (
+            _run_analyses(tasks, jobs, _analyze_compiled, on_result and finished) if tasks else []
+        )
+
+    by_label = {label: report for label, report, _ in results if report is not None}
+    errors.update({label: error for label, report, error in results if report is None})
+    for label, original in copies:
+        if original in by_label:
+            by_label[label] = copy_report(by_label[original], label)
+        else:
+            errors[label] = errors[original]
+
+    reports = [by_label[label] for label in labels if label in by_label]
+    return reports, errors
+
+
+# Demanglers in order of preference; both read one symbol per line on stdin
+DEMANGLERS = (["rustfilt"], ["c++filt"])
+
+# Legacy Rust symbols end in a hash that c++filt keeps ("::h0123456789abcdef")
+_RUST_HASH = re.compile(r"::h[0-9a-f]{16}$")
+
+
+@profiled("parse")
+def demangle_symbols(symbols: Iterable[str]) -> dict[str, str]:
+    """
+    Demangle Rust and C++ symbols in a single rustfilt or c++filt run.
+    Returns {symbol: readable name}; without a demangler, names are kept as is.
+    """
+    symbols = sorted(set(symbols))
+    registry = get_registry()
+    for command in DEMANGLERS:
+        if not symbols or not registry.is_available(command[0]):
+            continue
+        result = subprocess.run(
+            command, input="\n".join(symbols) + "\n", capture_output=True, text=True
+        )
+        names = result.stdout.splitlines()
+        if result.returncode == 0 and len(names) == len(symbols):
+            return {symbol: _RUST_HASH.sub("", name) for symbol, name in zip(symbols, names)}
+    return {symbol: symbol for symbol in symbols}
+
+
+def _demangle_results(functions: list[dict], violations: list[Violation]) -> None:
+    """Replace symbols by readable names in place; each function keeps its "symbol"."""
+    names = demangle_symbols(f["name"] for f in functions)
+    for function in functions:
+        function["symbol"] = function["name"]
+        function["name"] = names[function["name"]]
+    for v in violations:
+        v.function = names.get(v.function, v.function)
+
+
+def find_cargo_manifest(path: str) -> str | None:
+    """The Cargo.toml a crate-mode input refers to: the file itself or the one in a directory."""
+    candidate = Path(path)
+    if candidate.is_dir():
+        candidate = candidate / "Cargo.toml"
+    return str(candidate) if candidate.name == "Cargo.toml" and candidate.is_file() else None
+
+
+def _cargo_target_dir(manifest: str) -> str:
+    """Per-workspace cargo target directory kept in the cache directory between runs."""
+    digest = hashlib.sha256(str(Path(manifest).resolve()).encode()).hexdigest()[:16]
+    return os.path.join(default_cache_dir(), "cargo", digest)
+
+
+def _cargo_targets(package: dict) -> list[tuple[list[str], str]]:
+    """
+    cargo rustc target selections for a package, its library else each
+    binary, with the crate names rustc builds them under. A library's name
+    comes from its target, which [lib] name may set apart from the package's.
+    """
+    library = {"lib", "rlib", "dylib", "cdylib", "staticlib"}
+    for target in package["targets"]:
+        if library & set(target["kind"]):
+            return [(["--lib"], target["name"].replace("-", "_"))]
+    return [
+        (["--bin", t["name"]], t["name"].replace("-", "_"))
+        for t in package["targets"]
+        if "bin" in t["kind"]
+    ]
+
+
+@profiled("compile")
+def _cargo_emit_asm(
+    manifest: str,
+    selection: list[str],
+    crate: str,
+    cargo_flags: list[str],
+    rustc_flags: list[str],
+    env: dict,
+) -> Path:
+    """
+    Run cargo rustc for one crate target and return the path of its assembly.
+
+    The file is located through cargo's artifact messages, which name the
+    crate's metadata hash even when cargo found the build up to date.
+    """
+    build = subprocess.run(
+        [
+            "cargo",
+            "rustc",
+            "--release",
+            "--message-format=json",
+            "--manifest-path",
+            manifest,
+            *selection,
+            *cargo_flags,
+            "--",
+            *rustc_flags,
+        ],
+        capture_output=True,
+        text=True,
+        env=env,
+    )
+    if build.returncode != 0:
+        raise RuntimeError(f"cargo rustc failed: {build.stderr}")
+
+    artifacts = []
+    for line in build.stdout.splitlines():
+        message = json.loads(line) if line.startswith("{") else {}
+        if message.get("reason") == "compiler-artifact" and message.get("manifest_path") == manifest:
+            artifacts.extend(Path(f) for f in message["filenames"])
+
+    hashed = re.compile(rf"(?:lib)?{re.escape(crate)}-([0-9a-f]+)\.\w+$")
+    for artifact in artifacts:
+        match = hashed.match(artifact.name)
+        if match:
+            deps_dir = artifact.parent if artifact.parent.name == "deps" else artifact.parent / "deps"
+            output = deps_dir / f"{crate}-{match.group(1)}.s"
+            if output.exists():
+                return output
+
+    # Binaries are reported without their hash; take the newest assembly
+    candidates = [
+        path for artifact in artifacts for path in (artifact.parent / "deps").glob(f"{crate}-*.s")
+    ]
+    if not candidates:
+        raise RuntimeError(f"cargo rustc produced no assembly for {crate}")
+    return max(candidates, key=lambda path: path.stat().st_mtime)
+
+
+def analyze_crate(
+    path: str,
+    arch: str = None,
+    optimization: str = None,
+    include_warnings: bool = False,
+    function_filter: str = None,
+    previous: dict[str, AnalysisReport] | None = None,
+    on_result: Callable[[str, AnalysisReport | None, str], None] | None = None,
+    hash_functions: bool = False,
+) -> tuple[list[AnalysisReport], dict[str, str]]:
+    """
+    Analyze a Cargo package or workspace, one report per member crate.
+
+    Each crate is built with one `cargo rustc --release -- --emit=asm`, so
+    modules and dependencies resolve as in a normal build. The target
+    directory lives in the cache directory and is built incrementally, so
+    dependencies are compiled once across runs. The crate's assembly is
+    parsed function by function, and symbols are demangled in one batch so
+    reports and function filters use paths like crate::module::function.
+
+    Args:
+        path: Cargo.toml, or the directory holding it
+        arch: Target architecture (default: native)
+        optimization: Optimization level overriding the release profile (default: profile's)
+        include_warnings: Include warning-level violations
+        function_filter: Regex pattern on demangled function names
+        previous: Optional earlier reports keyed by crate manifest (see load_reports)
+        on_result: Optional callback for streaming output; receives
+            (label, report, error) as soon as each crate is finished,
+            with report None when it failed
+        hash_functions: Record a hash of each function's instructions in
+            report.functions, for a later --since run (implied by previous)
+
+    Returns:
+        (reports, errors) where errors maps each crate that failed to build
+        to the error message
+    """
+    manifest = find_cargo_manifest(path)
+    if manifest is None:
+        raise FileNotFoundError(f"Cargo.toml not found: {path}")
+    if not get_registry().is_available("cargo"):
+        raise RuntimeError("cargo is not available. Please install Rust to analyze crates.")
+
+    arch = normalize_arch(arch or get_native_arch())
+    previous = previous or {}
+    with phase("read", manifest):
+        result = subprocess.run(
+            [
+                "cargo",
+                "metadata",
+                "--no-deps",
+                "--format-version",
+                "1",
+                "--manifest-path",
+                manifest,
+            ],
+            capture_output=True,
+            text=True,
+        )
+    if result.returncode != 0:
+        raise RuntimeError(f"cargo metadata failed: {result.stderr}")
+    metadata = json.loads(result.stdout)
+    members = set(metadata["workspace_members"])
+
+    cargo_flags = []
+    if arch != get_native_arch():
+        cargo_flags = ["--target", RustCompiler.ARCH_TARGETS.get(arch, arch)]
+    rustc_flags = ["--emit=asm"]
+    if optimization:
+        rustc_flags += ["-C", f"opt-level={RustCompiler.OPT_LEVELS.get(optimization, '2')}"]
+    env = {**os.environ, "CARGO_TARGET_DIR": _cargo_target_dir(manifest), "CARGO_INCREMENTAL": "1"}
+
+    reports = []
+    errors = {}
+    for package in metadata["packages"]:
+        if package["id"] not in members:
+            continue
+        label = package["manifest_path"]
+        parser = get_parser(arch, "rustc")
+        baseline = function_baseline(previous.get(label), include_warnings)
+        hash_crate = hash_functions or label in previous
+        functions = []
+        violations = []
+        try:
+            for selection, crate in _cargo_targets(package):
+                output = _cargo_emit_asm(label, selection, crate, cargo_flags, rustc_flags, env)
+                with phase("parse", label), open(output, errors="replace") as f:
+                    for function, function_violations in parser.iter_parse(
+                        f, include_warnings, baseline, hash_functions=hash_crate
+                    ):
+                        if function is not None:
+                            functions.append(function)
+                        violations.extend(function_violations)
+        except RuntimeError as e:
+            errors[label] = str(e)
+            if on_result is not None:
+                on_result(label, None, errors[label])
+            continue
+
+        _demangle_results(functions, violations)
+        if function_filter:
+            with phase("filter", label):
+                pattern = re.compile(function_filter)
+                violations = [v for v in violations if pattern.search(v.function)]
+                functions = [f for f in functions if pattern.search(f["name"])]
+        if label in previous:
+            _mark_changes(functions, previous[label])
+
+        reports.append(
+            AnalysisReport(
+                architecture=arch,
+                compiler="cargo",
+                optimization=optimization or "release",
+                source_file=label,
+                total_functions=len(functions),
+                total_instructions=sum(f["instructions"] for f in functions),
+                violations=violations,
+                functions=functions,
+                include_warnings=include_warnings,
+            )
+        )
+        if on_result is not None:
+            on_result(label, reports[-1], "")
+    return reports, errors
+
+
+# Module-mode languages by source suffix, in the order they are analyzed
+JVM_MODULE_SUFFIXES = {".java": "java", ".kt": "kotlin"}
+
+# Prebuilt .NET inputs: assemblies, and NuGet packages holding them
+DOTNET_ASSEMBLY_SUFFIXES = (".dll", ".exe")
+NUGET_PACKAGE_SUFFIX = ".nupkg"
+
+
+def jvm_module_languages(path: str) -> list[str]:
+    """
+    The JVM languages a module-mode input holds, or [] if it is not one.
+
+    A .jar is Kotlin if it carries a META-INF/*.kotlin_module file, else Java.
+    A directory is analyzed per language of the sources scan mode finds in
+    it; a directory without sources is a class directory (target/classes),
+    typed like a jar.
+    """
+    module = Path(path)
+    if module.is_file():
+        if module.suffix.lower() != ".jar" or not zipfile.is_zipfile(module):
+            return []
+        with zipfile.ZipFile(module) as archive:
+            names = archive.namelist()
+        kotlin = any(n.startswith("META-INF/") and n.endswith(".kotlin_module") for n in names)
+        return ["kotlin" if kotlin else "java"]
+    if not module.is_dir():
+        return []
+
+    suffixes = {Path(source).suffix.lower() for source in find_sources(path)}
+    languages = [language for suffix, language in JVM_MODULE_SUFFIXES.items() if suffix in suffixes]
+    if languages:
+        return languages
+    if next(module.glob("**/*.class"), None) is None:
+        return []
+    return ["kotlin" if next(module.glob("META-INF/*.kotlin_module"), None) else "java"]
+
+
+def analyze_jvm_module(
+    path: str,
+    include_warnings: bool = False,
+    function_filter: str = None,
+    on_result: Callable[[str, AnalysisReport | None, str], None] | None = None,
+) -> tuple[list[AnalysisReport], dict[str, str]]:
+    """
+    Analyze a Java or Kotlin module, one report per source file.
+
+    Each compiler run pays JVM startup, so instead of compiling file by file,
+    a source tree is compiled with one javac or kotlinc run, and its class
+    files are read in process. A directory of compiled classes (such as
+    target/classes) or a .jar is read directly, needing no JDK. A tree with
+    both Java and Kotlin sources is analyzed as one module per language.
+
+    Args:
+        path: Source directory, class directory or .jar
+        include_warnings: Include warning-level violations
+        function_filter: Regex pattern to filter functions
+        on_result: Optional callback for streaming output; receives
+            (label, report, error) as soon as each source file is finished,
+            with report None when it failed
+
+    Returns:
+        (reports, errors) where errors maps the module to the error message
+        of each language that failed to compile or disassemble
+    """
+    languages = jvm_module_languages(path)
+    if not languages:
+        raise FileNotFoundError(f"No Java or Kotlin sources, classes or jar: {path}")
+
+    try:
+        from .script_analyzers import get_script_analyzer
+    except ImportError:
+        from script_analyzers import get_script_analyzer
+
+    reports = []
+    failures = []
+    for language in languages:
+        analyzer = get_script_analyzer(language)
+        try:
+            # One compiler run per language: its files finish together
+            module_reports = analyzer.analyze_module(path, include_warnings, function_filter)
+        except RuntimeError as e:
+            failures.append(f"{language}: {e}")
+            continue
+        reports.extend(module_reports)
+        for report in module_reports if on_result is not None else ():
+            on_result(report.source_file, report, "")
+    errors = {path: "\n".join(failures)} if failures else {}
+    if errors and on_result is not None:
+        on_result(path, None, errors[path])
+    return reports, errors
+
+
+def is_csharp_project(path: str) -> bool:
+    """Whether path is a directory holding C# sources (as scan mode finds them)."""
+    return Path(path).is_dir() and any(
+        Path(source).suffix.lower() == ".cs" for source in find_sources(path)
+    )
+
+
+def analyze_csharp_project(
+    path: str,
+    include_warnings: bool = False,
+    function_filter: str = None,
+    on_result: Callable[[str, AnalysisReport | None, str], None] | None = None,
+) -> tuple[list[AnalysisReport], dict[str, str]]:
+    """
+    Analyze the C# sources under a directory, one report per source file.
+
+    The sources are compiled together in one build of the shared .NET
+    workspace (see DotnetWorkspace) and disassembled once, instead of one
+    build and one disassembly per file.
+
+    Args:
+        path: Directory of C# sources
+        include_warnings: Include warning-level violations
+        function_filter: Regex pattern to filter functions
+        on_result: Optional callback for streaming output; receives
+            (label, report, error) as soon as each source file is finished,
+            with report None when it failed
+
+    Returns:
+        (reports, errors) where errors maps the project to the error message
+        if it could not be analyzed
+    """
+    try:
+        from .script_analyzers import get_script_analyzer
+    except ImportError:
+        from script_analyzers import get_script_analyzer
+
+    analyzer = get_script_analyzer("csharp")
+    reports = []
+    errors = {}
+    try:
+        if not analyzer.is_available():
+            raise RuntimeError(
+                ".NET SDK is not available. Please install it to analyze csharp files."
+            )
+        # One build: the project's files finish together
+        reports = analyzer.analyze_project(path, include_warnings, function_filter)
+    except RuntimeError as e:
+        errors[path] = str(e)
+    if on_result is not None:
+        for report in reports:
+            on_result(report.source_file, report, "")
+        for label, error in errors.items():
+            on_result(label, None, error)
+    return reports, errors
+
+
+def is_dotnet_assembly(path: str) -> bool:
+    """
+    Whether path is a prebuilt .NET input: a .dll, .exe or NuGet package, or
+    a directory holding some of them and no sources (as scan mode finds them).
+    """
+    target = Path(path)
+    suffixes = (*DOTNET_ASSEMBLY_SUFFIXES, NUGET_PACKAGE_SUFFIX)
+    if target.is_file():
+        return target.suffix.lower() in suffixes
+    if not target.is_dir() or find_sources(path):
+        return False
+    return any(p.suffix.lower() in suffixes for p in target.glob("**/*") if p.is_file())
+
+
+def analyze_dotnet_assemblies(
+    path: str,
+    include_warnings: bool = False,
+    function_filter: str = None,
+    on_result: Callable[[str, AnalysisReport | None, str], None] | None = None,
+) -> tuple[list[AnalysisReport], dict[str, str]]:
+    """
+    Analyze prebuilt .NET assemblies, one report per assembly.
+
+    The IL is read from the assemblies in process (see cil.py), so neither
+    the .NET SDK nor a disassembler is needed. The entries of a NuGet package
+    are read without extracting it and reported as "package.nupkg(entry)".
+
+    Args:
+        path: A .dll or .exe, a .nupkg, or a directory holding any of them
+        include_warnings: Include warning-level violations
+        function_filter: Regex pattern to filter functions
+        on_result: Optional callback for streaming output; receives
+            (label, report, error) as soon as each assembly is finished,
+            with report None when it failed
+
+    Returns:
+        (reports, errors) where errors maps each assembly that could not be
+        read to its error message
+    """
+    try:
+        from .script_analyzers import get_script_analyzer
+    except ImportError:
+        from script_analyzers import get_script_analyzer
+
+    return get_script_analyzer("csharp").analyze_assemblies(
+        path, include_warnings, function_filter, on_result
+    )
+
+
+def _analyze_one(source_file: str, options: dict) -> tuple[str, AnalysisReport | None, str]:
+    """Worker entry point for analyze_many. Returns (source_file, report, error)."""
+    compiler = options.get("compiler")
+    if compiler:
+        # A compiler name only applies to C/C++ and a compiler instance only to
+        # its own languages; other languages keep their default toolchain
+        languages = compiler.languages if isinstance(compiler, Compiler) else ("c", "cpp")
+        if detect_language(source_file) not in languages:
+            options = {**options, "compiler": None}
+    try:
+        return source_file, analyze_source(source_file, **options), ""
+    except Exception as e:
+        # One unreadable or malformed file is reported, not fatal to the batch
+        return source_file, None, str(e) or type(e).__name__
+
+
+def _run_analyses(
+    tasks: list[tuple[str, dict]],
+    jobs: int | None,
+    worker=None,
+    on_result: Callable[[str, AnalysisReport | None, str], None] | None = None,
+) -> list[tuple[str, AnalysisReport | None, str]]:
+    """
+    Run (path, options) tasks through worker (default: _analyze_one) on a
+    bounded process pool. Results are returned in task order; on_result, if
+    given, receives each one as soon as it is finished.
+    """
+    worker = worker or _analyze_one
+    jobs = min(jobs or os.cpu_count() or 1, len(tasks))
+
+    if jobs <= 1:
+        results = []
+        for path, options in tasks:
+            results.append(worker(path, options))
+            if on_result is not None:
+                on_result(*results[-1])
+        return results
+
+    with ProcessPoolExecutor(max_workers=jobs) as pool:
+        futures = [pool.submit(worker, path, options) for path, options in tasks]
+        if on_result is not None:
+            for future in as_completed(futures):
+                on_result(*future.result())
+        return [future.result() for future in futures]
+
+
+def analyze_many(
+    source_files: list[str],
+    arch: str = None,
+    compiler: str | Compiler = None,
+    optimization: str = "O2",
+    include_warnings: bool = False,
+    function_filter: str = None,
+    extra_flags: list[str] = None,
+    jobs: int | None = None,
+    cache=None,
+    previous: dict[str, AnalysisReport] | None = None,
+    on_result: Callable[[str, AnalysisReport | None, str], None] | None = None,
+    hash_functions: bool = False,
+) -> tuple[list[AnalysisReport], dict[str, str]]:
+    """
+    Analyze several source files on a bounded process pool.
+
+    Each file goes through analyze_source, which routes bytecode languages to
+    the script analyzers. A file that fails to compile or lacks a toolchain
+    does not abort the batch; its error message is returned instead.
+
+    Args:
+        source_files: Paths of the source files to analyze
+        arch: Target architecture (default: native, ignored for scripting languages)
+        compiler: Compiler name for C/C++ sources, or a Compiler instance for
+            its own languages (default: auto-detect from language)
+        optimization: Optimization level (default: O2, ignored for scripting languages)
+        include_warnings: Include warning-level violations
+        function_filter: Regex pattern to filter functions
+        extra_flags: Extra flags to pass to the compiler (ignored for scripting languages)
+        jobs: Number of worker processes (default: number of CPUs)
+        cache: Optional AnalysisCache shared by the workers
+        previous: Optional earlier reports keyed by source file (see load_reports)
+        on_result: Optional callback for streaming output; receives
+            (label, report, error) as soon as each file is finished,
+            with report None when it failed
+        hash_functions: Record a hash of each function's instructions in
+            report.functions, for a later --since run (implied by previous)
+
+    Returns:
+        (reports, errors) where reports are in input order and errors maps
+        each failed source file to its error message
+    """
+    options = {
+        "arch": arch,
+        "compiler": compiler,
+        "optimization": optimization,
+        "include_warnings": include_warnings,
+        "function_filter": function_filter,
+        "extra_flags": extra_flags,
+        "cache": cache,
+        "hash_functions": hash_functions,
+    }
+    previous = previous or {}
+    tasks = [
+        (source_file, {**options, "previous": previous.get(source_file)})
+        for source_file in source_files
+    ]
+    results = _run_analyses(tasks, jobs, on_result=on_result)
+
+    reports = [report for _, report, _ in results if report is not None]
+    errors = {source_file: error for source_file, report, error in results if report is None}
+    return reports, errors
+
+
+def analyze_matrix(
+    source_file: str,
+    arches: list[str],
+    compiler: str | Compiler = None,
+    optimization: str = "O2",
+    include_warnings: bool = False,
+    function_filter: str = None,
+    extra_flags: list[str] = None,
+    jobs: int | None = None,
+    cache=None,
+) -> MatrixReport:
+    """
+    Compile one source for several architectures concurrently.
+
+    Each target is compiled with the compiler's own cross-compilation settings
+    (e.g. ClangCompiler.ARCH_TARGETS, GoCompiler.ARCH_MAP, the cross gcc named
+    in GCCCompiler.CROSS_PREFIXES) and parsed with the matching
+    AssemblyParser. A target that fails to compile is recorded in the report's
+    errors and does not abort the others; one whose toolchain is not installed
+    is recorded in its unavailable targets and not attempted.
+
+    Args:
+        source_file: Path to the source file to analyze
+        arches: Target architectures
+        compiler: Compiler name or instance (default: auto-detect from language)
+        optimization: Optimization level (default: O2)
+        include_warnings: Include warning-level violations
+        function_filter: Regex pattern to filter functions
+        extra_flags: Extra flags to pass to the compiler
+        jobs: Number of worker processes (default: number of CPUs)
+        cache: Optional AnalysisCache shared by the workers
+
+    Returns:
+        MatrixReport over the "architecture" dimension
+    """
+    if is_bytecode_language(detect_language(source_file)):
+        raise RuntimeError(
+            f"Architecture matrix does not apply to {detect_language(source_file)} "
+            "(bytecode is architecture-independent)"
+        )
+
+    arches = list(dict.fromkeys(normalize_arch(a) for a in arches))
+    compiler_obj = get_compiler(compiler, detect_language(source_file))
+    unavailable = {}
+    for arch in arches:
+        reason = compiler_obj.target_unavailable(arch)
+        if reason is not None:
+            unavailable[arch] = reason
+    base = {
+        "compiler": compiler,
+        "optimization": optimization,
+        "include_warnings": include_warnings,
+        "function_filter": function_filter,
+        "extra_flags": extra_flags,
+        "cache": cache,
+    }
+    available = [arch for arch in arches if arch not in unavailable]
+    matrix = _analyze_variants(source_file, "architecture", "arch", available, base, jobs)
+    matrix.variants = arches
+    matrix.unavailable = unavailable
+    return matrix
+
+
+OPTIMIZATION_LEVELS = ["O0", "O1", "O2", "O3", "Os", "Oz"]
+
+
+def analyze_sweep(
+    source_file: str,
+    levels: list[str] | None = None,
+    baseline: str = "O2",
+    arch: str = None,
+    compiler: str | Compiler = None,
+    include_warnings: bool = False,
+    function_filter: str = None,
+    extra_flags: list[str] = None,
+    jobs: int | None = None,
+    cache=None,
+) -> MatrixReport:
+    """
+    Compile one source at several optimization levels concurrently.
+
+    Args:
+        source_file: Path to the source file to analyze
+        levels: Optimization levels (default: O0, O1, O2, O3, Os, Oz)
+        baseline: Level the others are diffed against (default: O2, or the
+            first level when O2 is not swept)
+        arch: Target architecture (default: native)
+        compiler: Compiler name or instance (default: auto-detect from language)
+        include_warnings: Include warning-level violations
+        function_filter: Regex pattern to filter functions
+        extra_flags: Extra flags to pass to the compiler
+        jobs: Number of worker processes (default: number of CPUs)
+        cache: Optional AnalysisCache shared by the workers
+
+    Returns:
+        MatrixReport over the "optimization" dimension; use its diff() for the
+        violations each level introduces or removes relative to the baseline
+    """
+    language = detect_language(source_file)
+    if is_bytecode_language(language):
+        raise RuntimeError(
+            f"Optimization sweep does not apply to {language} (bytecode has no optimization levels)"
+        )
+
+    levels = list(dict.fromkeys(levels or OPTIMIZATION_LEVELS))
+    base = {
+        "arch": arch,
+        "compiler": compiler,
+        "include_warnings": include_warnings,
+        "function_filter": function_filter,
+        "extra_flags": extra_flags,
+        "cache": cache,
+    }
+    matrix = _analyze_variants(source_file, "optimization", "optimization", levels, base, jobs)
+    matrix.baseline = baseline if baseline in levels else levels[0]
+    return matrix
+
+
+def _analyze_variants(
+    source_file: str,
+    dimension: str,
+    option: str,
+    variants: list[str],
+    base: dict,
+    jobs: int | None,
+) -> MatrixReport:
+    """Analyze source_file once per variant of one analyze_source option, on the pool."""
+    tasks = [(source_file, {**base, option: variant}) for variant in variants]
+    results = _run_analyses(tasks, jobs)
+
+    matrix = MatrixReport(source_file=source_file, dimension=dimension, variants=variants)
+    for variant, (_, report, error) in zip(variants, results):
+        if report is None:
+            matrix.errors[variant] = error
+        else:
+            matrix.reports[variant] = report
+    return matrix
+
+
+def _violation_to_dict(v: Violation) -> dict:
+    """Convert a violation to its JSON-serializable form."""
+    return {
+        "function": v.function,
+        "file": v.file,
+        "line": v.line,
+        "address": v.address,
+        "instruction": v.instruction,
+        "mnemonic": v.mnemonic,
+        "reason": v.reason,
+        "severity": v.severity.value,
+    }
+
+
+def _violation_from_dict(d: dict) -> Violation:
+    """Inverse of _violation_to_dict."""
+    return Violation(**{**d, "severity": Severity(d["severity"])})
+
+
+def _report_to_dict(report: AnalysisReport, function_hashes: bool = False) -> dict:
+    """
+    Convert a report to the JSON-serializable structure used by the JSON format.
+    function_hashes adds the per-function entries a later --since run needs.
+    """
+    d = {
+        "architecture": report.architecture,
+        "compiler": report.compiler,
+        "optimization": report.optimization,
+        "source_file": report.source_file,
+        "total_functions": report.total_functions,
+        "total_instructions": report.total_instructions,
+        "error_count": report.error_count,
+        "warning_count": report.warning_count,
+        "passed": report.passed,
+        "violations": [_violation_to_dict(v) for v in report.violations],
+        "include_warnings": report.include_warnings,
+    }
+    if function_hashes:
+        d["functions"] = report.functions
+    return d
+
+
+def _report_from_dict(d: dict) -> AnalysisReport:
+    """Inverse of _report_to_dict."""
+    return AnalysisReport(
+        architecture=d["architecture"],
+        compiler=d["compiler"],
+        optimization=d["optimization"],
+        source_file=d["source_file"],
+        total_functions=d["total_functions"],
+        total_instructions=d["total_instructions"],
+        violations=[_violation_from_dict(v) for v in d.get("violations", [])],
+        functions=d.get("functions", []),
+        include_warnings=d.get("include_warnings"),
+    )
+
+
+@profiled("read")
+def load_reports(path: str) -> dict[str, AnalysisReport]:
+    """
+    Load the reports of an earlier --json run, keyed by source file.
+
+    Accepts both the single-file report and the multi-file scan layout.
+    Raises ValueError if the file is not such a report.
+    """
+    with open(path) as f:
+        data = json.load(f)
+    try:
+        entries = data["reports"] if "reports" in data else [data]
+        reports = [_report_from_dict(entry) for entry in entries]
+    except (KeyError, TypeError, ValueError) as e:
+        raise ValueError(f"Not an analysis report: {path}") from e
+    return {report.source_file: report for report in reports}
+
+
+SARIF_SCHEMA = "https://json.schemastore.org/sarif-2.1.0.json"
+TOOL_URI = "https://github.com/trailofbits/skills"
+
+
+def _report_summary(report: AnalysisReport, errors: int, warnings: int) -> dict:
+    """The --json report fields that do not grow with the number of violations."""
+    return {
+        "source_file": report.source_file,
+        "architecture": report.architecture,
+        "compiler": report.compiler,
+        "optimization": report.optimization,
+        "total_functions": report.total_functions,
+        "total_instructions": report.total_instructions,
+        "error_count": errors,
+        "warning_count": warnings,
+        "passed": errors == 0,
+    }
+
+
+class ReportWriter(ABC):
+    """
+    Writes violations to a text stream as they are found.
+
+    write_violations may be called any number of times per source file, e.g.
+    as the on_violations callback of analyze_source. write_report finishes a
+    file: violations still held by the report are written, followed by the
+    file's summary. write_result is the on_result callback of the multi-file
+    analyses (analyze_many, analyze_archive, ...). close ends the output;
+    passed is False once a file had errors or failed to analyze.
+    """
+
+    def __init__(self, stream):
+        self.stream = stream
+        self.passed = True
+        # source file -> [errors, warnings] written so far
+        self._counts: dict[str, list[int]] = {}
+
+    def write_violations(self, source_file: str, violations: Iterable[Violation]) -> None:
+        counts = self._counts.setdefault(source_file, [0, 0])
+        for v in violations:
+            counts[v.severity != Severity.ERROR] += 1
+            self._write_violation(source_file, v)
+        self.stream.flush()
+
+    def write_report(self, report: AnalysisReport) -> None:
+        self.write_violations(report.source_file, report.violations)
+        errors, warnings = self._counts.pop(report.source_file)
+        self.passed = self.passed and errors == 0
+        self._write_summary(_report_summary(report, errors, warnings))
+        self.stream.flush()
+
+    def write_error(self, source_file: str, message: str) -> None:
+        self.passed = False
+        self._write_error(source_file, message)
+        self.stream.flush()
+
+    def write_result(self, source_file: str, report: AnalysisReport | None, error: str) -> None:
+        """Finish a file of a multi-file run: its report, or its error if report is None."""
+        if report is None:
+            self.write_error(source_file, error)
+        else:
+            self.write_report(report)
+
+    def close(self) -> None:
+        self.stream.flush()
+
+    @abstractmethod
+    def _write_violation(self, source_file: str, violation: Violation) -> None:
+        """Write one violation of source_file."""
+        raise NotImplementedError
+
+    @abstractmethod
+    def _write_summary(self, summary: dict) -> None:
+        """Write the summary that ends a file (see _report_summary)."""
+        raise NotImplementedError
+
+    @abstractmethod
+    def _write_error(self, source_file: str, message: str) -> None:
+        """Write the error of a file that could not be analyzed."""
+        raise NotImplementedError
+
+
+class NDJSONWriter(ReportWriter):
+    """
+    Newline-delimited JSON. Every line is an object with a "type": a
+    "violation" (the --json violation fields plus source_file), a "report"
+    once a file is finished (its --json fields other than violations and
+    functions), or an "error" for a file that failed to analyze.
+    """
+
+    def _write(self, record: dict) -> None:
+        self.stream.write(json.dumps(record) + "\n")
+
+    def _write_violation(self, source_file: str, violation: Violation) -> None:
+        record = {"type": "violation", "source_file": source_file}
+        self._write({**record, **_violation_to_dict(violation)})
+
+    def _write_summary(self, summary: dict) -> None:
+        self._write({"type": "report", **summary})
+
+    def _write_error(self, source_file: str, message: str) -> None:
+        self._write({"type": "error", "source_file": source_file, "error": message})
+
+
+def _sarif_uri(path: str) -> str:
+    if os.path.isabs(path):
+        return Path(path).as_uri()
+    return urllib.parse.quote(path.replace(os.sep, "/"))
+
+
+class SARIFWriter(ReportWriter):
+    """
+    SARIF 2.1.0 with a single run. Results are written as they arrive; the
+    rules, the per-file summaries (run properties) and the analysis failures
+    (tool execution notifications) follow the results when the writer is
+    closed.
+    """
+
+    def __init__(self, stream):
+        super().__init__(stream)
+        # mnemonic -> reason of its first violation
+        self._rules: dict[str, str] = {}
+        self._summaries: list[dict] = []
+        self._notifications: list[dict] = []
+        self._separator = "\n"
+        stream.write(
+            f'{{"$schema": "{SARIF_SCHEMA}", "version": "2.1.0", "runs": [{{"results": ['
+        )
+
+    def _write_violation(self, source_file: str, violation: Violation) -> None:
+        self._rules.setdefault(violation.mnemonic, violation.reason)
+        location = {"artifactLocation": {"uri": _sarif_uri(violation.file or source_file)}}
+        if violation.line:
+            location["region"] = {"startLine": violation.line}
+        properties = {"instruction": violation.instruction}
+        if violation.address:
+            properties["address"] = violation.address
+        result = {
+            "ruleId": violation.mnemonic,
+            "level": violation.severity.value,
+            "message": {
+                "text": f"{violation.mnemonic} in {violation.function}: {violation.reason}"
+            },
+            "locations": [
+                {
+                    "physicalLocation": location,
+                    "logicalLocations": [
+                        {"fullyQualifiedName": violation.function, "kind": "function"}
+                    ],
+                }
+            ],
+            "properties": properties,
+        }
+        self.stream.write(self._separator + json.dumps(result))
+        self._separator = ",\n"
+
+    def _write_summary(self, summary: dict) -> None:
+        self._summaries.append(summary)
+
+    def _write_error(self, source_file: str, message: str) -> None:
+        self._notifications.append(
             {
-                "architecture": report.architecture,
-                "compiler": report.compiler,
-                "optimization": report.optimization,
-                "source_file": report.source_file,
-                "total_functions": report.total_functions,
-                "total_instructions": report.total_instructions,
-                "error_count": report.error_count,
-                "warning_count": report.warning_count,
-                "passed": report.passed,
-                "violations": [
-                    {
-                        "function": v.function,
-                        "file": v.file,
-                        "line": v.line,
-                        "address": v.address,
-                        "instruction": v.instruction,
-                        "mnemonic": v.mnemonic,
-                        "reason": v.reason,
-                        "severity": v.severity.value,
-                    }
-                    for v in report.violations
+                "level": "error",
+                "message": {"text": message},
+                "locations": [
+                    {"physicalLocation": {"artifactLocation": {"uri": _sarif_uri(source_file)}}}
                 ],
-            },
-            indent=2,
+            }
         )
 
+    def close(self) -> None:
+        rules = [
+            {"id": mnemonic, "shortDescription": {"text": reason}}
+            for mnemonic, reason in self._rules.items()
+        ]
+        run = {
+            "tool": {"driver": {"name": "ct-analyzer", "informationUri": TOOL_URI, "rules": rules}},
+            "invocations": [
+                {
+                    "executionSuccessful": not self._notifications,
+                    "toolExecutionNotifications": self._notifications,
+                }
+            ],
+            "properties": {"reports": self._summaries},
+        }
+        # The run's remaining members, after the open results array
+        self.stream.write("\n], " + json.dumps(run)[1:] + "]}\n")
+        super().close()
+
+
+WRITERS = {OutputFormat.NDJSON: NDJSONWriter, OutputFormat.SARIF: SARIFWriter}
+
+
+def _write_reports(
+    format_type: OutputFormat, reports: list[AnalysisReport], errors: dict[str, str]
+) -> str:
+    """Run finished reports through a streaming writer and return its output."""
+    output = io.StringIO()
+    writer = WRITERS[format_type](output)
+    for report in reports:
+        writer.write_report(report)
+    for source_file, error in errors.items():
+        writer.write_error(source_file, error)
+    writer.close()
+    return output.getvalue().rstrip("\n")
+
+
+@profiled("format")
+def format_report(
+    report: AnalysisReport, format_type: OutputFormat, function_hashes: bool = False
+) -> str:
+    """
+    Format an analysis report for output. function_hashes adds the function
+    hashes to JSON output (see _report_to_dict).
+    """
+
+    if format_type in WRITERS:
+        return _write_reports(format_type, [report], {})
+
+    if format_type == OutputFormat.JSON:
+        return json.dumps(_report_to_dict(report, function_hashes), indent=2)
+
     elif format_type == OutputFormat.GITHUB:
         lines = []
         for v in report.violations:
@@ -1139,6 +3746,12 @@ def format_report(report: AnalysisReport, format_type: OutputFormat) -> str:
         lines.append(f"Optimization: {report.optimization}")
         lines.append(f"Functions analyzed: {report.total_functions}")
         lines.append(f"Instructions analyzed: {report.total_instructions}")
+        statuses = [f["status"] for f in report.functions if "status" in f]
+        if statuses:
+            lines.append(
+                f"Since previous report: {statuses.count('changed')} changed, "
+                f"{statuses.count('new')} new, {statuses.count('unchanged')} unchanged"
+            )
         lines.append("")
 
         if report.violations:
@@ -1168,7 +3781,170 @@ def format_report(report: AnalysisReport, format_type: OutputFormat) -> str:
         return "\n".join(lines)
 
 
-def main():
+def _first_line(text: str) -> str:
+    """First non-empty line of a (possibly multi-line) error message."""
+    stripped = text.strip()
+    return stripped.splitlines()[0] if stripped else ""
+
+
+@profiled("format")
+def format_reports(
+    reports: list[AnalysisReport],
+    format_type: OutputFormat,
+    errors: dict[str, str] | None = None,
+    function_hashes: bool = False,
+) -> str:
+    """
+    Format the reports of a multi-file scan, plus the files that failed to
+    analyze. function_hashes adds the function hashes to JSON output.
+    """
+    errors = errors or {}
+
+    if format_type in WRITERS:
+        return _write_reports(format_type, reports, errors)
+
+    if format_type == OutputFormat.JSON:
+        return json.dumps(
+            {
+                "total_files": len(reports) + len(errors),
+                "error_count": sum(r.error_count for r in reports),
+                "warning_count": sum(r.warning_count for r in reports),
+                "passed": all(r.passed for r in reports) and not errors,
+                "reports": [_report_to_dict(r, function_hashes) for r in reports],
+                "errors": errors,
+            },
+            indent=2,
+        )
+
+    elif format_type == OutputFormat.GITHUB:
+        lines = [format_report(r, format_type) for r in reports if r.violations]
+        lines.extend(
+            f"::error file={source_file}::Analysis failed: {_first_line(error)}"
+            for source_file, error in errors.items()
+        )
+        return "\n".join(lines)
+
+    else:  # TEXT
+        sections = [format_report(r, format_type) for r in reports]
+        summary = ["=" * 60, "Scan Summary", "=" * 60]
+        failed = [r for r in reports if not r.passed]
+        summary.append(
+            f"Files analyzed: {len(reports)}, Failed: {len(failed)}, Errors: {len(errors)}"
+        )
+        for r in failed:
+            summary.append(f"  FAILED {r.source_file} ({r.error_count} errors)")
+        for source_file, error in errors.items():
+            summary.append(f"  ERROR  {source_file}: {_first_line(error)}")
+        status = "PASSED" if not failed and not errors else "FAILED"
+        summary.append(f"Result: {status}")
+        return "\n\n".join([*sections, "\n".join(summary)])
+
+
+@profiled("format")
+def format_matrix(matrix: MatrixReport, format_type: OutputFormat) -> str:
+    """Format a matrix report: which violation appears under which variant."""
+    rows = matrix.violation_matrix()
+    diff = matrix.diff() if matrix.baseline else []
+
+    if format_type == OutputFormat.JSON:
+        return json.dumps(
+            {
+                "source_file": matrix.source_file,
+                "dimension": matrix.dimension,
+                "variants": matrix.variants,
+                "passed": matrix.passed,
+                "matrix": [{**row, "severity": row["severity"].value} for row in rows],
+                "baseline": matrix.baseline,
+                "diff": [{**row, "severity": row["severity"].value} for row in diff],
+                "reports": {
+                    variant: _report_to_dict(report) for variant, report in matrix.reports.items()
+                },
+                "errors": matrix.errors,
+                "unavailable": matrix.unavailable,
+            },
+            indent=2,
+        )
+
+    elif format_type == OutputFormat.GITHUB:
+        lines = []
+        for row in rows:
+            level = "error" if row["severity"] == Severity.ERROR else "warning"
+            variants = ", ".join(row["variants"])
+            lines.append(
+                f"::{level} file={matrix.source_file}::{row['mnemonic']} in "
+                f"{row['function']} ({matrix.dimension}: {variants})"
+            )
+        for variant, error in matrix.errors.items():
+            lines.append(
+                f"::error file={matrix.source_file}::Analysis failed for {variant}: "
+                f"{_first_line(error)}"
+            )
+        for variant, reason in matrix.unavailable.items():
+            lines.append(f"::notice file={matrix.source_file}::Skipped {variant}: {reason}")
+        return "\n".join(lines)
+
+    else:  # TEXT
+        lines = []
+        lines.append("=" * 60)
+        lines.append(f"Constant-Time Analysis Matrix ({matrix.dimension})")
+        lines.append("=" * 60)
+        lines.append(f"Source: {matrix.source_file}")
+        for variant in matrix.variants:
+            report = matrix.reports.get(variant)
+            if variant in matrix.unavailable:
+                lines.append(f"  {variant}: SKIPPED {matrix.unavailable[variant]}")
+            elif report is None:
+                lines.append(f"  {variant}: ERROR {_first_line(matrix.errors[variant])}")
+            else:
+                status = "PASSED" if report.passed else "FAILED"
+                lines.append(
+                    f"  {variant}: {status} ({report.error_count} errors, "
+                    f"{report.warning_count} warnings, {report.total_functions} functions)"
+                )
+        lines.append("")
+
+        if rows:
+            analyzed = [v for v in matrix.variants if v in matrix.reports]
+            name_width = max(len(f"{r['function']} {r['mnemonic']}") for r in rows)
+            col_width = max(len(v) for v in analyzed)
+            header = " " * (name_width + 2) + " ".join(v.rjust(col_width) for v in analyzed)
+            lines.append(header)
+            lines.append("-" * len(header))
+            for row in rows:
+                name = f"{row['function']} {row['mnemonic']}"
+                cells = [str(row["variants"].get(v, "-")).rjust(col_width) for v in analyzed]
+                lines.append(f"{name.ljust(name_width)}  {' '.join(cells)}")
+        else:
+            lines.append("No violations found.")
+
+        if matrix.baseline:
+            lines.append("")
+            lines.append(f"Changes relative to {matrix.baseline}:")
+            if not diff:
+                lines.append("  (none)")
+            for row in diff:
+                name = f"{row['function']} {row['mnemonic']}"
+                if row["introduced"]:
+                    lines.append(f"  + {name}: introduced at {', '.join(row['introduced'])}")
+                if row["removed"]:
+                    lines.append(f"  - {name}: removed at {', '.join(row['removed'])}")
+                changed = [
+                    f"{v} {row['counts'][v]} ({delta:+d})"
+                    for v, delta in row["deltas"].items()
+                    if v not in row["introduced"] and v not in row["removed"]
+                ]
+                if changed:
+                    lines.append(
+                        f"  ~ {name}: {row['baseline']} at {matrix.baseline}, "
+                        f"{', '.join(changed)}"
+                    )
+
+        lines.append("-" * 40)
+        lines.append(f"Result: {'PASSED' if matrix.passed else 'FAILED'}")
+        return "\n".join(lines)
+
+
+def main(argv: list[str] | None = None):
     parser = argparse.ArgumentParser(
         description="Analyze code for constant-time violations",
         formatter_class=argparse.RawDescriptionHelpFormatter,
@@ -1179,6 +3955,7 @@ Examples:
   %(prog)s --arch arm64 crypto.go            # Analyze Go for ARM64
   %(prog)s --warnings crypto.c               # Include branch warnings
   %(prog)s --json crypto.c                   # Output as JSON
+  %(prog)s --sarif --warnings crypto.c       # Stream SARIF 2.1.0 for code-scanning tools
   %(prog)s CryptoUtils.java                  # Analyze Java (JVM bytecode)
   %(prog)s CryptoUtils.kt                    # Analyze Kotlin (JVM bytecode)
   %(prog)s CryptoUtils.cs                    # Analyze C# (CIL bytecode)
@@ -1186,6 +3963,21 @@ Examples:
   %(prog)s crypto.php                        # Analyze PHP (uses VLD/opcache)
   %(prog)s crypto.ts                         # Analyze TypeScript (transpiles first)
   %(prog)s crypto.js                         # Analyze JavaScript (V8 bytecode)
+  %(prog)s scan src/                         # Analyze every source under src/
+  %(prog)s scan -j 8 --json src/             # Scan with 8 workers, JSON output
+  %(prog)s --arch-matrix x86_64,arm64 x.c    # Compare violations across architectures
+  %(prog)s --opt-sweep crypto.c              # Diff violations across optimization levels
+  %(prog)s --json --function-hashes crypto.c > old.json  # Baseline for --since
+  %(prog)s --json --since old.json crypto.c  # Re-classify only functions that changed
+  %(prog)s libcrypto.a                       # Disassemble every object in an archive
+  %(prog)s --compile-commands build/         # Every translation unit, with its own flags
+  %(prog)s path/to/crate                     # Whole Cargo crate or workspace (release build)
+  %(prog)s src/main/java                     # Java/Kotlin module: one javac run
+  %(prog)s app.jar                           # Classes of a jar (or target/classes)
+  %(prog)s src/Crypto                        # C# project: all .cs files in one build
+  %(prog)s Package.1.0.0.nupkg               # Prebuilt .NET assemblies (.dll, .nupkg), no SDK
+  %(prog)s --serve --socket /tmp/ct.sock     # Serve JSON-RPC requests with warm caches
+  %(prog)s --profile trace.json scan src/    # Time each phase; open trace.json in Perfetto
 
 Supported languages:
   Native compiled: C, C++, Go, Rust, Swift
@@ -1195,15 +3987,26 @@ Supported languages:
 Supported architectures (native compiled languages only):
   x86_64, arm64, arm, riscv64, ppc64le, s390x, i386
 
+Binary inputs: ELF object files (.o), shared libraries (.so) and static archives (.a)
+
 Note: VM-compiled and scripting languages analyze bytecode and don't use --arch or --opt-level.
 """,
     )
 
-    parser.add_argument("source_file", help="Source file to analyze")
+    parser.add_argument(
+        "source_file",
+        nargs="?",
+        help="Source file, Cargo crate, Java/Kotlin module, C# project, .NET assembly or ELF "
+        "binary to analyze, or 'scan' to analyze every source under DIR",
+    )
+    parser.add_argument("scan_dir", nargs="?", metavar="DIR", help="Directory to scan")
     parser.add_argument("--arch", "-a", help="Target architecture (default: native)")
     parser.add_argument("--compiler", "-c", help="Compiler to use (gcc, clang, go, rustc)")
     parser.add_argument(
-        "--opt-level", "-O", default="O2", help="Optimization level (O0, O1, O2, O3, Os, Oz)"
+        "--opt-level",
+        "-O",
+        help="Optimization level (O0, O1, O2, O3, Os, Oz; default: O2, "
+        "or the release profile for Cargo crates)",
     )
     parser.add_argument(
         "--warnings",
@@ -1214,11 +4017,21 @@ Note: VM-compiled and scripting languages analyze bytecode and don't use --arch
     parser.add_argument("--func", "-f", help="Regex pattern to filter functions")
     parser.add_argument("--json", action="store_true", help="Output in JSON format")
     parser.add_argument("--github", action="store_true", help="Output GitHub Actions annotations")
+    parser.add_argument(
+        "--ndjson",
+        action="store_true",
+        help="Stream newline-delimited JSON, one violation per line, as functions are analyzed",
+    )
+    parser.add_argument(
+        "--sarif", action="store_true", help="Stream SARIF 2.1.0 as functions are analyzed"
+    )
     parser.add_argument(
         "--assembly", action="store_true", help="Input is already assembly (requires --arch)"
     )
     parser.add_argument(
-        "--list-arch", action="store_true", help="List supported architectures and exit"
+        "--list-arch",
+        action="store_true",
+        help="List supported architectures and the compilers that can target them, then exit",
     )
     parser.add_argument(
         "--extra-flags",
@@ -1227,28 +4040,356 @@ Note: VM-compiled and scripting languages analyze bytecode and don't use --arch
         default=[],
         help="Extra flags to pass to the compiler",
     )
+    parser.add_argument(
+        "--jobs",
+        "-j",
+        type=int,
+        help="Worker processes for scan, archives, --compile-commands, --arch-matrix "
+        "and --opt-sweep (default: number of CPUs)",
+    )
+    parser.add_argument(
+        "--arch-matrix",
+        metavar="ARCHES",
+        help="Analyze for several architectures concurrently (comma-separated, or 'all')",
+    )
+    parser.add_argument(
+        "--opt-sweep",
+        action="store_true",
+        help="Analyze at O0, O1, O2, O3, Os and Oz concurrently and diff against --opt-level",
+    )
+    parser.add_argument(
+        "--go-scope",
+        choices=["package", "binary"],
+        default="package",
+        help="Go disassembly scope: the analyzed package (default) or the whole binary",
+    )
+    parser.add_argument(
+        "--go-package",
+        action="append",
+        default=[],
+        metavar="IMPORT_PATH",
+        help="Also analyze this Go dependency package (repeatable)",
+    )
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="Always recompile; do not read or write the assembly cache",
+    )
+    parser.add_argument(
+        "--cache-dir",
+        help="Assembly cache directory (default: $CT_ANALYZER_CACHE_DIR or ~/.cache/ct-analyzer)",
+    )
+    parser.add_argument(
+        "--compile-commands",
+        metavar="PATH",
+        help="Analyze every entry of a compilation database (compile_commands.json or its directory)",
+    )
+    parser.add_argument(
+        "--serve",
+        action="store_true",
+        help="Run as a JSON-RPC server on stdin/stdout, keeping toolchains and caches warm",
+    )
+    parser.add_argument(
+        "--socket",
+        metavar="PATH",
+        help="With --serve, listen on this Unix socket instead of stdin/stdout",
+    )
+    parser.add_argument(
+        "--since",
+        metavar="REPORT",
+        help="Earlier --json --function-hashes report; only functions whose instructions "
+        "changed are re-classified",
+    )
+    parser.add_argument(
+        "--function-hashes",
+        action="store_true",
+        help="With --json, record each function's instruction hash so the report can serve "
+        "as a later --since baseline",
+    )
+    parser.add_argument(
+        "--profile",
+        metavar="TRACE",
+        help="Record wall time and memory growth of each phase, per file and worker; write a "
+        "Chrome trace to TRACE and print a summary to stderr",
+    )
+
+    args = parser.parse_args(argv)
 
-    args = parser.parse_args()
+    # Crate mode keeps the release profile's level unless one is given
+    crate_opt_level = args.opt_level
+    args.opt_level = args.opt_level or "O2"
+
+    scan_mode = args.source_file == "scan" and args.scan_dir is not None
+    if args.scan_dir is not None and not scan_mode:
+        parser.error(f"unexpected argument: {args.scan_dir}")
 
     if args.list_arch:
+        targets = probe_cross_targets()
         print("Supported Architectures:")
         print("=" * 40)
         for arch, instructions in DANGEROUS_INSTRUCTIONS.items():
             print(f"\n{arch}:")
             print(f"  Errors: {len(instructions.get('errors', {}))}")
             print(f"  Warnings: {len(instructions.get('warnings', {}))}")
+            print(f"  Working compilers: {', '.join(targets[arch]) or 'none'}")
         return 0
 
+    cache = None
+    if not args.no_cache:
+        try:
+            from .cache import AnalysisCache
+        except ImportError:
+            from cache import AnalysisCache
+
+        cache = AnalysisCache(args.cache_dir)
+
+    if args.socket and not args.serve:
+        parser.error("--socket requires --serve")
+    if args.serve:
+        if args.source_file is not None or args.compile_commands:
+            parser.error("--serve does not take a source file")
+        if args.profile:
+            parser.error("--profile cannot be combined with --serve")
+        try:
+            from .server import serve
+        except ImportError:
+            from server import serve
+
+        return serve(args.socket, cache, args.jobs)
+
+    if args.compile_commands:
+        if args.source_file is not None:
+            parser.error("--compile-commands does not take a source file")
+        if args.assembly or args.arch_matrix or args.opt_sweep:
+            parser.error(
+                "--compile-commands cannot be combined with --assembly, --arch-matrix "
+                "or --opt-sweep"
+            )
+    elif args.source_file is None:
+        parser.error("the following arguments are required: source_file")
+
     # Determine output format
     if args.json:
         output_format = OutputFormat.JSON
+    elif args.ndjson:
+        output_format = OutputFormat.NDJSON
+    elif args.sarif:
+        output_format = OutputFormat.SARIF
     elif args.github:
         output_format = OutputFormat.GITHUB
     else:
         output_format = OutputFormat.TEXT
 
+    compiler = args.compiler
+    if args.go_scope != "package" or args.go_package:
+        if compiler not in (None, "go"):
+            parser.error("--go-scope/--go-package cannot be combined with --compiler")
+        if scan_mode or (args.source_file and detect_language(args.source_file) == "go"):
+            compiler = GoCompiler(scope=args.go_scope, packages=args.go_package)
+
+    binary_kind = crate_manifest = None
+    jvm_module = csharp_project = dotnet_assemblies = False
+    if not (args.assembly or scan_mode or args.compile_commands):
+        binary_kind = detect_binary_kind(args.source_file)
+        crate_manifest = find_cargo_manifest(args.source_file)
+        jvm_module = not crate_manifest and bool(jvm_module_languages(args.source_file))
+        csharp_project = not (crate_manifest or jvm_module) and is_csharp_project(args.source_file)
+        dotnet_assemblies = not (
+            crate_manifest or jvm_module or csharp_project
+        ) and is_dotnet_assembly(args.source_file)
+    if (args.arch_matrix or args.opt_sweep) and (
+        scan_mode
+        or args.assembly
+        or binary_kind
+        or crate_manifest
+        or jvm_module
+        or csharp_project
+        or dotnet_assemblies
+    ):
+        parser.error("--arch-matrix and --opt-sweep apply to a single source file")
+    if args.arch_matrix and args.opt_sweep:
+        parser.error("--arch-matrix and --opt-sweep cannot be combined")
+    if (args.arch_matrix or args.opt_sweep) and output_format in WRITERS:
+        parser.error("--ndjson and --sarif cannot be combined with --arch-matrix or --opt-sweep")
+
+    if args.since and (args.arch_matrix or args.opt_sweep):
+        parser.error("--since cannot be combined with --arch-matrix or --opt-sweep")
+
+    # Worker processes inherit the profile directory from the environment
+    profiler = None
+    if args.profile:
+        try:
+            from .profiling import Profiler
+        except ImportError:
+            from profiling import Profiler
+
+        profiler = Profiler()
+
+    previous = {}
+    writer = None
     try:
-        if args.assembly:
+        if args.since:
+            try:
+                previous = load_reports(args.since)
+            except (OSError, ValueError) as e:
+                parser.error(f"--since: {e}")
+
+        if args.opt_sweep:
+            matrix = analyze_sweep(
+                args.source_file,
+                baseline=args.opt_level,
+                arch=args.arch,
+                compiler=compiler,
+                include_warnings=args.warnings,
+                function_filter=args.func,
+                extra_flags=args.extra_flags,
+                jobs=args.jobs,
+                cache=cache,
+            )
+            print(format_matrix(matrix, output_format))
+            return 0 if matrix.passed else 1
+
+        if args.arch_matrix:
+            if args.arch_matrix == "all":
+                arches = list(DANGEROUS_INSTRUCTIONS)
+            else:
+                arches = [a.strip() for a in args.arch_matrix.split(",") if a.strip()]
+            matrix = analyze_matrix(
+                args.source_file,
+                arches,
+                compiler=compiler,
+                optimization=args.opt_level,
+                include_warnings=args.warnings,
+                function_filter=args.func,
+                extra_flags=args.extra_flags,
+                jobs=args.jobs,
+                cache=cache,
+            )
+            print(format_matrix(matrix, output_format))
+            return 0 if matrix.passed else 1
+
+        if scan_mode and args.assembly:
+            print("Error: --assembly cannot be combined with scan", file=sys.stderr)
+            return 1
+
+        # Streaming formats write each file's report as soon as it is finished,
+        # and a single file's violations as soon as each function is analyzed
+        on_result = None
+        if output_format in WRITERS:
+            writer = WRITERS[output_format](sys.stdout)
+            on_result = writer.write_result
+
+        def finish(reports: list[AnalysisReport], errors: dict[str, str]) -> int:
+            if writer is not None:
+                writer.close()
+                return 0 if writer.passed else 1
+            print(format_reports(reports, output_format, errors, args.function_hashes))
+            return 0 if all(r.passed for r in reports) and not errors else 1
+
+        if args.compile_commands:
+            reports, errors = analyze_compile_commands(
+                args.compile_commands,
+                arch=args.arch,
+                include_warnings=args.warnings,
+                function_filter=args.func,
+                jobs=args.jobs,
+                previous=previous,
+                hash_functions=args.function_hashes,
+                on_result=on_result,
+            )
+            return finish(reports, errors)
+
+        if scan_mode:
+            reports, errors = analyze_many(
+                find_sources(args.scan_dir),
+                arch=args.arch,
+                compiler=compiler,
+                optimization=args.opt_level,
+                include_warnings=args.warnings,
+                function_filter=args.func,
+                extra_flags=args.extra_flags,
+                jobs=args.jobs,
+                cache=cache,
+                previous=previous,
+                hash_functions=args.function_hashes,
+                on_result=on_result,
+            )
+            return finish(reports, errors)
+
+        # A single-file report applies whatever path it was recorded under
+        if len(previous) == 1:
+            previous_report = next(iter(previous.values()))
+        else:
+            previous_report = previous.get(args.source_file)
+
+        if crate_manifest:
+            reports, errors = analyze_crate(
+                crate_manifest,
+                arch=args.arch,
+                optimization=crate_opt_level,
+                include_warnings=args.warnings,
+                function_filter=args.func,
+                previous=previous,
+                hash_functions=args.function_hashes,
+                on_result=on_result,
+            )
+            return finish(reports, errors)
+
+        if jvm_module:
+            reports, errors = analyze_jvm_module(
+                args.source_file,
+                include_warnings=args.warnings,
+                function_filter=args.func,
+                on_result=on_result,
+            )
+            return finish(reports, errors)
+
+        if csharp_project:
+            reports, errors = analyze_csharp_project(
+                args.source_file,
+                include_warnings=args.warnings,
+                function_filter=args.func,
+                on_result=on_result,
+            )
+            return finish(reports, errors)
+
+        if dotnet_assemblies:
+            reports, errors = analyze_dotnet_assemblies(
+                args.source_file,
+                include_warnings=args.warnings,
+                function_filter=args.func,
+                on_result=on_result,
+            )
+            return finish(reports, errors)
+
+        if binary_kind == "archive":
+            reports, errors = analyze_archive(
+                args.source_file,
+                arch=args.arch,
+                include_warnings=args.warnings,
+                function_filter=args.func,
+                jobs=args.jobs,
+                previous=previous,
+                hash_functions=args.function_hashes,
+                on_result=on_result,
+            )
+            return finish(reports, errors)
+
+        on_violations = None
+        if writer is not None:
+            on_violations = functools.partial(writer.write_violations, args.source_file)
+
+        if binary_kind == "elf":
+            report = analyze_binary(
+                args.source_file,
+                args.arch,
+                include_warnings=args.warnings,
+                function_filter=args.func,
+                previous=previous_report,
+                hash_functions=args.function_hashes,
+                on_violations=on_violations,
+            )
+        elif args.assembly:
             if not args.arch:
                 print("Error: --arch is required when analyzing assembly files", file=sys.stderr)
                 return 1
@@ -1257,28 +4398,62 @@ Note: VM-compiled and scripting languages analyze bytecode and don't use --arch
                 args.arch,
                 include_warnings=args.warnings,
                 function_filter=args.func,
+                previous=previous_report,
+                hash_functions=args.function_hashes,
+                on_violations=on_violations,
             )
         else:
             report = analyze_source(
                 args.source_file,
                 arch=args.arch,
-                compiler=args.compiler,
+                compiler=compiler,
                 optimization=args.opt_level,
                 include_warnings=args.warnings,
                 function_filter=args.func,
                 extra_flags=args.extra_flags,
+                cache=cache,
+                previous=previous_report,
+                hash_functions=args.function_hashes,
+                on_violations=on_violations,
             )
 
-        print(format_report(report, output_format))
+        if writer is not None:
+            writer.write_report(report)
+            writer.close()
+            return 0 if writer.passed else 1
+        print(format_report(report, output_format, args.function_hashes))
         return 0 if report.passed else 1
 
     except (FileNotFoundError, RuntimeError, subprocess.CalledProcessError) as e:
-        if output_format == OutputFormat.JSON:
+        if writer is not None:
+            target = args.scan_dir if scan_mode else args.source_file or args.compile_commands
+            writer.write_error(target, str(e))
+            writer.close()
+        elif output_format == OutputFormat.JSON:
             print(json.dumps({"error": str(e)}))
         else:
             print(f"Error: {e}", file=sys.stderr)
         return 1
 
+    finally:
+        if profiler is not None:
+            _finish_profile(profiler, args.profile)
+
+
+def _finish_profile(profiler, trace_path: str) -> None:
+    """Write the Chrome trace of a --profile run and print its summary to stderr."""
+    try:
+        from .profiling import format_summary, write_trace
+    except ImportError:
+        from profiling import format_summary, write_trace
+
+    events = profiler.stop()
+    try:
+        write_trace(events, trace_path, profiler.pid)
+    except OSError as e:
+        print(f"Error: cannot write profile: {e}", file=sys.stderr)
+    print(format_summary(events, profiler.pid), file=sys.stderr)
+
 
 if __name__ == "__main__":
     sys.exit(main())
@@ -0,0 +1,306 @@
+"""
+On-disk cache for compiled assembly and parse results.
+
+Entries are content-addressed: the key covers every file the compilation
+reads (the source, its headers, Rust modules, Go packages of the same module,
+as the compiler itself lists them), the compiler binary and its version, the target
+architecture, the optimization level, the extra compiler flags and the
+dangerous-instruction table for the architecture. A repeat analysis of an
+unchanged file therefore skips both the compiler and the assembly parser.
+
+The cache is bounded in size; the least recently used entries are evicted
+first (a cache hit refreshes the entry's modification time). Long-running
+processes can also keep recently used entries in memory (memory_entries).
+
+Entries live in the entries/ subdirectory. The rest of the cache directory
+belongs to other users of default_cache_dir() - the toolchain registry, the
+cargo target directory, the .NET build workspace - which eviction and clear()
+leave alone.
+"""
+
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+
+try:
+    from .analyzer import DANGEROUS_INSTRUCTIONS, Compiler
+    from .toolchains import default_cache_dir
+except ImportError:
+    from analyzer import DANGEROUS_INSTRUCTIONS, Compiler
+    from toolchains import default_cache_dir
+
+
+# Bump when the parser or the entry layout changes in a way that
+# invalidates previously cached results.
+CACHE_FORMAT = 3
+
+# Subdirectory of the cache directory that holds the entries
+ENTRIES_DIR = "entries"
+
+DEFAULT_MAX_SIZE = 256 * 1024 * 1024
+
+# Files whose modification time is at least this many seconds in the past
+# keep their digest for the rest of the process; a more recent one could still
+# be rewritten within the same timestamp tick
+_STABLE_AFTER = 2.0
+
+# path -> (stat signature, digest)
+_file_digests: dict[str, tuple[tuple[int, int, int, int], bytes]] = {}
+_file_digests_lock = threading.Lock()
+
+
+def _file_digest(path: str) -> bytes:
+    """SHA-256 of a file's contents, remembered while its stat signature holds."""
+    st = os.stat(path)
+    signature = (st.st_ino, st.st_size, st.st_mtime_ns, st.st_ctime_ns)
+    with _file_digests_lock:
+        known = _file_digests.get(path)
+    if known is not None and known[0] == signature:
+        return known[1]
+    with open(path, "rb") as f:
+        digest = hashlib.sha256(f.read()).digest()
+    if time.time() - st.st_mtime >= _STABLE_AFTER:
+        with _file_digests_lock:
+            _file_digests[path] = (signature, digest)
+    return digest
+
+
+def hash_files(paths: list[str]) -> str:
+    """
+    Hash the contents of a compilation's input files, as named by the
+    compiler's dependency output (Compiler.dependencies).
+    """
+    digest = hashlib.sha256()
+    for path in sorted({os.path.realpath(path) for path in paths}):
+        digest.update(path.encode() + b"\0" + _file_digest(path))
+    return digest.hexdigest()
+
+
+class AnalysisCache:
+    """Size-bounded, content-addressed cache of assembly and parse results."""
+
+    def __init__(
+        self,
+        directory: str | None = None,
+        max_size: int = DEFAULT_MAX_SIZE,
+        memory_entries: int = 0,
+    ):
+        self.directory = directory or default_cache_dir()
+        self.max_size = max_size
+        self.memory_entries = memory_entries
+        self.hits = 0
+        self.misses = 0
+        # Bytes on disk as of the last scan plus those written since; None
+        # until the first put scans the directory
+        self._size: int | None = None
+        # key -> serialized entry; callers get fresh objects they may modify
+        self._memory: OrderedDict[str, str] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __getstate__(self) -> dict:
+        # Worker processes get the settings and start with an empty memory tier
+        state = self.__dict__.copy()
+        state["_memory"] = OrderedDict()
+        state["_size"] = None
+        del state["_lock"]
+        return state
+
+    def __setstate__(self, state: dict) -> None:
+        self.__dict__.update(state)
+        self._lock = threading.Lock()
+
+    def _remember(self, key: str, encoded: str) -> None:
+        if not self.memory_entries:
+            return
+        with self._lock:
+            self._memory[key] = encoded
+            self._memory.move_to_end(key)
+            while len(self._memory) > self.memory_entries:
+                self._memory.popitem(last=False)
+
+    def key(
+        self,
+        source_file: str,
+        compiler: Compiler,
+        arch: str,
+        optimization: str,
+        extra_flags: list[str] | None = None,
+    ) -> str | None:
+        """
+        Compute the cache key for one compilation, or None when the compiler
+        cannot list the files it reads (the compilation is then not cached).
+        """
+        inputs = compiler.dependencies(source_file, arch, optimization, extra_flags)
+        if inputs is None:
+            return None
+        try:
+            inputs_hash = hash_files(inputs)
+        except OSError:
+            return None
+        material = {
+            "format": CACHE_FORMAT,
+            "inputs": inputs_hash,
+            "compiler": compiler.name,
+            "compiler_version": compiler.version(arch),
+            "compiler_settings": compiler.settings(),
+            "arch": arch,
+            "optimization": optimization,
+            "extra_flags": list(extra_flags or []),
+            "instructions": DANGEROUS_INSTRUCTIONS.get(arch),
+        }
+        encoded = json.dumps(material, sort_keys=True).encode()
+        return hashlib.sha256(encoded).hexdigest()
+
+    @property
+    def entries_directory(self) -> str:
+        return os.path.join(self.directory, ENTRIES_DIR)
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.entries_directory, key[:2], key + ".json")
+
+    def get(self, key: str) -> tuple[str, list[dict], list[dict]] | None:
+        """
+        Look up an entry.
+
+        Returns (assembly_path, functions, violations) or None on a miss.
+        Violations are in the JSON report layout and include warning-level
+        findings; callers filter them.
+        """
+        path = self._path(key)
+        asm_path = path[: -len(".json")] + ".s"
+        with self._lock:
+            encoded = self._memory.get(key)
+            if encoded is not None:
+                self._memory.move_to_end(key)
+
+        if encoded is None:
+            try:
+                with open(path) as f:
+                    encoded = f.read()
+                os.utime(path)
+            except OSError:
+                encoded = None
+        try:
+            entry = json.loads(encoded) if encoded is not None else None
+        except ValueError:
+            entry = None
+
+        with self._lock:
+            if entry is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+        self._remember(key, encoded)
+        return asm_path, entry["functions"], entry["violations"]
+
+    def put(
+        self,
+        key: str,
+        assembly_file: str,
+        functions: list[dict],
+        violations: list[dict],
+    ) -> None:
+        """
+        Store an entry, then evict old entries if the cache has grown past its
+        size limit. The assembly is copied from assembly_file rather than held
+        in memory.
+        """
+        path = self._path(key)
+        asm_path = path[: -len(".json")] + ".s"
+        encoded = json.dumps({"functions": functions, "violations": violations})
+        self._remember(key, encoded)
+
+        staged = []
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            # Write to temporary files and rename so concurrent workers never
+            # observe a partially written entry. The JSON file is renamed
+            # last: its presence marks the entry as complete.
+            fd, tmp_asm = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+            staged.append(tmp_asm)
+            os.close(fd)
+            shutil.copyfile(assembly_file, tmp_asm)
+            written = os.path.getsize(tmp_asm)
+            os.replace(tmp_asm, asm_path)
+
+            fd, tmp_json = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+            staged.append(tmp_json)
+            with os.fdopen(fd, "w") as f:
+                f.write(encoded)
+            written += os.path.getsize(tmp_json)
+            os.replace(tmp_json, path)
+        except OSError:
+            # The cache is an optimization; an unwritable cache directory is not an error
+            return
+        finally:
+            for tmp in staged:
+                try:
+                    os.unlink(tmp)
+                except OSError:
+                    pass  # Renamed into place
+
+        with self._lock:
+            if self._size is None:
+                full = True
+            else:
+                self._size += written
+                full = self._size > self.max_size
+        if full:
+            self.evict()
+
+    def _entries(self) -> list[tuple[float, int, str]]:
+        """All entries as (mtime, size, json path); size includes the assembly."""
+        entries = []
+        for root, _dirs, files in os.walk(self.entries_directory):
+            for name in files:
+                if not name.endswith(".json"):
+                    continue
+                path = os.path.join(root, name)
+                try:
+                    st = os.stat(path)
+                except OSError:
+                    continue
+                try:
+                    asm_size = os.stat(path[: -len(".json")] + ".s").st_size
+                except OSError:
+                    asm_size = 0
+                entries.append((st.st_mtime, st.st_size + asm_size, path))
+        return entries
+
+    def _remove(self, path: str) -> None:
+        for entry_file in (path, path[: -len(".json")] + ".s"):
+            try:
+                os.unlink(entry_file)
+            except OSError:
+                pass
+
+    def evict(self) -> None:
+        """
+        Remove least recently used entries until the cache fits in max_size.
+        This scans the whole cache; put() only calls it once its running size
+        count passes the limit.
+        """
+        entries = self._entries()
+        total = sum(size for _, size, _ in entries)
+        if total > self.max_size:
+            for _mtime, size, path in sorted(entries):
+                self._remove(path)
+                total -= size
+                if total <= self.max_size:
+                    break
+        with self._lock:
+            self._size = total
+
+    def clear(self) -> None:
+        """Remove every entry."""
+        with self._lock:
+            self._memory.clear()
+        for _, _, path in self._entries():
+            self._remove(path)
+        with self._lock:
+            self._size = 0
@@ -0,0 +1,453 @@
+"""
+.NET assembly reader for the C# analyzer.
+
+Reads what the analyzer needs straight from a compiled DLL: the types, their
+nesting, and each method's IL body. This replaces an ILSpy or monodis process
+and the parsing of its text output. The PE file is mapped just far enough to
+find the CLI header and the metadata; of the metadata tables only TypeDef,
+MethodDef and NestedClass are decoded, the others are only measured so they
+can be skipped. Instructions are decoded on demand by instructions() and
+operand_text().
+
+Reference: ECMA-335, 6th edition, partition II (metadata and file format)
+and partition III (instruction set).
+"""
+
+import struct
+from collections.abc import Iterator
+from dataclasses import dataclass, field
+
+# Mnemonics by opcode (ECMA-335 III.1.2.1). Two-byte opcodes are 0xFE00 | second byte.
+OPCODES: dict[int, str] = {
+    opcode: name
+    for opcode, name in enumerate(
+        """
+        nop break ldarg.0 ldarg.1 ldarg.2 ldarg.3 ldloc.0 ldloc.1 ldloc.2 ldloc.3 stloc.0
+        stloc.1 stloc.2 stloc.3 ldarg.s ldarga.s starg.s ldloc.s ldloca.s stloc.s ldnull
+        ldc.i4.m1 ldc.i4.0 ldc.i4.1 ldc.i4.2 ldc.i4.3 ldc.i4.4 ldc.i4.5 ldc.i4.6 ldc.i4.7
+        ldc.i4.8 ldc.i4.s ldc.i4 ldc.i8 ldc.r4 ldc.r8 - dup pop jmp call calli ret br.s
+        brfalse.s brtrue.s beq.s bge.s bgt.s ble.s blt.s bne.un.s bge.un.s bgt.un.s ble.un.s
+        blt.un.s br brfalse brtrue beq bge bgt ble blt bne.un bge.un bgt.un ble.un blt.un
+        switch ldind.i1 ldind.u1 ldind.i2 ldind.u2 ldind.i4 ldind.u4 ldind.i8 ldind.i
+        ldind.r4 ldind.r8 ldind.ref stind.ref stind.i1 stind.i2 stind.i4 stind.i8 stind.r4
+        stind.r8 add sub mul div div.un rem rem.un and or xor shl shr shr.un neg not conv.i1
+        conv.i2 conv.i4 conv.i8 conv.r4 conv.r8 conv.u4 conv.u8 callvirt cpobj ldobj ldstr
+        newobj castclass isinst conv.r.un - - unbox throw ldfld ldflda stfld ldsfld ldsflda
+        stsfld stobj conv.ovf.i1.un conv.ovf.i2.un conv.ovf.i4.un conv.ovf.i8.un
+        conv.ovf.u1.un conv.ovf.u2.un conv.ovf.u4.un conv.ovf.u8.un conv.ovf.i.un
+        conv.ovf.u.un box newarr ldlen ldelema ldelem.i1 ldelem.u1 ldelem.i2 ldelem.u2
+        ldelem.i4 ldelem.u4 ldelem.i8 ldelem.i ldelem.r4 ldelem.r8 ldelem.ref stelem.i
+        stelem.i1 stelem.i2 stelem.i4 stelem.i8 stelem.r4 stelem.r8 stelem.ref ldelem stelem
+        unbox.any - - - - - - - - - - - - - conv.ovf.i1 conv.ovf.u1 conv.ovf.i2 conv.ovf.u2
+        conv.ovf.i4 conv.ovf.u4 conv.ovf.i8 conv.ovf.u8 - - - - - - - refanyval ckfinite - -
+        mkrefany - - - - - - - - - ldtoken conv.u2 conv.u1 conv.i conv.ovf.i conv.ovf.u
+        add.ovf add.ovf.un mul.ovf mul.ovf.un sub.ovf sub.ovf.un endfinally leave leave.s
+        stind.i conv.u
+        """.split()
+    )
+    if name != "-"
+}
+OPCODES.update(
+    (0xFE00 | opcode, name)
+    for opcode, name in enumerate(
+        """
+        arglist ceq cgt cgt.un clt clt.un ldftn ldvirtftn - ldarg ldarga starg ldloc ldloca
+        stloc localloc - endfilter unaligned. volatile. tail. initobj constrained. cpblk
+        initblk no. rethrow - sizeof refanytype readonly.
+        """.split()
+    )
+    if name != "-"
+)
+OPCODE_NUMBERS = {name: opcode for opcode, name in OPCODES.items()}
+
+SWITCH = OPCODE_NUMBERS["switch"]
+
+
+def _operand_sizes() -> dict[int, int]:
+    """Operand size by opcode, except switch, whose operands are variable-length."""
+    sizes = dict.fromkeys(OPCODES, 0)
+    for names, operand_bytes in (
+        ("ldarg.s ldarga.s starg.s ldloc.s ldloca.s stloc.s ldc.i4.s unaligned. no.", 1),
+        ("br.s brfalse.s brtrue.s beq.s bge.s bgt.s ble.s blt.s bne.un.s bge.un.s", 1),
+        ("bgt.un.s ble.un.s blt.un.s leave.s", 1),
+        ("ldarg ldarga starg ldloc ldloca stloc", 2),
+        ("ldc.i4 ldc.r4 jmp call calli callvirt cpobj ldobj ldstr newobj castclass isinst", 4),
+        ("unbox ldfld ldflda stfld ldsfld ldsflda stsfld stobj box newarr ldelema ldelem", 4),
+        ("stelem unbox.any refanyval mkrefany ldtoken leave ldftn ldvirtftn initobj", 4),
+        ("constrained. sizeof br brfalse brtrue beq bge bgt ble blt bne.un bge.un bgt.un", 4),
+        ("ble.un blt.un", 4),
+        ("ldc.i8 ldc.r8", 8),
+    ):
+        for name in names.split():
+            sizes[OPCODE_NUMBERS[name]] = operand_bytes
+    return sizes
+
+
+_OPERAND_SIZES = _operand_sizes()
+
+# Branches, whose operand is a signed offset from the end of the instruction
+_BRANCHES = frozenset(
+    OPCODE_NUMBERS[name]
+    for name in (
+        "br.s brfalse.s brtrue.s beq.s bge.s bgt.s ble.s blt.s bne.un.s bge.un.s bgt.un.s "
+        "ble.un.s blt.un.s leave.s br brfalse brtrue beq bge bgt ble blt bne.un bge.un "
+        "bgt.un ble.un blt.un leave"
+    ).split()
+)
+
+# Metadata tables (II.22) in table-number order: name and column types. A
+# column is a fixed size in bytes, a heap ("string", "guid", "blob"), a table
+# index (the table's name) or a coded index (the name of one in _CODED_INDEXES).
+_TABLES = (
+    ("Module", (2, "string", "guid", "guid", "guid")),
+    ("TypeRef", ("ResolutionScope", "string", "string")),
+    ("TypeDef", (4, "string", "string", "TypeDefOrRef", "Field", "MethodDef")),
+    ("FieldPtr", ("Field",)),
+    ("Field", (2, "string", "blob")),
+    ("MethodPtr", ("MethodDef",)),
+    ("MethodDef", (4, 2, 2, "string", "blob", "Param")),
+    ("ParamPtr", ("Param",)),
+    ("Param", (2, 2, "string")),
+    ("InterfaceImpl", ("TypeDef", "TypeDefOrRef")),
+    ("MemberRef", ("MemberRefParent", "string", "blob")),
+    ("Constant", (2, "HasConstant", "blob")),
+    ("CustomAttribute", ("HasCustomAttribute", "CustomAttributeType", "blob")),
+    ("FieldMarshal", ("HasFieldMarshal", "blob")),
+    ("DeclSecurity", (2, "HasDeclSecurity", "blob")),
+    ("ClassLayout", (2, 4, "TypeDef")),
+    ("FieldLayout", (4, "Field")),
+    ("StandAloneSig", ("blob",)),
+    ("EventMap", ("TypeDef", "Event")),
+    ("EventPtr", ("Event",)),
+    ("Event", (2, "string", "TypeDefOrRef")),
+    ("PropertyMap", ("TypeDef", "Property")),
+    ("PropertyPtr", ("Property",)),
+    ("Property", (2, "string", "blob")),
+    ("MethodSemantics", (2, "MethodDef", "HasSemantics")),
+    ("MethodImpl", ("TypeDef", "MethodDefOrRef", "MethodDefOrRef")),
+    ("ModuleRef", ("string",)),
+    ("TypeSpec", ("blob",)),
+    ("ImplMap", (2, "MemberForwarded", "string", "ModuleRef")),
+    ("FieldRVA", (4, "Field")),
+    ("EncLog", (4, 4)),
+    ("EncMap", (4,)),
+    ("Assembly", (4, 2, 2, 2, 2, 4, "blob", "string", "string")),
+    ("AssemblyProcessor", (4,)),
+    ("AssemblyOS", (4, 4, 4)),
+    ("AssemblyRef", (2, 2, 2, 2, 4, "blob", "string", "string", "blob")),
+    ("AssemblyRefProcessor", (4, "AssemblyRef")),
+    ("AssemblyRefOS", (4, 4, 4, "AssemblyRef")),
+    ("File", (4, "string", "blob")),
+    ("ExportedType", (4, 4, "string", "string", "Implementation")),
+    ("ManifestResource", (4, 4, "string", "Implementation")),
+    ("NestedClass", ("TypeDef", "TypeDef")),
+    ("GenericParam", (2, 2, "TypeOrMethodDef", "string")),
+    ("MethodSpec", ("MethodDefOrRef", "blob")),
+    ("GenericParamConstraint", ("GenericParam", "TypeDefOrRef")),
+)
+_TABLE_NUMBERS = {name: number for number, (name, _columns) in enumerate(_TABLES)}
+
+# Coded indexes (II.24.2.6): the tables they can refer to, in tag order
+_CODED_INDEXES = {
+    "TypeDefOrRef": ("TypeDef", "TypeRef", "TypeSpec"),
+    "HasConstant": ("Field", "Param", "Property"),
+    "HasCustomAttribute": (
+        "MethodDef Field TypeRef TypeDef Param InterfaceImpl MemberRef Module DeclSecurity "
+        "Property Event StandAloneSig ModuleRef TypeSpec Assembly AssemblyRef File "
+        "ExportedType ManifestResource GenericParam GenericParamConstraint MethodSpec"
+    ).split(),
+    "HasFieldMarshal": ("Field", "Param"),
+    "HasDeclSecurity": ("TypeDef", "MethodDef", "Assembly"),
+    "MemberRefParent": ("TypeDef", "TypeRef", "ModuleRef", "MethodDef", "TypeSpec"),
+    "HasSemantics": ("Event", "Property"),
+    "MethodDefOrRef": ("MethodDef", "MemberRef"),
+    "MemberForwarded": ("Field", "MethodDef"),
+    "Implementation": ("File", "AssemblyRef", "ExportedType"),
+    # Tags 0, 1 and 4 are unused
+    "CustomAttributeType": (None, None, "MethodDef", "MemberRef", None),
+    "ResolutionScope": ("Module", "ModuleRef", "AssemblyRef", "TypeRef"),
+    "TypeOrMethodDef": ("TypeDef", "MethodDef"),
+}
+
+_CLI_HEADER_DIRECTORY = 14
+_METADATA_SIGNATURE = 0x424A5342
+
+_U2 = struct.Struct("<H")
+_U4 = struct.Struct("<I")
+_I4 = struct.Struct("<i")
+
+
+class CILFormatError(ValueError):
+    """The data is not a well-formed .NET assembly."""
+
+
+class NotAssemblyError(CILFormatError):
+    """The data is not a .NET assembly at all (not a PE file, or a native one)."""
+
+
+@dataclass(slots=True)
+class Method:
+    """A method's name and IL body."""
+
+    name: str
+    # None for abstract, extern and runtime-implemented methods
+    body: bytes | None = None
+
+
+@dataclass(slots=True)
+class TypeDef:
+    """A type defined in the assembly, with the methods it declares."""
+
+    namespace: str
+    name: str
+    methods: list[Method] = field(default_factory=list)
+    # Index in Assembly.types of the enclosing type, for nested types
+    enclosing: int | None = None
+
+
+@dataclass(slots=True)
+class Assembly:
+    """The parts of a .NET assembly the analyzer uses."""
+
+    types: list[TypeDef]
+
+    def full_name(self, index: int) -> str:
+        """Name of types[index] as ILSpy writes it (Crypto.Keys/Inner)."""
+        names = []
+        while index is not None:
+            entry = self.types[index]
+            names.append(entry.name)
+            namespace = entry.namespace
+            index = entry.enclosing
+        name = "/".join(reversed(names))
+        return f"{namespace}.{name}" if namespace else name
+
+    def top_level(self, index: int) -> TypeDef:
+        """The outermost type enclosing types[index] (the type itself if it is not nested)."""
+        while self.types[index].enclosing is not None:
+            index = self.types[index].enclosing
+        return self.types[index]
+
+
+def read_assembly(data: bytes) -> Assembly:
+    """Parse a .NET assembly (DLL or EXE). Raises CILFormatError if data is not one."""
+    try:
+        return _read_assembly(memoryview(data))
+    except (struct.error, IndexError) as e:
+        raise CILFormatError(f"truncated assembly: {e}") from None
+
+
+def _sections(data: memoryview) -> tuple[list[tuple[int, int, int, int]], int]:
+    """
+    The PE section table as (RVA, virtual size, file offset, raw size)
+    tuples, and the RVA of the CLI header.
+    """
+    if bytes(data[:2]) != b"MZ":
+        raise NotAssemblyError("not a PE file (bad DOS signature)")
+    pe = _U4.unpack_from(data, 0x3C)[0]
+    if bytes(data[pe : pe + 4]) != b"PE\0\0":
+        raise NotAssemblyError("not a PE file (bad PE signature)")
+    coff = pe + 4
+    section_count = _U2.unpack_from(data, coff + 2)[0]
+    optional_size = _U2.unpack_from(data, coff + 16)[0]
+    optional = coff + 20
+    magic = _U2.unpack_from(data, optional)[0]
+    if magic == 0x10B:  # PE32
+        directories = optional + 96
+    elif magic == 0x20B:  # PE32+
+        directories = optional + 112
+    else:
+        raise CILFormatError(f"unknown optional header magic {magic:#x}")
+    directory_count = _U4.unpack_from(data, directories - 4)[0]
+    if directory_count <= _CLI_HEADER_DIRECTORY:
+        raise NotAssemblyError("not a .NET assembly (no CLI header)")
+    cli_rva = _U4.unpack_from(data, directories + 8 * _CLI_HEADER_DIRECTORY)[0]
+    if cli_rva == 0:
+        raise NotAssemblyError("not a .NET assembly (no CLI header)")
+
+    sections = []
+    table = optional + optional_size
+    for index in range(section_count):
+        entry = table + 40 * index
+        virtual_size, rva, raw_size, raw_offset = struct.unpack_from("<IIII", data, entry + 8)
+        sections.append((rva, virtual_size, raw_offset, raw_size))
+    return sections, cli_rva
+
+
+def _read_assembly(data: memoryview) -> Assembly:
+    sections, cli_rva = _sections(data)
+
+    def offset_of(rva: int) -> int:
+        for start, virtual_size, raw_offset, raw_size in sections:
+            if start <= rva < start + max(virtual_size, raw_size):
+                return raw_offset + rva - start
+        raise CILFormatError(f"RVA {rva:#x} is outside every section")
+
+    # CLI header (II.25.3.3) -> metadata root (II.24.2.1)
+    cli = offset_of(cli_rva)
+    metadata = offset_of(_U4.unpack_from(data, cli + 8)[0])
+    if _U4.unpack_from(data, metadata)[0] != _METADATA_SIGNATURE:
+        raise CILFormatError("bad metadata signature")
+    version_length = _U4.unpack_from(data, metadata + 12)[0]
+    position = metadata + 16 + version_length + 2
+    stream_count = _U2.unpack_from(data, position)[0]
+    position += 2
+    streams = {}
+    for _ in range(stream_count):
+        stream_offset, size = struct.unpack_from("<II", data, position)
+        end = bytes(data[position + 8 : position + 40]).index(b"\0")
+        name = bytes(data[position + 8 : position + 8 + end]).decode("ascii")
+        streams[name] = (metadata + stream_offset, size)
+        # The name is padded to a multiple of 4 bytes, including its NUL
+        position += 8 + (end + 4) // 4 * 4
+    tables = streams.get("#~") or streams.get("#-")
+    if tables is None or "#Strings" not in streams:
+        raise CILFormatError("metadata has no table or string stream")
+    strings_start = streams["#Strings"][0]
+
+    def string(index: int) -> str:
+        start = strings_start + index
+        end = start
+        while data[end]:
+            end += 1
+        return bytes(data[start:end]).decode("utf-8", "replace")
+
+    # Table stream header (II.24.2.6)
+    position = tables[0]
+    heap_sizes = data[position + 6]
+    valid = struct.unpack_from("<Q", data, position + 8)[0]
+    if valid >> len(_TABLES):
+        raise CILFormatError("metadata holds tables this reader does not know")
+    position += 24
+    rows = [0] * len(_TABLES)
+    for number in range(len(_TABLES)):
+        if valid >> number & 1:
+            rows[number] = _U4.unpack_from(data, position)[0]
+            position += 4
+    if heap_sizes & 0x40:
+        # Uncompressed (#-) streams may carry 4 extra bytes
+        position += 4
+
+    heap_widths = {
+        "string": 4 if heap_sizes & 0x01 else 2,
+        "guid": 4 if heap_sizes & 0x02 else 2,
+        "blob": 4 if heap_sizes & 0x04 else 2,
+    }
+
+    def width(column) -> int:
+        if isinstance(column, int):
+            return column
+        if column in heap_widths:
+            return heap_widths[column]
+        if column in _TABLE_NUMBERS:
+            return 2 if rows[_TABLE_NUMBERS[column]] < 1 << 16 else 4
+        targets = _CODED_INDEXES[column]
+        tag_bits = (len(targets) - 1).bit_length()
+        largest = max(rows[_TABLE_NUMBERS[t]] for t in targets if t is not None)
+        return 2 if largest < 1 << (16 - tag_bits) else 4
+
+    readers = {2: _U2, 4: _U4}
+    layouts = {}
+    starts = {}
+    for number, (name, columns) in enumerate(_TABLES):
+        widths = [width(column) for column in columns]
+        offsets = [sum(widths[:i]) for i in range(len(widths))]
+        layouts[name] = (sum(widths), list(zip(offsets, widths)))
+        starts[name] = position
+        position += rows[number] * sum(widths)
+
+    def column(table: str, row: int, index: int) -> int:
+        """Value of a column of a 1-based row."""
+        row_size, columns = layouts[table]
+        offset, size = columns[index]
+        return readers[size].unpack_from(data, starts[table] + (row - 1) * row_size + offset)[0]
+
+    def method_body(rva: int) -> bytes | None:
+        """The IL of the method body at rva (II.25.4)."""
+        if rva == 0:
+            return None
+        start = offset_of(rva)
+        header = data[start]
+        if header & 0x3 == 0x2:  # Tiny header
+            size = header >> 2
+            start += 1
+        elif header & 0x3 == 0x3:  # Fat header
+            header_size = (_U2.unpack_from(data, start)[0] >> 12) * 4
+            size = _U4.unpack_from(data, start + 4)[0]
+            start += header_size
+        else:
+            raise CILFormatError(f"bad method header at RVA {rva:#x}")
+        if start + size > len(data):
+            raise CILFormatError(f"method body at RVA {rva:#x} overruns the file")
+        return bytes(data[start : start + size])
+
+    def method_row(index: int) -> int:
+        # Uncompressed metadata may list methods through MethodPtr
+        if rows[_TABLE_NUMBERS["MethodPtr"]]:
+            return column("MethodPtr", index, 0)
+        return index
+
+    type_count = rows[_TABLE_NUMBERS["TypeDef"]]
+    method_count = rows[_TABLE_NUMBERS["MethodDef"]]
+    types = []
+    for row in range(1, type_count + 1):
+        entry = TypeDef(string(column("TypeDef", row, 2)), string(column("TypeDef", row, 1)))
+        # A type's methods run up to the next type's first method
+        first = column("TypeDef", row, 5)
+        end = column("TypeDef", row + 1, 5) if row < type_count else method_count + 1
+        for index in range(first, min(end, method_count + 1)):
+            method = method_row(index)
+            name = string(column("MethodDef", method, 3))
+            entry.methods.append(Method(name, method_body(column("MethodDef", method, 0))))
+        types.append(entry)
+
+    for row in range(1, rows[_TABLE_NUMBERS["NestedClass"]] + 1):
+        nested, enclosing = column("NestedClass", row, 0), column("NestedClass", row, 1)
+        if 0 < nested <= type_count and 0 < enclosing <= type_count:
+            types[nested - 1].enclosing = enclosing - 1
+
+    return Assembly(types)
+
+
+def instructions(code: bytes) -> Iterator[tuple[int, int]]:
+    """Yield (offset, opcode) for each instruction of a method body."""
+    sizes = _OPERAND_SIZES
+    offset = 0
+    end = len(code)
+    try:
+        while offset < end:
+            opcode = code[offset]
+            start = offset
+            offset += 1
+            if opcode == 0xFE:
+                opcode = 0xFE00 | code[offset]
+                offset += 1
+            if opcode == SWITCH:
+                offset += 4 + 4 * _U4.unpack_from(code, offset)[0]
+            else:
+                offset += sizes[opcode]
+            yield start, opcode
+    except (KeyError, IndexError, struct.error):
+        raise CILFormatError(f"invalid IL at offset {start:#x}") from None
+
+
+def operand_text(code: bytes, offset: int) -> str:
+    """
+    Operands of the instruction at offset as ILSpy prints them, for the
+    instructions the analyzer reports: branch targets and switch tables.
+    Other instructions give "".
+    """
+    opcode = code[offset]
+    if opcode in _BRANCHES:
+        size = _OPERAND_SIZES[opcode]
+        if size == 1:
+            delta = struct.unpack_from("<b", code, offset + 1)[0]
+        else:
+            delta = _I4.unpack_from(code, offset + 1)[0]
+        return f"IL_{offset + 1 + size + delta:04x}"
+    if opcode == SWITCH:
+        count = _U4.unpack_from(code, offset + 1)[0]
+        end = offset + 5 + 4 * count
+        targets = (end + _I4.unpack_from(code, offset + 5 + 4 * i)[0] for i in range(count))
+        return f"({', '.join(f'IL_{target:04x}' for target in targets)})"
+    return ""
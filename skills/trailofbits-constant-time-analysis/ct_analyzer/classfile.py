@@ -0,0 +1,304 @@
+"""
+JVM class file reader for the Java and Kotlin analyzers.
+
+Reads what the analyzers need straight from .class files (or jar entries):
+the class and source file names, and each method's bytecode and
+LineNumberTable. This replaces a javap process and the parsing of its text
+output. Only the structure is decoded; the constant pool is kept just far
+enough to resolve names, and instructions are decoded on demand by
+instructions() and operand_text().
+
+Reference: The Java Virtual Machine Specification, chapter 4 (class file
+format) and chapter 6 (instruction set).
+"""
+
+import struct
+from collections.abc import Iterator
+from dataclasses import dataclass, field
+
+MAGIC = 0xCAFEBABE
+
+# Mnemonics by opcode (JVMS 6.5); 202+ are reserved
+OPCODES = tuple(
+    """
+    nop aconst_null iconst_m1 iconst_0 iconst_1 iconst_2 iconst_3 iconst_4 iconst_5
+    lconst_0 lconst_1 fconst_0 fconst_1 fconst_2 dconst_0 dconst_1 bipush sipush ldc ldc_w
+    ldc2_w iload lload fload dload aload iload_0 iload_1 iload_2 iload_3 lload_0 lload_1
+    lload_2 lload_3 fload_0 fload_1 fload_2 fload_3 dload_0 dload_1 dload_2 dload_3 aload_0
+    aload_1 aload_2 aload_3 iaload laload faload daload aaload baload caload saload istore
+    lstore fstore dstore astore istore_0 istore_1 istore_2 istore_3 lstore_0 lstore_1
+    lstore_2 lstore_3 fstore_0 fstore_1 fstore_2 fstore_3 dstore_0 dstore_1 dstore_2
+    dstore_3 astore_0 astore_1 astore_2 astore_3 iastore lastore fastore dastore aastore
+    bastore castore sastore pop pop2 dup dup_x1 dup_x2 dup2 dup2_x1 dup2_x2 swap iadd ladd
+    fadd dadd isub lsub fsub dsub imul lmul fmul dmul idiv ldiv fdiv ddiv irem lrem frem
+    drem ineg lneg fneg dneg ishl lshl ishr lshr iushr lushr iand land ior lor ixor lxor
+    iinc i2l i2f i2d l2i l2f l2d f2i f2l f2d d2i d2l d2f i2b i2c i2s lcmp fcmpl fcmpg dcmpl
+    dcmpg ifeq ifne iflt ifge ifgt ifle if_icmpeq if_icmpne if_icmplt if_icmpge if_icmpgt
+    if_icmple if_acmpeq if_acmpne goto jsr ret tableswitch lookupswitch ireturn lreturn
+    freturn dreturn areturn return getstatic putstatic getfield putfield invokevirtual
+    invokespecial invokestatic invokeinterface invokedynamic new newarray anewarray
+    arraylength athrow checkcast instanceof monitorenter monitorexit wide multianewarray
+    ifnull ifnonnull goto_w jsr_w
+    """.split()
+)
+
+OPCODE_NUMBERS = {name: opcode for opcode, name in enumerate(OPCODES)}
+
+TABLESWITCH = OPCODE_NUMBERS["tableswitch"]
+LOOKUPSWITCH = OPCODE_NUMBERS["lookupswitch"]
+WIDE = OPCODE_NUMBERS["wide"]
+IINC = OPCODE_NUMBERS["iinc"]
+
+
+def _instruction_sizes() -> tuple[int, ...]:
+    """Size by opcode of the fixed-length instructions (variable-length ones give 1)."""
+    sizes = [1] * len(OPCODES)
+    for names, operand_bytes in (
+        ("bipush ldc iload lload fload dload aload istore lstore fstore dstore astore", 1),
+        ("ret newarray", 1),
+        ("sipush ldc_w ldc2_w iinc getstatic putstatic getfield putfield", 2),
+        ("invokevirtual invokespecial invokestatic new anewarray checkcast instanceof", 2),
+        ("ifeq ifne iflt ifge ifgt ifle if_icmpeq if_icmpne if_icmplt if_icmpge", 2),
+        ("if_icmpgt if_icmple if_acmpeq if_acmpne goto jsr ifnull ifnonnull", 2),
+        ("multianewarray", 3),
+        ("invokeinterface invokedynamic goto_w jsr_w", 4),
+    ):
+        for name in names.split():
+            sizes[OPCODE_NUMBERS[name]] = 1 + operand_bytes
+    return tuple(sizes)
+
+
+_INSTRUCTION_SIZES = _instruction_sizes()
+
+# Branches, whose operand is a signed offset from the instruction
+_BRANCHES = frozenset(
+    OPCODE_NUMBERS[name]
+    for name in (
+        "ifeq ifne iflt ifge ifgt ifle if_icmpeq if_icmpne if_icmplt if_icmpge if_icmpgt "
+        "if_icmple if_acmpeq if_acmpne goto jsr ifnull ifnonnull goto_w jsr_w"
+    ).split()
+)
+
+# Constant pool entry sizes after the tag byte (Utf8 is length-prefixed)
+_CONSTANT_SIZES = {3: 4, 4: 4, 5: 8, 6: 8, 7: 2, 8: 2, 9: 4, 10: 4, 11: 4, 12: 4}
+_CONSTANT_SIZES.update({15: 3, 16: 2, 17: 4, 18: 4, 19: 2, 20: 2})
+_UTF8, _CLASS, _LONG, _DOUBLE = 1, 7, 5, 6
+
+_U2 = struct.Struct(">H")
+_U4 = struct.Struct(">I")
+_I4 = struct.Struct(">i")
+_U2U2 = struct.Struct(">HH")
+
+
+class ClassFormatError(ValueError):
+    """The data is not a well-formed class file."""
+
+
+@dataclass(slots=True)
+class Method:
+    """A method's name, descriptor, bytecode and line number table."""
+
+    name: str
+    descriptor: str
+    # None for abstract and native methods
+    code: bytes | None = None
+    # (start offset, source line), sorted by offset
+    line_numbers: list[tuple[int, int]] = field(default_factory=list)
+
+    def line_at(self, offset: int) -> int | None:
+        """Source line of the instruction at offset, or None without a line number table."""
+        line = None
+        for start, number in self.line_numbers:
+            if start > offset:
+                break
+            line = number
+        return line
+
+
+@dataclass(slots=True)
+class ClassFile:
+    """The parts of a class file the analyzers use."""
+
+    # Binary name with dots, as javap prints it (com.example.Crypto$Inner)
+    name: str
+    # SourceFile attribute (Crypto.java), if the compiler recorded it
+    source_file: str | None
+    methods: list[Method]
+
+    @property
+    def package_path(self) -> str:
+        """Directory of the class's package (com/example), "" for the default package."""
+        return self.name.rpartition(".")[0].replace(".", "/")
+
+
+def _decode_utf8(data: bytes) -> str:
+    """Decode the modified UTF-8 of class files (JVMS 4.4.7)."""
+    try:
+        return data.decode("utf-8")
+    except UnicodeDecodeError:
+        # NUL is written as C0 80 and supplementary characters as surrogate pairs
+        text = data.replace(b"\xc0\x80", b"\x00").decode("utf-8", "surrogatepass")
+        return text.encode("utf-16-le", "surrogatepass").decode("utf-16-le", "replace")
+
+
+def read_class(data: bytes) -> ClassFile:
+    """Parse a class file. Raises ClassFormatError if data is not one."""
+    try:
+        return _read_class(memoryview(data))
+    except (struct.error, IndexError) as e:
+        raise ClassFormatError(f"truncated class file: {e}") from None
+
+
+def _read_class(data: memoryview) -> ClassFile:
+    if len(data) < 10 or _U4.unpack_from(data, 0)[0] != MAGIC:
+        raise ClassFormatError("not a class file (bad magic number)")
+
+    # Constant pool: only Utf8 strings and Class entries are kept
+    count = _U2.unpack_from(data, 8)[0]
+    strings: dict[int, str] = {}
+    classes: dict[int, int] = {}
+    offset = 10
+    index = 1
+    while index < count:
+        tag = data[offset]
+        if tag == _UTF8:
+            length = _U2.unpack_from(data, offset + 1)[0]
+            strings[index] = _decode_utf8(bytes(data[offset + 3 : offset + 3 + length]))
+            offset += 3 + length
+        elif tag in _CONSTANT_SIZES:
+            if tag == _CLASS:
+                classes[index] = _U2.unpack_from(data, offset + 1)[0]
+            offset += 1 + _CONSTANT_SIZES[tag]
+        else:
+            raise ClassFormatError(f"unknown constant pool tag {tag} at entry {index}")
+        # Long and Double entries take two slots
+        index += 2 if tag in (_LONG, _DOUBLE) else 1
+
+    def utf8(position: int) -> str:
+        try:
+            return strings[_U2.unpack_from(data, position)[0]]
+        except KeyError:
+            raise ClassFormatError("constant pool index does not name a string") from None
+
+    this_class = _U2.unpack_from(data, offset + 2)[0]
+    if this_class not in classes or classes[this_class] not in strings:
+        raise ClassFormatError("this_class does not name a class")
+    name = strings[classes[this_class]].replace("/", ".")
+    interfaces = _U2.unpack_from(data, offset + 6)[0]
+    offset += 8 + 2 * interfaces
+
+    # Fields: skipped with their attributes
+    fields = _U2.unpack_from(data, offset)[0]
+    offset += 2
+    for _ in range(fields):
+        attributes = _U2.unpack_from(data, offset + 6)[0]
+        offset += 8
+        for _ in range(attributes):
+            offset += 6 + _U4.unpack_from(data, offset + 2)[0]
+
+    methods = []
+    method_count = _U2.unpack_from(data, offset)[0]
+    offset += 2
+    for _ in range(method_count):
+        method = Method(utf8(offset + 2), utf8(offset + 4))
+        attributes = _U2.unpack_from(data, offset + 6)[0]
+        offset += 8
+        for _ in range(attributes):
+            length = _U4.unpack_from(data, offset + 2)[0]
+            if utf8(offset) == "Code":
+                _read_code(data, offset + 6, method, utf8)
+            offset += 6 + length
+        methods.append(method)
+
+    source_file = None
+    attributes = _U2.unpack_from(data, offset)[0]
+    offset += 2
+    for _ in range(attributes):
+        length = _U4.unpack_from(data, offset + 2)[0]
+        if utf8(offset) == "SourceFile":
+            source_file = utf8(offset + 6)
+        offset += 6 + length
+
+    return ClassFile(name=name, source_file=source_file, methods=methods)
+
+
+def _read_code(data: memoryview, offset: int, method: Method, utf8) -> None:
+    """Fill in method from the Code attribute whose body starts at offset (JVMS 4.7.3)."""
+    code_length = _U4.unpack_from(data, offset + 4)[0]
+    start = offset + 8
+    if start + code_length > len(data):
+        raise ClassFormatError(f"Code attribute of {method.name} overruns the class file")
+    method.code = bytes(data[start : start + code_length])
+    offset = start + code_length
+    exception_entries = _U2.unpack_from(data, offset)[0]
+    offset += 2 + 8 * exception_entries
+
+    attributes = _U2.unpack_from(data, offset)[0]
+    offset += 2
+    for _ in range(attributes):
+        length = _U4.unpack_from(data, offset + 2)[0]
+        if utf8(offset) == "LineNumberTable":
+            entries = _U2.unpack_from(data, offset + 6)[0]
+            table = offset + 8
+            method.line_numbers.extend(
+                _U2U2.unpack_from(data, table + 4 * i) for i in range(entries)
+            )
+        offset += 6 + length
+    method.line_numbers.sort()
+
+
+def _instruction_size(code: bytes, offset: int, opcode: int) -> int:
+    if opcode == TABLESWITCH:
+        # Operands are aligned to a multiple of 4 from the start of the code
+        aligned = offset + 1 + (-(offset + 1) % 4)
+        low, high = _I4.unpack_from(code, aligned + 4)[0], _I4.unpack_from(code, aligned + 8)[0]
+        if high < low:
+            raise ClassFormatError(f"tableswitch at offset {offset} has high < low")
+        return aligned - offset + 12 + 4 * (high - low + 1)
+    if opcode == LOOKUPSWITCH:
+        aligned = offset + 1 + (-(offset + 1) % 4)
+        pairs = _I4.unpack_from(code, aligned + 4)[0]
+        if pairs < 0:
+            raise ClassFormatError(f"lookupswitch at offset {offset} has a negative pair count")
+        return aligned - offset + 8 + 8 * pairs
+    # wide iinc has two 2-byte operands; other wide instructions one
+    return 6 if code[offset + 1] == IINC else 4
+
+
+def instructions(code: bytes) -> Iterator[tuple[int, int]]:
+    """Yield (offset, opcode) for each instruction of a method's bytecode."""
+    sizes = _INSTRUCTION_SIZES
+    offset = 0
+    end = len(code)
+    try:
+        while offset < end:
+            opcode = code[offset]
+            yield offset, opcode
+            if opcode in (TABLESWITCH, LOOKUPSWITCH, WIDE):
+                offset += _instruction_size(code, offset, opcode)
+            else:
+                offset += sizes[opcode]
+    except (IndexError, struct.error):
+        raise ClassFormatError(f"invalid bytecode at offset {offset}") from None
+
+
+def operand_text(code: bytes, offset: int) -> str:
+    """
+    Operands of the instruction at offset as javap prints them, for the
+    instructions the analyzers report: branch targets and switch sizes.
+    Other instructions give "".
+    """
+    opcode = code[offset]
+    if opcode in _BRANCHES:
+        if OPCODES[opcode] in ("goto_w", "jsr_w"):
+            delta = _I4.unpack_from(code, offset + 1)[0]
+        else:
+            delta = struct.unpack_from(">h", code, offset + 1)[0]
+        return str(offset + delta)
+    aligned = offset + 1 + (-(offset + 1) % 4)
+    if opcode == TABLESWITCH:
+        low, high = _I4.unpack_from(code, aligned + 4)[0], _I4.unpack_from(code, aligned + 8)[0]
+        return f"{{ // {low} to {high}"
+    if opcode == LOOKUPSWITCH:
+        return f"{{ // {_I4.unpack_from(code, aligned + 4)[0]}"
+    return ""
@@ -0,0 +1,341 @@
+"""
+Phase profiling for the constant-time analyzer.
+
+A run is divided into phases - toolchain probe, compile, disassemble, read,
+parse, filter, store and format - and every phase is recorded with the file
+it worked on, its wall time and the memory high-water marks of the analyzer
+process and of its child processes (compilers, disassemblers, runtimes) at
+its start and end. A high-water mark only ever grows, so a phase is charged
+with how far it raised the mark, not with the mark itself.
+
+Profiling is switched on by a Profiler, which points $CT_ANALYZER_PROFILE_DIR
+at a temporary directory. Every process, including the workers of scan,
+archive and compilation-database runs, appends its events to its own file
+there, so nothing has to be passed back from the workers. When profiling is
+off, phase() only looks up the environment variable.
+
+The events are exported as Chrome trace-event JSON (chrome://tracing,
+https://ui.perfetto.dev) and summarized in a table per phase, per worker and
+per file.
+"""
+
+import functools
+import json
+import os
+import sys
+import tempfile
+import threading
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+PROFILE_ENV = "CT_ANALYZER_PROFILE_DIR"
+
+# Phases in pipeline order, for the summary table
+PHASES = ("probe", "compile", "disassemble", "read", "parse", "filter", "store", "format")
+
+_local = threading.local()
+_write_lock = threading.Lock()
+
+
+def _maxrss_kb(who: int) -> int | None:
+    if resource is None:
+        return None
+    peak = resource.getrusage(who).ru_maxrss
+    # Bytes on macOS, kilobytes elsewhere
+    return peak // 1024 if sys.platform == "darwin" else peak
+
+
+def _peak_rss_kb() -> int | None:
+    """High-water resident set size of this process in KiB."""
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1])
+    except OSError:
+        pass
+    return _maxrss_kb(resource.RUSAGE_SELF) if resource is not None else None
+
+
+def _child_peak_rss_kb() -> int | None:
+    """High-water resident set size of the largest child waited for, in KiB."""
+    return _maxrss_kb(resource.RUSAGE_CHILDREN) if resource is not None else None
+
+
+def _peaks() -> tuple[int | None, int | None]:
+    return _peak_rss_kb(), _child_peak_rss_kb()
+
+
+def _growth(end: int | None, start: int | None) -> int | None:
+    return None if end is None or start is None else end - start
+
+
+def _record(
+    directory: str,
+    cat: str,
+    name: str,
+    file: str | None,
+    start: int,
+    start_peaks: tuple[int | None, int | None],
+) -> None:
+    """Append one finished event to this process's file in the profile directory."""
+    end = time.perf_counter_ns()
+    peak, child_peak = _peaks()
+    event = {
+        "cat": cat,
+        "name": name,
+        "file": file,
+        "pid": os.getpid(),
+        "tid": threading.get_native_id(),
+        "start": start,
+        "end": end,
+        "peak_rss_kb": peak,
+        "child_peak_rss_kb": child_peak,
+        "peak_rss_growth_kb": _growth(peak, start_peaks[0]),
+        "child_peak_rss_growth_kb": _growth(child_peak, start_peaks[1]),
+    }
+    line = json.dumps(event) + "\n"
+    with _write_lock, open(os.path.join(directory, f"{os.getpid()}.jsonl"), "a") as f:
+        f.write(line)
+
+
+@contextmanager
+def phase(name: str, file: str | None = None):
+    """
+    Record the enclosed block as one phase. file defaults to the file of the
+    enclosing file_scope. Phases nested in a probe (trial compilations) are
+    counted as part of the probe.
+    """
+    directory = os.environ.get(PROFILE_ENV)
+    if not directory or getattr(_local, "probing", False):
+        yield
+        return
+
+    _local.probing = name == "probe"
+    start_peaks = _peaks()
+    start = time.perf_counter_ns()
+    try:
+        yield
+    finally:
+        _local.probing = False
+        file = file or getattr(_local, "file", None)
+        _record(directory, "phase", name, file, start, start_peaks)
+
+
+@contextmanager
+def file_scope(path: str):
+    """
+    Attribute the phases in the enclosed block to path, and record the block
+    as one file event. A nested scope keeps the outer path, so worker entry
+    points can label a file (an archive member, say) before the analysis
+    function sees its temporary path.
+    """
+    directory = os.environ.get(PROFILE_ENV)
+    if not directory or getattr(_local, "file", None) is not None:
+        yield
+        return
+
+    _local.file = path
+    start_peaks = _peaks()
+    start = time.perf_counter_ns()
+    try:
+        yield
+    finally:
+        _local.file = None
+        _record(directory, "file", str(path), str(path), start, start_peaks)
+
+
+def profiled(name: str):
+    """Decorator: record every call of the function as the given phase."""
+
+    def decorate(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with phase(name):
+                return func(*args, **kwargs)
+
+        return wrapper
+
+    return decorate
+
+
+def profiled_file(func):
+    """Decorator: run the function in a file_scope for its first argument."""
+    parameter = func.__code__.co_varnames[0]
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        with file_scope(args[0] if args else kwargs.get(parameter)):
+            return func(*args, **kwargs)
+
+    return wrapper
+
+
+class Profiler:
+    """
+    Switches profiling on for this process and the worker processes it
+    starts, until stop() collects the events.
+    """
+
+    def __init__(self):
+        self._tmpdir = tempfile.TemporaryDirectory(prefix="ct-profile-")
+        self._previous = os.environ.get(PROFILE_ENV)
+        os.environ[PROFILE_ENV] = self._tmpdir.name
+        self.pid = os.getpid()
+
+    def stop(self) -> list[dict]:
+        """Switch profiling off and return the recorded events, oldest first."""
+        if self._previous is None:
+            os.environ.pop(PROFILE_ENV, None)
+        else:
+            os.environ[PROFILE_ENV] = self._previous
+
+        events = []
+        for name in sorted(os.listdir(self._tmpdir.name)):
+            with open(os.path.join(self._tmpdir.name, name)) as f:
+                events.extend(json.loads(line) for line in f if line.strip())
+        self._tmpdir.cleanup()
+        events.sort(key=lambda e: (e["start"], -e["end"]))
+        return events
+
+
+def _self_values(events: list[dict], value) -> list:
+    """
+    value(event) for each event minus the values of the events nested in it
+    on the same thread. events must be sorted by start time; None stays None.
+    """
+    values = [value(e) for e in events]
+    self_values = list(values)
+    stacks = defaultdict(list)
+    for index, event in enumerate(events):
+        stack = stacks[event["pid"], event["tid"]]
+        while stack and events[stack[-1]]["end"] <= event["start"]:
+            stack.pop()
+        if stack and self_values[stack[-1]] is not None and values[index] is not None:
+            self_values[stack[-1]] -= values[index]
+        stack.append(index)
+    return self_values
+
+
+def _self_times(events: list[dict]) -> list[int]:
+    """Wall time of each event minus the events nested in it, in nanoseconds."""
+    return _self_values(events, lambda e: e["end"] - e["start"])
+
+
+def chrome_trace(events: list[dict], main_pid: int | None = None) -> dict:
+    """Chrome trace-event JSON for the events, with times relative to the first one."""
+    origin = min((e["start"] for e in events), default=0)
+    trace = []
+    for pid in sorted({e["pid"] for e in events}):
+        label = "ct-analyzer" if pid == main_pid else f"worker {pid}"
+        trace.append({"name": "process_name", "ph": "M", "pid": pid, "args": {"name": label}})
+    for event in events:
+        args = {
+            key: event.get(key)
+            for key in (
+                "file",
+                "peak_rss_kb",
+                "child_peak_rss_kb",
+                "peak_rss_growth_kb",
+                "child_peak_rss_growth_kb",
+            )
+        }
+        trace.append(
+            {
+                "name": event["name"],
+                "cat": event["cat"],
+                "ph": "X",
+                "ts": (event["start"] - origin) / 1000,
+                "dur": (event["end"] - event["start"]) / 1000,
+                "pid": event["pid"],
+                "tid": event["tid"],
+                "args": args,
+            }
+        )
+    return {"traceEvents": trace, "displayTimeUnit": "ms"}
+
+
+def _mib(kib: int | None) -> str:
+    return "-" if kib is None else f"{kib / 1024:.1f}"
+
+
+def _peak(events: list[dict], key: str) -> int | None:
+    values = [e[key] for e in events if e[key] is not None]
+    return max(values) if values else None
+
+
+def _total(values: list[int | None]) -> int | None:
+    known = [v for v in values if v is not None]
+    return sum(known) if known else None
+
+
+def format_summary(events: list[dict], main_pid: int | None = None, top: int = 10) -> str:
+    """
+    Summary table of the events: self time and high-water mark growth per
+    phase, busy time and peak memory per worker thread, and the slowest files.
+    """
+    self_times = _self_times(events)
+    growth = _self_values(events, lambda e: e.get("peak_rss_growth_kb"))
+    child_growth = _self_values(events, lambda e: e.get("child_peak_rss_growth_kb"))
+    busy = sum(self_times) or 1
+    lines = [
+        (
+            "Profile (nested phases excluded; +MiB is how far a phase raised the memory "
+            "high-water mark)"
+        ),
+        (
+            f"{'Phase':<14}{'Calls':>7}{'Wall (s)':>11}{'Share':>8}{'Peak +MiB':>12}"
+            f"{'Child peak +MiB':>17}"
+        ),
+    ]
+
+    phases = defaultdict(list)
+    for index, event in enumerate(events):
+        name = event["name"] if event["cat"] == "phase" else "other"
+        phases[name].append(index)
+    order = [p for p in PHASES if p in phases] + sorted(set(phases) - set(PHASES))
+    for name in order:
+        indexes = phases[name]
+        seconds = sum(self_times[i] for i in indexes)
+        lines.append(
+            f"{name:<14}{len(indexes):>7}{seconds / 1e9:>11.3f}{seconds / busy:>8.1%}"
+            f"{_mib(_total([growth[i] for i in indexes])):>12}"
+            f"{_mib(_total([child_growth[i] for i in indexes])):>17}"
+        )
+
+    workers = defaultdict(list)
+    for event, self_time in zip(events, self_times):
+        workers[event["pid"], event["tid"]].append((event, self_time))
+    lines += ["", f"{'Worker':<24}{'Files':>7}{'Busy (s)':>11}{'Peak RSS (MiB)':>16}"]
+    for (pid, tid), entries in sorted(workers.items()):
+        label = f"{pid}/{tid}" + (" (main)" if pid == main_pid else "")
+        recorded = [e for e, _ in entries]
+        files = sum(1 for e in recorded if e["cat"] == "file")
+        seconds = sum(t for _, t in entries)
+        lines.append(
+            f"{label:<24}{files:>7}{seconds / 1e9:>11.3f}"
+            f"{_mib(_peak(recorded, 'peak_rss_kb')):>16}"
+        )
+
+    files = defaultdict(int)
+    for event in events:
+        if event["cat"] == "file":
+            files[event["name"]] += event["end"] - event["start"]
+    if files:
+        lines += ["", f"{'Slowest files':<60}{'Wall (s)':>11}"]
+        for path, seconds in sorted(files.items(), key=lambda item: -item[1])[:top]:
+            label = path if len(path) <= 58 else "..." + path[-55:]
+            lines.append(f"{label:<60}{seconds / 1e9:>11.3f}")
+    return "\n".join(lines)
+
+
+def write_trace(events: list[dict], path: str, main_pid: int | None = None) -> None:
+    """Write the events to path as Chrome trace-event JSON."""
+    with open(path, "w") as f:
+        json.dump(chrome_trace(events, main_pid), f)
@@ -9,19 +9,82 @@ This module provides analyzers for scripting languages (PHP, JavaScript/TypeScri
 that work at the bytecode/opcode level rather than native assembly.
 """
 
+import dis
+import functools
+import hashlib
+import html
+import inspect
+import json
 import os
 import re
+import secrets
+import shutil
 import subprocess
 import sys
 import tempfile
+import threading
+import types
+import weakref
+import zipfile
 from abc import ABC, abstractmethod
+from collections.abc import Callable, Iterable, Iterator
+from contextlib import contextmanager
+from dataclasses import dataclass
 from pathlib import Path
 
 # Import shared types from main analyzer
 try:
-    from .analyzer import AnalysisReport, Severity, Violation
+    from .analyzer import (
+        DOTNET_ASSEMBLY_SUFFIXES,
+        NUGET_PACKAGE_SUFFIX,
+        AnalysisReport,
+        Severity,
+        Violation,
+        find_sources,
+    )
+    from .cil import OPCODE_NUMBERS as CIL_OPCODE_NUMBERS
+    from .cil import OPCODES as CIL_OPCODES
+    from .cil import Assembly, CILFormatError, NotAssemblyError, read_assembly
+    from .cil import instructions as cil_instructions
+    from .cil import operand_text as cil_operand_text
+    from .classfile import (
+        OPCODE_NUMBERS,
+        OPCODES,
+        ClassFile,
+        ClassFormatError,
+        instructions,
+        operand_text,
+        read_class,
+    )
+    from .profiling import profiled
+    from .source_index import PatternSet, SourceIndex
+    from .toolchains import default_cache_dir, get_registry
 except ImportError:
-    from analyzer import AnalysisReport, Severity, Violation
+    from analyzer import (
+        DOTNET_ASSEMBLY_SUFFIXES,
+        NUGET_PACKAGE_SUFFIX,
+        AnalysisReport,
+        Severity,
+        Violation,
+        find_sources,
+    )
+    from cil import OPCODE_NUMBERS as CIL_OPCODE_NUMBERS
+    from cil import OPCODES as CIL_OPCODES
+    from cil import Assembly, CILFormatError, NotAssemblyError, read_assembly
+    from cil import instructions as cil_instructions
+    from cil import operand_text as cil_operand_text
+    from classfile import (
+        OPCODE_NUMBERS,
+        OPCODES,
+        ClassFile,
+        ClassFormatError,
+        instructions,
+        operand_text,
+        read_class,
+    )
+    from profiling import profiled
+    from source_index import PatternSet, SourceIndex
+    from toolchains import default_cache_dir, get_registry
 
 
 # =============================================================================
@@ -515,11 +578,48 @@ DANGEROUS_CSHARP_FUNCTIONS = {
 # =============================================================================
 
 
+@dataclass(frozen=True)
+class SourceRule:
+    """What a source pattern reports when it matches."""
+
+    mnemonic: str
+    reason: str
+    severity: Severity
+    # Reported instruction; None reports the matched text
+    instruction: str | None = None
+    # Matches on lines starting with these (comment markers) are ignored
+    comments: tuple[str, ...] = ()
+
+
 class ScriptAnalyzer(ABC):
     """Base class for scripting language analyzers."""
 
     name: str = "unknown"
 
+    @staticmethod
+    def _scan_source(
+        source_file: str, index: SourceIndex, patterns: PatternSet
+    ) -> list[Violation]:
+        """Violations for every match of patterns (keyed by SourceRule) in the source."""
+        violations = []
+        for rule, match in patterns.finditer(index.text):
+            start = match.start()
+            if rule.comments and index.line_text(start).strip().startswith(rule.comments):
+                continue
+            violations.append(
+                Violation(
+                    function="<source>",
+                    file=source_file,
+                    line=index.line(start),
+                    address="",
+                    instruction=rule.instruction or match.group(0),
+                    mnemonic=rule.mnemonic,
+                    reason=rule.reason,
+                    severity=rule.severity,
+                )
+            )
+        return violations
+
     @abstractmethod
     def is_available(self) -> bool:
         """Check if the analyzer's runtime is available."""
@@ -566,26 +666,22 @@ class PHPAnalyzer(ScriptAnalyzer):
 
     def is_available(self) -> bool:
         """Check if PHP is available."""
-        try:
-            result = subprocess.run(
-                [self.php_path, "--version"],
-                capture_output=True,
-                text=True,
-            )
-            return result.returncode == 0
-        except FileNotFoundError:
-            return False
+        return get_registry().is_available(self.php_path, ["--version"])
 
+    @profiled("probe")
     def _check_vld_available(self) -> bool:
         """Check if VLD extension is available."""
         if self._vld_available is not None:
             return self._vld_available
 
+        # Not kept in the toolchain registry: php.ini and conf.d can load or
+        # drop VLD without the php binary changing
         try:
             result = subprocess.run(
                 [self.php_path, "-m"],
                 capture_output=True,
                 text=True,
+                check=False,
             )
             self._vld_available = "vld" in result.stdout.lower()
         except FileNotFoundError:
@@ -593,6 +689,7 @@ class PHPAnalyzer(ScriptAnalyzer):
 
         return self._vld_available
 
+    @profiled("disassemble")
     def _get_vld_output(self, source_file: str) -> tuple[bool, str]:
         """Get VLD opcode dump for a PHP file."""
         cmd = [
@@ -613,6 +710,7 @@ class PHPAnalyzer(ScriptAnalyzer):
         except FileNotFoundError:
             return False, f"PHP not found: {self.php_path}"
 
+    @profiled("disassemble")
     def _get_opcache_output(self, source_file: str) -> tuple[bool, str]:
         """Get OPcache debug output for a PHP file (fallback)."""
         cmd = [
@@ -631,6 +729,7 @@ class PHPAnalyzer(ScriptAnalyzer):
         except FileNotFoundError:
             return False, f"PHP not found: {self.php_path}"
 
+    @profiled("parse")
     def _parse_vld_output(
         self,
         output: str,
@@ -794,6 +893,7 @@ class PHPAnalyzer(ScriptAnalyzer):
 
         return functions, violations
 
+    @profiled("parse")
     def _parse_opcache_output(
         self,
         output: str,
@@ -856,6 +956,378 @@ class PHPAnalyzer(ScriptAnalyzer):
 # =============================================================================
 
 
+# A V8 bytecode instruction as node prints it (see _parse_v8_bytecode)
+_V8_INSTRUCTION = re.compile(
+    r"(?:\d+\s+[SE]>\s+)?(?:0x[0-9a-fA-F]+\s+@\s+)?(\d+)\s*:\s*(?:[0-9a-f]{2}\s+)*"
+    r"([A-Za-z][A-Za-z0-9]*)\s*(.*)"
+)
+
+# Function filters a worker passes to V8's --print-bytecode-filter. The flag
+# is set from inside the worker, where whitespace would start further flags
+# that stay set for every later file.
+_V8_FUNCTION_FILTER = re.compile(r"[\w.$*~-]+")
+
+# The script each Node worker runs. Requests are JSON lines on stdin. For each
+# one the worker turns bytecode printing on (for the requested function
+# filter), runs the file as node would, waits until the timers, I/O and other
+# handles the file left have completed (for at most the pool's drain time),
+# turns printing off again and writes the pool's token on a line of its own,
+# followed by " pending" if the file's handles were still active and
+# " modified" if it left globals or process listeners behind, then a tab and
+# the JSON list of the names of the functions the file defines. Printing is
+# filtered to nothing ("~") between requests, so node's own startup and the
+# worker itself are not printed. Node functions the file is the first to call
+# (console.log's formatting, for instance) are printed with it; the list of
+# its own functions lets the pool leave them out. The list comes from V8's
+# function-level coverage, which does not change the bytecode, and is null
+# when node was built without the inspector.
+_NODE_WORKER = """'use strict';
+const path = require('path');
+const readline = require('readline');
+const { pathToFileURL } = require('url');
+const v8 = require('v8');
+
+const token = process.argv[2];
+const drainMs = Number(process.argv[3]);
+let session = null;
+try {
+  session = new (require('inspector').Session)();
+  session.connect();
+} catch {
+  // node built without the inspector: functions are not attributed
+}
+// Node opens these on first use: open them now, so their handles are not
+// taken for those of the first file that logs
+const { stdout, stderr } = process;
+let loads = 0;
+
+async function load(file) {
+  // Modules the file loads are dropped with it, so the next file that
+  // requires them compiles (and prints) them again
+  const cached = new Set(Object.keys(require.cache));
+  try {
+    if (!file.endsWith('.mjs')) {
+      try {
+        require(file);
+        return;
+      } catch (error) {
+        if (error.code !== 'ERR_REQUIRE_ESM') throw error;
+      }
+    }
+    // ES modules are cached by URL: a new query loads the file again
+    await import(`${pathToFileURL(file)}?ct-analyzer=${++loads}`);
+  } finally {
+    for (const key of Object.keys(require.cache)) {
+      if (!cached.has(key)) delete require.cache[key];
+    }
+  }
+}
+
+// Counts of the resources keeping the event loop alive, by type. Unref'd
+// handles are not counted, as node would exit with them still pending.
+function activeResources() {
+  const counts = new Map();
+  for (const type of process.getActiveResourcesInfo()) {
+    counts.set(type, (counts.get(type) || 0) + 1);
+  }
+  return counts;
+}
+
+// Resolves to whether the resources added since before were released within
+// drainMs. The poll timer is unref'd, so it is not one of them.
+function drain(before) {
+  const deadline = Date.now() + drainMs;
+  return new Promise((resolve) => {
+    (function poll() {
+      const added = [...activeResources()].some(([type, n]) => n > (before.get(type) || 0));
+      if (!added || Date.now() >= deadline) {
+        resolve(!added);
+      } else {
+        setTimeout(poll, 1).unref();
+      }
+    })();
+  });
+}
+
+// The names of the globals and of the process events with listeners, with
+// their counts. Every file a worker runs shares its realm, so a file that
+// changes these could change what a later file runs.
+function realm() {
+  const events = process.eventNames().map((name) => `${String(name)}:${process.listenerCount(name)}`);
+  return new Set([...Object.getOwnPropertyNames(globalThis), ...events]);
+}
+
+// Runs the file; resolves to whether its handles were released in time and
+// whether it left the globals and process listeners as they were
+async function run(file) {
+  const before = activeResources();
+  const names = realm();
+  try {
+    await load(file);
+  } catch (error) {
+    stderr.write(`${(error && error.stack) || error}\\n`);
+  }
+  const drained = await drain(before);
+  const after = realm();
+  const unchanged = after.size === names.size && [...after].every((name) => names.has(name));
+  return { drained, unchanged };
+}
+
+function post(method, params) {
+  return new Promise((resolve, reject) => {
+    session.post(method, params, (error, result) => (error ? reject(error) : resolve(result)));
+  });
+}
+
+// Starts recording the functions of the scripts compiled from now on
+async function startCoverage() {
+  if (session) {
+    await post('Profiler.enable');
+    await post('Profiler.startPreciseCoverage', { callCount: false, detailed: false });
+  }
+}
+
+// Stops recording; resolves to the names of the functions defined in file
+// (in any of the copies loaded since startCoverage), or null
+async function definedIn(file) {
+  if (!session) return null;
+  const { result } = await post('Profiler.takePreciseCoverage');
+  await post('Profiler.stopPreciseCoverage');
+  const url = pathToFileURL(file).href;
+  const names = new Set();
+  for (const script of result) {
+    if (script.url.split('?')[0] !== url) continue;
+    for (const { functionName } of script.functions) {
+      if (functionName) names.add(functionName);
+    }
+  }
+  return [...names].sort();
+}
+
+// Node compiles its timer, immediate and task queue functions on first use,
+// and the resolution and error reporting functions of a failed load
+async function warmUp() {
+  await run(__dirname);
+  await run(path.join(__dirname, 'missing.mjs'));
+  const after = (ms) => new Promise((resolve) => setTimeout(resolve, ms));
+  await Promise.all([after(1), after(2), after(1), new Promise(setImmediate)]);
+  await new Promise((resolve) => {
+    const interval = setInterval(() => {
+      clearInterval(interval);
+      resolve();
+    }, 1);
+  });
+  await new Promise((resolve) => process.nextTick(resolve));
+  await new Promise((resolve) => queueMicrotask(resolve));
+  const before = activeResources();
+  setTimeout(() => {}, 2);
+  await drain(before);
+  await startCoverage();
+  await definedIn(__filename);
+}
+
+if (require.main === module) {
+  // Opened first, so the warm-up does not wait for stdin's handle
+  const requests = readline.createInterface({ input: process.stdin });
+
+  // Load this script once more, both required and imported, and an ES
+  // module while printing is off, so the loader functions node compiles
+  // lazily are compiled before the first request rather than printed with it
+  delete require.cache[__filename];
+  let queue = run(__filename)
+    .then(() => import(`${pathToFileURL(__filename)}?ct-analyzer=0`))
+    .then(() => import('data:text/javascript,export%20default%200'))
+    .then(warmUp);
+
+  requests.on('line', (line) => {
+    const { file, filter } = JSON.parse(line);
+    queue = queue.then(async () => {
+      await startCoverage();
+      v8.setFlagsFromString(`--print-bytecode-filter=${filter || '*'}`);
+      const { drained, unchanged } = await run(file);
+      v8.setFlagsFromString('--print-bytecode-filter=~');
+      const functions = JSON.stringify(await definedIn(file));
+      const status = `${drained ? '' : ' pending'}${unchanged ? '' : ' modified'}`;
+      stdout.write(`\\n${token}${status}\\t${functions}\\n`);
+    });
+  });
+}
+"""
+
+
+def _kill_node_worker(worker: subprocess.Popen) -> None:
+    """Kill a worker and close its pipes."""
+    worker.kill()
+    worker.wait()
+    for pipe in (worker.stdin, worker.stdout):
+        try:
+            pipe.close()
+        except OSError:
+            pass  # A request still buffered for the dead worker
+
+
+def _stop_node_workers(workers: list[subprocess.Popen]) -> None:
+    """Close the workers' requests; kill those still busy after a moment."""
+    for worker in workers:
+        try:
+            worker.stdin.close()
+            worker.wait(timeout=2)
+        except (OSError, subprocess.TimeoutExpired):
+            pass
+        _kill_node_worker(worker)
+    workers.clear()
+
+
+@dataclass
+class NodeDump:
+    """
+    A file's bytecode dump as a worker prints it; iterating yields its
+    lines. Once they have been read to the end, functions holds the names of
+    the functions the file defines, or None if they are unknown (the file
+    ended the worker, or node has no inspector).
+    """
+
+    lines: Iterator[str]
+    functions: set[str] | None = None
+
+    def __iter__(self) -> Iterator[str]:
+        return self.lines
+
+
+class NodeWorkerPool:
+    """
+    Long-lived node processes that print the V8 bytecode of files on request.
+
+    Starting `node --print-bytecode` once per file made node startup dominate
+    the analysis of large trees. A worker is started once with bytecode
+    printing filtered to nothing, and for each request it runs one file with
+    printing on and then writes the pool's token, so a file's dump is the
+    worker's output up to the token. It is read line by line as node prints
+    it. Workers are started on demand, one per concurrent caller, and kept
+    for later requests; one whose file ended the process (process.exit) is
+    replaced.
+
+    A worker waits for the timers, I/O and other handles a file leaves behind
+    before writing the token, so functions first called from them are in the
+    file's dump. A file whose handles are still active after drain_timeout
+    seconds (a server, an interval never cleared) costs its worker, which is
+    stopped rather than reused so its callbacks cannot run into another
+    file's dump.
+
+    The files a worker runs share one realm, and only the module cache is
+    reset between them. A file that adds or removes globals or process
+    listeners also costs its worker, so later files do not run against
+    them. Changes to built-in prototypes and to the properties of existing
+    globals are not detected and stay in place for the worker's later files.
+    """
+
+    def __init__(self, node_path: str = "node", drain_timeout: float = 5.0):
+        self.node_path = node_path
+        self.drain_timeout = drain_timeout
+        self.token = secrets.token_hex(16)
+        self._idle: list[subprocess.Popen] = []
+        self._lock = threading.Lock()
+        self._script: str | None = None
+        weakref.finalize(self, _stop_node_workers, self._idle)
+
+    def _worker_script(self) -> str:
+        """_NODE_WORKER's path in the cache directory, written on first use."""
+        if self._script is None:
+            digest = hashlib.sha256(_NODE_WORKER.encode()).hexdigest()[:16]
+            directory = os.path.join(default_cache_dir(), "node")
+            path = os.path.join(directory, f"bytecode-worker-{digest}.js")
+            if not os.path.exists(path):
+                os.makedirs(directory, exist_ok=True)
+                fd, staging = tempfile.mkstemp(prefix=".worker-", suffix=".js", dir=directory)
+                with os.fdopen(fd, "w") as f:
+                    f.write(_NODE_WORKER)
+                os.replace(staging, path)
+            self._script = path
+        return self._script
+
+    @profiled("disassemble")
+    def _start(self) -> subprocess.Popen:
+        """Start a worker. Raises FileNotFoundError if node is not installed."""
+        return subprocess.Popen(
+            [
+                self.node_path,
+                "--print-bytecode",
+                "--print-bytecode-filter=~",
+                self._worker_script(),
+                self.token,
+                str(int(self.drain_timeout * 1000)),
+            ],
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+            text=True,
+            encoding="utf-8",
+            errors="replace",
+        )
+
+    def _request(self, js_file: str, function_filter: str | None) -> subprocess.Popen:
+        """Send the request to an idle worker, starting one if none is idle or alive."""
+        if function_filter and not _V8_FUNCTION_FILTER.fullmatch(function_filter):
+            raise ValueError(f"Unsupported V8 function filter: {function_filter!r}")
+        request = json.dumps({"file": os.path.abspath(js_file), "filter": function_filter})
+        while True:
+            with self._lock:
+                worker = self._idle.pop() if self._idle else None
+            started = worker is None
+            if started:
+                worker = self._start()
+            try:
+                worker.stdin.write(request + "\n")
+                worker.stdin.flush()
+                return worker
+            except OSError:
+                _kill_node_worker(worker)
+                if started:
+                    raise RuntimeError(f"Node.js worker exited on start: {self.node_path}")
+                # The worker exited since its last request
+
+    @contextmanager
+    def dump(self, js_file: str, function_filter: str | None = None) -> Iterator[NodeDump]:
+        """
+        Run js_file in a worker and yield its NodeDump, whose lines are read
+        as node prints them. The worker is returned to the pool once the dump
+        has been read to the end, unless the file's handles were still
+        active then. Raises ValueError for a function filter that is not a V8
+        filter of word characters, ".", "$", "*", "~" and "-".
+        """
+        worker = self._request(js_file, function_filter)
+        reusable = False
+
+        def lines() -> Iterator[str]:
+            nonlocal reusable
+            for line in iter(worker.stdout.readline, ""):
+                if line.startswith(self.token):
+                    # " pending": the file's handles outlived the drain timeout;
+                    # " modified": it changed the globals or process listeners
+                    status, _, functions = line.rstrip("\n").partition("\t")
+                    reusable = status == self.token
+                    names = json.loads(functions or "null")
+                    dump.functions = set(names) if names is not None else None
+                    return
+                yield line
+            # The file ended the worker; its dump ends there
+
+        dump = NodeDump(lines())
+        try:
+            yield dump
+        finally:
+            if reusable:
+                with self._lock:
+                    self._idle.append(worker)
+            else:
+                _kill_node_worker(worker)
+
+    def close(self) -> None:
+        """Stop the idle workers."""
+        with self._lock:
+            _stop_node_workers(self._idle)
+
+
 class JavaScriptAnalyzer(ScriptAnalyzer):
     """
     Analyzer for JavaScript/TypeScript using V8 bytecode output.
@@ -868,43 +1340,28 @@ class JavaScriptAnalyzer(ScriptAnalyzer):
     def __init__(self, node_path: str | None = None, tsc_path: str | None = None):
         self.node_path = node_path or "node"
         self.tsc_path = tsc_path or "tsc"
+        self.workers = NodeWorkerPool(self.node_path)
 
     def is_available(self) -> bool:
         """Check if Node.js is available."""
-        try:
-            result = subprocess.run(
-                [self.node_path, "--version"],
-                capture_output=True,
-                text=True,
-            )
-            return result.returncode == 0
-        except FileNotFoundError:
-            return False
+        return get_registry().is_available(self.node_path, ["--version"])
 
+    @profiled("probe")
     def _is_tsc_available(self) -> bool:
         """Check if TypeScript compiler is available."""
-        try:
-            result = subprocess.run(
-                [self.tsc_path, "--version"],
-                capture_output=True,
-                text=True,
-            )
-            return result.returncode == 0
-        except FileNotFoundError:
-            # Try npx tsc
-            try:
-                result = subprocess.run(
-                    ["npx", "tsc", "--version"],
-                    capture_output=True,
-                    text=True,
-                )
-                if result.returncode == 0:
-                    self.tsc_path = "npx tsc"
-                    return True
-            except FileNotFoundError:
-                pass
-            return False
-
+        registry = get_registry()
+        if self.tsc_path == "npx tsc":
+            return True
+        tsc = registry.lookup(self.tsc_path, ["--version"])
+        if tsc.path is not None:
+            return tsc.available
+        # Try npx tsc
+        if registry.is_available("npx", ["tsc", "--version"]):
+            self.tsc_path = "npx tsc"
+            return True
+        return False
+
+    @profiled("compile")
     def _transpile_typescript(self, source_file: str, output_dir: str) -> tuple[bool, str]:
         """Transpile TypeScript to JavaScript."""
         source_path = Path(source_file)
@@ -955,33 +1412,18 @@ class JavaScriptAnalyzer(ScriptAnalyzer):
         except FileNotFoundError:
             return False, "TypeScript compiler not found"
 
-    def _get_v8_bytecode(
-        self, source_file: str, function_filter: str | None = None
-    ) -> tuple[bool, str]:
-        """Get V8 bytecode output for a JavaScript file."""
-        cmd = [self.node_path, "--print-bytecode"]
-
-        if function_filter:
-            cmd.extend(["--print-bytecode-filter", function_filter])
-
-        cmd.append(source_file)
-
-        try:
-            result = subprocess.run(cmd, capture_output=True, text=True)
-            # V8 bytecode goes to stdout
-            return True, result.stdout
-        except FileNotFoundError:
-            return False, f"Node.js not found: {self.node_path}"
-
+    @profiled("parse")
     def _parse_v8_bytecode(
         self,
-        output: str,
+        output: str | Iterable[str],
         source_file: str,
         include_warnings: bool = False,
         function_filter: str | None = None,
     ) -> tuple[list[dict], list[Violation]]:
         """
-        Parse V8 bytecode output for dangerous operations.
+        Parse V8 bytecode output for dangerous operations. output is the
+        whole dump or an iterable of its lines, such as a worker's stream,
+        which is parsed as the lines arrive.
 
         V8 bytecode format example:
         [generated bytecode for function: vulnerableFunction (0x...)]
@@ -996,6 +1438,9 @@ class JavaScriptAnalyzer(ScriptAnalyzer):
                 6 : Ldar r0
                 8 : Div r1
                10 : Return
+
+        node prefixes each instruction with its source position, address
+        and encoding: "31 E> 0x2a8e0c9d9a12 @    8 : 3b 03 00  Div r1, [0]".
         """
         functions = []
         violations = []
@@ -1005,10 +1450,8 @@ class JavaScriptAnalyzer(ScriptAnalyzer):
         in_bytecode_section = False
         filter_pattern = re.compile(function_filter) if function_filter else None
 
-        # Track function calls
-        pending_call: str | None = None
-
-        for line in output.split("\n"):
+        lines = output.split("\n") if isinstance(output, str) else output
+        for line in lines:
             line_stripped = line.strip()
 
             # Detect function start
@@ -1046,10 +1489,8 @@ class JavaScriptAnalyzer(ScriptAnalyzer):
                 continue
 
             # Parse bytecode instruction
-            # Format: offset : Instruction [operands]
-            bytecode_match = re.match(
-                r"\s*(\d+)\s*:\s*([A-Za-z][A-Za-z0-9]*)\s*(.*)", line_stripped
-            )
+            # Format: [position S>|E>] [address @] offset : [encoding] Instruction [operands]
+            bytecode_match = _V8_INSTRUCTION.match(line_stripped)
 
             if not bytecode_match:
                 continue
@@ -1070,19 +1511,6 @@ class JavaScriptAnalyzer(ScriptAnalyzer):
             instruction_lower = instruction.lower()
 
             # Track function calls
-            if instruction in (
-                "CallRuntime",
-                "CallUndefinedReceiver0",
-                "CallUndefinedReceiver1",
-                "CallUndefinedReceiver2",
-                "CallProperty0",
-                "CallProperty1",
-                "CallProperty2",
-            ):
-                # Try to extract function name from operands
-                # This is approximate since V8 bytecode uses indices
-                pending_call = operands.lower()
-
             # Check for dangerous bytecodes
             if instruction_lower in DANGEROUS_JS_BYTECODES["errors"]:
                 violations.append(
@@ -1113,114 +1541,67 @@ class JavaScriptAnalyzer(ScriptAnalyzer):
 
         return functions, violations
 
-    def _detect_dangerous_function_calls(
-        self,
-        source_file: str,
-        include_warnings: bool = False,
-    ) -> list[Violation]:
-        """
-        Detect dangerous function calls and operators via static analysis of source.
-
-        This complements bytecode analysis since function names aren't
-        always clear in V8 bytecode output.
-        """
-        violations = []
-
-        try:
-            with open(source_file) as f:
-                source = f.read()
-        except OSError:
-            return violations
-
-        # Simple regex-based detection for common patterns
+    @classmethod
+    @functools.cache
+    def _source_patterns(cls, include_warnings: bool) -> PatternSet:
+        """Source patterns for dangerous calls and division operators."""
+        patterns = []
         for func_name, reason in DANGEROUS_JS_FUNCTIONS["errors"].items():
             # Match function calls like Math.sqrt() or standalone sqrt()
-            pattern = rf"\b{re.escape(func_name)}\s*\("
-            for match in re.finditer(pattern, source, re.IGNORECASE):
-                # Get line number
-                line_num = source[: match.start()].count("\n") + 1
-                violations.append(
-                    Violation(
-                        function="<source>",
-                        file=source_file,
-                        line=line_num,
-                        address="",
-                        instruction=match.group(0),
-                        mnemonic=func_name.upper().replace(".", "_"),
-                        reason=reason,
-                        severity=Severity.ERROR,
-                    )
-                )
+            rule = SourceRule(func_name.upper().replace(".", "_"), reason, Severity.ERROR)
+            patterns.append((rf"\b{re.escape(func_name)}\s*\(", re.IGNORECASE, rule))
 
-        # Detect division and modulo operators in source
+        # Detect division and modulo operators in source, skipping comment lines
         # Pattern matches: a / b, a % b (but not // comments or /= assignment)
-        div_pattern = r"[^/]\s*/\s*[^/=*]"
-        for match in re.finditer(div_pattern, source):
-            # Skip if inside a comment or regex
-            line_start = source.rfind("\n", 0, match.start()) + 1
-            line_end = source.find("\n", match.start())
-            if line_end == -1:
-                line_end = len(source)
-            line = source[line_start:line_end]
-            # Skip comment lines
-            if line.strip().startswith("//") or line.strip().startswith("*"):
-                continue
-            line_num = source[: match.start()].count("\n") + 1
-            violations.append(
-                Violation(
-                    function="<source>",
-                    file=source_file,
-                    line=line_num,
-                    address="",
+        patterns.append(
+            (
+                r"[^/]\s*/\s*[^/=*]",
+                0,
+                SourceRule(
+                    "DIV_OP",
+                    "Division operator has variable-time execution",
+                    Severity.ERROR,
                     instruction="/",
-                    mnemonic="DIV_OP",
-                    reason="Division operator has variable-time execution",
-                    severity=Severity.ERROR,
-                )
+                    comments=("//", "*"),
+                ),
             )
-
-        mod_pattern = r"\s%\s*[^=]"
-        for match in re.finditer(mod_pattern, source):
-            line_start = source.rfind("\n", 0, match.start()) + 1
-            line_end = source.find("\n", match.start())
-            if line_end == -1:
-                line_end = len(source)
-            line = source[line_start:line_end]
-            if line.strip().startswith("//") or line.strip().startswith("*"):
-                continue
-            line_num = source[: match.start()].count("\n") + 1
-            violations.append(
-                Violation(
-                    function="<source>",
-                    file=source_file,
-                    line=line_num,
-                    address="",
+        )
+        patterns.append(
+            (
+                r"\s%\s*[^=]",
+                0,
+                SourceRule(
+                    "MOD_OP",
+                    "Modulo operator has variable-time execution",
+                    Severity.ERROR,
                     instruction="%",
-                    mnemonic="MOD_OP",
-                    reason="Modulo operator has variable-time execution",
-                    severity=Severity.ERROR,
-                )
+                    comments=("//", "*"),
+                ),
             )
+        )
 
         if include_warnings:
             for func_name, reason in DANGEROUS_JS_FUNCTIONS["warnings"].items():
-                pattern = rf"\.{re.escape(func_name)}\s*\("
-                for match in re.finditer(pattern, source, re.IGNORECASE):
-                    line_num = source[: match.start()].count("\n") + 1
-                    violations.append(
-                        Violation(
-                            function="<source>",
-                            file=source_file,
-                            line=line_num,
-                            address="",
-                            instruction=match.group(0),
-                            mnemonic=func_name.upper(),
-                            reason=reason,
-                            severity=Severity.WARNING,
-                        )
-                    )
+                rule = SourceRule(func_name.upper(), reason, Severity.WARNING)
+                patterns.append((rf"\.{re.escape(func_name)}\s*\(", re.IGNORECASE, rule))
+        return PatternSet(patterns)
 
-        return violations
+    @profiled("parse")
+    def _detect_dangerous_function_calls(
+        self,
+        source_file: str,
+        include_warnings: bool = False,
+    ) -> list[Violation]:
+        """
+        Detect dangerous function calls and operators via static analysis of source.
+
+        This complements bytecode analysis since function names aren't
+        always clear in V8 bytecode output.
+        """
+        index = SourceIndex.read(source_file)
+        if index is None:
+            return []
+        return self._scan_source(source_file, index, self._source_patterns(include_warnings))
 
     def analyze(
         self,
@@ -1271,17 +1652,25 @@ class JavaScriptAnalyzer(ScriptAnalyzer):
         include_warnings: bool = False,
         function_filter: str | None = None,
     ) -> AnalysisReport:
-        """Analyze a JavaScript file."""
-        success, output = self._get_v8_bytecode(js_file, function_filter)
-        if not success:
-            raise RuntimeError(f"Failed to get V8 bytecode: {output}")
-
-        functions, violations = self._parse_v8_bytecode(
-            output,
-            report_file,
-            include_warnings,
-            function_filter,
-        )
+        """Analyze a JavaScript file, parsing its bytecode as a worker prints it."""
+        try:
+            with self.workers.dump(js_file, function_filter) as dump:
+                functions, violations = self._parse_v8_bytecode(
+                    dump,
+                    report_file,
+                    include_warnings,
+                    function_filter,
+                )
+        except FileNotFoundError:
+            raise RuntimeError(
+                f"Failed to get V8 bytecode: Node.js not found: {self.node_path}"
+            ) from None
+        except ValueError as e:
+            raise RuntimeError(f"Failed to get V8 bytecode: {e}") from None
+        if dump.functions is not None:
+            # Node internals the file is first to reach are printed with it
+            functions = [f for f in functions if f["name"] in dump.functions]
+            violations = [v for v in violations if v.function in dump.functions]
 
         # Also check for dangerous function calls in source
         source_violations = self._detect_dangerous_function_calls(
@@ -1311,42 +1700,206 @@ class JavaScriptAnalyzer(ScriptAnalyzer):
 # =============================================================================
 
 
+def _is_running_interpreter(command: str) -> bool:
+    """Whether command resolves to the interpreter running the analyzer."""
+    path = shutil.which(command)
+    return path is not None and os.path.realpath(path) == os.path.realpath(sys.executable)
+
+
+def _instruction_line(instruction: dis.Instruction, previous: int | None) -> int | None:
+    """Source line of an instruction; instructions without one keep the previous line."""
+    line = getattr(instruction, "line_number", None)  # Python 3.13+
+    if line is None and getattr(instruction, "positions", None) is not None:
+        line = instruction.positions.lineno  # Python 3.11+
+    if line is None and type(instruction.starts_line) is int:
+        line = instruction.starts_line
+    return previous if line is None else line
+
+
 class PythonAnalyzer(ScriptAnalyzer):
     """
     Analyzer for Python scripts using the dis module for bytecode disassembly.
 
     Detects timing-unsafe bytecodes and function calls in Python code.
+
+    When the target interpreter is the one running the analyzer (the default),
+    sources are compiled in process and the code objects are walked with
+    dis.get_instructions. A different python_path is run as `python -m dis`
+    and its listing is parsed.
     """
 
     name = "python"
 
-    # Python 3.11+ BINARY_OP opargs for division/modulo
+    # Python 3.11+ BINARY_OP operators for division/modulo, as dis shows them
     # See: https://docs.python.org/3.11/library/dis.html#opcode-BINARY_OP
-    BINARY_OP_DIV_OPARGS = {
-        11: "BINARY_OP_TRUEDIV",  # /
-        12: "BINARY_OP_FLOORDIV",  # //
-        6: "BINARY_OP_MODULO",  # %
+    BINARY_OP_DIVISIONS = {
+        "/": "BINARY_OP_TRUEDIV",
+        "//": "BINARY_OP_FLOORDIV",
+        "%": "BINARY_OP_MODULO",
         # Inplace variants
-        24: "BINARY_OP_INPLACE_TRUEDIV",  # /=
-        25: "BINARY_OP_INPLACE_FLOORDIV",  # //=
-        19: "BINARY_OP_INPLACE_MODULO",  # %=
+        "/=": "BINARY_OP_INPLACE_TRUEDIV",
+        "//=": "BINARY_OP_INPLACE_FLOORDIV",
+        "%=": "BINARY_OP_INPLACE_MODULO",
     }
 
+    # BINARY_OP oparg -> division operator for the running interpreter
+    _binary_op_args: dict[int, str] | None = None
+
     def __init__(self, python_path: str | None = None):
         self.python_path = python_path or "python3"
+        self.in_process = python_path is None or _is_running_interpreter(python_path)
 
     def is_available(self) -> bool:
         """Check if Python is available."""
+        return self.in_process or get_registry().is_available(self.python_path, ["--version"])
+
+    def _classify(
+        self, opname: str, operator: str, include_warnings: bool
+    ) -> tuple[str, str, Severity] | None:
+        """
+        (mnemonic, reason, severity) for a flagged bytecode, or None.
+        operator is the operator of a Python 3.11+ BINARY_OP, such as "//".
+        """
+        if opname == "BINARY_OP":
+            mnemonic = self.BINARY_OP_DIVISIONS.get(operator)
+            if mnemonic is None:
+                return None
+            return mnemonic, f"{mnemonic} has variable-time execution", Severity.ERROR
+
+        # Dangerous bytecodes (Python < 3.11)
+        opname_lower = opname.lower()
+        if opname_lower in DANGEROUS_PYTHON_BYTECODES["errors"]:
+            return opname, DANGEROUS_PYTHON_BYTECODES["errors"][opname_lower], Severity.ERROR
+        if include_warnings and opname_lower in DANGEROUS_PYTHON_BYTECODES["warnings"]:
+            return opname, DANGEROUS_PYTHON_BYTECODES["warnings"][opname_lower], Severity.WARNING
+        return None
+
+    @profiled("compile")
+    def _compile_source(self, source_file: str) -> tuple[bool, types.CodeType | str]:
+        """Compile a source file with the running interpreter."""
         try:
-            result = subprocess.run(
-                [self.python_path, "--version"],
-                capture_output=True,
-                text=True,
-            )
-            return result.returncode == 0
-        except FileNotFoundError:
+            source = Path(source_file).read_bytes()
+            return True, compile(source, source_file, "exec", dont_inherit=True)
+        except (OSError, SyntaxError, ValueError) as e:
+            return False, str(e)
+
+    @classmethod
+    def _division_args(cls) -> dict[int, str]:
+        """
+        BINARY_OP opargs of the division operators in the running interpreter,
+        found by compiling each operator once (empty before Python 3.11).
+        """
+        if cls._binary_op_args is None:
+            args = {}
+            for operator in cls.BINARY_OP_DIVISIONS:
+                for instruction in dis.get_instructions(compile(f"a {operator} b", "", "exec")):
+                    if instruction.opname == "BINARY_OP":
+                        args[instruction.arg] = operator
+            cls._binary_op_args = args
+        return cls._binary_op_args
+
+    def _may_violate(self, opcodes: bytes, opargs: bytes, include_warnings: bool) -> bool:
+        """
+        Whether a code object's opcode and oparg bytes hold an instruction
+        that _classify flags. Screening the raw bytes lets code objects without
+        one skip dis.get_instructions, which costs far more than the scan.
+        """
+        names = DANGEROUS_PYTHON_BYTECODES["errors"]
+        if include_warnings:
+            names = {**names, **DANGEROUS_PYTHON_BYTECODES["warnings"]}
+        for name in names:
+            opcode = dis.opmap.get(name.upper())
+            if opcode is not None and opcodes.find(opcode) >= 0:
+                return True
+
+        binary_op = dis.opmap.get("BINARY_OP")
+        if binary_op is None:
             return False
+        division_args = self._division_args()
+        index = opcodes.find(binary_op)
+        while index >= 0:
+            if opargs[index] in division_args:
+                return True
+            index = opcodes.find(binary_op, index + 1)
+        return False
+
+    @classmethod
+    def _code_objects(
+        cls, code: types.CodeType, qualname: str = "<module>"
+    ) -> Iterator[tuple[str, types.CodeType]]:
+        """Yield (qualified name, code object) for code and the code objects nested in it."""
+        yield qualname, code
+        for const in code.co_consts:
+            if not isinstance(const, types.CodeType):
+                continue
+            name = getattr(const, "co_qualname", None)
+            if name is None:
+                # Python 3.10 has no co_qualname; functions scope their nested code
+                if code.co_flags & inspect.CO_OPTIMIZED:
+                    name = f"{qualname}.<locals>.{const.co_name}"
+                elif qualname == "<module>":
+                    name = const.co_name
+                else:
+                    name = f"{qualname}.{const.co_name}"
+            yield from cls._code_objects(const, name)
+
+    @profiled("parse")
+    def _analyze_code(
+        self,
+        code: types.CodeType,
+        source_file: str,
+        include_warnings: bool = False,
+        function_filter: str | None = None,
+    ) -> tuple[list[dict], list[Violation]]:
+        """
+        Classify the instructions of a compiled module and of every function,
+        class body and comprehension in it. Code objects whose qualified name
+        does not match function_filter are skipped.
+        """
+        functions = []
+        violations = []
+        filter_pattern = re.compile(function_filter) if function_filter else None
+        # Python 3.11+ interleaves inline cache entries, which dis does not list
+        cache = dis.opmap.get("CACHE")
+
+        for name, code_object in self._code_objects(code):
+            if filter_pattern and not filter_pattern.search(name):
+                continue
+            opcodes = code_object.co_code[::2]
+            count = len(opcodes) - (opcodes.count(cache) if cache is not None else 0)
+            functions.append({"name": name, "instructions": count})
+            if not self._may_violate(opcodes, code_object.co_code[1::2], include_warnings):
+                continue
+
+            line = code_object.co_firstlineno
+            for instruction in dis.get_instructions(code_object):
+                line = _instruction_line(instruction, line)
+                operator = instruction.argrepr if instruction.opname == "BINARY_OP" else ""
+                flagged = self._classify(instruction.opname, operator, include_warnings)
+                if flagged is None:
+                    continue
+                mnemonic, reason, severity = flagged
+                text = instruction.opname
+                if instruction.arg is not None:
+                    text += f" {instruction.arg}"
+                if instruction.argrepr:
+                    text += f" ({instruction.argrepr})"
+                violations.append(
+                    Violation(
+                        function=name,
+                        file=source_file,
+                        line=line,
+                        address=str(instruction.offset),
+                        instruction=text,
+                        mnemonic=mnemonic,
+                        reason=reason,
+                        severity=severity,
+                    )
+                )
+
+        return functions, violations
 
+    @profiled("disassemble")
     def _get_dis_output(self, source_file: str) -> tuple[bool, str]:
         """Get Python dis module output for bytecode disassembly."""
         cmd = [
@@ -1365,6 +1918,7 @@ class PythonAnalyzer(ScriptAnalyzer):
         except FileNotFoundError:
             return False, f"Python not found: {self.python_path}"
 
+    @profiled("parse")
     def _parse_dis_output(
         self,
         output: str,
@@ -1442,32 +1996,15 @@ class PythonAnalyzer(ScriptAnalyzer):
                 if not filter_pattern.search(current_function):
                     continue
 
-            instruction_lower = instruction.lower()
-
-            # Handle Python 3.11+ BINARY_OP with oparg
+            # Python 3.11+ BINARY_OP shows its operator in parentheses: "11 (/)"
+            operator = ""
             if instruction == "BINARY_OP":
-                # Extract oparg number from operands
-                oparg_match = re.match(r"(\d+)", operands)
-                if oparg_match:
-                    oparg = int(oparg_match.group(1))
-                    if oparg in self.BINARY_OP_DIV_OPARGS:
-                        op_name = self.BINARY_OP_DIV_OPARGS[oparg]
-                        violations.append(
-                            Violation(
-                                function=current_function or "<module>",
-                                file=source_file,
-                                line=line_num,
-                                address=offset,
-                                instruction=f"{instruction} {operands}".strip(),
-                                mnemonic=op_name,
-                                reason=f"{op_name} has variable-time execution",
-                                severity=Severity.ERROR,
-                            )
-                        )
-                continue
+                operator_match = re.search(r"\((.*)\)$", operands)
+                operator = operator_match.group(1) if operator_match else ""
 
-            # Check for dangerous bytecodes (Python < 3.11)
-            if instruction_lower in DANGEROUS_PYTHON_BYTECODES["errors"]:
+            flagged = self._classify(instruction, operator, include_warnings)
+            if flagged is not None:
+                mnemonic, reason, severity = flagged
                 violations.append(
                     Violation(
                         function=current_function or "<module>",
@@ -1475,83 +2012,43 @@ class PythonAnalyzer(ScriptAnalyzer):
                         line=line_num,
                         address=offset,
                         instruction=f"{instruction} {operands}".strip(),
-                        mnemonic=instruction.upper(),
-                        reason=DANGEROUS_PYTHON_BYTECODES["errors"][instruction_lower],
-                        severity=Severity.ERROR,
-                    )
-                )
-            elif include_warnings and instruction_lower in DANGEROUS_PYTHON_BYTECODES["warnings"]:
-                violations.append(
-                    Violation(
-                        function=current_function or "<module>",
-                        file=source_file,
-                        line=line_num,
-                        address=offset,
-                        instruction=f"{instruction} {operands}".strip(),
-                        mnemonic=instruction.upper(),
-                        reason=DANGEROUS_PYTHON_BYTECODES["warnings"][instruction_lower],
-                        severity=Severity.WARNING,
+                        mnemonic=mnemonic,
+                        reason=reason,
+                        severity=severity,
                     )
                 )
 
         return functions, violations
 
-    def _detect_dangerous_function_calls(
-        self,
-        source_file: str,
-        include_warnings: bool = False,
-    ) -> list[Violation]:
-        """
-        Detect dangerous function calls via static analysis of source.
-        """
-        violations = []
-
-        try:
-            with open(source_file) as f:
-                source = f.read()
-        except OSError:
-            return violations
-
-        # Detect dangerous function calls
+    @classmethod
+    @functools.cache
+    def _source_patterns(cls, include_warnings: bool) -> PatternSet:
+        """Source patterns for dangerous function calls."""
+        patterns = []
         for func_name, reason in DANGEROUS_PYTHON_FUNCTIONS["errors"].items():
             # Match function calls like random.random() or math.sqrt()
-            pattern = rf"\b{re.escape(func_name)}\s*\("
-            for match in re.finditer(pattern, source, re.IGNORECASE):
-                line_num = source[: match.start()].count("\n") + 1
-                violations.append(
-                    Violation(
-                        function="<source>",
-                        file=source_file,
-                        line=line_num,
-                        address="",
-                        instruction=match.group(0),
-                        mnemonic=func_name.upper().replace(".", "_"),
-                        reason=reason,
-                        severity=Severity.ERROR,
-                    )
-                )
+            rule = SourceRule(func_name.upper().replace(".", "_"), reason, Severity.ERROR)
+            patterns.append((rf"\b{re.escape(func_name)}\s*\(", re.IGNORECASE, rule))
 
         if include_warnings:
             for func_name, reason in DANGEROUS_PYTHON_FUNCTIONS["warnings"].items():
                 # Match method calls like .find(), .startswith()
                 method_name = func_name.split(".")[-1] if "." in func_name else func_name
-                pattern = rf"\.{re.escape(method_name)}\s*\("
-                for match in re.finditer(pattern, source, re.IGNORECASE):
-                    line_num = source[: match.start()].count("\n") + 1
-                    violations.append(
-                        Violation(
-                            function="<source>",
-                            file=source_file,
-                            line=line_num,
-                            address="",
-                            instruction=match.group(0),
-                            mnemonic=method_name.upper(),
-                            reason=reason,
-                            severity=Severity.WARNING,
-                        )
-                    )
+                rule = SourceRule(method_name.upper(), reason, Severity.WARNING)
+                patterns.append((rf"\.{re.escape(method_name)}\s*\(", re.IGNORECASE, rule))
+        return PatternSet(patterns)
 
-        return violations
+    @profiled("parse")
+    def _detect_dangerous_function_calls(
+        self,
+        source_file: str,
+        include_warnings: bool = False,
+    ) -> list[Violation]:
+        """Detect dangerous function calls via static analysis of source."""
+        index = SourceIndex.read(source_file)
+        if index is None:
+            return []
+        return self._scan_source(source_file, index, self._source_patterns(include_warnings))
 
     def analyze(
         self,
@@ -1564,16 +2061,24 @@ class PythonAnalyzer(ScriptAnalyzer):
         if not source_path.exists():
             raise FileNotFoundError(f"Source file not found: {source_file}")
 
-        success, output = self._get_dis_output(str(source_path.absolute()))
-        if not success:
-            raise RuntimeError(f"Failed to get Python bytecode: {output}")
+        if self.in_process:
+            success, code = self._compile_source(str(source_path.absolute()))
+            if not success:
+                raise RuntimeError(f"Failed to get Python bytecode: {code}")
+            functions, violations = self._analyze_code(
+                code, source_file, include_warnings, function_filter
+            )
+        else:
+            success, output = self._get_dis_output(str(source_path.absolute()))
+            if not success:
+                raise RuntimeError(f"Failed to get Python bytecode: {output}")
 
-        functions, violations = self._parse_dis_output(
-            output,
-            source_file,
-            include_warnings,
-            function_filter,
-        )
+            functions, violations = self._parse_dis_output(
+                output,
+                source_file,
+                include_warnings,
+                function_filter,
+            )
 
         # Also check for dangerous function calls in source
         source_violations = self._detect_dangerous_function_calls(
@@ -1617,16 +2122,9 @@ class RubyAnalyzer(ScriptAnalyzer):
 
     def is_available(self) -> bool:
         """Check if Ruby is available."""
-        try:
-            result = subprocess.run(
-                [self.ruby_path, "--version"],
-                capture_output=True,
-                text=True,
-            )
-            return result.returncode == 0
-        except FileNotFoundError:
-            return False
+        return get_registry().is_available(self.ruby_path, ["--version"])
 
+    @profiled("disassemble")
     def _get_yarv_output(self, source_file: str) -> tuple[bool, str]:
         """Get Ruby YARV instruction sequence dump."""
         # Use --dump=insns to get instruction sequence
@@ -1645,6 +2143,7 @@ class RubyAnalyzer(ScriptAnalyzer):
         except FileNotFoundError:
             return False, f"Ruby not found: {self.ruby_path}"
 
+    @profiled("parse")
     def _parse_yarv_output(
         self,
         output: str,
@@ -1751,23 +2250,11 @@ class RubyAnalyzer(ScriptAnalyzer):
 
         return functions, violations
 
-    def _detect_dangerous_function_calls(
-        self,
-        source_file: str,
-        include_warnings: bool = False,
-    ) -> list[Violation]:
-        """
-        Detect dangerous function calls via static analysis of source.
-        """
-        violations = []
-
-        try:
-            with open(source_file) as f:
-                source = f.read()
-        except OSError:
-            return violations
-
-        # Detect dangerous function calls
+    @classmethod
+    @functools.cache
+    def _source_patterns(cls, include_warnings: bool) -> PatternSet:
+        """Source patterns for dangerous function calls."""
+        patterns = []
         for func_name, reason in DANGEROUS_RUBY_FUNCTIONS["errors"].items():
             # Match function calls like rand() or Random.new
             if func_name == "random":
@@ -1777,20 +2264,8 @@ class RubyAnalyzer(ScriptAnalyzer):
                 pattern = r"\bMath\.sqrt\s*\("
             else:
                 pattern = rf"\b{re.escape(func_name)}\s*[(\[]?"
-            for match in re.finditer(pattern, source, re.IGNORECASE):
-                line_num = source[: match.start()].count("\n") + 1
-                violations.append(
-                    Violation(
-                        function="<source>",
-                        file=source_file,
-                        line=line_num,
-                        address="",
-                        instruction=match.group(0),
-                        mnemonic=func_name.upper().replace(".", "_").replace("?", ""),
-                        reason=reason,
-                        severity=Severity.ERROR,
-                    )
-                )
+            mnemonic = func_name.upper().replace(".", "_").replace("?", "")
+            patterns.append((pattern, re.IGNORECASE, SourceRule(mnemonic, reason, Severity.ERROR)))
 
         if include_warnings:
             for func_name, reason in DANGEROUS_RUBY_FUNCTIONS["warnings"].items():
@@ -1799,22 +2274,21 @@ class RubyAnalyzer(ScriptAnalyzer):
                     pattern = r"\s=~\s"
                 else:
                     pattern = rf"\.{re.escape(func_name)}\s*[(\[]?"
-                for match in re.finditer(pattern, source):
-                    line_num = source[: match.start()].count("\n") + 1
-                    violations.append(
-                        Violation(
-                            function="<source>",
-                            file=source_file,
-                            line=line_num,
-                            address="",
-                            instruction=match.group(0),
-                            mnemonic=func_name.upper().replace("?", ""),
-                            reason=reason,
-                            severity=Severity.WARNING,
-                        )
-                    )
+                rule = SourceRule(func_name.upper().replace("?", ""), reason, Severity.WARNING)
+                patterns.append((pattern, 0, rule))
+        return PatternSet(patterns)
 
-        return violations
+    @profiled("parse")
+    def _detect_dangerous_function_calls(
+        self,
+        source_file: str,
+        include_warnings: bool = False,
+    ) -> list[Violation]:
+        """Detect dangerous function calls via static analysis of source."""
+        index = SourceIndex.read(source_file)
+        if index is None:
+            return []
+        return self._scan_source(source_file, index, self._source_patterns(include_warnings))
 
     def analyze(
         self,
@@ -1861,43 +2335,405 @@ class RubyAnalyzer(ScriptAnalyzer):
         )
 
 
+# =============================================================================
+# JVM Module Analysis
+# =============================================================================
+
+# "Classfile <location>" opens each class in verbose javap output
+_JAVAP_CLASSFILE = re.compile(r"^Classfile (.+)$", re.MULTILINE)
+_JAVAP_COMPILED_FROM = re.compile(r'^\s*Compiled from "([^"]+)"', re.MULTILINE)
+
+
+def _split_javap_output(output: str) -> Iterator[tuple[str, str]]:
+    """
+    Split the verbose output of one javap run over several classes into
+    (class file location, disassembly) pairs. The location is a path, or a
+    jar:file:...!/entry URL for classes read from a jar.
+    """
+    location = None
+    start = 0
+    for match in _JAVAP_CLASSFILE.finditer(output):
+        if location is not None:
+            yield location, output[start : match.start()]
+        location, start = match.group(1).strip(), match.start()
+    if location is not None:
+        yield location, output[start:]
+
+
+def _jar_classes(jar: str) -> list[str]:
+    """Entry names of the classes in a jar, without module and package descriptors."""
+    with zipfile.ZipFile(jar) as archive:
+        entries = archive.namelist()
+    return sorted(
+        entry
+        for entry in entries
+        if entry.endswith(".class")
+        and not entry.startswith("META-INF/")
+        and Path(entry).name not in ("module-info.class", "package-info.class")
+    )
+
+
+def _write_argfile(arguments: list[str], directory: str) -> str:
+    """
+    Write arguments to an @argfile for javac or kotlinc, one quoted argument
+    per line, and return its path. It keeps the command line of a whole
+    source tree within the operating system's limits.
+    """
+    path = os.path.join(directory, "arguments.txt")
+    with open(path, "w") as f:
+        for argument in arguments:
+            escaped = argument.replace("\\", "\\\\").replace('"', '\\"')
+            f.write(f'"{escaped}"\n')
+    return path
+
+
+class JVMAnalyzer(ScriptAnalyzer):
+    """
+    Class file analysis and module mode shared by the Java and Kotlin analyzers.
+
+    Compiled classes are read with the built-in class file reader
+    (classfile.py), so no javap process or text parsing is involved; javap
+    is only run for classes the reader rejects. Since every javac and kotlinc
+    run pays JVM startup, a module (a source tree, a directory of compiled
+    classes such as target/classes, or a .jar) is compiled with one compiler
+    invocation, and jar entries are read without extracting them. Classes
+    are grouped into one report per source file they were compiled from.
+    """
+
+    # Source file suffixes the compiler accepts
+    SOURCE_SUFFIXES: tuple[str, ...] = ()
+    # Dangerous bytecodes, keyed by lowercase mnemonic
+    BYTECODES: dict[str, dict[str, str]] = {}
+    # Classes per javap invocation, bounding the command line
+    JAVAP_BATCH = 200
+
+    javap_path: str
+    compiler_name: str
+
+    @abstractmethod
+    def _compile_sources(self, source_files: list[str], output_dir: str) -> tuple[bool, str]:
+        """Compile source files to class files in output_dir with one compiler run."""
+        raise NotImplementedError
+
+    @classmethod
+    @functools.cache
+    def _flagged_opcodes(cls, include_warnings: bool) -> dict[int, tuple[Severity, str]]:
+        """Opcode -> (severity, reason) for the bytecodes to report."""
+        flagged = {}
+        tables = [(Severity.ERROR, cls.BYTECODES["errors"])]
+        if include_warnings:
+            tables.append((Severity.WARNING, cls.BYTECODES["warnings"]))
+        for severity, table in tables:
+            for mnemonic, reason in table.items():
+                if mnemonic in OPCODE_NUMBERS:
+                    flagged.setdefault(OPCODE_NUMBERS[mnemonic], (severity, reason))
+        return flagged
+
+    @profiled("parse")
+    def _analyze_classfile(
+        self,
+        classfile: ClassFile,
+        source_file: str,
+        include_warnings: bool = False,
+        function_filter: str | None = None,
+    ) -> tuple[list[dict], list[Violation]]:
+        """
+        Check the bytecode of a class read by read_class, reporting methods
+        as javap names them (com.example.Crypto$Inner.reduce). Methods not
+        matching function_filter are skipped without decoding.
+        """
+        functions = []
+        violations = []
+        flagged = self._flagged_opcodes(include_warnings)
+        filter_pattern = re.compile(function_filter) if function_filter else None
+
+        for method in classfile.methods:
+            name = f"{classfile.name}.{method.name}"
+            if method.code is None or (filter_pattern and not filter_pattern.search(name)):
+                continue
+            count = 0
+            for offset, opcode in instructions(method.code):
+                count += 1
+                if opcode not in flagged:
+                    continue
+                severity, reason = flagged[opcode]
+                mnemonic = OPCODES[opcode]
+                violations.append(
+                    Violation(
+                        function=name,
+                        file=source_file,
+                        line=method.line_at(offset),
+                        address=str(offset),
+                        instruction=f"{mnemonic} {operand_text(method.code, offset)}".strip(),
+                        mnemonic=mnemonic.upper(),
+                        reason=reason,
+                        severity=severity,
+                    )
+                )
+            functions.append({"name": name, "instructions": count})
+
+        return functions, violations
+
+    @profiled("disassemble")
+    def _disassemble_classes(
+        self, classes: list[str], classpath: str | None = None
+    ) -> list[tuple[str, str]]:
+        """
+        Disassemble class files, or the named classes on classpath, with one
+        javap invocation per JAVAP_BATCH classes. Returns (class file
+        location, disassembly) pairs.
+        """
+        disassembled = []
+        for start in range(0, len(classes), self.JAVAP_BATCH):
+            cmd = [
+                self.javap_path,
+                "-c",  # Disassemble code
+                "-p",  # Show private members
+                "-v",  # Verbose (includes line numbers)
+            ]
+            if classpath:
+                cmd += ["-cp", classpath]
+            cmd += classes[start : start + self.JAVAP_BATCH]
+
+            try:
+                result = subprocess.run(cmd, capture_output=True, text=True)
+            except FileNotFoundError:
+                raise RuntimeError(f"Java disassembler not found: {self.javap_path}") from None
+            # javap reports unreadable classes but still disassembles the rest
+            split = list(_split_javap_output(result.stdout))
+            if result.returncode != 0 and not split:
+                raise RuntimeError(f"javap failed: {result.stderr or result.stdout}")
+            disassembled.extend(split)
+        return disassembled
+
+    @profiled("read")
+    def _read_classes(self, classes: list[str], jar: str | None = None) -> list[tuple[str, bytes]]:
+        """Read class files, or the named entries of jar without extracting them."""
+        if jar is None:
+            return [(location, Path(location).read_bytes()) for location in classes]
+        with zipfile.ZipFile(jar) as archive:
+            return [(entry, archive.read(entry)) for entry in classes]
+
+    def _merge_source_violations(
+        self, source_file: str, violations: list[Violation], include_warnings: bool
+    ) -> None:
+        """Add the source-level findings the bytecode analysis did not already report."""
+        existing = {(v.line, v.mnemonic) for v in violations}
+        for v in self._detect_dangerous_function_calls(source_file, include_warnings):
+            if (v.line, v.mnemonic) not in existing:
+                violations.append(v)
+
+    def module_sources(self, directory: str) -> list[str]:
+        """Source files of this language under directory, as scan mode finds them."""
+        return [
+            path
+            for path in find_sources(directory)
+            if Path(path).suffix.lower() in self.SOURCE_SUFFIXES
+        ]
+
+    def analyze_module(
+        self,
+        path: str,
+        include_warnings: bool = False,
+        function_filter: str | None = None,
+    ) -> list[AnalysisReport]:
+        """
+        Analyze a module: a directory of sources, a directory of class files
+        (when it holds no sources), or a .jar.
+
+        Args:
+            path: Source tree, class directory or jar
+            include_warnings: Include warning-level violations
+            function_filter: Regex pattern to filter functions
+
+        Returns:
+            One AnalysisReport per source file. Class directories and jars
+            without sources are reported under the source paths recorded in
+            the classes, relative to the package root (com/example/Crypto.java).
+        """
+        module = Path(path)
+        if not module.exists():
+            raise FileNotFoundError(f"Module not found: {path}")
+        sources = self.module_sources(path) if module.is_dir() else []
+
+        # Sources by file name, to find the one a class was compiled from
+        known = set(sources)
+        by_name: dict[str, list[str]] = {}
+        for source in sources:
+            by_name.setdefault(Path(source).name, []).append(source)
+
+        def label_for(relative: str) -> str:
+            candidates = by_name.get(Path(relative).name, [])
+            matching = [s for s in candidates if Path(s).as_posix().endswith(f"/{relative}")]
+            if matching:
+                return matching[0]
+            if len(candidates) == 1:
+                # Declared package and directory differ
+                return candidates[0]
+            return relative
+
+        results: dict[str, tuple[list[dict], list[Violation]]] = {s: ([], []) for s in sources}
+
+        def add(label: str, analysis: tuple[list[dict], list[Violation]]) -> None:
+            functions, violations = results.setdefault(label, ([], []))
+            functions.extend(analysis[0])
+            violations.extend(analysis[1])
+
+        with tempfile.TemporaryDirectory() as tmpdir:
+            jar = root = None
+            if module.is_file():
+                jar = str(module)
+                classes = _jar_classes(jar)
+            elif sources:
+                success, result = self._compile_sources(sources, tmpdir)
+                if not success:
+                    raise RuntimeError(f"{self.compiler_name} compilation failed: {result}")
+                root = tmpdir
+                classes = sorted(str(p) for p in Path(tmpdir).glob("**/*.class"))
+            else:
+                root = str(module)
+                classes = sorted(str(p) for p in module.glob("**/*.class"))
+            if not classes:
+                raise RuntimeError(f"No class files found in {path}")
+
+            rejected = []
+            for location, data in self._read_classes(classes, jar):
+                try:
+                    classfile = read_class(data)
+                    if classfile.source_file:
+                        relative = str(Path(classfile.package_path) / classfile.source_file)
+                    else:
+                        relative = location if jar else os.path.relpath(location, root)
+                    label = label_for(relative)
+                    analysis = self._analyze_classfile(
+                        classfile, label, include_warnings, function_filter
+                    )
+                except ClassFormatError:
+                    rejected.append(location)
+                    continue
+                add(label, analysis)
+
+            if rejected:
+                # Left to javap, which takes a jar's classes by binary name
+                if jar:
+                    rejected = [entry[: -len(".class")].replace("/", ".") for entry in rejected]
+                for location, output in self._disassemble_classes(rejected, jar):
+                    if "!/" in location:
+                        entry = location.split("!/", 1)[1]
+                    else:
+                        entry = os.path.relpath(location, root)
+                    compiled_from = _JAVAP_COMPILED_FROM.search(output)
+                    if compiled_from:
+                        relative = str(Path(entry).parent / compiled_from.group(1))
+                    else:
+                        relative = entry
+                    label = label_for(relative)
+                    add(
+                        label,
+                        self._parse_javap_output(output, label, include_warnings, function_filter),
+                    )
+
+        reports = []
+        for label, (functions, violations) in results.items():
+            if label in known:
+                self._merge_source_violations(label, violations, include_warnings)
+            reports.append(
+                AnalysisReport(
+                    architecture="jvm",
+                    compiler=self.compiler_name,
+                    optimization="default",
+                    source_file=label,
+                    total_functions=len(functions),
+                    total_instructions=sum(f["instructions"] for f in functions),
+                    violations=violations,
+                )
+            )
+        return reports
+
+    def _analyze_compiled(
+        self,
+        class_dir: str,
+        source_file: str,
+        include_warnings: bool = False,
+        function_filter: str | None = None,
+    ) -> AnalysisReport:
+        """Report the classes compiled from one source file into class_dir."""
+        class_files = sorted(str(p) for p in Path(class_dir).glob("**/*.class"))
+        if not class_files:
+            raise RuntimeError("No class files generated from compilation")
+
+        all_functions = []
+        all_violations = []
+
+        def add(analysis: tuple[list[dict], list[Violation]]) -> None:
+            all_functions.extend(analysis[0])
+            all_violations.extend(analysis[1])
+
+        # All classes (nested and companion classes too) are read in process
+        rejected = []
+        for location, data in self._read_classes(class_files):
+            try:
+                add(
+                    self._analyze_classfile(
+                        read_class(data), source_file, include_warnings, function_filter
+                    )
+                )
+            except ClassFormatError:
+                rejected.append(location)
+        if rejected:
+            try:
+                disassembled = self._disassemble_classes(rejected)
+            except RuntimeError:
+                # Classes neither the reader nor javap can decode leave only
+                # the source-level findings
+                disassembled = []
+            for _location, output in disassembled:
+                add(
+                    self._parse_javap_output(
+                        output, source_file, include_warnings, function_filter
+                    )
+                )
+
+        # Also check for dangerous function calls in source, avoiding duplicates
+        self._merge_source_violations(source_file, all_violations, include_warnings)
+
+        return AnalysisReport(
+            architecture="jvm",
+            compiler=self.compiler_name,
+            optimization="default",
+            source_file=str(source_file),
+            total_functions=len(all_functions),
+            total_instructions=sum(f["instructions"] for f in all_functions),
+            violations=all_violations,
+        )
+
+
 # =============================================================================
 # Java Analyzer
 # =============================================================================
 
 
-class JavaAnalyzer(ScriptAnalyzer):
+class JavaAnalyzer(JVMAnalyzer):
     """
-    Analyzer for Java source files using javap for bytecode disassembly.
+    Analyzer for Java source files, reading the compiled class files directly.
 
     Compiles Java source to bytecode and analyzes for timing-unsafe operations.
     """
 
     name = "java"
+    compiler_name = "javac"
+    SOURCE_SUFFIXES = (".java",)
+    BYTECODES = DANGEROUS_JAVA_BYTECODES
 
     def __init__(self, javac_path: str | None = None, javap_path: str | None = None):
         self.javac_path = javac_path or "javac"
         self.javap_path = javap_path or "javap"
 
     def is_available(self) -> bool:
-        """Check if Java compiler and disassembler are available."""
-        try:
-            result = subprocess.run(
-                [self.javac_path, "-version"],
-                capture_output=True,
-                text=True,
-            )
-            if result.returncode != 0:
-                return False
-            result = subprocess.run(
-                [self.javap_path, "-version"],
-                capture_output=True,
-                text=True,
-            )
-            return result.returncode == 0
-        except FileNotFoundError:
-            return False
+        """Check if the Java compiler is available (javap is only a fallback)."""
+        return get_registry().is_available(self.javac_path, ["-version"])
 
+    @profiled("compile")
     def _compile_java(self, source_file: str, output_dir: str) -> tuple[bool, str]:
         """Compile Java source to class files."""
         cmd = [
@@ -1915,24 +2751,13 @@ class JavaAnalyzer(ScriptAnalyzer):
         except FileNotFoundError:
             return False, f"Java compiler not found: {self.javac_path}"
 
-    def _get_bytecode_output(self, class_file: str) -> tuple[bool, str]:
-        """Get javap bytecode disassembly for a class file."""
-        cmd = [
-            self.javap_path,
-            "-c",  # Disassemble code
-            "-p",  # Show private members
-            "-v",  # Verbose (includes line numbers)
-            class_file,
-        ]
-
-        try:
-            result = subprocess.run(cmd, capture_output=True, text=True)
-            if result.returncode != 0:
-                return False, result.stderr or result.stdout
-            return True, result.stdout
-        except FileNotFoundError:
-            return False, f"Java disassembler not found: {self.javap_path}"
+    def _compile_sources(self, source_files: list[str], output_dir: str) -> tuple[bool, str]:
+        """Compile a module's sources with one javac run, listing them in an argument file."""
+        with tempfile.TemporaryDirectory() as argument_dir:
+            argfile = _write_argfile(source_files, argument_dir)
+            return self._compile_java(f"@{argfile}", output_dir)
 
+    @profiled("parse")
     def _parse_javap_output(
         self,
         output: str,
@@ -2082,21 +2907,11 @@ class JavaAnalyzer(ScriptAnalyzer):
 
         return functions, violations
 
-    def _detect_dangerous_function_calls(
-        self,
-        source_file: str,
-        include_warnings: bool = False,
-    ) -> list[Violation]:
-        """Detect dangerous function calls via static analysis of source."""
-        violations = []
-
-        try:
-            with open(source_file) as f:
-                source = f.read()
-        except OSError:
-            return violations
-
-        # Detect dangerous function calls
+    @classmethod
+    @functools.cache
+    def _source_patterns(cls, include_warnings: bool) -> PatternSet:
+        """Source patterns for dangerous function calls."""
+        patterns = []
         for func_name, reason in DANGEROUS_JAVA_FUNCTIONS["errors"].items():
             if func_name == "java.util.random":
                 pattern = r"\bnew\s+Random\s*\("
@@ -2108,20 +2923,8 @@ class JavaAnalyzer(ScriptAnalyzer):
                 pattern = r"\bMath\.pow\s*\("
             else:
                 continue
-            for match in re.finditer(pattern, source):
-                line_num = source[: match.start()].count("\n") + 1
-                violations.append(
-                    Violation(
-                        function="<source>",
-                        file=source_file,
-                        line=line_num,
-                        address="",
-                        instruction=match.group(0),
-                        mnemonic=func_name.upper().replace(".", "_"),
-                        reason=reason,
-                        severity=Severity.ERROR,
-                    )
-                )
+            rule = SourceRule(func_name.upper().replace(".", "_"), reason, Severity.ERROR)
+            patterns.append((pattern, 0, rule))
 
         if include_warnings:
             for func_name, reason in DANGEROUS_JAVA_FUNCTIONS["warnings"].items():
@@ -2133,22 +2936,21 @@ class JavaAnalyzer(ScriptAnalyzer):
                     pattern = r"\.compareTo\s*\("
                 else:
                     continue
-                for match in re.finditer(pattern, source):
-                    line_num = source[: match.start()].count("\n") + 1
-                    violations.append(
-                        Violation(
-                            function="<source>",
-                            file=source_file,
-                            line=line_num,
-                            address="",
-                            instruction=match.group(0),
-                            mnemonic=func_name.upper().replace(".", "_"),
-                            reason=reason,
-                            severity=Severity.WARNING,
-                        )
-                    )
+                rule = SourceRule(func_name.upper().replace(".", "_"), reason, Severity.WARNING)
+                patterns.append((pattern, 0, rule))
+        return PatternSet(patterns)
 
-        return violations
+    @profiled("parse")
+    def _detect_dangerous_function_calls(
+        self,
+        source_file: str,
+        include_warnings: bool = False,
+    ) -> list[Violation]:
+        """Detect dangerous function calls via static analysis of source."""
+        index = SourceIndex.read(source_file)
+        if index is None:
+            return []
+        return self._scan_source(source_file, index, self._source_patterns(include_warnings))
 
     def analyze(
         self,
@@ -2166,91 +2968,36 @@ class JavaAnalyzer(ScriptAnalyzer):
             success, result = self._compile_java(str(source_path.absolute()), tmpdir)
             if not success:
                 raise RuntimeError(f"Java compilation failed: {result}")
+            return self._analyze_compiled(tmpdir, source_file, include_warnings, function_filter)
 
-            # Find compiled class files
-            class_files = list(Path(tmpdir).glob("**/*.class"))
-            if not class_files:
-                raise RuntimeError("No class files generated from compilation")
 
-            all_functions = []
-            all_violations = []
+# =============================================================================
+# Kotlin Analyzer
+# =============================================================================
 
-            # Analyze each class file
-            for class_file in class_files:
-                success, output = self._get_bytecode_output(str(class_file))
-                if not success:
-                    continue
 
-                functions, violations = self._parse_javap_output(
-                    output,
-                    source_file,
-                    include_warnings,
-                    function_filter,
-                )
-                all_functions.extend(functions)
-                all_violations.extend(violations)
-
-        # Also check for dangerous function calls in source
-        source_violations = self._detect_dangerous_function_calls(
-            source_file,
-            include_warnings,
-        )
-
-        # Merge violations, avoiding duplicates
-        existing = {(v.line, v.mnemonic) for v in all_violations}
-        for v in source_violations:
-            if (v.line, v.mnemonic) not in existing:
-                all_violations.append(v)
-
-        return AnalysisReport(
-            architecture="jvm",
-            compiler="javac",
-            optimization="default",
-            source_file=str(source_file),
-            total_functions=len(all_functions),
-            total_instructions=sum(f["instructions"] for f in all_functions),
-            violations=all_violations,
-        )
-
-
-# =============================================================================
-# Kotlin Analyzer
-# =============================================================================
-
-
-class KotlinAnalyzer(ScriptAnalyzer):
+class KotlinAnalyzer(JVMAnalyzer):
     """
-    Analyzer for Kotlin source files using kotlinc and javap for bytecode disassembly.
+    Analyzer for Kotlin source files, reading the class files kotlinc produces directly.
 
     Compiles Kotlin source to JVM bytecode and analyzes for timing-unsafe operations.
     Kotlin targets Android and JVM platforms, compiling to the same bytecode as Java.
     """
 
     name = "kotlin"
+    compiler_name = "kotlinc"
+    SOURCE_SUFFIXES = (".kt",)
+    BYTECODES = DANGEROUS_KOTLIN_BYTECODES
 
     def __init__(self, kotlinc_path: str | None = None, javap_path: str | None = None):
         self.kotlinc_path = kotlinc_path or "kotlinc"
         self.javap_path = javap_path or "javap"
 
     def is_available(self) -> bool:
-        """Check if Kotlin compiler and Java disassembler are available."""
-        try:
-            result = subprocess.run(
-                [self.kotlinc_path, "-version"],
-                capture_output=True,
-                text=True,
-            )
-            if result.returncode != 0:
-                return False
-            result = subprocess.run(
-                [self.javap_path, "-version"],
-                capture_output=True,
-                text=True,
-            )
-            return result.returncode == 0
-        except FileNotFoundError:
-            return False
+        """Check if the Kotlin compiler is available (javap is only a fallback)."""
+        return get_registry().is_available(self.kotlinc_path, ["-version"])
 
+    @profiled("compile")
     def _compile_kotlin(self, source_file: str, output_dir: str) -> tuple[bool, str]:
         """Compile Kotlin source to class files."""
         cmd = [
@@ -2268,24 +3015,13 @@ class KotlinAnalyzer(ScriptAnalyzer):
         except FileNotFoundError:
             return False, f"Kotlin compiler not found: {self.kotlinc_path}"
 
-    def _get_bytecode_output(self, class_file: str) -> tuple[bool, str]:
-        """Get javap bytecode disassembly for a class file."""
-        cmd = [
-            self.javap_path,
-            "-c",  # Disassemble code
-            "-p",  # Show private members
-            "-v",  # Verbose (includes line numbers)
-            class_file,
-        ]
-
-        try:
-            result = subprocess.run(cmd, capture_output=True, text=True)
-            if result.returncode != 0:
-                return False, result.stderr or result.stdout
-            return True, result.stdout
-        except FileNotFoundError:
-            return False, f"Java disassembler not found: {self.javap_path}"
+    def _compile_sources(self, source_files: list[str], output_dir: str) -> tuple[bool, str]:
+        """Compile a module's sources with one kotlinc run, listing them in an argument file."""
+        with tempfile.TemporaryDirectory() as argument_dir:
+            argfile = _write_argfile(source_files, argument_dir)
+            return self._compile_kotlin(f"@{argfile}", output_dir)
 
+    @profiled("parse")
     def _parse_javap_output(
         self,
         output: str,
@@ -2414,21 +3150,11 @@ class KotlinAnalyzer(ScriptAnalyzer):
 
         return functions, violations
 
-    def _detect_dangerous_function_calls(
-        self,
-        source_file: str,
-        include_warnings: bool = False,
-    ) -> list[Violation]:
-        """Detect dangerous function calls via static analysis of Kotlin source."""
-        violations = []
-
-        try:
-            with open(source_file) as f:
-                source = f.read()
-        except OSError:
-            return violations
-
-        # Detect dangerous function calls (Kotlin-specific patterns)
+    @classmethod
+    @functools.cache
+    def _source_patterns(cls, include_warnings: bool) -> PatternSet:
+        """Source patterns for dangerous function calls (Kotlin-specific)."""
+        patterns = []
         for func_name, reason in DANGEROUS_KOTLIN_FUNCTIONS["errors"].items():
             pattern = None
             if func_name == "random.nextint":
@@ -2453,20 +3179,8 @@ class KotlinAnalyzer(ScriptAnalyzer):
                 pattern = r"\b(?:kotlin\.math\.)?pow\s*\(|\bMath\.pow\s*\("
 
             if pattern:
-                for match in re.finditer(pattern, source, re.IGNORECASE):
-                    line_num = source[: match.start()].count("\n") + 1
-                    violations.append(
-                        Violation(
-                            function="<source>",
-                            file=source_file,
-                            line=line_num,
-                            address="",
-                            instruction=match.group(0),
-                            mnemonic=func_name.upper().replace(".", "_"),
-                            reason=reason,
-                            severity=Severity.ERROR,
-                        )
-                    )
+                rule = SourceRule(func_name.upper().replace(".", "_"), reason, Severity.ERROR)
+                patterns.append((pattern, re.IGNORECASE, rule))
 
         if include_warnings:
             for func_name, reason in DANGEROUS_KOTLIN_FUNCTIONS["warnings"].items():
@@ -2481,22 +3195,21 @@ class KotlinAnalyzer(ScriptAnalyzer):
                     pattern = r"\bArrays\.equals\s*\("
 
                 if pattern:
-                    for match in re.finditer(pattern, source):
-                        line_num = source[: match.start()].count("\n") + 1
-                        violations.append(
-                            Violation(
-                                function="<source>",
-                                file=source_file,
-                                line=line_num,
-                                address="",
-                                instruction=match.group(0),
-                                mnemonic=func_name.upper().replace(".", "_"),
-                                reason=reason,
-                                severity=Severity.WARNING,
-                            )
-                        )
+                    mnemonic = func_name.upper().replace(".", "_")
+                    patterns.append((pattern, 0, SourceRule(mnemonic, reason, Severity.WARNING)))
+        return PatternSet(patterns)
 
-        return violations
+    @profiled("parse")
+    def _detect_dangerous_function_calls(
+        self,
+        source_file: str,
+        include_warnings: bool = False,
+    ) -> list[Violation]:
+        """Detect dangerous function calls via static analysis of Kotlin source."""
+        index = SourceIndex.read(source_file)
+        if index is None:
+            return []
+        return self._scan_source(source_file, index, self._source_patterns(include_warnings))
 
     def analyze(
         self,
@@ -2514,193 +3227,311 @@ class KotlinAnalyzer(ScriptAnalyzer):
             success, result = self._compile_kotlin(str(source_path.absolute()), tmpdir)
             if not success:
                 raise RuntimeError(f"Kotlin compilation failed: {result}")
+            return self._analyze_compiled(tmpdir, source_file, include_warnings, function_filter)
 
-            # Find compiled class files
-            class_files = list(Path(tmpdir).glob("**/*.class"))
-            if not class_files:
-                raise RuntimeError("No class files generated from compilation")
 
-            all_functions = []
-            all_violations = []
-
-            # Analyze each class file
-            for class_file in class_files:
-                success, output = self._get_bytecode_output(str(class_file))
-                if not success:
-                    continue
-
-                functions, violations = self._parse_javap_output(
-                    output,
-                    source_file,
-                    include_warnings,
-                    function_filter,
-                )
-                all_functions.extend(functions)
-                all_violations.extend(violations)
-
-        # Also check for dangerous function calls in source
-        source_violations = self._detect_dangerous_function_calls(
-            source_file,
-            include_warnings,
-        )
+# =============================================================================
+# C# Analyzer
+# =============================================================================
 
-        # Merge violations, avoiding duplicates
-        existing = {(v.line, v.mnemonic) for v in all_violations}
-        for v in source_violations:
-            if (v.line, v.mnemonic) not in existing:
-                all_violations.append(v)
 
-        return AnalysisReport(
-            architecture="jvm",
-            compiler="kotlinc",
-            optimization="default",
-            source_file=str(source_file),
-            total_functions=len(all_functions),
-            total_instructions=sum(f["instructions"] for f in all_functions),
-            violations=all_violations,
-        )
+# Bump when the workspace project changes
+DOTNET_WORKSPACE_FORMAT = 1
 
+# The project every C# compilation goes through. Its sources come from a props
+# file written for each build, so the project itself - and its restore - never
+# changes.
+_DOTNET_PROJECT = """<Project Sdk="Microsoft.NET.Sdk">
+  <PropertyGroup>
+    <TargetFramework>net8.0</TargetFramework>
+    <OutputType>Library</OutputType>
+    <EnableDefaultCompileItems>false</EnableDefaultCompileItems>
+    <ProduceReferenceAssembly>false</ProduceReferenceAssembly>
+    <UseSharedCompilation>true</UseSharedCompilation>
+  </PropertyGroup>
+  <Import Project="$(CtAnalyzerSources)" Condition="'$(CtAnalyzerSources)' != ''" />
+</Project>
+"""
 
-# =============================================================================
-# C# Analyzer
-# =============================================================================
+# Top-level type declarations in ILSpy output (nested types are indented)
+_IL_CLASS = re.compile(r"^\.class\b(.*)$", re.MULTILINE)
+# Type declarations in C# source, for attributing IL types to files
+_CSHARP_TYPE = re.compile(
+    r"\b(?:class|struct|interface|enum|record(?:\s+(?:class|struct))?)\s+@?(\w+)"
+)
 
 
-class CSharpAnalyzer(ScriptAnalyzer):
+def _split_il_types(output: str) -> Iterator[tuple[str, str]]:
     """
-    Analyzer for C# source files using .NET SDK for compilation and IL disassembly.
-
-    Compiles C# source to IL and analyzes for timing-unsafe operations.
+    Split IL disassembly into (simple type name, IL) pairs, one per top-level
+    type including its nested types. Output before the first type (assembly
+    and module headers) is dropped.
+    """
+    name = None
+    start = 0
+    for match in _IL_CLASS.finditer(output):
+        if name is not None:
+            yield name, output[start : match.start()]
+        # ".class public auto ansi beforefieldinit Crypto.Keys`1" -> "Keys"
+        declared = match.group(1).split(" extends ")[0].split()[-1]
+        name = declared.strip("'").rpartition(".")[2].split("`")[0]
+        start = match.start()
+    if name is not None:
+        yield name, output[start:]
+
+
+class DotnetWorkspace:
+    """
+    A build project kept in the cache directory and reused for every C# build.
+
+    A fresh project per file made every build restore from NuGet and start
+    MSBuild cold. The workspace project is restored once, when it is created,
+    and every build then runs with --no-restore, leaving MSBuild node reuse
+    and the shared compiler server on so that later builds find them warm.
+    Builds pass their sources in a props file and get their own output and
+    intermediate directories, so concurrent builds (scan workers) share the
+    workspace safely.
     """
 
-    name = "csharp"
+    PROJECT = "ct-analyzer.csproj"
+
+    def __init__(self, dotnet_path: str = "dotnet", directory: str | None = None):
+        self.dotnet_path = dotnet_path
+        self._directory = directory
+
+    @property
+    def directory(self) -> str:
+        """Workspace directory, one per .NET SDK install and project format."""
+        if self._directory is None:
+            sdk = get_registry().version(self.dotnet_path, ["--version"])
+            key = hashlib.sha256(f"{DOTNET_WORKSPACE_FORMAT}\n{sdk}".encode()).hexdigest()[:16]
+            self._directory = os.path.join(default_cache_dir(), "dotnet", key)
+        return self._directory
+
+    @property
+    def project(self) -> str:
+        return os.path.join(self.directory, self.PROJECT)
+
+    def _run(self, args: list[str], cwd: str | None = None) -> subprocess.CompletedProcess:
+        env = {
+            **os.environ,
+            "DOTNET_CLI_TELEMETRY_OPTOUT": "1",
+            "DOTNET_NOLOGO": "1",
+            "DOTNET_SKIP_FIRST_TIME_EXPERIENCE": "1",
+        }
+        return subprocess.run(
+            [self.dotnet_path, *args], capture_output=True, text=True, cwd=cwd, env=env
+        )
 
-    def __init__(self, dotnet_path: str | None = None):
-        self.dotnet_path = dotnet_path or "dotnet"
+    def _restored(self) -> bool:
+        return os.path.exists(os.path.join(self.directory, "obj", "project.assets.json"))
 
-    def is_available(self) -> bool:
-        """Check if .NET SDK is available."""
+    def ensure(self) -> tuple[bool, str]:
+        """
+        Create and restore the workspace unless an earlier run did. It is
+        restored in a staging directory and renamed into place, so a
+        concurrent run either sees no workspace or a restored one.
+        """
+        if self._restored():
+            return True, self.directory
+
+        parent = os.path.dirname(self.directory)
+        os.makedirs(parent, exist_ok=True)
+        staging = tempfile.mkdtemp(prefix=".restore-", dir=parent)
         try:
-            result = subprocess.run(
-                [self.dotnet_path, "--version"],
-                capture_output=True,
-                text=True,
-            )
-            return result.returncode == 0
+            Path(staging, self.PROJECT).write_text(_DOTNET_PROJECT)
+            result = self._run(["restore", os.path.join(staging, self.PROJECT), "-v", "q"])
+            if result.returncode != 0:
+                return False, result.stderr or result.stdout
+            if not self._install(staging):
+                return False, f"Cannot create the .NET workspace {self.directory}"
+            return True, self.directory
         except FileNotFoundError:
-            return False
+            return False, f".NET SDK not found: {self.dotnet_path}"
+        finally:
+            shutil.rmtree(staging, ignore_errors=True)
 
-    def _compile_csharp(self, source_file: str, output_dir: str) -> tuple[bool, str]:
-        """Compile C# source to DLL using dotnet build."""
-        source_path = Path(source_file)
-        output_dll = Path(output_dir) / f"{source_path.stem}.dll"
+    def _install(self, staging: str) -> bool:
+        """
+        Rename the restored staging directory into place. A restored workspace
+        that another process installed first is kept; one without restored
+        assets (an interrupted run, a cleaned obj directory) is replaced.
+        """
+        for _attempt in range(3):
+            try:
+                os.rename(staging, self.directory)
+                return True
+            except OSError:
+                pass
+            if self._restored():
+                return True
+            # Set the incomplete workspace aside; a concurrent run may be doing the same
+            discard = tempfile.mkdtemp(prefix=".discard-", dir=os.path.dirname(self.directory))
+            try:
+                os.rename(self.directory, os.path.join(discard, "workspace"))
+            except OSError:
+                pass
+            shutil.rmtree(discard, ignore_errors=True)
+        return self._restored()
 
-        # Create a minimal project file for compilation
-        proj_content = f"""<Project Sdk="Microsoft.NET.Sdk">
-  <PropertyGroup>
-    <TargetFramework>net8.0</TargetFramework>
-    <OutputType>Library</OutputType>
-    <OutputPath>{output_dir}</OutputPath>
-    <EnableDefaultCompileItems>false</EnableDefaultCompileItems>
-  </PropertyGroup>
-  <ItemGroup>
-    <Compile Include="{source_path.absolute()}" />
-  </ItemGroup>
-</Project>
-"""
-        proj_file = Path(output_dir) / "temp.csproj"
-        proj_file.write_text(proj_content)
+    def build(self, source_files: list[str], output_dir: str) -> tuple[bool, str]:
+        """
+        Compile source_files together into one assembly under output_dir.
+        Returns (True, path of the assembly) or (False, error message).
+        """
+        success, message = self.ensure()
+        if not success:
+            return False, message
 
-        cmd = [
-            self.dotnet_path,
+        items = "\n".join(
+            f'    <Compile Include="{html.escape(str(Path(source).absolute()))}" />'
+            for source in source_files
+        )
+        sources = Path(output_dir, "sources.props")
+        sources.write_text(f"<Project>\n  <ItemGroup>\n{items}\n  </ItemGroup>\n</Project>\n")
+        name = "CtAnalyzerBuild"
+        output = os.path.join(output_dir, "bin", "")
+        args = [
             "build",
-            str(proj_file),
+            self.project,
+            "--no-restore",
             "-c",
             "Release",
             "--nologo",
             "-v",
             "q",
+            f"-p:CtAnalyzerSources={sources}",
+            f"-p:AssemblyName={name}",
+            f"-p:OutputPath={output}",
+            f"-p:IntermediateOutputPath={os.path.join(output_dir, 'obj', '')}",
         ]
 
         try:
-            result = subprocess.run(cmd, capture_output=True, text=True, cwd=output_dir)
-            if result.returncode != 0:
-                return False, result.stderr or result.stdout
-
-            # Find the output DLL
-            dll_files = list(Path(output_dir).glob("**/*.dll"))
-            if not dll_files:
-                return False, "No DLL files generated"
-
-            return True, str(dll_files[0])
+            result = self._run(args, cwd=output_dir)
         except FileNotFoundError:
             return False, f".NET SDK not found: {self.dotnet_path}"
+        if result.returncode != 0:
+            return False, result.stderr or result.stdout
+        dll = os.path.join(output, f"{name}.dll")
+        if not os.path.exists(dll):
+            return False, "No DLL files generated"
+        return True, dll
 
-    def _get_il_output(self, dll_file: str) -> tuple[bool, str]:
-        """Get IL disassembly for a .NET assembly."""
-        # First try ilspycmd directly (globally installed and in PATH)
-        try:
-            result = subprocess.run(
-                ["ilspycmd", "-il", dll_file],
-                capture_output=True,
-                text=True,
-            )
-            if result.returncode == 0:
-                return True, result.stdout
-        except FileNotFoundError:
-            pass  # ilspycmd not in PATH, try other methods
 
-        # Try as local tool
-        try:
-            result = subprocess.run(
-                [self.dotnet_path, "tool", "run", "ilspycmd", "-il", dll_file],
-                capture_output=True,
-                text=True,
-            )
-            if result.returncode == 0:
-                return True, result.stdout
-        except FileNotFoundError:
-            pass  # dotnet not found or local tool not installed
+class CSharpAnalyzer(ScriptAnalyzer):
+    """
+    Analyzer for C# source files using .NET SDK for compilation and IL disassembly.
+
+    Compiles C# source to IL and analyzes for timing-unsafe operations. All
+    builds go through one DotnetWorkspace, and a directory of sources can be
+    analyzed as one project, compiled in a single build. Assemblies are read
+    with the built-in reader (cil.py), so no disassembler process or text
+    parsing is involved; ILSpy or monodis is only run for assemblies the
+    reader rejects. Prebuilt assemblies and NuGet packages are read directly.
+    """
+
+    name = "csharp"
+
+    # Division and modulo operators, for the source-only fallback
+    _OPERATOR_PATTERNS = PatternSet(
+        [
+            (
+                r"[^/]\s*/\s*[^/=*]",
+                0,
+                SourceRule(
+                    "DIV_OP",
+                    "Division operator may have variable-time execution",
+                    Severity.ERROR,
+                    instruction="/",
+                    comments=("//",),
+                ),
+            ),
+            (
+                r"\s%\s*[^=]",
+                0,
+                SourceRule(
+                    "REM_OP",
+                    "Modulo operator may have variable-time execution",
+                    Severity.ERROR,
+                    instruction="%",
+                    comments=("//",),
+                ),
+            ),
+        ]
+    )
+
+    def __init__(self, dotnet_path: str | None = None):
+        self.dotnet_path = dotnet_path or "dotnet"
+        self.workspace = DotnetWorkspace(self.dotnet_path)
+        # (command, environment) of the disassembler that worked, chosen on first use
+        self._disassembler: tuple[list[str], dict | None] | None = None
+        self._disassembler_chosen = False
+
+    def is_available(self) -> bool:
+        """Check if .NET SDK is available."""
+        return get_registry().is_available(self.dotnet_path, ["--version"])
 
-        # Try running ilspycmd via .NET 8.0 from Homebrew (macOS)
-        # This handles the case where ilspycmd targets .NET 8.0 but the system
-        # has a newer .NET version installed
+    @profiled("compile")
+    def _compile_csharp(self, source_file: str, output_dir: str) -> tuple[bool, str]:
+        """Compile C# source to a DLL in the shared build workspace."""
+        return self.workspace.build([source_file], output_dir)
+
+    @profiled("compile")
+    def _compile_sources(self, source_files: list[str], output_dir: str) -> tuple[bool, str]:
+        """Compile a project's sources together into one DLL."""
+        return self.workspace.build(source_files, output_dir)
+
+    def _il_disassemblers(self) -> Iterator[tuple[list[str], dict | None]]:
+        """IL disassembler commands to try, in order of preference, with their environment."""
+        # ilspycmd installed globally and in PATH
+        yield ["ilspycmd", "-il"], None
+        # ilspycmd as a local tool
+        yield [self.dotnet_path, "tool", "run", "ilspycmd", "-il"], None
+
+        # ilspycmd run via .NET 8.0 from Homebrew (macOS). This handles the case
+        # where ilspycmd targets .NET 8.0 but the system has a newer .NET
+        # version installed
         dotnet8_paths = [
             "/opt/homebrew/opt/dotnet@8/libexec/dotnet",  # Apple Silicon
             "/usr/local/opt/dotnet@8/libexec/dotnet",  # Intel Mac
         ]
-        ilspycmd_dll = Path.home() / ".dotnet/tools/.store/ilspycmd"
-        if ilspycmd_dll.exists():
-            # Find the ilspycmd.dll in the store
-            for dll_path in ilspycmd_dll.glob("*/ilspycmd/*/tools/net8.0/any/ilspycmd.dll"):
+        ilspycmd_store = Path.home() / ".dotnet/tools/.store/ilspycmd"
+        if ilspycmd_store.exists():
+            # Only the first ilspycmd.dll in the store
+            for dll_path in ilspycmd_store.glob("*/ilspycmd/*/tools/net8.0/any/ilspycmd.dll"):
                 for dotnet8 in dotnet8_paths:
                     if Path(dotnet8).exists():
-                        try:
-                            env = os.environ.copy()
-                            env["DOTNET_ROOT"] = str(Path(dotnet8).parent)
-                            result = subprocess.run(
-                                [dotnet8, str(dll_path), "-il", dll_file],
-                                capture_output=True,
-                                text=True,
-                                env=env,
-                            )
-                            if result.returncode == 0:
-                                return True, result.stdout
-                        except FileNotFoundError:
-                            pass
-                break  # Only try the first matching dll
+                        env = {**os.environ, "DOTNET_ROOT": str(Path(dotnet8).parent)}
+                        yield [dotnet8, str(dll_path), "-il"], env
+                break
 
-        # Try monodis (available on Linux/macOS with Mono)
-        try:
-            result = subprocess.run(
-                ["monodis", "--method", dll_file],
-                capture_output=True,
-                text=True,
-            )
+        # monodis (available on Linux/macOS with Mono)
+        yield ["monodis", "--method"], None
+
+    @profiled("disassemble")
+    def _get_il_output(self, dll_file: str) -> tuple[bool, str]:
+        """
+        Get IL disassembly for a .NET assembly. The first disassembler that
+        works is remembered and is the only one tried for later assemblies.
+        """
+        if self._disassembler_chosen:
+            candidates = [self._disassembler] if self._disassembler else []
+        else:
+            candidates = self._il_disassemblers()
+
+        for command, env in candidates:
+            try:
+                result = subprocess.run(
+                    [*command, dll_file], capture_output=True, text=True, env=env
+                )
+            except FileNotFoundError:
+                continue  # Not installed, try the next one
             if result.returncode == 0:
+                self._disassembler, self._disassembler_chosen = (command, env), True
                 return True, result.stdout
-        except FileNotFoundError:
-            pass  # monodis not available
+            if self._disassembler_chosen:
+                return False, result.stderr or result.stdout
+        self._disassembler_chosen = True
 
         # If nothing works, return helpful error
         return False, (
@@ -2708,6 +3539,7 @@ class CSharpAnalyzer(ScriptAnalyzer):
             "`dotnet tool install -g ilspycmd`"
         )
 
+    @profiled("parse")
     def _parse_il_output(
         self,
         output: str,
@@ -2834,21 +3666,86 @@ class CSharpAnalyzer(ScriptAnalyzer):
 
         return functions, violations
 
-    def _detect_dangerous_function_calls(
+    @classmethod
+    @functools.cache
+    def _flagged_opcodes(cls, include_warnings: bool) -> dict[int, tuple[Severity, str]]:
+        """Opcode -> (severity, reason) for the IL instructions to report."""
+        flagged = {}
+        tables = [(Severity.ERROR, DANGEROUS_CSHARP_BYTECODES["errors"])]
+        if include_warnings:
+            tables.append((Severity.WARNING, DANGEROUS_CSHARP_BYTECODES["warnings"]))
+        for severity, table in tables:
+            for mnemonic, reason in table.items():
+                # The table's "bne" is not an IL opcode (only bne.un is)
+                if mnemonic in CIL_OPCODE_NUMBERS:
+                    flagged.setdefault(CIL_OPCODE_NUMBERS[mnemonic], (severity, reason))
+        return flagged
+
+    @profiled("read")
+    def _read_assembly(self, dll_file: str) -> Assembly | None:
+        """
+        Read a compiled assembly with the built-in reader (cil.py), or return
+        None if it cannot, so the caller can fall back to an IL disassembler.
+        """
+        try:
+            return read_assembly(Path(dll_file).read_bytes())
+        except (OSError, CILFormatError):
+            return None
+
+    @profiled("parse")
+    def _analyze_types(
         self,
+        assembly: Assembly,
+        indexes: list[int],
         source_file: str,
         include_warnings: bool = False,
-    ) -> list[Violation]:
-        """Detect dangerous function calls via static analysis of source."""
+        function_filter: str | None = None,
+    ) -> tuple[list[dict], list[Violation]]:
+        """
+        Check the IL of the methods of assembly.types[i] for each i in
+        indexes, naming them Type::Method as IL does (Crypto.Keys/Inner::Reduce).
+        Methods not matching function_filter are skipped without decoding.
+        """
+        functions = []
         violations = []
+        flagged = self._flagged_opcodes(include_warnings)
+        filter_pattern = re.compile(function_filter) if function_filter else None
 
-        try:
-            with open(source_file) as f:
-                source = f.read()
-        except OSError:
-            return violations
+        for index in indexes:
+            type_name = assembly.full_name(index)
+            for method in assembly.types[index].methods:
+                name = f"{type_name}::{method.name}"
+                if method.body is None or (filter_pattern and not filter_pattern.search(name)):
+                    continue
+                count = 0
+                for offset, opcode in cil_instructions(method.body):
+                    count += 1
+                    if opcode not in flagged:
+                        continue
+                    severity, reason = flagged[opcode]
+                    mnemonic = CIL_OPCODES[opcode]
+                    operands = cil_operand_text(method.body, offset)
+                    violations.append(
+                        Violation(
+                            function=name,
+                            file=source_file,
+                            line=None,
+                            address=f"IL_{offset:04x}",
+                            instruction=f"{mnemonic} {operands}".strip(),
+                            mnemonic=mnemonic.upper(),
+                            reason=reason,
+                            severity=severity,
+                        )
+                    )
+                functions.append({"name": name, "instructions": count})
+
+        return functions, violations
 
-        # Detect dangerous function calls
+    @classmethod
+    @functools.cache
+    def _source_patterns(cls, include_warnings: bool) -> PatternSet:
+        """Source patterns for dangerous function calls."""
+        patterns = []
         for func_name, reason in DANGEROUS_CSHARP_FUNCTIONS["errors"].items():
             if func_name == "system.random":
                 pattern = r"\bnew\s+Random\s*\("
@@ -2858,20 +3755,8 @@ class CSharpAnalyzer(ScriptAnalyzer):
                 pattern = r"\bMath\.Pow\s*\("
             else:
                 continue
-            for match in re.finditer(pattern, source):
-                line_num = source[: match.start()].count("\n") + 1
-                violations.append(
-                    Violation(
-                        function="<source>",
-                        file=source_file,
-                        line=line_num,
-                        address="",
-                        instruction=match.group(0),
-                        mnemonic=func_name.upper().replace(".", "_"),
-                        reason=reason,
-                        severity=Severity.ERROR,
-                    )
-                )
+            rule = SourceRule(func_name.upper().replace(".", "_"), reason, Severity.ERROR)
+            patterns.append((pattern, 0, rule))
 
         if include_warnings:
             for func_name, reason in DANGEROUS_CSHARP_FUNCTIONS["warnings"].items():
@@ -2883,85 +3768,33 @@ class CSharpAnalyzer(ScriptAnalyzer):
                     pattern = r"String\.Compare\s*\("
                 else:
                     continue
-                for match in re.finditer(pattern, source):
-                    line_num = source[: match.start()].count("\n") + 1
-                    violations.append(
-                        Violation(
-                            function="<source>",
-                            file=source_file,
-                            line=line_num,
-                            address="",
-                            instruction=match.group(0),
-                            mnemonic=func_name.upper().replace(".", "_"),
-                            reason=reason,
-                            severity=Severity.WARNING,
-                        )
-                    )
+                rule = SourceRule(func_name.upper().replace(".", "_"), reason, Severity.WARNING)
+                patterns.append((pattern, 0, rule))
+        return PatternSet(patterns)
 
-        return violations
+    @profiled("parse")
+    def _detect_dangerous_function_calls(
+        self,
+        source_file: str,
+        include_warnings: bool = False,
+    ) -> list[Violation]:
+        """Detect dangerous function calls via static analysis of source."""
+        index = SourceIndex.read(source_file)
+        if index is None:
+            return []
+        return self._scan_source(source_file, index, self._source_patterns(include_warnings))
 
+    @profiled("parse")
     def _analyze_source_only(
         self,
         source_file: str,
         include_warnings: bool = False,
     ) -> AnalysisReport:
         """Fallback analysis using source-level pattern matching only."""
-        violations = self._detect_dangerous_function_calls(source_file, include_warnings)
-
+        index = SourceIndex.read(source_file) or SourceIndex("")
+        violations = self._scan_source(source_file, index, self._source_patterns(include_warnings))
         # Also detect division/modulo operators in source
-        try:
-            with open(source_file) as f:
-                source = f.read()
-        except OSError:
-            source = ""
-
-        # Detect division operator
-        div_pattern = r"[^/]\s*/\s*[^/=*]"
-        for match in re.finditer(div_pattern, source):
-            line_start = source.rfind("\n", 0, match.start()) + 1
-            line_end = source.find("\n", match.start())
-            if line_end == -1:
-                line_end = len(source)
-            line = source[line_start:line_end]
-            if line.strip().startswith("//"):
-                continue
-            line_num = source[: match.start()].count("\n") + 1
-            violations.append(
-                Violation(
-                    function="<source>",
-                    file=source_file,
-                    line=line_num,
-                    address="",
-                    instruction="/",
-                    mnemonic="DIV_OP",
-                    reason="Division operator may have variable-time execution",
-                    severity=Severity.ERROR,
-                )
-            )
-
-        # Detect modulo operator
-        mod_pattern = r"\s%\s*[^=]"
-        for match in re.finditer(mod_pattern, source):
-            line_start = source.rfind("\n", 0, match.start()) + 1
-            line_end = source.find("\n", match.start())
-            if line_end == -1:
-                line_end = len(source)
-            line = source[line_start:line_end]
-            if line.strip().startswith("//"):
-                continue
-            line_num = source[: match.start()].count("\n") + 1
-            violations.append(
-                Violation(
-                    function="<source>",
-                    file=source_file,
-                    line=line_num,
-                    address="",
-                    instruction="%",
-                    mnemonic="REM_OP",
-                    reason="Modulo operator may have variable-time execution",
-                    severity=Severity.ERROR,
-                )
-            )
+        violations += self._scan_source(source_file, index, self._OPERATOR_PATTERNS)
 
         return AnalysisReport(
             architecture="cil",
@@ -2995,22 +3828,37 @@ class CSharpAnalyzer(ScriptAnalyzer):
                 )
                 return self._analyze_source_only(source_file, include_warnings)
 
-            # Get IL disassembly
-            success, output = self._get_il_output(result)
-            if not success:
-                # Fall back to source-only analysis
-                print(
-                    f"Note: IL disassembly failed ({output}), using source analysis only",
-                    file=sys.stderr,
-                )
-                return self._analyze_source_only(source_file, include_warnings)
+            analysis = None
+            assembly = self._read_assembly(result)
+            if assembly is not None:
+                try:
+                    analysis = self._analyze_types(
+                        assembly,
+                        list(range(len(assembly.types))),
+                        source_file,
+                        include_warnings,
+                        function_filter,
+                    )
+                except CILFormatError:
+                    pass  # Let the disassembler try
 
-            functions, violations = self._parse_il_output(
-                output,
-                source_file,
-                include_warnings,
-                function_filter,
-            )
+            if analysis is None:
+                # Get IL disassembly
+                success, output = self._get_il_output(result)
+                if not success:
+                    # Fall back to source-only analysis
+                    print(
+                        f"Note: IL disassembly failed ({output}), using source analysis only",
+                        file=sys.stderr,
+                    )
+                    return self._analyze_source_only(source_file, include_warnings)
+                analysis = self._parse_il_output(
+                    output,
+                    source_file,
+                    include_warnings,
+                    function_filter,
+                )
+            functions, violations = analysis
 
         # Also check for dangerous function calls in source
         source_violations = self._detect_dangerous_function_calls(
@@ -3034,15 +3882,247 @@ class CSharpAnalyzer(ScriptAnalyzer):
             violations=violations,
         )
 
+    def project_sources(self, directory: str) -> list[str]:
+        """C# sources under directory, as scan mode finds them."""
+        return [path for path in find_sources(directory) if Path(path).suffix.lower() == ".cs"]
+
+    def _analyze_project_assembly(
+        self,
+        dll_file: str,
+        declared: dict[str, str],
+        default: str,
+        include_warnings: bool = False,
+        function_filter: str | None = None,
+    ) -> list[tuple[str, tuple[list[dict], list[Violation]]]] | None:
+        """
+        Analyze a project's assembly with the built-in reader, each type under
+        the source declaring its top-level type (default if none does).
+        Returns (label, (functions, violations)) pairs, or None if the reader
+        cannot handle the assembly.
+        """
+        assembly = self._read_assembly(dll_file)
+        if assembly is None:
+            return None
+        groups: dict[str, list[int]] = {}
+        for index in range(len(assembly.types)):
+            # Generic types carry their arity: Keys`1
+            name = assembly.top_level(index).name.split("`")[0]
+            groups.setdefault(declared.get(name, default), []).append(index)
+        try:
+            return [
+                (
+                    label,
+                    self._analyze_types(
+                        assembly, indexes, label, include_warnings, function_filter
+                    ),
+                )
+                for label, indexes in groups.items()
+            ]
+        except CILFormatError:
+            return None
+
+    def analyze_project(
+        self,
+        path: str,
+        include_warnings: bool = False,
+        function_filter: str | None = None,
+    ) -> list[AnalysisReport]:
+        """
+        Analyze the C# sources under a directory as one project.
+
+        The sources are compiled together, so they may use each other's types,
+        in one build, and the assembly is disassembled once. Each top-level
+        type's methods are reported under the source file declaring it (the
+        first one, for partial types); types declared in no source, such as
+        the Program class of top-level statements, are reported under path.
+
+        Args:
+            path: Directory of C# sources
+            include_warnings: Include warning-level violations
+            function_filter: Regex pattern to filter functions
+
+        Returns:
+            One AnalysisReport per source file
+        """
+        sources = self.project_sources(path)
+        if not sources:
+            raise FileNotFoundError(f"No C# sources found in {path}")
+
+        declared: dict[str, str] = {}
+        for source in sources:
+            index = SourceIndex.read(source)
+            for match in _CSHARP_TYPE.finditer(index.text if index else ""):
+                declared.setdefault(match.group(1), source)
+        default = sources[0] if len(sources) == 1 else path
+
+        with tempfile.TemporaryDirectory() as tmpdir:
+            success, result = self._compile_sources(sources, tmpdir)
+            if success:
+                analyses = self._analyze_project_assembly(
+                    result, declared, default, include_warnings, function_filter
+                )
+                if analyses is None:
+                    success, output = self._get_il_output(result)
+                    if success:
+                        analyses = []
+                        for type_name, il in _split_il_types(output):
+                            label = declared.get(type_name, default)
+                            analysis = self._parse_il_output(
+                                il, label, include_warnings, function_filter
+                            )
+                            analyses.append((label, analysis))
+                    else:
+                        result = f"IL disassembly failed ({output})"
+            else:
+                result = f"C# compilation failed ({result})"
+        if not success:
+            # Fall back to source-only analysis
+            print(f"Note: {result}, using source analysis only", file=sys.stderr)
+            return [self._analyze_source_only(source, include_warnings) for source in sources]
+
+        known = set(sources)
+        results: dict[str, tuple[list[dict], list[Violation]]] = {s: ([], []) for s in sources}
+        for label, (functions, violations) in analyses:
+            if functions or violations:
+                results.setdefault(label, ([], []))
+                results[label][0].extend(functions)
+                results[label][1].extend(violations)
+
+        reports = []
+        for label, (functions, violations) in results.items():
+            if label in known:
+                # Also check for dangerous function calls in source, avoiding duplicates
+                existing = {(v.line, v.mnemonic) for v in violations}
+                for v in self._detect_dangerous_function_calls(label, include_warnings):
+                    if (v.line, v.mnemonic) not in existing:
+                        violations.append(v)
+            reports.append(
+                AnalysisReport(
+                    architecture="cil",
+                    compiler="dotnet",
+                    optimization="Release",
+                    source_file=label,
+                    total_functions=len(functions),
+                    total_instructions=sum(f["instructions"] for f in functions),
+                    violations=violations,
+                )
+            )
+        return reports
+
+    def _assembly_inputs(self, path: str) -> Iterator[tuple[str, bytes | None, bool]]:
+        """
+        Yield (label, contents, named) for each assembly of an assemblies-mode
+        input. Entries of a NuGet package are read in memory and labelled
+        "package.nupkg(lib/net8.0/Crypto.dll)". named is True for an assembly
+        given directly, which must then be a .NET one; contents is None if
+        the package holding the entry is not a zip file.
+        """
+        root = Path(path)
+        if root.is_dir():
+            files = sorted(
+                p
+                for p in root.glob("**/*")
+                if p.is_file()
+                and p.suffix.lower() in (*DOTNET_ASSEMBLY_SUFFIXES, NUGET_PACKAGE_SUFFIX)
+            )
+        else:
+            files = [root]
+        for file in files:
+            if file.suffix.lower() != NUGET_PACKAGE_SUFFIX:
+                yield str(file), file.read_bytes(), not root.is_dir()
+                continue
+            if not zipfile.is_zipfile(file):
+                yield str(file), None, True
+                continue
+            with zipfile.ZipFile(file) as package:
+                for entry in package.namelist():
+                    if Path(entry).suffix.lower() in DOTNET_ASSEMBLY_SUFFIXES:
+                        yield f"{file}({entry})", package.read(entry), False
+
+    def analyze_assemblies(
+        self,
+        path: str,
+        include_warnings: bool = False,
+        function_filter: str | None = None,
+        on_result: Callable[[str, AnalysisReport | None, str], None] | None = None,
+    ) -> tuple[list[AnalysisReport], dict[str, str]]:
+        """
+        Analyze prebuilt .NET assemblies with the built-in reader, needing
+        neither the .NET SDK nor a disassembler.
+
+        Args:
+            path: A .dll or .exe, a NuGet package (.nupkg), or a directory
+                holding any of them
+            include_warnings: Include warning-level violations
+            function_filter: Regex pattern to filter functions
+            on_result: Optional callback receiving (label, report, error) as
+                soon as each assembly is finished, with report None when it
+                could not be read
+
+        Returns:
+            (reports, errors): one report per assembly, and the error message
+            of each assembly that could not be read. Native DLLs found in a
+            directory or package are skipped.
+        """
+        if not Path(path).exists():
+            raise FileNotFoundError(f"Assembly not found: {path}")
+
+        reports = []
+        errors = {}
+
+        def failed(label: str, message: str) -> None:
+            errors[label] = message
+            if on_result is not None:
+                on_result(label, None, message)
+
+        for label, data, named in self._assembly_inputs(path):
+            if data is None:
+                failed(label, "Not a NuGet package (not a zip file)")
+                continue
+            try:
+                assembly = read_assembly(data)
+                functions, violations = self._analyze_types(
+                    assembly,
+                    list(range(len(assembly.types))),
+                    label,
+                    include_warnings,
+                    function_filter,
+                )
+            except NotAssemblyError as e:
+                if named:
+                    failed(label, str(e))
+                continue
+            except CILFormatError as e:
+                failed(label, str(e))
+                continue
+            reports.append(
+                AnalysisReport(
+                    architecture="cil",
+                    compiler="dotnet",
+                    optimization="Release",
+                    source_file=label,
+                    total_functions=len(functions),
+                    total_instructions=sum(f["instructions"] for f in functions),
+                    violations=violations,
+                )
+            )
+            if on_result is not None:
+                on_result(label, reports[-1], "")
+        return reports, errors
+
 
 # =============================================================================
 # Helper Functions
 # =============================================================================
 
 
+# Shared analyzer instances, keyed on analyzer class
+_ANALYZERS: dict[type, ScriptAnalyzer] = {}
+
+
 def get_script_analyzer(language: str) -> ScriptAnalyzer | None:
     """
-    Get the appropriate analyzer for a bytecode-analyzed language.
+    Get the shared analyzer for a bytecode-analyzed language.
 
     Args:
         language: The language identifier
@@ -3062,9 +4142,12 @@ def get_script_analyzer(language: str) -> ScriptAnalyzer | None:
     }
 
     analyzer_class = analyzers.get(language.lower())
-    if analyzer_class:
-        return analyzer_class()
-    return None
+    if analyzer_class is None:
+        return None
+    # Analyzers are shared so their toolchain probes are made once per process
+    if analyzer_class not in _ANALYZERS:
+        _ANALYZERS[analyzer_class] = analyzer_class()
+    return _ANALYZERS[analyzer_class]
 
 
 def is_script_language(language: str) -> bool:
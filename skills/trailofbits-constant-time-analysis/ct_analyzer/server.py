@@ -0,0 +1,269 @@
+"""
+Long-running analysis server.
+
+Speaks JSON-RPC 2.0 with one JSON message per line, over stdio or a Unix
+socket. The toolchain registry, the instruction tables, the script analyzers
+and recently used cache entries stay in memory between requests, so an
+editor or pre-commit hook pays the start-up cost once. Requests are served
+concurrently; responses may arrive out of order and are matched by id.
+
+Methods:
+    analyze_source     params of analyzer.analyze_source (compiler by name)
+    analyze_assembly   params of analyzer.analyze_assembly
+    analyze_binary     params of analyzer.analyze_binary
+    status             uptime, request count and cache statistics
+    shutdown           stop serving once in-flight requests are answered
+
+Other params are rejected with INVALID_PARAMS; the cache is the server's,
+and function hashes are always recorded.
+Analysis results use the --json --function-hashes report layout. The
+optional "previous" parameter takes an earlier result in the same layout
+(see --since).
+"""
+
+import inspect
+import io
+import json
+import os
+import socket
+import socketserver
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from subprocess import CalledProcessError
+
+try:
+    from . import analyzer
+    from .cache import AnalysisCache
+    from .toolchains import get_registry
+except ImportError:
+    import analyzer
+    from cache import AnalysisCache
+    from toolchains import get_registry
+
+
+# JSON-RPC 2.0 error codes
+PARSE_ERROR = -32700
+INVALID_REQUEST = -32600
+METHOD_NOT_FOUND = -32601
+INVALID_PARAMS = -32602
+INTERNAL_ERROR = -32603
+ANALYSIS_ERROR = -32000
+
+# Cache entries kept in memory by default
+MEMORY_ENTRIES = 512
+
+
+def _client_params(function, *server_params: str) -> frozenset[str]:
+    """Parameters of an analyzer function a request may set (not server_params)."""
+    return frozenset(inspect.signature(function).parameters).difference(server_params)
+
+
+class AnalysisServer:
+    """Dispatches JSON-RPC requests to the analyzer on a thread pool."""
+
+    def __init__(self, cache: AnalysisCache | None = None, jobs: int | None = None):
+        self.cache = cache
+        self.pool = ThreadPoolExecutor(max_workers=jobs or os.cpu_count() or 1)
+        self.started = time.time()
+        self.requests = 0
+        self.stopped = threading.Event()
+        self._lock = threading.Lock()
+        self.methods = {
+            "analyze_source": self._analyze_source,
+            "analyze_assembly": self._analyze_assembly,
+            "analyze_binary": self._analyze_binary,
+            "status": self._status,
+            "shutdown": self._shutdown,
+        }
+        # Parameters the analysis methods pass on to the analyzer; the cache,
+        # the streaming callback and function hashing belong to the server
+        server_params = ("on_violations", "hash_functions")
+        self.params = {
+            "analyze_source": _client_params(analyzer.analyze_source, "cache", *server_params),
+            "analyze_assembly": _client_params(analyzer.analyze_assembly, *server_params),
+            "analyze_binary": _client_params(analyzer.analyze_binary, *server_params),
+        }
+
+    def warm_up(self) -> None:
+        """Load everything a first request would otherwise wait for."""
+        tools = get_registry().discover()
+        # Parsers are shared per (arch, compiler): analyze_source asks for the
+        # compiler's own, analyze_assembly for "unknown"
+        compilers = ["unknown"]
+        for name in ("gcc", "clang", "go", "rustc", "swiftc"):
+            if tools[name].available:
+                compilers.append(analyzer.get_compiler(name, "c").name)
+        for arch in analyzer.DANGEROUS_INSTRUCTIONS:
+            for compiler in compilers:
+                analyzer.get_parser(arch, compiler)
+        # Import the script analyzers (compiling their patterns) and create the
+        # shared instances the first request for each language would create
+        try:
+            from .script_analyzers import get_script_analyzer
+        except ImportError:
+            from script_analyzers import get_script_analyzer
+        for language in ("php", "javascript", "python", "ruby", "java", "kotlin", "csharp"):
+            get_script_analyzer(language)
+
+    def _analyze_source(self, source_file: str, **options) -> dict:
+        options = _decode_previous(options)
+        report = analyzer.analyze_source(
+            source_file, cache=self.cache, hash_functions=True, **options
+        )
+        return analyzer._report_to_dict(report, function_hashes=True)
+
+    def _analyze_assembly(self, assembly_file: str, arch: str, **options) -> dict:
+        report = analyzer.analyze_assembly(
+            assembly_file, arch, hash_functions=True, **_decode_previous(options)
+        )
+        return analyzer._report_to_dict(report, function_hashes=True)
+
+    def _analyze_binary(self, binary_file: str, **options) -> dict:
+        report = analyzer.analyze_binary(
+            binary_file, hash_functions=True, **_decode_previous(options)
+        )
+        return analyzer._report_to_dict(report, function_hashes=True)
+
+    def _status(self) -> dict:
+        status = {
+            "uptime": round(time.time() - self.started, 3),
+            "requests": self.requests,
+        }
+        if self.cache is not None:
+            status["cache"] = {"hits": self.cache.hits, "misses": self.cache.misses}
+        return status
+
+    def _shutdown(self) -> None:
+        self.stopped.set()
+
+    def handle(self, message) -> dict | None:
+        """Answer one decoded request. Returns None for notifications (no id)."""
+        if not isinstance(message, dict) or not isinstance(message.get("method"), str):
+            return _error(None, INVALID_REQUEST, "Invalid request")
+        request_id = message.get("id")
+        with self._lock:
+            self.requests += 1
+
+        method = self.methods.get(message["method"])
+        params = message.get("params", {})
+        allowed = self.params.get(message["method"])
+        unknown = sorted(set(params) - allowed) if isinstance(params, dict) and allowed else []
+        if method is None:
+            response = _error(request_id, METHOD_NOT_FOUND, f"Unknown method: {message['method']}")
+        elif not isinstance(params, (dict, list)):
+            response = _error(request_id, INVALID_PARAMS, "params must be an object or array")
+        elif unknown:
+            response = _error(request_id, INVALID_PARAMS, f"Unknown params: {', '.join(unknown)}")
+        else:
+            try:
+                if isinstance(params, dict):
+                    bound = inspect.signature(method).bind(**params)
+                else:
+                    bound = inspect.signature(method).bind(*params)
+            except TypeError as e:
+                response = _error(request_id, INVALID_PARAMS, str(e))
+            else:
+                try:
+                    result = method(*bound.args, **bound.kwargs)
+                    response = {"jsonrpc": "2.0", "id": request_id, "result": result}
+                except (OSError, RuntimeError, ValueError, CalledProcessError) as e:
+                    response = _error(request_id, ANALYSIS_ERROR, str(e))
+                except Exception as e:
+                    # A bad request must not take the server down
+                    response = _error(request_id, INTERNAL_ERROR, f"{type(e).__name__}: {e}")
+
+        return response if "id" in message else None
+
+    def serve_stream(self, reader, writer) -> None:
+        """Serve newline-delimited requests from reader until EOF or shutdown."""
+        write_lock = threading.Lock()
+        pending = []
+
+        def respond(response):
+            if response is None:
+                return
+            with write_lock:
+                writer.write(json.dumps(response) + "\n")
+                writer.flush()
+
+        for line in reader:
+            if not line.strip():
+                continue
+            try:
+                message = json.loads(line)
+            except ValueError:
+                respond(_error(None, PARSE_ERROR, "Parse error"))
+                continue
+            if isinstance(message, dict) and message.get("method") == "shutdown":
+                # Answer everything already accepted before acknowledging
+                for future in pending:
+                    future.result()
+                respond(self.handle(message))
+                break
+            pending.append(self.pool.submit(lambda m=message: respond(self.handle(m))))
+            pending = [future for future in pending if not future.done()]
+
+        for future in pending:
+            future.result()
+
+    def serve_unix(self, path: str) -> None:
+        """Serve clients on a Unix socket until a shutdown request arrives."""
+        server = self
+
+        class Handler(socketserver.StreamRequestHandler):
+            def handle(self):
+                reader = io.TextIOWrapper(self.rfile, encoding="utf-8", errors="replace")
+                writer = io.TextIOWrapper(self.wfile, encoding="utf-8", write_through=True)
+                server.serve_stream(reader, writer)
+                if server.stopped.is_set():
+                    threading.Thread(target=unix_server.shutdown).start()
+
+        if os.path.exists(path):
+            os.unlink(path)
+        unix_server = socketserver.ThreadingUnixStreamServer(path, Handler)
+        unix_server.daemon_threads = True
+        try:
+            unix_server.serve_forever()
+        finally:
+            unix_server.server_close()
+            if os.path.exists(path):
+                os.unlink(path)
+
+
+def _decode_previous(options: dict) -> dict:
+    """Turn a "previous" report from the request into an AnalysisReport."""
+    previous = options.get("previous")
+    if previous is None:
+        return options
+    try:
+        return {**options, "previous": analyzer._report_from_dict(previous)}
+    except (KeyError, TypeError) as e:
+        raise ValueError(f"previous is not a --json report: {e}") from e
+
+
+def _error(request_id, code: int, message: str) -> dict:
+    return {"jsonrpc": "2.0", "id": request_id, "error": {"code": code, "message": message}}
+
+
+def serve(
+    socket_path: str | None = None,
+    cache: AnalysisCache | None = None,
+    jobs: int | None = None,
+) -> int:
+    """Run the server on stdio, or on a Unix socket when socket_path is given."""
+    if cache is not None and not cache.memory_entries:
+        cache.memory_entries = MEMORY_ENTRIES
+    server = AnalysisServer(cache, jobs)
+    server.warm_up()
+
+    if socket_path is None:
+        server.serve_stream(sys.stdin, sys.stdout)
+    elif not hasattr(socket, "AF_UNIX"):
+        print("Error: Unix sockets are not supported on this platform", file=sys.stderr)
+        return 1
+    else:
+        server.serve_unix(socket_path)
+    server.pool.shutdown()
+    return 0
@@ -0,0 +1,138 @@
+"""
+Source-level pattern matching for the script analyzers.
+
+The script analyzers complement bytecode analysis with regular expressions
+over the source (calls such as Math.random() or .equals(), and division
+operators in languages whose bytecode hides them). A SourceIndex reads a file
+once and records where its lines start, so a match offset becomes a line
+number by binary search instead of counting the newlines before it. A
+PatternSet searches a whole table of expressions in one pass over the source.
+"""
+
+import bisect
+import re
+from collections.abc import Iterable, Iterator
+from typing import Any
+
+
+class SourceIndex:
+    """A source file's text and the offsets at which its lines start."""
+
+    __slots__ = ("_line_starts", "text")
+
+    def __init__(self, text: str):
+        self.text = text
+        self._line_starts = [0]
+        find = text.find
+        offset = find("\n")
+        while offset >= 0:
+            self._line_starts.append(offset + 1)
+            offset = find("\n", offset + 1)
+
+    @classmethod
+    def read(cls, path: str) -> "SourceIndex | None":
+        """Index the file at path, or return None if it cannot be read."""
+        try:
+            with open(path) as f:
+                return cls(f.read())
+        except OSError:
+            return None
+
+    def line(self, offset: int) -> int:
+        """1-based line number of the character at offset."""
+        return bisect.bisect_right(self._line_starts, offset)
+
+    def line_text(self, offset: int) -> str:
+        """The line containing offset, without its newline."""
+        number = self.line(offset)
+        start = self._line_starts[number - 1]
+        end = self._line_starts[number] - 1 if number < len(self._line_starts) else len(self.text)
+        return self.text[start:end]
+
+
+# Escapes a pattern may start with that PatternSet factors out of its scanner
+_LEADING_ESCAPES = ("\\b", "\\.", "\\s")
+
+
+def _leading_escape(regex: str) -> str | None:
+    """
+    The escape in _LEADING_ESCAPES that regex starts with, if it can be
+    factored out: it must not be quantified, and regex must not be an
+    alternation at its top level, as "\\bA|B" is.
+    """
+    if regex[:2] not in _LEADING_ESCAPES or regex[2:3] in ("*", "+", "?", "{"):
+        return None
+    depth = 0
+    in_class = False
+    index = 0
+    while index < len(regex):
+        char = regex[index]
+        if char == "\\":
+            index += 1
+        elif in_class:
+            in_class = char != "]"
+        elif char == "[":
+            in_class = True
+        elif char == "(":
+            depth += 1
+        elif char == ")":
+            depth -= 1
+        elif char == "|" and depth == 0:
+            return None
+        index += 1
+    return regex[:2]
+
+
+class PatternSet:
+    """
+    Regular expressions searched together, each with a key identifying it.
+
+    The expressions are folded into one zero-width alternation, with those
+    starting with the same escape (\\b for calls, \\. for methods) sharing
+    it, so a single scan of the source finds each offset at which any of them
+    matches; only at those offsets are the individual expressions tried. The
+    matches are the ones a separate re.finditer per expression would give, in
+    the same order (by expression, then by offset): matches of different
+    expressions may overlap, matches of one expression never do.
+    """
+
+    def __init__(self, patterns: Iterable[tuple[str, int, Any]]):
+        """
+        patterns holds (regex, re flags, key) triples. Only IGNORECASE is
+        carried into the combined scan, and the expressions must not use
+        numbered backreferences, which combining them would renumber.
+        """
+        self._patterns = []
+        # (leading escape, ignore case) -> the rest of each expression
+        groups: dict[tuple[str, bool], list[str]] = {}
+        for regex, flags, key in patterns:
+            self._patterns.append((re.compile(regex, flags), key))
+            lead = _leading_escape(regex)
+            rest = regex[len(lead) :] if lead else regex
+            groups.setdefault((lead or "", bool(flags & re.IGNORECASE)), []).append(rest)
+
+        alternatives = []
+        for (lead, ignore_case), rests in groups.items():
+            alternative = f"{lead}(?:{'|'.join(rests)})"
+            alternatives.append(f"(?i:{alternative})" if ignore_case else f"(?:{alternative})")
+        self._scanner = re.compile(f"(?=(?:{'|'.join(alternatives)}))") if alternatives else None
+
+    def finditer(self, text: str) -> Iterator[tuple[Any, re.Match]]:
+        """Yield (key, match) for every match of every expression in text."""
+        if self._scanner is None:
+            return
+        found = [[] for _ in self._patterns]
+        # End of each expression's last match: finditer resumes from there
+        resume = [0] * len(self._patterns)
+        for candidate in self._scanner.finditer(text):
+            offset = candidate.start()
+            for position, (pattern, _key) in enumerate(self._patterns):
+                if offset < resume[position]:
+                    continue
+                match = pattern.match(text, offset)
+                if match:
+                    found[position].append(match)
+                    resume[position] = max(match.end(), offset + 1)
+        for (_pattern, key), matches in zip(self._patterns, found):
+            for match in matches:
+                yield key, match
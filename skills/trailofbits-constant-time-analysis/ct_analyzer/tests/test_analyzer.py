@@ -6,7 +6,10 @@ These tests verify that the analyzer correctly detects timing side-channel
 vulnerabilities in compiled cryptographic code.
 """
 
+import functools
 import os
+import re
+import shutil
 import subprocess
 import sys
 import unittest
@@ -17,14 +20,35 @@ sys.path.insert(0, str(Path(__file__).parent.parent))
 
 from analyzer import (
     DANGEROUS_INSTRUCTIONS,
+    AnalysisReport,
     AssemblyParser,
     OutputFormat,
     Severity,
+    Violation,
+    _archive_members,
+    _assembly_command,
+    _compile_command_arch,
+    _function_sections,
+    _objdump_lines,
+    analyze_archive,
     analyze_assembly,
+    analyze_binary,
+    analyze_compile_commands,
+    analyze_crate,
+    analyze_many,
     analyze_source,
+    demangle_symbols,
+    detect_binary_arch,
+    detect_binary_kind,
     detect_language,
+    find_cargo_manifest,
+    find_sources,
     format_report,
+    format_reports,
+    function_baseline,
     get_native_arch,
+    load_compile_commands,
+    load_reports,
     normalize_arch,
 )
 
@@ -217,6 +241,145 @@ class TestAssemblyParser(unittest.TestCase):
         error_violations = [v for v in violations if v.severity == Severity.ERROR]
         self.assertEqual(len(error_violations), 0, "Clean code should have no violations")
 
+    def test_parse_accepts_streams(self):
+        """Strings, file objects, bytes and mmaps should all parse identically."""
+        import io
+        import mmap
+        import tempfile
+
+        assembly = """
+unused_preamble:
+decompose:
+    movl %edi, %eax
+    cltd
+    idivl %esi
+    ret
+# crypto.c:42
+other:
+    divq %rcx
+    ret
+"""
+        parser = AssemblyParser("x86_64", "clang")
+        expected = parser.parse(assembly, include_warnings=True)
+
+        self.assertEqual(parser.parse(io.StringIO(assembly), include_warnings=True), expected)
+        self.assertEqual(parser.parse(assembly.encode(), include_warnings=True), expected)
+        self.assertEqual(parser.parse(iter(assembly.splitlines()), include_warnings=True), expected)
+
+        with tempfile.TemporaryFile() as f:
+            f.write(assembly.encode())
+            f.flush()
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                self.assertEqual(parser.parse(mm, include_warnings=True), expected)
+            f.seek(0)
+            self.assertEqual(parser.parse(f, include_warnings=True), expected)
+
+    def test_iter_parse_yields_per_function(self):
+        """iter_parse should yield each function with its own violations."""
+        assembly = """
+    idivl %esi
+decompose:
+    idivl %esi
+    ret
+other:
+    ret
+"""
+        parser = AssemblyParser("x86_64", "clang")
+        events = list(parser.iter_parse(assembly))
+
+        self.assertEqual([f and f["name"] for f, _ in events], [None, "decompose", "other"])
+        self.assertEqual([len(v) for _, v in events], [1, 1, 0])
+        self.assertEqual(events[0][1][0].function, "<unknown>")
+        self.assertEqual(events[1][0]["instructions"], 2)
+
+    def test_iter_parse_function_filter(self):
+        """Functions outside the filter should be skipped, not parsed and dropped."""
+        assembly = """
+    idivl %esi
+decompose:
+    idivl %esi
+    ret
+other:
+    divl %ecx
+    ret
+"""
+        parser = AssemblyParser("x86_64", "clang")
+        events = list(parser.iter_parse(assembly, function_filter="^other$", hash_functions=True))
+
+        self.assertEqual([f["name"] for f, _ in events], ["other"])
+        self.assertEqual(events[0][0]["instructions"], 2)
+        self.assertEqual([v.mnemonic for v in events[0][1]], ["DIVL"])
+        # The hash matches an unfiltered parse, so baselines stay comparable
+        unfiltered = {
+            f["name"]: f for f, _ in parser.iter_parse(assembly, hash_functions=True) if f
+        }
+        self.assertEqual(events[0][0]["hash"], unfiltered["other"]["hash"])
+
+    def test_hex_letter_mnemonics(self):
+        """Mnemonics spelled with hex letters should not be taken for raw bytes."""
+        assembly = """
+compare:
+    bcc .L1
+    add x0, x0, x1
+    adc x0, x0, x1
+.L1:
+    ret
+"""
+        parser = AssemblyParser("arm64", "clang")
+        functions, violations = parser.parse(assembly, include_warnings=True)
+        self.assertEqual(functions[0]["instructions"], 4)
+        self.assertEqual([v.mnemonic for v in violations], ["BCC"])
+
+        # go tool objdump: address and raw bytes come before the mnemonic
+        disassembly = """
+TEXT main.compare(SB) /src/main.go
+  main.go:3\t0x1000\t8b020020\tADD R2, R1, R0
+  main.go:4\t0x1004\t54000043\tBCC 4(PC)
+  main.go:5\t0x1008\td65f03c0\tRET
+"""
+        functions, violations = parser.parse(disassembly, include_warnings=True)
+        self.assertEqual(functions[-1]["instructions"], 3)
+        self.assertEqual([v.mnemonic for v in violations], ["BCC"])
+
+        # An even-length hex mnemonic after raw bytes is followed by operands;
+        # the instruction hashes as it would without its prefix
+        prefixed, _ = parser.parse("f:\n  f.c:10 0x1234 ad fadd d0, d0, d1\n", hash_functions=True)
+        plain, _ = parser.parse("f:\n  fadd d0, d0, d1\n", hash_functions=True)
+        self.assertEqual(prefixed[-1]["hash"], plain[-1]["hash"])
+        _, violations = parser.parse("f:\n  f.c:11 0x1238 ad fdiv d0, d0, d1\n")
+        self.assertEqual([v.mnemonic for v in violations], ["FDIV"])
+
+        parser = AssemblyParser("x86_64", "clang")
+        _, violations = parser.parse("f:\n    dec %ecx\n    divl %ecx\n", include_warnings=True)
+        self.assertEqual([v.mnemonic for v in violations], ["DIVL"])
+
+    def test_function_sections(self):
+        """Only the function sections of matching functions should be kept."""
+        assembly = """\t.text
+\t.section\t.text.keep,"ax",@progbits
+keep:
+\tret
+\t.section\t.text.unlikely.drop,"ax",@progbits
+drop.cold:
+\tud2
+\t.section\t.rodata
+table:
+\t.long 1
+\t.pushsection\t.text.drop,"ax",@progbits
+drop:
+\tidivl %esi
+\t.popsection
+\t.long 2
+"""
+        lines = list(_function_sections(assembly.splitlines(), re.compile("keep")))
+
+        self.assertIn("keep:", lines)
+        self.assertIn("table:", lines)
+        self.assertIn("\t.long 2", lines)
+        self.assertNotIn("drop:", lines)
+        self.assertNotIn("drop.cold:", lines)
+        self.assertNotIn("\tidivl %esi", lines)
+
 
 class TestReportFormatting(unittest.TestCase):
     """Test report output formatting."""
@@ -290,6 +453,33 @@ class TestReportFormatting(unittest.TestCase):
         self.assertIn("FAILED", output)
         self.assertIn("IDIVQ", output)
 
+    def test_violations_share_strings(self):
+        """Violations should be slotted and share their repeated strings."""
+        import json
+
+        from analyzer import _violation_from_dict, _violation_to_dict
+
+        violation = Violation("f", "a.c", 1, "", "jne .L2", "JNE", "branch", Severity.WARNING)
+        self.assertFalse(hasattr(violation, "__dict__"))
+        # Decoded JSON holds a separate copy of each string until interned
+        decoded = json.loads(json.dumps([_violation_to_dict(violation)] * 2))
+        copies = [_violation_from_dict(d) for d in decoded]
+        self.assertIs(copies[0].reason, copies[1].reason)
+        self.assertIs(copies[0].function, copies[1].function)
+
+    def test_severity_counts_follow_violations(self):
+        """Cached counts should be refreshed when the violations list changes."""
+        error = Violation("f", "a.c", 1, "", "idivq %rsi", "IDIVQ", "div", Severity.ERROR)
+        warning = Violation("f", "a.c", 2, "", "jne .L2", "JNE", "branch", Severity.WARNING)
+        report = AnalysisReport("x86_64", "gcc", "O2", "a.c", 1, 2, violations=[error])
+        self.assertEqual((report.error_count, report.warning_count), (1, 0))
+
+        report.violations.append(warning)
+        self.assertEqual((report.error_count, report.warning_count), (1, 1))
+        report.violations = [warning, warning]
+        self.assertEqual((report.error_count, report.warning_count), (0, 2))
+        self.assertTrue(report.passed)
+
 
 class TestIntegration(unittest.TestCase):
     """Integration tests that compile actual code.
@@ -451,6 +641,1393 @@ class TestCrossArchitecture(unittest.TestCase):
             raise
 
 
+class TestGoPackageScope(unittest.TestCase):
+    """Test Go disassembly scoping.
+
+    The analysis tests require the Go toolchain and are skipped without it.
+    """
+
+    @classmethod
+    def setUpClass(cls):
+        cls.go_file = Path(__file__).parent / "test_samples" / "decompose_vulnerable.go"
+        try:
+            subprocess.run(["go", "version"], capture_output=True, check=True)
+            cls.has_go = True
+        except (subprocess.CalledProcessError, FileNotFoundError):
+            cls.has_go = False
+
+    def test_symbol_filter(self):
+        """The objdump filter should cover the local package and requested dependencies."""
+        from analyzer import GoCompiler
+
+        pattern = re.compile(GoCompiler(packages=["crypto/subtle"]).symbol_filter())
+        self.assertTrue(pattern.search("main.DecomposeVulnerable"))
+        self.assertTrue(pattern.search("command-line-arguments.Div"))
+        self.assertTrue(pattern.search("crypto/subtle.XORBytes"))
+        self.assertFalse(pattern.search("runtime.mallocgc"))
+        self.assertFalse(pattern.search("crypto/subtlety.X"))
+        self.assertIsNone(GoCompiler(scope="binary").symbol_filter())
+
+        with self.assertRaises(ValueError):
+            GoCompiler(scope="module")
+
+    def test_package_scope_excludes_runtime(self):
+        """Package scope should only report the analyzed package's functions."""
+        if not self.has_go:
+            self.skipTest("Go not available")
+
+        from analyzer import GoCompiler
+
+        scoped = analyze_source(str(self.go_file), optimization="O0")
+        whole = analyze_source(
+            str(self.go_file), optimization="O0", compiler=GoCompiler(scope="binary")
+        )
+
+        self.assertGreater(scoped.error_count, 0)
+        self.assertTrue(all(v.function.startswith("main.") for v in scoped.violations))
+        self.assertGreater(whole.total_functions, 10 * scoped.total_functions)
+        self.assertTrue(any(v.function.startswith("runtime.") for v in whole.violations))
+
+
+class TestArchitectureMatrix(unittest.TestCase):
+    """Test multi-architecture matrix analysis."""
+
+    @staticmethod
+    def _report(arch, violations):
+        from analyzer import AnalysisReport, Violation
+
+        return AnalysisReport(
+            architecture=arch,
+            compiler="clang",
+            optimization="O2",
+            source_file="test.c",
+            total_functions=2,
+            total_instructions=20,
+            violations=[
+                Violation(
+                    function=function,
+                    file="test.c",
+                    line=None,
+                    address="",
+                    instruction=mnemonic.lower(),
+                    mnemonic=mnemonic,
+                    reason="variable time",
+                    severity=Severity.ERROR,
+                )
+                for function, mnemonic in violations
+            ],
+        )
+
+    def test_violation_matrix_and_formatting(self):
+        """Rows should record which architectures each violation appears on."""
+        import json
+
+        from analyzer import MatrixReport, format_matrix
+
+        matrix = MatrixReport(
+            source_file="test.c",
+            dimension="architecture",
+            variants=["x86_64", "arm64", "riscv64"],
+            reports={
+                "x86_64": self._report("x86_64", [("reduce", "IDIVL"), ("reduce", "IDIVL")]),
+                "arm64": self._report("arm64", [("reduce", "SDIV")]),
+            },
+            errors={"riscv64": "Compilation failed: unknown target"},
+        )
+
+        rows = matrix.violation_matrix()
+        self.assertEqual(
+            [(r["function"], r["mnemonic"], r["variants"]) for r in rows],
+            [("reduce", "IDIVL", {"x86_64": 2}), ("reduce", "SDIV", {"arm64": 1})],
+        )
+        self.assertFalse(matrix.passed)
+
+        parsed = json.loads(format_matrix(matrix, OutputFormat.JSON))
+        self.assertEqual(parsed["matrix"][1]["variants"], {"arm64": 1})
+        self.assertEqual(parsed["errors"], {"riscv64": "Compilation failed: unknown target"})
+
+        text = format_matrix(matrix, OutputFormat.TEXT)
+        self.assertIn("riscv64: ERROR Compilation failed", text)
+        self.assertIn("reduce SDIV", text)
+
+    def test_go_matrix(self):
+        """Go cross-compiles natively, so each target should get its own report."""
+        try:
+            subprocess.run(["go", "version"], capture_output=True, check=True)
+        except (subprocess.CalledProcessError, FileNotFoundError):
+            self.skipTest("Go not available")
+
+        from analyzer import analyze_matrix
+
+        go_file = Path(__file__).parent / "test_samples" / "decompose_vulnerable.go"
+        matrix = analyze_matrix(str(go_file), ["amd64", "ppc64le"], optimization="O0", jobs=2)
+
+        self.assertEqual(matrix.variants, ["x86_64", "ppc64le"])
+        self.assertEqual(matrix.errors, {})
+        self.assertEqual(matrix.reports["ppc64le"].architecture, "ppc64le")
+        mnemonics = {(r["mnemonic"], tuple(r["variants"])) for r in matrix.violation_matrix()}
+        self.assertIn(("IDIVL", ("x86_64",)), mnemonics)
+        self.assertIn(("DIVW", ("ppc64le",)), mnemonics)
+
+    def test_gcc_cross_compilers(self):
+        """gcc should build foreign architectures with the cross gcc named after the triple."""
+        from unittest import mock
+
+        from analyzer import GCCCompiler
+
+        with mock.patch("analyzer.get_native_arch", return_value="x86_64"):
+            self.assertEqual(GCCCompiler().binary("x86_64"), "gcc")
+            self.assertEqual(GCCCompiler().binary("i386"), "gcc")
+            self.assertEqual(GCCCompiler().binary("arm64"), "aarch64-linux-gnu-gcc")
+            self.assertEqual(
+                GCCCompiler("/usr/bin/gcc-12").binary("riscv64"),
+                "/usr/bin/riscv64-linux-gnu-gcc-12",
+            )
+            cross = "/opt/cross/bin/s390x-linux-gnu-gcc"
+            self.assertEqual(GCCCompiler(cross).binary("s390x"), cross)
+
+    def test_missing_cross_compiler_is_unavailable(self):
+        """An architecture without a cross gcc should be skipped, not failed."""
+        import tempfile
+
+        from analyzer import GCCCompiler, analyze_matrix, format_matrix, get_native_arch
+
+        if not shutil.which("gcc"):
+            self.skipTest("gcc not available")
+        native = get_native_arch()
+        foreign = "riscv64" if native != "riscv64" else "arm64"
+        source = Path(__file__).parent / "test_samples" / "decompose_vulnerable.c"
+        with tempfile.TemporaryDirectory() as tmpdir:
+            # A gcc with no cross compilers next to it
+            gcc = Path(tmpdir) / "gcc"
+            gcc.write_text(f'#!/bin/sh\nexec {shutil.which("gcc")} "$@"\n')
+            gcc.chmod(0o755)
+            matrix = analyze_matrix(str(source), [native, foreign], GCCCompiler(str(gcc)), jobs=1)
+
+        self.assertEqual(matrix.variants, [native, foreign])
+        self.assertEqual(list(matrix.reports), [native])
+        self.assertEqual(matrix.errors, {})
+        self.assertIn(GCCCompiler.CROSS_PREFIXES[foreign], matrix.unavailable[foreign])
+        self.assertIn(f"{foreign}: SKIPPED", format_matrix(matrix, OutputFormat.TEXT))
+
+    def test_bytecode_language_rejected(self):
+        """Bytecode languages are architecture-independent."""
+        from analyzer import analyze_matrix
+
+        sample = Path(__file__).parent / "test_samples" / "vulnerable.py"
+        with self.assertRaises(RuntimeError):
+            analyze_matrix(str(sample), ["x86_64", "arm64"])
+
+
+class TestOptimizationSweep(unittest.TestCase):
+    """Test optimization-level sweeps and their differential report."""
+
+    def test_diff_against_baseline(self):
+        """The diff should list the levels that introduce or remove each violation."""
+        from analyzer import MatrixReport, format_matrix
+
+        report = TestArchitectureMatrix._report
+        matrix = MatrixReport(
+            source_file="test.c",
+            dimension="optimization",
+            variants=["O0", "O2", "O3", "Os"],
+            reports={
+                "O0": report("x86_64", [("reduce", "IDIVL"), ("sign", "IDIVL")]),
+                "O2": report("x86_64", [("reduce", "IDIVL")]),
+                "O3": report("x86_64", [("sign", "DIVQ")]),
+            },
+            errors={"Os": "Compilation failed"},
+            baseline="O2",
+        )
+
+        diff = {(r["function"], r["mnemonic"]): r for r in matrix.diff()}
+        self.assertEqual(diff[("reduce", "IDIVL")]["removed"], ["O3"])
+        self.assertEqual(diff[("sign", "IDIVL")]["introduced"], ["O0"])
+        self.assertEqual(diff[("sign", "DIVQ")]["introduced"], ["O3"])
+        self.assertEqual(len(diff), 3)
+
+        text = format_matrix(matrix, OutputFormat.TEXT)
+        self.assertIn("+ sign DIVQ: introduced at O3", text)
+        self.assertIn("- reduce IDIVL: removed at O3", text)
+
+    def test_diff_reports_count_changes(self):
+        """A violation present on both sides but at a different count should show its delta."""
+        from analyzer import MatrixReport, format_matrix
+
+        report = TestArchitectureMatrix._report
+        matrix = MatrixReport(
+            source_file="test.c",
+            dimension="optimization",
+            variants=["O0", "O2", "O3"],
+            reports={
+                "O0": report("x86_64", [("reduce", "IDIVL")] * 7),
+                "O2": report("x86_64", [("reduce", "IDIVL")] * 5),
+                "O3": report("x86_64", [("reduce", "IDIVL")] * 5),
+            },
+            baseline="O2",
+        )
+
+        [row] = matrix.diff()
+        self.assertEqual(row["baseline"], 5)
+        self.assertEqual(row["counts"], {"O0": 7, "O3": 5})
+        self.assertEqual(row["deltas"], {"O0": 2})
+        self.assertEqual((row["introduced"], row["removed"]), ([], []))
+
+        text = format_matrix(matrix, OutputFormat.TEXT)
+        self.assertIn("~ reduce IDIVL: 5 at O2, O0 7 (+2)", text)
+        self.assertNotIn("(none)", text)
+
+    def test_gcc_sweep(self):
+        """A sweep should produce one report per level, diffed against the baseline."""
+        if not TestIntegration._check_compiler("gcc"):
+            self.skipTest("gcc not available")
+
+        from analyzer import analyze_sweep
+
+        source = Path(__file__).parent / "test_samples" / "decompose_vulnerable.c"
+        matrix = analyze_sweep(str(source), ["O0", "O2", "Os"], compiler="gcc", jobs=2)
+
+        self.assertEqual(matrix.baseline, "O2")
+        self.assertEqual(sorted(matrix.reports), ["O0", "O2", "Os"])
+        self.assertEqual(matrix.reports["Os"].optimization, "Os")
+        self.assertFalse(matrix.passed)
+
+
+class TestToolchainRegistry(unittest.TestCase):
+    """Test toolchain discovery, persistence and invalidation."""
+
+    def setUp(self):
+        import tempfile
+
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.root = Path(self.tmpdir.name)
+        self.registry_file = str(self.root / "toolchains.json")
+        self.tool = self.root / "fakecc"
+        self._write_tool("fakecc 1.0")
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def _write_tool(self, banner, mtime=None):
+        self.tool.write_text(f"#!/bin/sh\necho '{banner}'\n")
+        self.tool.chmod(0o755)
+        if mtime is not None:
+            os.utime(self.tool, (mtime, mtime))
+
+    def test_probe_and_persist(self):
+        """Probe results should be persisted and reused without spawning the tool."""
+        import toolchains
+
+        registry = toolchains.ToolchainRegistry(self.registry_file)
+        self.assertTrue(registry.is_available(str(self.tool)))
+        self.assertIn("fakecc 1.0", registry.version(str(self.tool)))
+        self.assertFalse(registry.is_available(str(self.root / "missing-tool")))
+
+        original_probe = toolchains._probe
+        toolchains._probe = lambda *args: self.fail("persisted entry was probed again")
+        try:
+            reloaded = toolchains.ToolchainRegistry(self.registry_file)
+            self.assertIn("fakecc 1.0", reloaded.version(str(self.tool)))
+            self.assertFalse(reloaded.is_available(str(self.root / "missing-tool")))
+        finally:
+            toolchains._probe = original_probe
+
+    def test_mtime_invalidation(self):
+        """Replacing the binary should trigger a new probe."""
+        import toolchains
+
+        registry = toolchains.ToolchainRegistry(self.registry_file)
+        os.utime(self.tool, (1_000_000, 1_000_000))
+        self.assertIn("fakecc 1.0", registry.version(str(self.tool)))
+
+        self._write_tool("fakecc 2.0", mtime=2_000_000)
+        self.assertIn("fakecc 2.0", registry.version(str(self.tool)))
+
+    def test_discover_in_parallel(self):
+        """discover() should probe every requested command."""
+        import toolchains
+
+        registry = toolchains.ToolchainRegistry(self.registry_file)
+        found = registry.discover({str(self.tool): ["--version"], sys.executable: ["--version"]})
+
+        self.assertTrue(found[str(self.tool)].available)
+        self.assertIn("Python", found[sys.executable].version)
+
+    def test_target_probe_cached(self):
+        """Cross-target checks should run once per compiler binary."""
+        import toolchains
+
+        registry = toolchains.ToolchainRegistry(self.registry_file)
+        calls = []
+
+        def probe():
+            calls.append(1)
+            return True
+
+        self.assertTrue(registry.target_works(str(self.tool), "arm64", probe))
+        self.assertTrue(registry.target_works(str(self.tool), "arm64", probe))
+        self.assertEqual(len(calls), 1)
+        self.assertFalse(registry.target_works(str(self.root / "missing"), "arm64", probe))
+
+    def test_failed_target_not_persisted(self):
+        """A failed cross-target check should be retried by the next process."""
+        import toolchains
+
+        registry = toolchains.ToolchainRegistry(self.registry_file)
+        self.assertFalse(registry.target_works(str(self.tool), "riscv64", lambda: False))
+        self.assertFalse(registry.target_works(str(self.tool), "riscv64", self.fail))
+
+        reloaded = toolchains.ToolchainRegistry(self.registry_file)
+        self.assertTrue(reloaded.target_works(str(self.tool), "riscv64", lambda: True))
+
+    def test_shim_follows_selected_toolchain(self):
+        """A version-manager shim should be keyed on the binary it currently selects."""
+        import toolchains
+
+        for version in ("1.0", "2.0"):
+            tool = self.root / "versions" / version / "fakecc"
+            tool.parent.mkdir(parents=True)
+            tool.write_text(f"#!/bin/sh\necho 'fakecc {version}'\n")
+            tool.chmod(0o755)
+            os.utime(tool, (1_000_000, 1_000_000))
+        manager = self.root / "fakeenv"
+        manager.write_text(
+            f'#!/bin/sh\ntarget="{self.root}/versions/$(cat "$0.version")/$2"\n'
+            'if [ "$1" = which ]; then echo "$target"; exit; fi\n'
+            'shift 2\nexec "$target" "$@"\n'
+        )
+        manager.chmod(0o755)
+        shim = self.root / "shims" / "fakecc"
+        shim.parent.mkdir()
+        shim.write_text(f'#!/bin/sh\nexec "{manager}" exec "fakecc" "$@"\n')
+        shim.chmod(0o755)
+
+        toolchains._shim_targets.clear()
+        Path(f"{manager}.version").write_text("1.0")
+        registry = toolchains.ToolchainRegistry(self.registry_file)
+        self.assertIn("versions/1.0/fakecc\nfakecc 1.0", registry.version(str(shim)))
+
+        # The shim itself is untouched; only the manager's selection changes
+        toolchains._shim_targets.clear()
+        Path(f"{manager}.version").write_text("2.0")
+        reloaded = toolchains.ToolchainRegistry(self.registry_file)
+        self.assertIn("versions/2.0/fakecc\nfakecc 2.0", reloaded.version(str(shim)))
+
+    def test_shared_instances(self):
+        """get_compiler and get_script_analyzer should hand out warm, shared instances."""
+        from analyzer import get_compiler
+        from script_analyzers import get_script_analyzer
+
+        self.assertIs(get_compiler("gcc", "c"), get_compiler("gcc", "c"))
+        self.assertIs(get_compiler(None, "go"), get_compiler("go", "go"))
+        self.assertIs(get_script_analyzer("python"), get_script_analyzer("python"))
+        self.assertIs(get_script_analyzer("javascript"), get_script_analyzer("typescript"))
+
+
+class TestIncrementalAnalysis(unittest.TestCase):
+    """Test function hashing and --since carry-forward."""
+
+    OLD = """
+.type keep, @function
+keep:
+    # crypto.c:10
+    pushq %rbp
+    idivl %ecx
+    jmp .L3
+.type edit, @function
+edit:
+    # crypto.c:20
+    addl $1, %eax
+"""
+
+    # keep moved down five lines and its local label was renumbered;
+    # edit gained a division
+    NEW = """
+.type keep, @function
+keep:
+    # crypto.c:15
+    pushq %rbp
+    idivl %ecx
+    jmp .L7
+.type edit, @function
+edit:
+    # crypto.c:25
+    addl $1, %eax
+    divq %rbx
+"""
+
+    def setUp(self):
+        import tempfile
+
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.root = Path(self.tmpdir.name)
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def _write(self, name, text):
+        path = self.root / name
+        path.write_text(text)
+        return str(path)
+
+    def test_hashes_are_opt_in(self):
+        """Functions should only be hashed when asked to, or when there is a baseline."""
+        parser = AssemblyParser("x86_64", "unknown")
+        functions, _ = parser.parse(self.OLD)
+        self.assertEqual([f["name"] for f in functions], ["keep", "keep", "edit", "edit"])
+        self.assertFalse(any("hash" in f for f in functions))
+
+        old = analyze_assembly(self._write("old.s", self.OLD), "x86_64")
+        self.assertEqual(function_baseline(old, False), {})
+        self.assertFalse(any("hash" in f for f in old.functions))
+
+        hashed = analyze_assembly(self._write("old.s", self.OLD), "x86_64", hash_functions=True)
+        functions, _ = parser.parse(self.NEW, False, function_baseline(hashed, False))
+        self.assertTrue(all("hash" in f for f in functions))
+
+    def test_hash_ignores_position(self):
+        """Addresses, raw bytes and local label numbers should not affect the hash."""
+        parser = AssemblyParser("x86_64", "go")
+
+        def parse(text):
+            return parser.parse(text, hash_functions=True)
+
+        first, _ = parse("TEXT main.f(SB) a.go\n  a.go:3  0x1000  e8  CALL 0x2000\n")
+        second, _ = parse("TEXT main.f(SB) a.go\n  a.go:9  0x4000  e9  CALL 0x8000\n")
+        self.assertEqual(first[-1]["hash"], second[-1]["hash"])
+
+        first, _ = parse("f:\n  jmp .L3\n")
+        second, _ = parse("f:\n  jmp .L12\n")
+        changed, _ = parse("f:\n  jne .L12\n")
+        self.assertEqual(first[-1]["hash"], second[-1]["hash"])
+        self.assertNotEqual(first[-1]["hash"], changed[-1]["hash"])
+
+    def test_unchanged_functions_are_carried_forward(self):
+        """Unchanged functions keep their earlier violations, shifted to their new lines."""
+        old = analyze_assembly(self._write("old.s", self.OLD), "x86_64", hash_functions=True)
+        self.assertEqual([(v.function, v.line) for v in old.violations], [("keep", 10)])
+
+        parser = AssemblyParser("x86_64", "unknown")
+        classified = []
+        original = parser._violation
+
+        def spy(entry, function, *args):
+            classified.append(function)
+            return original(entry, function, *args)
+
+        parser._violation = spy
+        functions, violations = parser.parse(self.NEW, False, function_baseline(old, False))
+
+        # Only the changed function went through the classifier
+        self.assertEqual(classified, ["edit"])
+        self.assertEqual(
+            [(v.function, v.mnemonic, v.line) for v in violations],
+            [("keep", "IDIVL", 15), ("edit", "DIVQ", 25)],
+        )
+
+    def test_baseline_requires_matching_warnings(self):
+        """A report without warnings cannot stand in for a run that wants them."""
+        old = analyze_assembly(self._write("old.s", self.OLD), "x86_64", hash_functions=True)
+        self.assertEqual(function_baseline(old, True), {})
+        self.assertIn("keep", function_baseline(old, False))
+
+    def test_since_round_trip(self):
+        """A JSON report should load back and mark functions by change status."""
+        import json
+
+        old = analyze_assembly(self._write("old.s", self.OLD), "x86_64", hash_functions=True)
+        self.assertNotIn("functions", json.loads(format_report(old, OutputFormat.JSON)))
+        report_file = self._write("old.json", format_report(old, OutputFormat.JSON, True))
+        loaded = load_reports(report_file)[old.source_file]
+        self.assertEqual(loaded.functions, old.functions)
+        self.assertEqual(loaded.violations, old.violations)
+
+        new = analyze_assembly(self._write("new.s", self.NEW), "x86_64", previous=loaded)
+        statuses = {f["name"]: f["status"] for f in new.functions if f["instructions"]}
+        self.assertEqual(statuses, {"keep": "unchanged", "edit": "changed"})
+        self.assertEqual(new.error_count, 2)
+        self.assertIn("1 changed, 0 new", format_report(new, OutputFormat.TEXT))
+
+    def test_cli_since_with_default_cache(self):
+        """--since should skip unchanged functions with the cache on, as the CLI runs by default."""
+        import contextlib
+        import io
+        import json
+        import shutil
+
+        from analyzer import get_parser, main
+
+        if not shutil.which("gcc"):
+            self.skipTest("gcc is required")
+
+        source = self._write("crypto.c", "int keep(int a, int b) { return a / b; }\n")
+        baseline = self.root / "old.json"
+        cache_dir = str(self.root / "cache")
+
+        def run(*args):
+            stdout = io.StringIO()
+            with contextlib.redirect_stdout(stdout):
+                main(["--json", "--compiler", "gcc", "--cache-dir", cache_dir, *args, source])
+            return json.loads(stdout.getvalue())
+
+        plain = run()
+        self.assertNotIn("functions", plain)
+        baseline.write_text(json.dumps(run("--function-hashes")))
+
+        with open(source, "a") as f:
+            f.write("int edit(int a, int b) { return a % b; }\n")
+        parser = get_parser(normalize_arch(get_native_arch()), "gcc")
+        classified = []
+        original = parser._violation
+
+        def spy(entry, function, *args):
+            classified.append(function)
+            return original(entry, function, *args)
+
+        parser._violation = spy
+        try:
+            report = run("--function-hashes", "--since", str(baseline))
+        finally:
+            del parser._violation
+
+        statuses = {f["name"]: f["status"] for f in report["functions"] if f["instructions"]}
+        self.assertEqual(statuses, {"keep": "unchanged", "edit": "new"})
+        self.assertEqual(set(classified), {"edit"})
+        self.assertEqual({v["function"] for v in report["violations"]}, {"keep", "edit"})
+
+    def test_load_reports_rejects_other_json(self):
+        with self.assertRaises(ValueError):
+            load_reports(self._write("error.json", '{"error": "Compiler not available"}'))
+
+
+class TestBinaryInput(unittest.TestCase):
+    """Test disassembly of ELF objects, shared libraries and archives."""
+
+    LLVM_OBJDUMP = """
+bin.o:\tfile format elf64-x86-64
+
+Disassembly of section .text:
+
+0000000000000000 <divide>:
+; divide():
+; /src/bin.c:1
+       0:      \tmovl\t%edi, %eax
+       3:      \tidivl\t%esi
+       5:      \tjne\t0x10 <divide.cold+0x4>
+       6:      \tretq
+
+0000000000000010 <divide.cold>:
+      10:      \tretq
+"""
+
+    GNU_OBJDUMP = """
+0000000000401000 <f>:
+f():
+/src/f.c:7 (discriminator 2)
+  401000:\tdivq   %rbx
+  401003:\tmov    0x2fd5(%rip),%rax        # 3fe0 <__gmon_start__>
+\t...
+"""
+
+    def setUp(self):
+        import tempfile
+
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.root = Path(self.tmpdir.name)
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def test_objdump_output_translation(self):
+        """objdump output should parse into functions, source lines and addresses."""
+        parser = AssemblyParser("x86_64", "objdump")
+        functions, violations = parser.parse(_objdump_lines(self.LLVM_OBJDUMP.splitlines()))
+        self.assertEqual([f["name"] for f in functions], ["divide", "divide.cold"])
+        self.assertEqual([f["instructions"] for f in functions], [4, 1])
+        v = violations[0]
+        self.assertEqual((v.function, v.file, v.line, v.address), ("divide", "/src/bin.c", 1, "0x3"))
+
+        lines = list(_objdump_lines(self.GNU_OBJDUMP.splitlines()))
+        self.assertEqual(
+            lines,
+            [
+                "0000000000401000 <f>:",
+                "# /src/f.c:7",
+                "0x401000 divq   %rbx",
+                "0x401003 mov    0x2fd5(%rip),%rax",
+            ],
+        )
+
+    def test_archive_members(self):
+        """GNU archives with symbol and long name tables should split into their members."""
+
+        def member(name, data):
+            header = f"{name:<16}{0:<12}{0:<6}{0:<6}{644:<8}{len(data):<10}`\n".encode()
+            return header + data + (b"\n" if len(data) % 2 else b"")
+
+        long_names = b"a_rather_long_member_name.o/\n"
+        archive = self.root / "lib.a"
+        archive.write_bytes(
+            b"!<arch>\n"
+            + member("/", b"\0\0\0\0")
+            + member("//", long_names)
+            + member("short.o/", b"first")
+            + member("/0", b"second")
+        )
+        self.assertEqual(
+            list(_archive_members(str(archive))),
+            [("short.o", b"first"), ("a_rather_long_member_name.o", b"second")],
+        )
+
+    def test_detect_binary(self):
+        header = bytearray(64)
+        header[:4] = b"\x7fELF"
+        header[5] = 1  # little-endian
+        header[18:20] = (183).to_bytes(2, "little")
+        elf = self.root / "x.o"
+        elf.write_bytes(bytes(header))
+        self.assertEqual(detect_binary_kind(str(elf)), "elf")
+        self.assertEqual(detect_binary_arch(str(elf)), "arm64")
+
+        archive = self.root / "x.a"
+        archive.write_bytes(b"!<arch>\n")
+        self.assertEqual(detect_binary_kind(str(archive)), "archive")
+        self.assertIsNone(detect_binary_kind(__file__))
+
+    def _build(self, name, source):
+        """Compile a C snippet to an object file with debug info, or skip."""
+        import shutil
+
+        if not shutil.which("gcc") or not (shutil.which("objdump") or shutil.which("llvm-objdump")):
+            self.skipTest("gcc and objdump are required")
+        source_file = self.root / f"{name}.c"
+        source_file.write_text(source)
+        object_file = self.root / f"{name}.o"
+        subprocess.run(
+            ["gcc", "-O2", "-g", "-c", str(source_file), "-o", str(object_file)], check=True
+        )
+        return object_file
+
+    def test_object_file(self):
+        """An object file should be analyzed with source lines from its debug info."""
+        object_file = self._build("div", "int f(int a, int b) {\n  return a / b;\n}\n")
+        report = analyze_binary(str(object_file))
+        self.assertEqual(report.architecture, get_native_arch())
+        self.assertFalse(report.passed)
+        self.assertEqual(report.violations[0].function, "f")
+        self.assertTrue(report.violations[0].file.endswith("div.c"))
+        self.assertIn(report.violations[0].line, (1, 2))
+
+    def test_archive(self):
+        """Each archive member should get its own report."""
+        import shutil
+
+        first = self._build("first", "int f(int a, int b) { return a / b; }\n")
+        second = self._build("second", "int g(int a) { return a + 1; }\n")
+        if not shutil.which("ar"):
+            self.skipTest("ar is required")
+        archive = self.root / "libx.a"
+        subprocess.run(["ar", "rcs", str(archive), str(first), str(second)], check=True)
+
+        reports, errors = analyze_archive(str(archive), jobs=2)
+        self.assertEqual(errors, {})
+        self.assertEqual(
+            [(r.source_file, r.passed) for r in reports],
+            [(f"{archive}(first.o)", False), (f"{archive}(second.o)", True)],
+        )
+
+    def test_function_filter(self):
+        """A filter should limit disassembly to the matching symbols."""
+        object_file = self._build(
+            "two",
+            "int f(int a, int b) { return a / b; }\nint g(int a, int b) { return a % b; }\n",
+        )
+        report = analyze_binary(str(object_file), function_filter="^g$")
+        self.assertEqual([f["name"] for f in report.functions], ["g"])
+        self.assertEqual({v.function for v in report.violations}, {"g"})
+
+        report = analyze_binary(str(object_file), function_filter="^missing$")
+        self.assertEqual(report.functions, [])
+        self.assertTrue(report.passed)
+
+
+class TestCompileCommands(unittest.TestCase):
+    """Test compilation database ingestion."""
+
+    def setUp(self):
+        import tempfile
+
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.root = Path(self.tmpdir.name)
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def _database(self, entries):
+        import json
+
+        for entry in entries:
+            entry.setdefault("directory", str(self.root))
+        (self.root / "compile_commands.json").write_text(json.dumps(entries))
+        return str(self.root)
+
+    def test_assembly_command(self):
+        """Output and dependency flags should be replaced; everything else kept."""
+        arguments = "cc -Iinc -DX=1 -O3 -MD -MF a.d -MTa.o -c a.c -o build/a.o".split()
+        self.assertEqual(
+            _assembly_command(arguments, "a.c", "/tmp/a.s"),
+            ["cc", "-Iinc", "-DX=1", "-O3", "a.c", "-S", "-fno-lto", "-o", "/tmp/a.s"],
+        )
+        arguments = ["cc", "-O2", "-MMD", "-MFbuild/a.d", "-c", "a.c", "-obuild/a.o"]
+        self.assertEqual(
+            _assembly_command(arguments, "a.c", "/tmp/a.s"),
+            ["cc", "-O2", "a.c", "-S", "-fno-lto", "-o", "/tmp/a.s"],
+        )
+        self.assertEqual(
+            _assembly_command(["cc", "-c", "x.S"], "x.S", "/tmp/x.s"),
+            ["cc", "x.S", "-E", "-o", "/tmp/x.s"],
+        )
+
+    def test_compile_command_arch(self):
+        self.assertEqual(_compile_command_arch(["clang", "--target=aarch64-linux-gnu"]), "arm64")
+        self.assertEqual(_compile_command_arch(["clang", "-target", "i686-pc-linux"]), "i386")
+        self.assertEqual(_compile_command_arch(["riscv64-linux-gnu-gcc", "-c"]), "riscv64")
+        self.assertEqual(_compile_command_arch(["gcc", "-m32"]), "i386")
+        self.assertIsNone(_compile_command_arch(["gcc", "-O2"]))
+        self.assertIsNone(_compile_command_arch(["my-cc-wrapper", "-O2"]))
+        with self.assertRaises(ValueError):
+            _compile_command_arch(["clang", "--target=mips-linux-gnu"])
+
+    def test_load_deduplicates_commands(self):
+        database = self._database(
+            [
+                {"file": "a.c", "command": "cc -O2 -c 'a.c'"},
+                {"file": "a.c", "arguments": ["cc", "-O2", "-c", "a.c"]},
+                {"file": "a.c", "arguments": ["cc", "-O3", "-c", "a.c"]},
+            ]
+        )
+        commands = load_compile_commands(database)
+        self.assertEqual([c.arguments[1] for c in commands], ["-O2", "-O3"])
+        self.assertEqual(commands[0].source_path, str(self.root / "a.c"))
+
+    def test_invalid_database(self):
+        (self.root / "compile_commands.json").write_text('{"not": "a list"}')
+        with self.assertRaises(RuntimeError):
+            load_compile_commands(str(self.root))
+
+    def test_analyze_database(self):
+        """Entries should be compiled with their own flags and identical output parsed once."""
+        import shutil
+
+        if not shutil.which("gcc"):
+            self.skipTest("gcc is required")
+        (self.root / "inc").mkdir()
+        (self.root / "inc" / "cfg.h").write_text("#define DIVIDE 1\n")
+        (self.root / "a.c").write_text(
+            '#include "cfg.h"\n'
+            "#if DIVIDE && defined(SLOW)\n"
+            "int f(int a, int b) { return a / b; }\n"
+            "#else\n"
+            "int f(int a, int b) { return a + b; }\n"
+            "#endif\n"
+        )
+        (self.root / "bad.c").write_text("int broken(\n")
+        database = self._database(
+            [
+                {"file": "a.c", "command": "gcc -Iinc -O2 -DSLOW -c a.c -o a.o"},
+                {"file": "a.c", "command": "gcc -Iinc -O2 -DSLOW -c a.c -o pic/a.o -MD"},
+                {"file": "a.c", "command": "gcc -Iinc -O2 -c a.c -o fast/a.o"},
+                {"file": "bad.c", "command": "gcc -c bad.c"},
+            ]
+        )
+
+        reports, errors = analyze_compile_commands(database, jobs=2)
+        source = str(self.root / "a.c")
+        self.assertEqual(
+            [(r.source_file, r.optimization, r.passed) for r in reports],
+            [(source, "O2", False), (f"{source} (2)", "O2", True)],
+        )
+        self.assertEqual(list(errors), [str(self.root / "bad.c")])
+        self.assertFalse((self.root / "a.d").exists())
+
+    def _identical_entries(self):
+        for name in ("x.s", "y.s"):
+            (self.root / name).write_text("f:\n    idivl %ecx\n    ret\n")
+        database = self._database(
+            [{"file": name, "command": f"cc -c {name}"} for name in ("x.s", "y.s")]
+        )
+        return database, str(self.root / "x.s"), str(self.root / "y.s")
+
+    def test_identical_entry_failure(self):
+        """An entry sharing a failed entry's assembly should fail with it."""
+        from unittest import mock
+
+        database, x, y = self._identical_entries()
+        results = []
+        with mock.patch("analyzer.analyze_assembly", side_effect=ValueError("unparsable")):
+            reports, errors = analyze_compile_commands(
+                database, "x86_64", jobs=1, on_result=lambda *result: results.append(result)
+            )
+        self.assertEqual(reports, [])
+        self.assertEqual(errors, {x: "unparsable", y: "unparsable"})
+        self.assertEqual(results, [(x, None, "unparsable"), (y, None, "unparsable")])
+
+    def test_identical_entry_previous(self):
+        """An entry sharing another's assembly should be compared with its own earlier report."""
+        database, x, y = self._identical_entries()
+        earlier = AnalysisReport("x86_64", "cc", "O0", y, 1, 2, functions=[{"name": "f"}])
+        reports, errors = analyze_compile_commands(database, "x86_64", previous={y: earlier})
+        self.assertEqual(errors, {})
+        self.assertEqual([r.source_file for r in reports], [x, y])
+        self.assertNotIn("status", reports[0].functions[0])
+        self.assertEqual(reports[1].functions[0]["status"], "changed")
+        self.assertIn("hash", reports[1].functions[0])
+
+
+class TestCargoCrate(unittest.TestCase):
+    """Test crate-level Rust analysis and symbol demangling."""
+
+    def setUp(self):
+        import tempfile
+
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.root = Path(self.tmpdir.name)
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def test_demangle_symbols(self):
+        import shutil
+
+        if not (shutil.which("rustfilt") or shutil.which("c++filt")):
+            self.skipTest("No demangler available")
+        names = demangle_symbols(["_ZN6crate15arith3div17hdc10039e12ea5c1dE", "main"])
+        self.assertEqual(names["_ZN6crate15arith3div17hdc10039e12ea5c1dE"], "crate1::arith::div")
+        self.assertEqual(names["main"], "main")
+
+    def test_baseline_keyed_by_symbol(self):
+        """Demangled reports should carry forward through their original symbols."""
+        violation = Violation("crate1::div", "", None, "", "divq %rsi", "DIVQ", "", Severity.ERROR)
+        previous = AnalysisReport(
+            "x86_64",
+            "cargo",
+            "release",
+            "Cargo.toml",
+            1,
+            3,
+            [violation],
+            functions=[
+                {
+                    "name": "crate1::div",
+                    "symbol": "_ZN6crate13div17h0E",
+                    "instructions": 3,
+                    "hash": "abc",
+                    "line": None,
+                }
+            ],
+            include_warnings=False,
+        )
+        baseline = function_baseline(previous, False)
+        self.assertEqual(list(baseline), ["_ZN6crate13div17h0E"])
+        self.assertEqual(baseline["_ZN6crate13div17h0E"][0]["violations"], [violation])
+
+    def test_find_cargo_manifest(self):
+        self.assertIsNone(find_cargo_manifest(str(self.root)))
+        (self.root / "Cargo.toml").write_text("[package]\n")
+        self.assertEqual(find_cargo_manifest(str(self.root)), str(self.root / "Cargo.toml"))
+        self.assertIsNone(find_cargo_manifest(__file__))
+
+    def _crate(self, directory, name, lib_rs, extra=""):
+        (directory / "src").mkdir(parents=True)
+        (directory / "Cargo.toml").write_text(
+            f'[package]\nname = "{name}"\nversion = "0.1.0"\nedition = "2021"\n{extra}'
+        )
+        (directory / "src" / "lib.rs").write_text(lib_rs)
+
+    def test_analyze_workspace(self):
+        """Each workspace member should be built once and reported with readable names."""
+        import shutil
+
+        if not shutil.which("cargo"):
+            self.skipTest("cargo is required")
+        (self.root / "Cargo.toml").write_text(
+            '[workspace]\nmembers = ["ct-core", "ct-util"]\nresolver = "2"\n'
+        )
+        self._crate(
+            self.root / "ct-core",
+            "ct-core",
+            "pub mod arith;\npub fn reduce(a: u64, m: u64) -> u64 { arith::div(a, m) }\n",
+        )
+        (self.root / "ct-core" / "src" / "arith.rs").write_text(
+            "#[inline(never)]\npub fn div(a: u64, m: u64) -> u64 { a / m }\n"
+        )
+        self._crate(
+            self.root / "ct-util",
+            "ct-util",
+            "pub fn select(c: u64, a: u64, b: u64) -> u64 { (c & a) | (!c & b) }\n",
+        )
+
+        old_cache = os.environ.get("CT_ANALYZER_CACHE_DIR")
+        os.environ["CT_ANALYZER_CACHE_DIR"] = str(self.root / "cache")
+        try:
+            reports, errors = analyze_crate(str(self.root), function_filter=r"^ct_")
+        finally:
+            if old_cache is None:
+                del os.environ["CT_ANALYZER_CACHE_DIR"]
+            else:
+                os.environ["CT_ANALYZER_CACHE_DIR"] = old_cache
+
+        self.assertEqual(errors, {})
+        by_crate = {Path(r.source_file).parent.name: r for r in reports}
+        self.assertEqual(set(by_crate), {"ct-core", "ct-util"})
+        self.assertTrue(by_crate["ct-util"].passed)
+        self.assertIn("ct_core::arith::div", {v.function for v in by_crate["ct-core"].violations})
+        self.assertFalse((self.root / "target").exists())
+
+    def test_analyze_renamed_lib(self):
+        """A library whose [lib] name differs from its package's should be found."""
+        import shutil
+
+        if not shutil.which("cargo"):
+            self.skipTest("cargo is required")
+        self._crate(
+            self.root,
+            "ct-demo-lib",
+            "#[inline(never)]\npub fn ct_div(a: u64, m: u64) -> u64 { a / m }\n",
+            '[lib]\nname = "ct_demo"\n',
+        )
+
+        old_cache = os.environ.get("CT_ANALYZER_CACHE_DIR")
+        os.environ["CT_ANALYZER_CACHE_DIR"] = str(self.root / "cache")
+        try:
+            reports, errors = analyze_crate(str(self.root), function_filter=r"^ct_")
+        finally:
+            if old_cache is None:
+                del os.environ["CT_ANALYZER_CACHE_DIR"]
+            else:
+                os.environ["CT_ANALYZER_CACHE_DIR"] = old_cache
+
+        self.assertEqual(errors, {})
+        self.assertIn("ct_demo::ct_div", {v.function for v in reports[0].violations})
+
+
+class TestStreamingOutput(unittest.TestCase):
+    """Test the NDJSON and SARIF writers."""
+
+    ASSEMBLY = "f:\n    idivl %ecx\n    jne .L2\n    ret\ng:\n    divq %rsi\n    ret\n"
+
+    def setUp(self):
+        import tempfile
+
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.assembly = Path(self.tmpdir.name) / "f.s"
+        self.assembly.write_text(self.ASSEMBLY)
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def test_on_violations(self):
+        """Violations should reach the callback per function instead of the report."""
+        batches = []
+        report = analyze_assembly(
+            str(self.assembly), "x86_64", include_warnings=True, on_violations=batches.append
+        )
+        self.assertEqual(report.violations, [])
+        mnemonics = [[v.mnemonic for v in batch] for batch in batches]
+        self.assertEqual(mnemonics, [["IDIVL", "JNE"], ["DIVQ"]])
+
+        batches = []
+        analyze_assembly(
+            str(self.assembly), "x86_64", function_filter="^g$", on_violations=batches.append
+        )
+        self.assertEqual([[v.function for v in batch] for batch in batches], [["g"]])
+
+    def test_ndjson(self):
+        import json
+
+        report = analyze_assembly(str(self.assembly), "x86_64", include_warnings=True)
+        output = format_reports([report], OutputFormat.NDJSON, {"broken.c": "Compilation failed"})
+        records = [json.loads(line) for line in output.splitlines()]
+        self.assertEqual([r["type"] for r in records], ["violation"] * 3 + ["report", "error"])
+        self.assertEqual(records[0]["source_file"], str(self.assembly))
+        self.assertEqual(records[3]["error_count"], 2)
+        self.assertEqual(records[3]["warning_count"], 1)
+        self.assertFalse(records[3]["passed"])
+
+    def test_sarif(self):
+        import io
+        import json
+
+        from analyzer import SARIFWriter
+
+        stream = io.StringIO()
+        writer = SARIFWriter(stream)
+        report = analyze_assembly(
+            str(self.assembly),
+            "x86_64",
+            include_warnings=True,
+            on_violations=lambda vs: writer.write_violations(str(self.assembly), vs),
+        )
+        writer.write_report(report)
+        writer.write_error("broken.c", "Compilation failed")
+        writer.close()
+
+        sarif = json.loads(stream.getvalue())
+        self.assertEqual(sarif["version"], "2.1.0")
+        run = sarif["runs"][0]
+        self.assertEqual([r["ruleId"] for r in run["results"]], ["IDIVL", "JNE", "DIVQ"])
+        self.assertEqual([r["level"] for r in run["results"]], ["error", "warning", "error"])
+        rules = {rule["id"] for rule in run["tool"]["driver"]["rules"]}
+        self.assertEqual(rules, {"IDIVL", "JNE", "DIVQ"})
+        self.assertEqual(run["properties"]["reports"][0]["error_count"], 2)
+        self.assertFalse(run["invocations"][0]["executionSuccessful"])
+        self.assertFalse(writer.passed)
+
+    def test_writer_hooks_are_abstract(self):
+        """A writer missing one of the hooks should fail when created, not mid-report."""
+        import io
+
+        from analyzer import NDJSONWriter, ReportWriter
+
+        class ViolationsOnly(ReportWriter):
+            def _write_violation(self, source_file, violation):
+                pass
+
+        with self.assertRaises(TypeError):
+            ViolationsOnly(io.StringIO())
+        NDJSONWriter(io.StringIO()).close()
+
+    def test_cli_streams(self):
+        import contextlib
+        import io
+        import json
+
+        from analyzer import main
+
+        for flag in ("--ndjson", "--sarif"):
+            with self.subTest(flag=flag):
+                stdout = io.StringIO()
+                with contextlib.redirect_stdout(stdout):
+                    status = main([flag, "--assembly", "--arch", "x86_64", str(self.assembly)])
+                self.assertEqual(status, 1)
+                output = stdout.getvalue()
+                if flag == "--sarif":
+                    self.assertEqual(len(json.loads(output)["runs"][0]["results"]), 2)
+                else:
+                    self.assertEqual(len(output.splitlines()), 3)
+
+    def test_cli_scan_streams_each_report(self):
+        """Multi-file runs should write each report as it finishes, not collect them."""
+        import contextlib
+        import io
+        import json
+        from unittest import mock
+
+        import analyzer
+
+        scan_dir = Path(self.tmpdir.name) / "scan"
+        scan_dir.mkdir()
+        (scan_dir / "a.py").write_text("def div(a, b):\n    return a // b\n")
+        (scan_dir / "b.py").write_text("def broken(:\n")
+
+        sources = [str(scan_dir / "a.py"), str(scan_dir / "b.py")]
+        finished = []
+        reports, errors = analyzer.analyze_many(
+            sources, jobs=2, on_result=lambda *result: finished.append(result)
+        )
+        self.assertEqual(sorted(label for label, _, _ in finished), sources)
+        self.assertEqual([r.source_file for r in reports], sources[:1])
+        self.assertEqual(list(errors), sources[1:])
+
+        # The collect-then-format path must not be taken
+        stdout = io.StringIO()
+        with (
+            mock.patch.object(analyzer, "_write_reports", side_effect=AssertionError),
+            contextlib.redirect_stdout(stdout),
+        ):
+            status = analyzer.main(["--ndjson", "--jobs", "2", "scan", str(scan_dir)])
+        self.assertEqual(status, 1)
+        records = [json.loads(line) for line in stdout.getvalue().splitlines()]
+        by_type = {}
+        for record in records:
+            by_type.setdefault(record["type"], []).append(record["source_file"])
+        self.assertEqual(by_type["report"], sources[:1])
+        self.assertEqual(by_type["error"], sources[1:])
+
+
+class TestAnalysisServer(unittest.TestCase):
+    """Test the JSON-RPC server."""
+
+    ASSEMBLY = "f:\n    idivl %ecx\n    ret\n"
+
+    def setUp(self):
+        import tempfile
+
+        from server import AnalysisServer
+
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.root = Path(self.tmpdir.name)
+        self.assembly = self.root / "f.s"
+        self.assembly.write_text(self.ASSEMBLY)
+        self.server = AnalysisServer(jobs=4)
+
+    def tearDown(self):
+        self.server.pool.shutdown()
+        self.tmpdir.cleanup()
+
+    def _analyze(self, request_id):
+        params = {"assembly_file": str(self.assembly), "arch": "x86_64"}
+        return self._request(request_id, "analyze_assembly", params)
+
+    def _request(self, request_id, method, params=None):
+        message = {"jsonrpc": "2.0", "id": request_id, "method": method}
+        if params is not None:
+            message["params"] = params
+        return message
+
+    def test_handle(self):
+        """Results should use the JSON report layout; failures map to JSON-RPC errors."""
+        response = self.server.handle(self._analyze(1))
+        self.assertEqual(response["id"], 1)
+        self.assertEqual(response["result"]["error_count"], 1)
+        self.assertEqual(response["result"]["violations"][0]["mnemonic"], "IDIVL")
+
+        request = self._analyze(4)
+        request["params"]["previous"] = response["result"]
+        again = self.server.handle(request)["result"]
+        self.assertEqual(again["error_count"], 1)
+        self.assertEqual([f["status"] for f in again["functions"]], ["unchanged"])
+
+        errors = {
+            "nope": -32601,
+            "analyze_assembly": -32602,
+        }
+        for method, code in errors.items():
+            response = self.server.handle(self._request(2, method, {}))
+            self.assertEqual(response["error"]["code"], code)
+        for name in ("cache", "on_violations", "verbose"):
+            request = self._analyze(5)
+            request["params"][name] = True
+            response = self.server.handle(request)
+            self.assertEqual(response["error"]["code"], -32602)
+            self.assertIn(name, response["error"]["message"])
+        missing = self.server.handle(
+            self._request(3, "analyze_assembly", [str(self.root / "missing.s"), "x86_64"])
+        )
+        self.assertEqual(missing["error"]["code"], -32000)
+        self.assertEqual(self.server.handle([1, 2])["error"]["code"], -32600)
+        # Notifications get no response
+        self.assertIsNone(self.server.handle({"jsonrpc": "2.0", "method": "status"}))
+
+    def test_warm_up(self):
+        """Parsers should be ready for analyze_source with each available compiler."""
+        import shutil
+
+        import analyzer
+
+        if not shutil.which("gcc"):
+            self.skipTest("gcc is required")
+        self.server.warm_up()
+        self.assertIn(("x86_64", "unknown"), analyzer._PARSERS)
+        self.assertIn(("x86_64", "gcc"), analyzer._PARSERS)
+
+    def test_serve_stream(self):
+        """Concurrent requests should all be answered before shutdown is acknowledged."""
+        import io
+        import json
+
+        lines = [json.dumps(self._analyze(i)) for i in range(8)]
+        lines.append("not json")
+        lines.append(json.dumps(self._request("s", "shutdown")))
+        lines.append(json.dumps(self._request("late", "status")))
+        writer = io.StringIO()
+        self.server.serve_stream(io.StringIO("\n".join(lines) + "\n"), writer)
+
+        responses = [json.loads(line) for line in writer.getvalue().splitlines()]
+        ids = [r["id"] for r in responses]
+        self.assertEqual(sorted(i for i in ids if isinstance(i, int)), list(range(8)))
+        self.assertIn(None, ids)  # the parse error
+        self.assertEqual(ids[-1], "s")
+        self.assertNotIn("late", ids)
+        self.assertTrue(self.server.stopped.is_set())
+
+    @unittest.skipUnless(hasattr(__import__("socket"), "AF_UNIX"), "Unix sockets required")
+    def test_unix_socket(self):
+        import json
+        import socket
+        import threading
+
+        path = str(self.root / "ct.sock")
+        thread = threading.Thread(target=self.server.serve_unix, args=(path,))
+        thread.start()
+        for _ in range(100):
+            if os.path.exists(path):
+                break
+            threading.Event().wait(0.05)
+
+        client = socket.socket(socket.AF_UNIX)
+        client.connect(path)
+        with client, client.makefile("rw") as stream:
+            stream.write(json.dumps(self._request(1, "status")) + "\n")
+            stream.write(json.dumps(self._request(2, "shutdown")) + "\n")
+            stream.flush()
+            responses = [json.loads(stream.readline()) for _ in range(2)]
+
+        thread.join(timeout=10)
+        self.assertFalse(thread.is_alive())
+        self.assertEqual([r["id"] for r in responses], [1, 2])
+        self.assertEqual(responses[0]["result"]["requests"], 1)
+        self.assertFalse(os.path.exists(path))
+
+
+class TestProfiling(unittest.TestCase):
+    """Test phase profiling and trace export."""
+
+    def test_phases(self):
+        """Phases should be attributed to their file, with nested time excluded."""
+        import time
+
+        from profiling import (
+            PROFILE_ENV,
+            Profiler,
+            _self_times,
+            chrome_trace,
+            file_scope,
+            phase,
+        )
+
+        profiler = Profiler()
+        with file_scope("crypto.c"):
+            with phase("compile"):
+                with phase("disassemble"):
+                    time.sleep(0.01)
+            with phase("probe"):
+                # A trial compilation is part of the probe
+                with phase("compile"):
+                    pass
+        with phase("format"):
+            pass
+        events = profiler.stop()
+
+        self.assertNotIn(PROFILE_ENV, os.environ)
+        self.assertEqual(
+            [(e["cat"], e["name"], e["file"]) for e in events],
+            [
+                ("file", "crypto.c", "crypto.c"),
+                ("phase", "compile", "crypto.c"),
+                ("phase", "disassemble", "crypto.c"),
+                ("phase", "probe", "crypto.c"),
+                ("phase", "format", None),
+            ],
+        )
+        self_times = _self_times(events)
+        self.assertLess(self_times[1], 10_000_000)
+        self.assertGreaterEqual(self_times[2], 10_000_000)
+
+        trace = chrome_trace(events, profiler.pid)["traceEvents"]
+        self.assertEqual(trace[0]["args"], {"name": "ct-analyzer"})
+        self.assertEqual({e["ph"] for e in trace[1:]}, {"X"})
+        self.assertEqual(trace[1]["ts"], 0)
+
+    def test_worker_processes(self):
+        """Processes started during profiling should record into the same profile."""
+        from profiling import Profiler
+
+        profiler = Profiler()
+        code = "from profiling import phase\nwith phase('parse', 'worker.c'): pass\n"
+        subprocess.run([sys.executable, "-c", code], cwd=Path(__file__).parent.parent, check=True)
+        events = profiler.stop()
+
+        self.assertEqual([(e["name"], e["file"]) for e in events], [("parse", "worker.c")])
+        self.assertNotEqual(events[0]["pid"], os.getpid())
+
+    def test_memory_growth(self):
+        """A phase should be charged with how far it raised the high-water mark."""
+        from profiling import Profiler, format_summary
+
+        profiler = Profiler()
+        code = (
+            "from profiling import phase\n"
+            "with phase('parse'):\n    data = b'x' * (64 << 20)\n    del data\n"
+            "with phase('format'): pass\n"
+        )
+        subprocess.run([sys.executable, "-c", code], cwd=Path(__file__).parent.parent, check=True)
+        events = profiler.stop()
+
+        parse, format_ = events
+        if parse["peak_rss_growth_kb"] is None:
+            self.skipTest("memory high-water mark not available")
+        self.assertGreater(parse["peak_rss_growth_kb"], 32 << 10)
+        # The later phase ends with the same high-water mark but did not raise it
+        self.assertGreater(format_["peak_rss_kb"], 32 << 10)
+        self.assertLess(format_["peak_rss_growth_kb"], 1 << 10)
+        self.assertIn("Peak +MiB", format_summary(events))
+
+    def test_cli_profile(self):
+        import contextlib
+        import io
+        import json
+        import tempfile
+
+        from analyzer import main
+
+        with tempfile.TemporaryDirectory() as tmpdir:
+            assembly = Path(tmpdir) / "f.s"
+            assembly.write_text("f:\n    idivl %ecx\n    ret\n")
+            trace_file = Path(tmpdir) / "trace.json"
+            argv = ["--profile", str(trace_file), "--assembly", "--arch", "x86_64", str(assembly)]
+            stderr = io.StringIO()
+            with contextlib.redirect_stdout(io.StringIO()), contextlib.redirect_stderr(stderr):
+                status = main(argv)
+            trace = json.loads(trace_file.read_text())["traceEvents"]
+
+        self.assertEqual(status, 1)
+        names = {(e["name"], e["args"].get("file")) for e in trace if e["ph"] == "X"}
+        self.assertIn((str(assembly), str(assembly)), names)
+        self.assertIn(("parse", str(assembly)), names)
+        self.assertIn(("format", None), names)
+        self.assertIn("parse", stderr.getvalue())
+        self.assertIn("Slowest files", stderr.getvalue())
+
+
+class TestSourceIndex(unittest.TestCase):
+    """Test the line index and combined matcher behind source-level detection."""
+
+    def test_line_numbers(self):
+        """Offsets should map to the line numbers newline counting gives."""
+        from source_index import SourceIndex
+
+        text = "first\n\nthird line\nlast"
+        index = SourceIndex(text)
+        for offset in range(len(text)):
+            self.assertEqual(index.line(offset), text[:offset].count("\n") + 1)
+        self.assertEqual(index.line_text(text.index("third")), "third line")
+        self.assertEqual(index.line_text(len(text) - 1), "last")
+        self.assertIsNone(SourceIndex.read("/nonexistent/source.js"))
+
+    def test_pattern_set_matches_finditer(self):
+        """One combined scan should find what a finditer per pattern finds."""
+        from source_index import PatternSet
+
+        patterns = [
+            (r"\bmath\.sqrt\s*\(", re.IGNORECASE, "sqrt"),
+            # Overlaps the first pattern, and is not factored (top-level |)
+            (r"\bsqrt\s*\(|\bpow\s*\(", 0, "bare"),
+            (r"[^/]\s*/\s*[^/=*]", 0, "div"),
+            (r"\.equals\s*\(", 0, "equals"),
+            (r"\s%\s*[^=]", 0, "mod"),
+        ]
+        text = "x = Math.sqrt(a / b) % c;\ny = sqrt(d/e/f) + pow(2, 3);\nz.equals(w) // q / r\n"
+        expected = [
+            (key, match.start(), match.group(0))
+            for regex, flags, key in patterns
+            for match in re.finditer(regex, text, flags)
+        ]
+        found = [(key, m.start(), m.group(0)) for key, m in PatternSet(patterns).finditer(text)]
+        self.assertEqual(found, expected)
+        self.assertEqual(list(PatternSet([]).finditer(text)), [])
+
+
 class TestScriptingLanguageDetection(unittest.TestCase):
     """Test language detection for scripting languages."""
 
@@ -584,33 +2161,246 @@ Frame size 16
             v8_output, "test.js", include_warnings=False
         )
 
-        self.assertEqual(len(functions), 1)
-        self.assertEqual(functions[0]["name"], "vulnerableDiv")
+        self.assertEqual(len(functions), 1)
+        self.assertEqual(functions[0]["name"], "vulnerableDiv")
+
+        # Should find Div bytecode
+        error_violations = [v for v in violations if v.severity == Severity.ERROR]
+        self.assertGreater(len(error_violations), 0, "Should detect Div bytecode")
+
+    def test_parse_v8_modulo(self):
+        """Parser should detect V8 modulo bytecodes."""
+        from script_analyzers import JavaScriptAnalyzer
+
+        v8_output = """
+[generated bytecode for function: vulnerableMod (0x5678)]
+Bytecode length: 15
+Parameter count 3
+Register count 1
+Frame size 8
+         0 : Ldar a0
+         2 : Mod a1
+         4 : Return
+"""
+
+        analyzer = JavaScriptAnalyzer()
+        functions, violations = analyzer._parse_v8_bytecode(v8_output, "test.js")
+
+        error_violations = [v for v in violations if v.severity == Severity.ERROR]
+        self.assertGreater(len(error_violations), 0, "Should detect Mod bytecode")
+
+    def test_parse_v8_node_output(self):
+        """Parser should read node's offset-prefixed lines from a stream."""
+        from script_analyzers import JavaScriptAnalyzer
+
+        v8_output = """
+[generated bytecode for function: check (0x2c4a1e6d9a11 <SharedFunctionInfo check>)]
+Bytecode length: 9
+Parameter count 3
+Register count 0
+Frame size 0
+   21 S> 0x2c4a1e6da0de @    0 : 0b 03             Ldar a0
+         0x2c4a1e6da0e0 @    2 : 3e 04 00          Mod a1, [0]
+   35 E> 0x2c4a1e6da0e3 @    5 : 98 03             JumpIfFalse [3] (0x2c4a1e6da0e6 @ 8)
+   50 S> 0x2c4a1e6da0e5 @    7 : ab                Return
+"""
+
+        analyzer = JavaScriptAnalyzer()
+        functions, violations = analyzer._parse_v8_bytecode(
+            iter(v8_output.splitlines()), "test.js", include_warnings=True
+        )
+
+        self.assertEqual(functions, [{"name": "check", "instructions": 4}])
+        self.assertEqual([v.mnemonic for v in violations], ["MOD", "JUMPIFFALSE"])
+        self.assertEqual(violations[0].address, "2")
+
+    def test_node_worker_pool(self):
+        """Workers should be reused and print only the requested file's functions."""
+        import shutil
+        import tempfile
+
+        from script_analyzers import JavaScriptAnalyzer
+
+        if not shutil.which("node"):
+            self.skipTest("node is required")
+
+        analyzer = JavaScriptAnalyzer()
+        with tempfile.TemporaryDirectory() as tmpdir:
+            sources = {
+                "first.js": "function first(a, b) { return a / b; }\nfirst(6, 3);\n",
+                "second.js": "function second(a, b) { return a % b; }\nsecond(6, 4);\n",
+                "exits.js": "function exits(a) { return a / 2; }\nexits(4);\nprocess.exit(0);\n",
+            }
+            for name, source in sources.items():
+                with open(os.path.join(tmpdir, name), "w") as f:
+                    f.write(source)
+
+            def functions(name):
+                report = analyzer.analyze(os.path.join(tmpdir, name))
+                return {v.function for v in report.violations} - {"<source>"}
+
+            try:
+                self.assertEqual(functions("first.js"), {"first"})
+                worker = analyzer.workers._idle[0]
+                self.assertEqual(functions("second.js"), {"second"})
+                self.assertIs(analyzer.workers._idle[0], worker)
+
+                # A file that ends the process costs its worker, not the analysis
+                self.assertEqual(functions("exits.js"), {"exits"})
+                self.assertEqual(functions("first.js"), {"first"})
+                self.assertIsNot(analyzer.workers._idle[0], worker)
+            finally:
+                analyzer.workers.close()
+
+    def test_node_worker_realm_changes(self):
+        """A file that leaves globals or process listeners behind should cost its worker."""
+        import shutil
+        import tempfile
+
+        from script_analyzers import JavaScriptAnalyzer
+
+        if not shutil.which("node"):
+            self.skipTest("node is required")
+
+        analyzer = JavaScriptAnalyzer()
+        with tempfile.TemporaryDirectory() as tmpdir:
+            sources = {
+                "plain.js": "function plain(a, b) { return a / b; }\nplain(6, 3);\n",
+                "global.js": "function leaks(a) { return a % 3; }\nglobalThis.leaked = leaks(7);\n",
+                "listener.js": "function hook(a) { return a / 2; }\nprocess.on('exit', () => hook(4));\n",
+            }
+            for name, source in sources.items():
+                with open(os.path.join(tmpdir, name), "w") as f:
+                    f.write(source)
+
+            def analyze(name):
+                return analyzer.analyze(os.path.join(tmpdir, name))
+
+            try:
+                for name in ("global.js", "listener.js"):
+                    analyze("plain.js")
+                    worker = analyzer.workers._idle[0]
+                    analyze(name)
+                    self.assertEqual(analyzer.workers._idle, [], name)
+                    self.assertIsNotNone(worker.wait(timeout=5))
+            finally:
+                analyzer.workers.close()
+
+    def test_node_worker_function_filter(self):
+        """A filter that could add V8 flags to a worker should be refused before it is sent."""
+        import shutil
+        import tempfile
+
+        from script_analyzers import JavaScriptAnalyzer
+
+        if not shutil.which("node"):
+            self.skipTest("node is required")
+
+        analyzer = JavaScriptAnalyzer()
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = os.path.join(tmpdir, "pair.js")
+            with open(path, "w") as f:
+                f.write(
+                    "function first(a, b) { return a / b; }\n"
+                    "function second(a, b) { return a % b; }\n"
+                    "first(6, 3);\nsecond(6, 4);\n"
+                )
+
+            def functions(function_filter):
+                report = analyzer.analyze(path, function_filter=function_filter)
+                return {v.function for v in report.violations} - {"<source>"}
+
+            try:
+                for injected in ("first --print-bytecode-filter=*", "first\n--no-lazy"):
+                    with self.assertRaises(RuntimeError):
+                        functions(injected)
+                self.assertEqual(analyzer.workers._idle, [])
+
+                self.assertEqual(functions("first"), {"first"})
+                self.assertEqual(functions(None), {"first", "second"})
+            finally:
+                analyzer.workers.close()
+
+    def test_node_worker_deferred_code(self):
+        """Functions first called from timers and promises belong to their file's report."""
+        import shutil
+        import tempfile
+
+        from script_analyzers import JavaScriptAnalyzer
+
+        if not shutil.which("node"):
+            self.skipTest("node is required")
 
-        # Should find Div bytecode
-        error_violations = [v for v in violations if v.severity == Severity.ERROR]
-        self.assertGreater(len(error_violations), 0, "Should detect Div bytecode")
+        analyzer = JavaScriptAnalyzer()
+        analyzer.workers.drain_timeout = 0.5
+        with tempfile.TemporaryDirectory() as tmpdir:
+            sources = {
+                "deferred.js": (
+                    "function leakedDiv(a, b) { return a / b; }\n"
+                    "function promised(a, b) { return a % b; }\n"
+                    "setTimeout(() => leakedDiv(7, 3), 300);\n"
+                    "setTimeout(() => {}, 50);\n"
+                    "Promise.resolve().then(() => console.log(promised(9, 4)));\n"
+                ),
+                "second.js": "function second(a, b) { return a % b; }\nsecond(6, 4);\n",
+                "forever.js": (
+                    "function ticks(a) { return a / 3; }\nsetInterval(() => ticks(9), 10);\n"
+                ),
+            }
+            for name, source in sources.items():
+                with open(os.path.join(tmpdir, name), "w") as f:
+                    f.write(source)
+
+            def functions(name):
+                report = analyzer.analyze(os.path.join(tmpdir, name))
+                return {v.function for v in report.violations} - {"<source>"}
+
+            try:
+                # Node's own timer functions are not reported with them
+                self.assertEqual(functions("deferred.js"), {"leakedDiv", "promised"})
+                # Logging opens no handle of the file's: the worker is kept
+                worker = analyzer.workers._idle[0]
+                self.assertEqual(functions("second.js"), {"second"})
+                self.assertIs(analyzer.workers._idle[0], worker)
+
+                # An interval never settles: its worker is stopped, not reused
+                self.assertEqual(functions("forever.js"), {"ticks"})
+                self.assertEqual(analyzer.workers._idle, [])
+                self.assertIsNotNone(worker.wait(timeout=5))
+                self.assertEqual(functions("second.js"), {"second"})
+            finally:
+                analyzer.workers.close()
+
+    def test_node_worker_repeat_analysis(self):
+        """A file's report does not depend on the files its worker ran before."""
+        import shutil
+        import tempfile
 
-    def test_parse_v8_modulo(self):
-        """Parser should detect V8 modulo bytecodes."""
         from script_analyzers import JavaScriptAnalyzer
 
-        v8_output = """
-[generated bytecode for function: vulnerableMod (0x5678)]
-Bytecode length: 15
-Parameter count 3
-Register count 1
-Frame size 8
-         0 : Ldar a0
-         2 : Mod a1
-         4 : Return
-"""
+        if not shutil.which("node"):
+            self.skipTest("node is required")
 
         analyzer = JavaScriptAnalyzer()
-        functions, violations = analyzer._parse_v8_bytecode(v8_output, "test.js")
-
-        error_violations = [v for v in violations if v.severity == Severity.ERROR]
-        self.assertGreater(len(error_violations), 0, "Should detect Mod bytecode")
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = os.path.join(tmpdir, "logs.js")
+            with open(path, "w") as f:
+                f.write(
+                    "function half(a) { return a / 2; }\n"
+                    "console.log(half(9));\n"
+                    "console.log({ value: half(7) }, [1, 2]);\n"
+                )
+            try:
+                first = analyzer.analyze(path, include_warnings=True)
+                worker = analyzer.workers._idle[0]
+                second = analyzer.analyze(path, include_warnings=True)
+                self.assertIs(analyzer.workers._idle[0], worker)
+                # console.log's formatting is printed with the first run only
+                self.assertEqual(first, second)
+                self.assertEqual(first.total_functions, 1)
+                self.assertEqual({v.function for v in first.violations} - {"<source>"}, {"half"})
+            finally:
+                analyzer.workers.close()
 
     def test_detect_math_sqrt_in_source(self):
         """Should detect Math.sqrt() calls in source."""
@@ -725,6 +2515,89 @@ Disassembly of <code object vulnerable_div at 0x1234>:
         self.assertIn("BINARY_TRUE_DIVIDE", mnemonics)
         self.assertIn("BINARY_MODULO", mnemonics)
 
+    def test_parse_dis_binary_op_operators(self):
+        """BINARY_OP should be classified by its operator, not a fixed oparg table."""
+        from script_analyzers import PythonAnalyzer
+
+        dis_output = """
+Disassembly of <code object f at 0x1234>:
+  2           0 RESUME                   0
+              2 BINARY_OP                2 (//)
+              4 BINARY_OP               12 (^)
+              6 BINARY_OP               15 (//=)
+"""
+        functions, violations = PythonAnalyzer()._parse_dis_output(dis_output, "test.py")
+        self.assertEqual(
+            [v.mnemonic for v in violations],
+            ["BINARY_OP_FLOORDIV", "BINARY_OP_INPLACE_FLOORDIV"],
+        )
+
+    def test_in_process_analysis(self):
+        """The running interpreter's code objects should be walked directly."""
+        import tempfile
+
+        from script_analyzers import PythonAnalyzer
+
+        source = """\
+def f(a, b):
+    return a // b
+
+class Key:
+    def reduce(self, x):
+        def inner(y):
+            return y % 3
+        return inner(x) / 2
+"""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = os.path.join(tmpdir, "key.py")
+            Path(path).write_text(source)
+
+            analyzer = PythonAnalyzer()
+            self.assertTrue(analyzer.in_process)
+            report = analyzer.analyze(path)
+            filtered = analyzer.analyze(path, function_filter="inner")
+
+        # <module>, f, Key, Key.reduce and Key.reduce.<locals>.inner
+        self.assertEqual(report.total_functions, 5)
+        found = [(v.function, v.line) for v in report.violations]
+        if sys.version_info >= (3, 11):
+            self.assertEqual(
+                found, [("f", 2), ("Key.reduce", 8), ("Key.reduce.<locals>.inner", 7)]
+            )
+        else:
+            self.assertEqual(len(found), 3)
+        self.assertEqual([v.function for v in filtered.violations], ["Key.reduce.<locals>.inner"])
+        self.assertEqual(filtered.total_functions, 1)
+
+    def test_bytecode_screen(self):
+        """Screening raw bytecode should not change counts or findings."""
+        import dis
+
+        from script_analyzers import PythonAnalyzer
+
+        sample = Path(__file__).parent / "test_samples" / "vulnerable.py"
+        code = compile(sample.read_text(), str(sample), "exec")
+        analyzer = PythonAnalyzer()
+        functions, violations = analyzer._analyze_code(code, str(sample), True)
+
+        expected = [len(list(dis.get_instructions(c))) for _, c in analyzer._code_objects(code)]
+        self.assertEqual([f["instructions"] for f in functions], expected)
+
+        unscreened = PythonAnalyzer()
+        unscreened._may_violate = lambda *args: True
+        _, all_violations = unscreened._analyze_code(code, str(sample), True)
+        self.assertEqual(violations, all_violations)
+        self.assertFalse(analyzer._may_violate(b"", b"", True))
+
+    def test_interpreter_selection(self):
+        """Only a differing python_path should use the dis subprocess."""
+        from script_analyzers import PythonAnalyzer
+
+        self.assertTrue(PythonAnalyzer(sys.executable).in_process)
+        other = PythonAnalyzer("/nonexistent/python3")
+        self.assertFalse(other.in_process)
+        self.assertFalse(other.is_available())
+
     def test_detect_random_in_source(self):
         """Should detect random.random() calls in source."""
         import tempfile
@@ -1037,6 +2910,357 @@ public class Test {
             os.unlink(temp_path)
 
 
+class TestJVMModule(unittest.TestCase):
+    """Test module mode for Java and Kotlin: batched compilation and disassembly."""
+
+    @staticmethod
+    def _javap_class(location: str, source: str, class_name: str, method: str) -> str:
+        return f"""Classfile {location}
+  Last modified Oct 18, 2026; size 412 bytes
+  Compiled from "{source}"
+public class {class_name}
+  minor version: 0
+  major version: 65
+{{
+  public int {method}(int, int);
+    descriptor: (II)I
+    flags: (0x0001) ACC_PUBLIC
+    Code:
+      stack=2, locals=3, args_size=3
+         0: iload_1
+         1: iload_2
+         2: idiv
+         3: ireturn
+      LineNumberTable:
+        line 4: 0
+}}
+SourceFile: "{source}"
+"""
+
+    @staticmethod
+    def _class_bytes(name: str, source: str | None, methods: list[tuple]) -> bytes:
+        """
+        Assemble a class file (JVMS 4.1) for name (com/example/Crypto), with
+        the given (name, descriptor, code, line number table) methods.
+        """
+        import struct
+
+        pool = []
+
+        def constant(entry: bytes) -> int:
+            pool.append(entry)
+            # A Long takes two slots
+            return len(pool) + sum(1 for e in pool[:-1] if e[0] == 5)
+
+        def utf8(text: str) -> int:
+            data = text.encode()
+            return constant(struct.pack(">BH", 1, len(data)) + data)
+
+        def attribute(attribute_name: str, body: bytes) -> bytes:
+            return struct.pack(">HI", utf8(attribute_name), len(body)) + body
+
+        this_class = constant(struct.pack(">BH", 7, utf8(name)))
+        super_class = constant(struct.pack(">BH", 7, utf8("java/lang/Object")))
+        constant(struct.pack(">Bq", 5, 1 << 40))
+        encoded_methods = []
+        for method_name, descriptor, code, lines in methods:
+            table = struct.pack(">H", len(lines)) + b"".join(
+                struct.pack(">HH", offset, line) for offset, line in lines
+            )
+            body = struct.pack(">HHI", 4, 4, len(code)) + code + struct.pack(">H", 0)
+            body += struct.pack(">H", 1) + attribute("LineNumberTable", table)
+            encoded_methods.append(
+                struct.pack(">HHHH", 0x0001, utf8(method_name), utf8(descriptor), 1)
+                + attribute("Code", body)
+            )
+        attributes = [attribute("SourceFile", struct.pack(">H", utf8(source)))] if source else []
+
+        return (
+            struct.pack(">IHHH", 0xCAFEBABE, 0, 65, len(pool) + 2)
+            + b"".join(pool)
+            + struct.pack(">HHHHHH", 0x0021, this_class, super_class, 0, 0, len(methods))
+            + b"".join(encoded_methods)
+            + struct.pack(">H", len(attributes))
+            + b"".join(attributes)
+        )
+
+    # int select(int a, int b): a tableswitch (padded to 4 bytes), a wide iinc, then irem
+    _SELECT_CODE = (
+        bytes([0x1B, 0xAA, 0, 0])  # iload_1; tableswitch; 2 bytes padding
+        + (23).to_bytes(4, "big")  # default
+        + (0).to_bytes(4, "big")  # low
+        + (1).to_bytes(4, "big")  # high
+        + (23).to_bytes(4, "big") * 2
+        + bytes([0xC4, 0x84, 0x01, 0x00, 0x00, 0x01])  # wide iinc 256, 1
+        + bytes([0x1B, 0x1C, 0x70, 0xAC])  # iload_1; iload_2; irem; ireturn
+    )
+
+    def test_split_javap_output(self):
+        """One javap run over several classes should split at each Classfile line."""
+        from script_analyzers import JavaAnalyzer, _split_javap_output
+
+        output = self._javap_class(
+            "/out/com/example/Crypto.class", "Crypto.java", "com.example.Crypto", "div"
+        ) + self._javap_class(
+            "jar:file:/lib/app.jar!/com/example/Crypto$Inner.class",
+            "Crypto.java",
+            "com.example.Crypto$Inner",
+            "mod",
+        )
+        split = list(_split_javap_output(output))
+        self.assertEqual(
+            [location for location, _ in split],
+            [
+                "/out/com/example/Crypto.class",
+                "jar:file:/lib/app.jar!/com/example/Crypto$Inner.class",
+            ],
+        )
+        functions, violations = JavaAnalyzer()._parse_javap_output(split[1][1], "Crypto.java")
+        self.assertEqual([f["name"] for f in functions], ["com.example.Crypto$Inner.mod"])
+        self.assertEqual([v.mnemonic for v in violations], ["IDIV"])
+        self.assertEqual(list(_split_javap_output("Error: class not found: Missing\n")), [])
+
+    def test_read_class(self):
+        """The class file reader should decode methods, switches, wide and line numbers."""
+        from classfile import OPCODES, ClassFormatError, instructions, operand_text, read_class
+
+        data = self._class_bytes(
+            "com/example/Crypto$Inner",
+            "Crypto.java",
+            [
+                ("<init>", "()V", bytes([0x2A, 0xB1]), [(0, 3)]),
+                ("select", "(II)I", self._SELECT_CODE, [(0, 5), (30, 7)]),
+            ],
+        )
+        classfile = read_class(data)
+        self.assertEqual(classfile.name, "com.example.Crypto$Inner")
+        self.assertEqual(classfile.source_file, "Crypto.java")
+        self.assertEqual(classfile.package_path, "com/example")
+        self.assertEqual([m.name for m in classfile.methods], ["<init>", "select"])
+
+        select = classfile.methods[1]
+        self.assertEqual(
+            [(offset, OPCODES[opcode]) for offset, opcode in instructions(select.code)],
+            [
+                (0, "iload_1"),
+                (1, "tableswitch"),
+                (24, "wide"),
+                (30, "iload_1"),
+                (31, "iload_2"),
+                (32, "irem"),
+                (33, "ireturn"),
+            ],
+        )
+        self.assertEqual(operand_text(select.code, 1), "{ // 0 to 1")
+        self.assertEqual([select.line_at(0), select.line_at(24), select.line_at(32)], [5, 5, 7])
+
+        with self.assertRaises(ClassFormatError):
+            read_class(b"\xca\xfe\xba\xbe")
+        with self.assertRaises(ClassFormatError):
+            read_class(data[:-3])
+        with self.assertRaises(ClassFormatError):
+            list(instructions(self._SELECT_CODE[:10]))
+
+    def test_module_reads_jar(self):
+        """Jar entries should be read in process and reported under their source files."""
+        import tempfile
+        import zipfile
+
+        from script_analyzers import JavaAnalyzer
+
+        divide = bytes([0x1B, 0x1C, 0x6C, 0xAC])  # iload_1; iload_2; idiv; ireturn
+        analyzer = JavaAnalyzer()
+        calls = []
+
+        def disassemble(classes, classpath=None):
+            calls.append(classes)
+            return [
+                (
+                    f"jar:file:{classpath}!/com/example/Broken.class",
+                    self._javap_class(
+                        f"jar:file:{classpath}!/com/example/Broken.class",
+                        "Broken.java",
+                        "com.example.Broken",
+                        "f",
+                    ),
+                )
+            ]
+
+        analyzer._disassemble_classes = disassemble
+        with tempfile.TemporaryDirectory() as tmpdir:
+            jar = str(Path(tmpdir) / "app.jar")
+            with zipfile.ZipFile(jar, "w") as archive:
+                archive.writestr(
+                    "com/example/Crypto.class",
+                    self._class_bytes(
+                        "com/example/Crypto",
+                        "Crypto.java",
+                        [("div", "(II)I", divide, [(0, 4)]), ("<init>", "()V", b"\xb1", [])],
+                    ),
+                )
+                archive.writestr(
+                    "com/example/Crypto$Inner.class",
+                    self._class_bytes(
+                        "com/example/Crypto$Inner",
+                        "Crypto.java",
+                        [("select", "(II)I", self._SELECT_CODE, [(0, 9)])],
+                    ),
+                )
+                archive.writestr(
+                    "com/example/Keys.class", self._class_bytes("com/example/Keys", None, [])
+                )
+                # Rejected by the reader, and left to javap
+                archive.writestr("com/example/Broken.class", b"\xca\xfe\xba\xbe")
+                archive.writestr("META-INF/MANIFEST.MF", "Manifest-Version: 1.0\n")
+            reports = {r.source_file: r for r in analyzer.analyze_module(jar)}
+            filtered = analyzer.analyze_module(jar, True, function_filter=r"\.div$")
+
+        self.assertEqual(calls, [["com.example.Broken"]] * 2)
+        self.assertEqual(
+            set(reports),
+            {"com/example/Crypto.java", "com/example/Keys.class", "com/example/Broken.java"},
+        )
+        crypto = reports["com/example/Crypto.java"]
+        self.assertEqual(crypto.compiler, "javac")
+        self.assertEqual(crypto.total_functions, 3)
+        self.assertEqual(crypto.total_instructions, 12)
+        self.assertEqual(
+            [(v.function, v.mnemonic, v.line, v.address) for v in crypto.violations],
+            [
+                ("com.example.Crypto$Inner.select", "IREM", 9, "32"),
+                ("com.example.Crypto.div", "IDIV", 4, "2"),
+            ],
+        )
+        self.assertEqual(reports["com/example/Broken.java"].violations[0].mnemonic, "IDIV")
+
+        crypto = next(r for r in filtered if r.source_file == "com/example/Crypto.java")
+        self.assertEqual([v.function for v in crypto.violations], ["com.example.Crypto.div"])
+        self.assertEqual(crypto.total_functions, 1)
+
+    def test_module_languages(self):
+        """Source trees, class directories and jars should be recognized as modules."""
+        import tempfile
+        import zipfile
+
+        from analyzer import jvm_module_languages
+
+        with tempfile.TemporaryDirectory() as tmpdir:
+            root = Path(tmpdir)
+            self.assertEqual(jvm_module_languages(tmpdir), [])
+
+            (root / "classes" / "com").mkdir(parents=True)
+            (root / "classes" / "com" / "Crypto.class").write_bytes(b"\xca\xfe\xba\xbe")
+            self.assertEqual(jvm_module_languages(str(root / "classes")), ["java"])
+
+            (root / "src").mkdir()
+            (root / "src" / "Crypto.java").write_text("class Crypto {}\n")
+            (root / "src" / "Util.kt").write_text("fun f() = 1\n")
+            self.assertEqual(jvm_module_languages(str(root / "src")), ["java", "kotlin"])
+
+            jar = root / "app.jar"
+            with zipfile.ZipFile(jar, "w") as archive:
+                archive.writestr("META-INF/app.kotlin_module", b"")
+                archive.writestr("com/UtilKt.class", b"\xca\xfe\xba\xbe")
+            self.assertEqual(jvm_module_languages(str(jar)), ["kotlin"])
+            self.assertEqual(jvm_module_languages(str(root / "src" / "Crypto.java")), [])
+
+    def test_module_reports_per_source(self):
+        """Classes should be reported under the source file they were compiled from."""
+        import tempfile
+
+        from script_analyzers import JavaAnalyzer
+
+        with tempfile.TemporaryDirectory() as tmpdir:
+            root = Path(tmpdir)
+            source_dir = root / "src" / "main" / "java" / "com" / "example"
+            source_dir.mkdir(parents=True)
+            crypto = source_dir / "Crypto.java"
+            crypto.write_text(
+                "package com.example;\nclass Crypto {\n  double r = Math.random();\n}\n"
+            )
+            # Declared package and directory differ
+            (root / "Keys.java").write_text("package com.example;\nclass Keys {}\n")
+            (root / "Empty.java").write_text("package com.example;\n")
+
+            analyzer = JavaAnalyzer()
+            calls = []
+
+            def compile_sources(sources, output_dir):
+                calls.append(("javac", sources))
+                # Rejected by the class file reader, so left to javap
+                Path(output_dir, "Crypto.class").write_bytes(b"")
+                return True, output_dir
+
+            def disassemble(classes, classpath=None):
+                calls.append(("javap", classes))
+                return [
+                    (
+                        f"/out/com/example/{name}.class",
+                        self._javap_class(
+                            f"/out/com/example/{name}.class", source, f"com.example.{name}", "f"
+                        ),
+                    )
+                    for name, source in (
+                        ("Crypto", "Crypto.java"),
+                        ("Crypto$Inner", "Crypto.java"),
+                        ("Keys", "Keys.java"),
+                    )
+                ]
+
+            # Stand-ins for javac and javap, which record their batches
+            analyzer._compile_sources = compile_sources
+            analyzer._disassemble_classes = disassemble
+            reports = {Path(r.source_file).name: r for r in analyzer.analyze_module(tmpdir)}
+
+        self.assertEqual(
+            [(tool, len(batch)) for tool, batch in calls], [("javac", 3), ("javap", 1)]
+        )
+        self.assertEqual(set(reports), {"Crypto.java", "Keys.java", "Empty.java"})
+        self.assertEqual(reports["Crypto.java"].source_file, str(crypto))
+        self.assertEqual(reports["Crypto.java"].total_functions, 2)
+        self.assertEqual(
+            sorted(v.mnemonic for v in reports["Crypto.java"].violations),
+            ["IDIV", "IDIV", "MATH_RANDOM"],
+        )
+        self.assertEqual(reports["Keys.java"].total_functions, 1)
+        self.assertEqual(reports["Empty.java"].total_functions, 0)
+
+    def test_analyze_module(self):
+        """A source tree should be compiled and disassembled once for all its files."""
+        import tempfile
+
+        from analyzer import analyze_jvm_module
+        from script_analyzers import JavaAnalyzer
+
+        if not JavaAnalyzer().is_available():
+            self.skipTest("javac and javap are required")
+
+        with tempfile.TemporaryDirectory() as tmpdir:
+            package = Path(tmpdir, "com", "example")
+            package.mkdir(parents=True)
+            (package / "Crypto.java").write_text(
+                "package com.example;\n"
+                "public class Crypto {\n"
+                "  public int reduce(int a, int b) { return a % b; }\n"
+                "  static class Inner { int half(int a, int b) { return a / b; } }\n"
+                "}\n"
+            )
+            (package / "Safe.java").write_text(
+                "package com.example;\n"
+                "public class Safe {\n"
+                "  public int add(int a, int b) { return a + b; }\n"
+                "}\n"
+            )
+            reports, errors = analyze_jvm_module(tmpdir)
+
+        self.assertEqual(errors, {})
+        by_name = {Path(r.source_file).name: r for r in reports}
+        self.assertEqual(
+            sorted(v.mnemonic for v in by_name["Crypto.java"].violations), ["IDIV", "IREM"]
+        )
+        self.assertTrue(by_name["Safe.java"].passed)
+
+
 class TestCSharpAnalyzerParsing(unittest.TestCase):
     """Test C# IL bytecode parsing."""
 
@@ -1209,6 +3433,368 @@ public class Test {
             os.unlink(temp_path)
 
 
+class TestCSharpProject(unittest.TestCase):
+    """Test the shared .NET build workspace, C# project mode and the assembly reader."""
+
+    _IL = """// IL code: CtAnalyzerBuild
+.assembly CtAnalyzerBuild
+{
+}
+.class private auto ansi '<Module>'
+{
+}
+.class public auto ansi beforefieldinit Demo.Crypto
+\textends [System.Runtime]System.Object
+{
+\t.method public hidebysig static
+\t\tint32 Reduce (
+\t\t\tint32 a,
+\t\t\tint32 b
+\t\t) cil managed
+\t{
+\t\tIL_0000: ldarg.0
+\t\tIL_0001: ldarg.1
+\t\tIL_0002: call int32 Demo.Helpers::Mod(int32, int32)
+\t\tIL_0007: ret
+\t}
+\t.class nested private auto ansi sealed beforefieldinit '<>c'
+\t\textends [System.Runtime]System.Object
+\t{
+\t\t.method assembly hidebysig instance int32 Lambda (int32 x) cil managed
+\t\t{
+\t\t\tIL_0000: ldarg.1
+\t\t\tIL_0001: ldc.i4.3
+\t\t\tIL_0002: div
+\t\t\tIL_0003: ret
+\t\t}
+\t}
+}
+.class private auto ansi abstract sealed beforefieldinit Demo.Helpers
+\textends [System.Runtime]System.Object
+{
+\t.method public hidebysig static int32 Mod (int32 a, int32 b) cil managed
+\t{
+\t\tIL_0000: ldarg.0
+\t\tIL_0001: ldarg.1
+\t\tIL_0002: rem
+\t\tIL_0003: ret
+\t}
+}
+.class private auto ansi beforefieldinit Program
+\textends [System.Runtime]System.Object
+{
+\t.method private hidebysig static void Main (string[] args) cil managed
+\t{
+\t\tIL_0000: ret
+\t}
+}
+"""
+
+    def test_split_il_types(self):
+        """IL should split per top-level type, nested types staying with their parent."""
+        from script_analyzers import _split_il_types
+
+        split = list(_split_il_types(self._IL))
+        self.assertEqual([name for name, _ in split], ["<Module>", "Crypto", "Helpers", "Program"])
+        self.assertIn("Lambda", split[1][1])
+        self.assertEqual(list(_split_il_types("IL_0000: ret\n")), [])
+
+    def test_project_reports_per_source(self):
+        """A project should be built and disassembled once, and reported per declaring file."""
+        import tempfile
+
+        from script_analyzers import CSharpAnalyzer
+
+        with tempfile.TemporaryDirectory() as tmpdir:
+            root = Path(tmpdir)
+            (root / "Crypto.cs").write_text(
+                "namespace Demo {\npublic class Crypto {\n"
+                "  int Seed() => new Random().Next();\n}\n}\n"
+            )
+            (root / "util").mkdir()
+            (root / "util" / "Helpers.cs").write_text(
+                "namespace Demo { static class Helpers {} }\n"
+            )
+            (root / "Program.cs").write_text("System.Console.WriteLine(1);\n")
+
+            analyzer = CSharpAnalyzer()
+            calls = []
+
+            def compile_sources(sources, output_dir):
+                calls.append(("build", len(sources)))
+                return True, str(Path(output_dir, "CtAnalyzerBuild.dll"))
+
+            def get_il_output(dll_file):
+                calls.append(("disassemble", 1))
+                return True, self._IL
+
+            # Stand-ins for dotnet build and the disassembler
+            analyzer._compile_sources = compile_sources
+            analyzer._get_il_output = get_il_output
+            reports = {r.source_file: r for r in analyzer.analyze_project(tmpdir)}
+
+        self.assertEqual(calls, [("build", 3), ("disassemble", 1)])
+        crypto = reports[str(root / "Crypto.cs")]
+        self.assertEqual(crypto.total_functions, 2)
+        self.assertEqual(sorted(v.mnemonic for v in crypto.violations), ["DIV", "SYSTEM_RANDOM"])
+        helpers = reports[str(root / "util" / "Helpers.cs")]
+        self.assertEqual([v.mnemonic for v in helpers.violations], ["REM"])
+        # Top-level statements declare no type; Program is reported under the project
+        self.assertEqual(reports[str(root / "Program.cs")].total_functions, 0)
+        self.assertEqual(reports[tmpdir].total_functions, 1)
+
+    def test_disassembler_chosen_once(self):
+        """The first disassembler that works should be the only one tried afterwards."""
+        from script_analyzers import CSharpAnalyzer
+
+        analyzer = CSharpAnalyzer()
+        working = [sys.executable, "-c", "print('.class public C')"]
+        analyzer._il_disassemblers = lambda: iter(
+            [(["ct-analyzer-missing-disassembler"], None), (working, None)]
+        )
+        self.assertEqual(analyzer._get_il_output("a.dll"), (True, ".class public C\n"))
+
+        def probe_again():
+            raise AssertionError("disassemblers probed again")
+
+        analyzer._il_disassemblers = probe_again
+        self.assertEqual(analyzer._get_il_output("b.dll"), (True, ".class public C\n"))
+        self.assertEqual(analyzer._disassembler, (working, None))
+
+    @staticmethod
+    def _assembly_bytes(types: list[tuple]) -> bytes:
+        """
+        Assemble a minimal PE32 .NET assembly (ECMA-335 II.25) with the given
+        (namespace, name, index of the enclosing type or None, methods) types,
+        each method a (name, IL) pair. IL of 64 bytes or more gets a fat header.
+        """
+        import struct
+
+        strings = bytearray(b"\0")
+
+        def string(text: str) -> int:
+            strings.extend(text.encode() + b"\0")
+            return len(strings) - len(text) - 1
+
+        section_rva = 0x2000
+        bodies = bytearray()
+        method_rows = []
+        type_rows = []
+        nested_rows = []
+        for index, (namespace, name, enclosing, methods) in enumerate(types):
+            first_method = len(method_rows) + 1
+            type_rows.append(
+                struct.pack("<IHHHHH", 0, string(name), string(namespace), 0, 1, first_method)
+            )
+            if enclosing is not None:
+                nested_rows.append(struct.pack("<HH", index + 1, enclosing + 1))
+            for method_name, code in methods:
+                # Bodies follow the 72-byte CLI header, 4-byte aligned
+                bodies.extend(b"\0" * (-len(bodies) % 4))
+                rva = section_rva + 72 + len(bodies)
+                if len(code) < 64:
+                    bodies.extend(bytes([len(code) << 2 | 2]))
+                else:
+                    bodies.extend(struct.pack("<HHII", 0x3003, 8, len(code), 0))
+                bodies.extend(code)
+                method_rows.append(struct.pack("<IHHHHH", rva, 0, 0, string(method_name), 0, 1))
+        bodies.extend(b"\0" * (-len(bodies) % 4))
+
+        # Module, TypeDef, MethodDef and NestedClass
+        tables = {0x00: [struct.pack("<HHHHH", 0, string("Test.dll"), 0, 0, 0)]}
+        tables[0x02], tables[0x06], tables[0x29] = type_rows, method_rows, nested_rows
+        table_stream = struct.pack("<IBBBBQQ", 0, 2, 0, 0, 1, sum(1 << n for n in tables), 0)
+        table_stream += b"".join(struct.pack("<I", len(rows)) for rows in tables.values())
+        table_stream += b"".join(b"".join(rows) for rows in tables.values())
+        table_stream += b"\0" * (-len(table_stream) % 4)
+        strings.extend(b"\0" * (-len(strings) % 4))
+
+        version = b"v4.0.30319\0\0"
+        headers_size = 8 + 4 + 8 + 12
+        metadata = struct.pack("<IHHII", 0x424A5342, 1, 1, 0, len(version)) + version
+        metadata += struct.pack("<HH", 0, 2)
+        stream_offset = len(metadata) + headers_size
+        metadata += struct.pack("<II", stream_offset, len(table_stream)) + b"#~\0\0"
+        metadata += struct.pack("<II", stream_offset + len(table_stream), len(strings))
+        metadata += b"#Strings\0\0\0\0"
+        metadata += table_stream + strings
+
+        metadata_rva = section_rva + 72 + len(bodies)
+        cli_header = struct.pack("<IHHII", 72, 2, 5, metadata_rva, len(metadata))
+        section = cli_header.ljust(72, b"\0") + bodies + metadata
+
+        dos = b"MZ".ljust(0x3C, b"\0") + struct.pack("<I", 0x80)
+        coff = struct.pack("<HHIIIHH", 0x14C, 1, 0, 0, 0, 224, 0x2102)
+        directories = [(0, 0)] * 16
+        directories[14] = (section_rva, 72)
+        optional = struct.pack("<H", 0x10B).ljust(92, b"\0") + struct.pack("<I", 16)
+        optional += b"".join(struct.pack("<II", rva, size) for rva, size in directories)
+        section_header = b".text\0\0\0" + struct.pack(
+            "<IIII", len(section), section_rva, len(section), 0x200
+        ).ljust(32, b"\0")
+        headers = dos.ljust(0x80, b"\0") + b"PE\0\0" + coff + optional + section_header
+        return headers.ljust(0x200, b"\0") + section
+
+    # Reduce(a, b): a % b; Check(a, b): blt.s over a switch, then a / b
+    _REDUCE_IL = bytes([0x02, 0x03, 0x5D, 0x2A])  # ldarg.0; ldarg.1; rem; ret
+    _CHECK_IL = (
+        bytes([0x02, 0x03, 0x32, 0x0E])  # ldarg.0; ldarg.1; blt.s IL_0012
+        + bytes([0x02, 0x45, 0x02, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0])  # ldarg.0; switch (2)
+        + bytes([0x02, 0x03, 0x5B, 0x2A])  # ldarg.0; ldarg.1; div; ret
+    )
+
+    def test_read_assembly(self):
+        """The assembly reader should decode types, nesting, method bodies and branches."""
+        from cil import (
+            OPCODES,
+            CILFormatError,
+            NotAssemblyError,
+            instructions,
+            operand_text,
+            read_assembly,
+        )
+
+        data = self._assembly_bytes(
+            [
+                ("", "<Module>", None, []),
+                ("Demo", "Crypto", None, [("Reduce", self._REDUCE_IL)]),
+                ("", "Inner`1", 1, [("Check", self._CHECK_IL), ("Wide", bytes(70) + b"\x2a")]),
+            ]
+        )
+        assembly = read_assembly(data)
+        self.assertEqual(
+            [assembly.full_name(i) for i in range(3)],
+            ["<Module>", "Demo.Crypto", "Demo.Crypto/Inner`1"],
+        )
+        self.assertEqual(assembly.top_level(2).name, "Crypto")
+        check, wide = assembly.types[2].methods
+        self.assertEqual(check.body, self._CHECK_IL)
+        self.assertEqual(len(wide.body), 71)
+        self.assertEqual(
+            [(offset, OPCODES[opcode]) for offset, opcode in instructions(check.body)],
+            [
+                (0, "ldarg.0"),
+                (1, "ldarg.1"),
+                (2, "blt.s"),
+                (4, "ldarg.0"),
+                (5, "switch"),
+                (18, "ldarg.0"),
+                (19, "ldarg.1"),
+                (20, "div"),
+                (21, "ret"),
+            ],
+        )
+        self.assertEqual(operand_text(check.body, 2), "IL_0012")
+        self.assertEqual(operand_text(check.body, 5), "(IL_0012, IL_0012)")
+
+        with self.assertRaises(NotAssemblyError):
+            read_assembly(b"\x7fELF" + bytes(60))
+        with self.assertRaises(CILFormatError):
+            read_assembly(data[:0x240])
+        with self.assertRaises(CILFormatError):
+            list(instructions(self._CHECK_IL[:8]))
+
+    def test_analyze_assemblies(self):
+        """Assemblies and NuGet packages should be analyzed in process, without the SDK."""
+        import tempfile
+        import zipfile
+
+        from script_analyzers import CSharpAnalyzer
+
+        data = self._assembly_bytes(
+            [
+                ("Demo", "Crypto", None, [("Reduce", self._REDUCE_IL)]),
+                ("", "Inner", 0, [("Check", self._CHECK_IL)]),
+            ]
+        )
+        analyzer = CSharpAnalyzer(dotnet_path="ct-analyzer-missing-dotnet")
+        with tempfile.TemporaryDirectory() as tmpdir:
+            package = Path(tmpdir) / "Demo.1.0.0.nupkg"
+            with zipfile.ZipFile(package, "w") as archive:
+                archive.writestr("lib/net8.0/Demo.dll", data)
+                archive.writestr("runtimes/linux-x64/native/libdemo.dll", b"\x7fELF")
+                archive.writestr("Demo.nuspec", "<package/>")
+            (Path(tmpdir) / "Broken.dll").write_bytes(data[:0x240])
+            reports, errors = analyzer.analyze_assemblies(tmpdir, include_warnings=True)
+            filtered, _ = analyzer.analyze_assemblies(str(package), function_filter="Reduce")
+            native = Path(tmpdir) / "native.dll"
+            native.write_bytes(b"\x7fELF")
+            _, native_errors = analyzer.analyze_assemblies(str(native))
+
+        self.assertEqual([r.source_file for r in reports], [f"{package}(lib/net8.0/Demo.dll)"])
+        self.assertEqual(list(errors), [str(Path(tmpdir) / "Broken.dll")])
+        report = reports[0]
+        self.assertEqual((report.total_functions, report.total_instructions), (2, 13))
+        self.assertEqual(
+            [(v.function, v.mnemonic, v.address, v.instruction) for v in report.violations],
+            [
+                ("Demo.Crypto::Reduce", "REM", "IL_0002", "rem"),
+                ("Demo.Crypto/Inner::Check", "BLT.S", "IL_0002", "blt.s IL_0012"),
+                ("Demo.Crypto/Inner::Check", "SWITCH", "IL_0005", "switch (IL_0012, IL_0012)"),
+                ("Demo.Crypto/Inner::Check", "DIV", "IL_0014", "div"),
+            ],
+        )
+        self.assertEqual([v.function for v in filtered[0].violations], ["Demo.Crypto::Reduce"])
+        self.assertIn("not a PE file", native_errors[str(native)])
+
+    def test_workspace_build(self):
+        """Workspace builds should compile several files together, restoring only once."""
+        import shutil
+        import tempfile
+
+        from script_analyzers import DotnetWorkspace
+
+        if shutil.which("dotnet") is None:
+            self.skipTest(".NET SDK not installed")
+
+        with tempfile.TemporaryDirectory() as tmpdir:
+            root = Path(tmpdir)
+            (root / "A.cs").write_text("public class A { public int F(int x) => B.G(x); }\n")
+            (root / "B.cs").write_text(
+                "public static class B { public static int G(int x) => x % 3; }\n"
+            )
+            workspace = DotnetWorkspace(directory=str(root / "workspace"))
+            for build in ("first", "second"):
+                (root / build).mkdir()
+                success, dll = workspace.build(
+                    [str(root / "A.cs"), str(root / "B.cs")], str(root / build)
+                )
+                self.assertTrue(success, dll)
+                self.assertTrue(Path(dll).is_file())
+            self.assertTrue((root / "workspace" / "obj" / "project.assets.json").is_file())
+            self.assertEqual(sorted(p.name for p in root.iterdir() if p.name.startswith(".")), [])
+
+
+    def test_workspace_replaces_unrestored(self):
+        """A workspace without restored assets should be replaced; a restored one kept."""
+        import tempfile
+
+        from script_analyzers import DotnetWorkspace
+
+        def staging(root, name):
+            directory = root / name
+            (directory / "obj").mkdir(parents=True)
+            (directory / "obj" / "project.assets.json").write_text("{}")
+            (directory / name).write_text("")
+            return str(directory)
+
+        with tempfile.TemporaryDirectory() as tmpdir:
+            root = Path(tmpdir)
+            workspace = DotnetWorkspace(directory=str(root / "workspace"))
+            # An earlier run was interrupted before its restore finished
+            (root / "workspace").mkdir()
+            (root / "workspace" / "ct-analyzer.csproj").write_text("")
+
+            self.assertTrue(workspace._install(staging(root, ".restore-1")))
+            self.assertTrue((root / "workspace" / ".restore-1").is_file())
+
+            # A concurrent run that restored second keeps the installed workspace
+            self.assertTrue(workspace._install(staging(root, ".restore-2")))
+            self.assertTrue((root / "workspace" / ".restore-1").is_file())
+            self.assertEqual(
+                sorted(p.name for p in root.iterdir()), [".restore-2", "workspace"]
+            )
+
 class TestScriptAnalyzerIntegration(unittest.TestCase):
     """Integration tests for scripting language analyzers.
 
@@ -1393,5 +3979,397 @@ console.log(vulnerableRandom());
                 raise
 
 
+class TestScanMode(unittest.TestCase):
+    """Test multi-file scanning."""
+
+    def setUp(self):
+        import tempfile
+
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.root = Path(self.tmpdir.name)
+        (self.root / "pkg").mkdir()
+        (self.root / "node_modules").mkdir()
+        (self.root / ".git").mkdir()
+        (self.root / "pkg" / "nonce.py").write_text(
+            "import random\n\ndef nonce():\n    return random.random()\n"
+        )
+        (self.root / "pkg" / "add.py").write_text("def add(a, b):\n    return a + b\n")
+        (self.root / "pkg" / "notes.txt").write_text("not source\n")
+        (self.root / "pkg" / "crypto.h").write_text("int f(void);\n")
+        (self.root / "node_modules" / "dep.js").write_text("var x = 1;\n")
+        (self.root / ".git" / "hook.py").write_text("x = 1\n")
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def test_find_sources_skips_vendored_and_unknown(self):
+        """Only analyzable sources outside skipped directories should be found."""
+        sources = find_sources(str(self.root))
+        self.assertEqual(
+            [os.path.relpath(s, self.root) for s in sources],
+            [os.path.join("pkg", "add.py"), os.path.join("pkg", "nonce.py")],
+        )
+
+    def test_find_sources_missing_directory(self):
+        """A missing directory should raise FileNotFoundError."""
+        with self.assertRaises(FileNotFoundError):
+            find_sources(str(self.root / "missing"))
+
+    def test_analyze_many_serial_and_parallel_agree(self):
+        """Serial and pooled runs should produce the same reports in input order."""
+        sources = find_sources(str(self.root))
+
+        serial, serial_errors = analyze_many(sources, jobs=1)
+        parallel, parallel_errors = analyze_many(sources, jobs=2)
+
+        self.assertEqual(serial_errors, {})
+        self.assertEqual(parallel_errors, {})
+        self.assertEqual([r.source_file for r in serial], sources)
+        self.assertEqual([r.source_file for r in parallel], sources)
+        self.assertEqual([r.error_count for r in serial], [r.error_count for r in parallel])
+        self.assertTrue(serial[0].passed)
+        self.assertFalse(serial[1].passed)
+
+    def test_analyze_many_collects_errors(self):
+        """A file that cannot be analyzed should not abort the batch."""
+        missing = str(self.root / "pkg" / "missing.py")
+        reports, errors = analyze_many([missing, str(self.root / "pkg" / "add.py")], jobs=1)
+
+        self.assertEqual(len(reports), 1)
+        self.assertIn(missing, errors)
+
+    def test_analyze_many_survives_unexpected_errors(self):
+        """Any exception from one file should become that file's error entry."""
+        from analyzer import Compiler
+
+        class BrokenCompiler(Compiler):
+            languages = ("c",)
+
+            def is_available(self):
+                return True
+
+            def version(self, arch=None):
+                return "broken 1.0"
+
+            def compile_to_assembly(self, source_file, *args, **kwargs):
+                raise UnicodeDecodeError("utf-8", b"\xff", 0, 1, "invalid start byte")
+
+        source = self.root / "pkg" / "crypto.c"
+        source.write_text("int f(int a, int b) { return a / b; }\n")
+        add = str(self.root / "pkg" / "add.py")
+        reports, errors = analyze_many(
+            [str(source), add], compiler=BrokenCompiler("broken"), jobs=1
+        )
+
+        self.assertEqual([r.source_file for r in reports], [add])
+        self.assertIn("invalid start byte", errors[str(source)])
+
+    def test_format_reports(self):
+        """Combined reports should summarize every file and fail on errors."""
+        import json
+
+        from analyzer import AnalysisReport
+
+        report = AnalysisReport(
+            architecture="cpython",
+            compiler="python3",
+            optimization="N/A",
+            source_file="a.py",
+            total_functions=1,
+            total_instructions=4,
+            violations=[],
+        )
+        errors = {"b.py": "Python compilation failed:\nSyntaxError"}
+
+        parsed = json.loads(format_reports([report], OutputFormat.JSON, errors))
+        self.assertEqual(parsed["total_files"], 2)
+        self.assertFalse(parsed["passed"])
+        self.assertEqual(parsed["errors"], errors)
+
+        text = format_reports([report], OutputFormat.TEXT, errors)
+        self.assertIn("Files analyzed: 1, Failed: 0, Errors: 1", text)
+        self.assertIn("Result: FAILED", text)
+
+        self.assertIn("PASSED", format_reports([report], OutputFormat.TEXT))
+
+
+class TestAnalysisCache(unittest.TestCase):
+    """Test the on-disk assembly cache."""
+
+    class FakeCompiler:
+        name = "fakecc"
+
+        def __init__(self, version="fakecc 1.0", settings=None, headers=("util.h",)):
+            self._version = version
+            self._settings = settings or {}
+            self._headers = headers
+
+        def version(self, arch=None):
+            return self._version
+
+        def settings(self):
+            return self._settings
+
+        def dependencies(self, source_file, arch, optimization, extra_flags=None):
+            if self._headers is None:
+                return None
+            return [source_file, *(str(Path(source_file).parent / h) for h in self._headers)]
+
+    def setUp(self):
+        import tempfile
+
+        from cache import AnalysisCache
+
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.root = Path(self.tmpdir.name)
+        self.cache = AnalysisCache(str(self.root / "cache"))
+        self.source = self.root / "crypto.c"
+        self.source.write_text('#include "util.h"\nint f(int a, int b) { return a / b; }\n')
+        (self.root / "util.h").write_text("#define LIMBS 4\n")
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def _key(self, **overrides):
+        args = {
+            "source_file": str(self.source),
+            "compiler": self.FakeCompiler(),
+            "arch": "x86_64",
+            "optimization": "O2",
+            "extra_flags": [],
+        }
+        args.update(overrides)
+        return self.cache.key(**args)
+
+    def test_key_covers_inputs(self):
+        """Changing any input, including an included header, should change the key."""
+        base = self._key()
+        self.assertEqual(base, self._key())
+        self.assertNotEqual(base, self._key(compiler=self.FakeCompiler("fakecc 1.1")))
+        self.assertNotEqual(
+            base, self._key(compiler=self.FakeCompiler(settings={"scope": "binary"}))
+        )
+        self.assertNotEqual(base, self._key(arch="arm64"))
+        self.assertNotEqual(base, self._key(optimization="O3"))
+        self.assertNotEqual(base, self._key(extra_flags=["-DFOO"]))
+
+        (self.root / "util.h").write_text("#define LIMBS 5\n")
+        self.assertNotEqual(base, self._key())
+
+        # A compiler that cannot list its inputs is not cached
+        self.assertIsNone(self._key(compiler=self.FakeCompiler(headers=None)))
+
+    def _assert_key_follows(self, compiler, source, inputs, extra_flags=None):
+        """The key should change when any of inputs (paths) is edited."""
+        key = functools.partial(self.cache.key, str(source), compiler, "x86_64", "O2", extra_flags)
+        self.assertIsNotNone(key())
+        for path in inputs:
+            before = key()
+            path.write_text(path.read_text() + "\n// edited\n")
+            self.assertNotEqual(before, key(), path.name)
+
+    def test_key_covers_c_includes(self):
+        """Headers from -I, -isystem, -iquote and -include should be part of the key."""
+        from analyzer import GCCCompiler
+
+        if not shutil.which("gcc"):
+            self.skipTest("gcc not available")
+        for name in ("inc", "sys", "quote"):
+            (self.root / name).mkdir()
+        headers = [
+            self.root / "inc" / "angle.h",
+            self.root / "sys" / "system.h",
+            self.root / "quote" / "quoted.h",
+            self.root / "forced.h",
+        ]
+        for header in headers:
+            header.write_text("#define X 1\n")
+        self.source.write_text(
+            "#include <angle.h>\n#include <system.h>\n#include \"quoted.h\"\n"
+            "int f(int a) { return a / X; }\n"
+        )
+        flags = [
+            f"-I{self.root / 'inc'}",
+            *("-isystem", str(self.root / "sys")),
+            *("-iquote", str(self.root / "quote")),
+            *("-include", str(self.root / "forced.h")),
+        ]
+        self._assert_key_follows(GCCCompiler(), self.source, headers, flags)
+
+    def test_key_covers_rust_modules(self):
+        """Files pulled in with `mod` should be part of the key."""
+        from analyzer import RustCompiler
+
+        if not shutil.which("rustc"):
+            self.skipTest("rustc not available")
+        main = self.root / "main.rs"
+        main.write_text("mod limbs;\nfn main() { println!(\"{}\", limbs::div(6, 3)); }\n")
+        module = self.root / "limbs.rs"
+        module.write_text("pub fn div(a: u32, b: u32) -> u32 { a / b }\n")
+        self._assert_key_follows(RustCompiler(), main, [module])
+
+    def test_key_covers_go_module_packages(self):
+        """Packages of the same Go module should be part of the key."""
+        from analyzer import GoCompiler
+
+        if not shutil.which("go"):
+            self.skipTest("go not available")
+        (self.root / "go.mod").write_text("module example.com/m\n\ngo 1.21\n")
+        (self.root / "util").mkdir()
+        package = self.root / "util" / "util.go"
+        package.write_text("package util\n\nfunc Div(a, b int) int { return a / b }\n")
+        main = self.root / "main.go"
+        main.write_text(
+            'package main\n\nimport "example.com/m/util"\n\n'
+            "func main() { println(util.Div(6, 3)) }\n"
+        )
+        cwd = os.getcwd()
+        os.chdir(self.root)  # go resolves the module from the working directory
+        try:
+            self._assert_key_follows(GoCompiler(), main, [package, self.root / "go.mod"])
+        finally:
+            os.chdir(cwd)
+
+    def test_round_trip(self):
+        """Stored entries should be returned unchanged, with a copy of the assembly."""
+        key = self._key()
+        self.assertIsNone(self.cache.get(key))
+
+        asm = self.root / "crypto.s"
+        asm.write_text("f:\n\tidivl %esi\n")
+        functions = [{"name": "f", "instructions": 3}]
+        violations = [{"function": "f", "mnemonic": "IDIVL", "severity": "error"}]
+        self.cache.put(key, str(asm), functions, violations)
+        asm.unlink()
+
+        asm_path, cached_functions, cached_violations = self.cache.get(key)
+        self.assertEqual(Path(asm_path).read_text(), "f:\n\tidivl %esi\n")
+        self.assertEqual(cached_functions, functions)
+        self.assertEqual(cached_violations, violations)
+        self.assertEqual((self.cache.hits, self.cache.misses), (1, 1))
+
+    def test_memory_entries(self):
+        """In-memory entries should be served without the disk and as fresh copies."""
+        from cache import AnalysisCache
+
+        cache = AnalysisCache(str(self.root / "cache"), memory_entries=1)
+        asm = self.root / "crypto.s"
+        asm.write_text("f:\n")
+        cache.put("a" * 64, str(asm), [{"name": "f", "instructions": 1}], [])
+        os.unlink(cache._path("a" * 64))
+
+        _, functions, _ = cache.get("a" * 64)
+        functions[0]["status"] = "new"
+        _, functions, _ = cache.get("a" * 64)
+        self.assertEqual(functions, [{"name": "f", "instructions": 1}])
+
+        # Only the most recent entry is kept in memory
+        cache.put("b" * 64, str(asm), [], [])
+        self.assertIsNone(cache.get("a" * 64))
+
+    def test_pickle(self):
+        """The cache should reach worker processes, without its memory tier."""
+        import pickle
+
+        from cache import AnalysisCache
+
+        cache = AnalysisCache(str(self.root / "cache"), memory_entries=4)
+        asm = self.root / "crypto.s"
+        asm.write_text("f:\n")
+        cache.put("a" * 64, str(asm), [], [])
+
+        copy = pickle.loads(pickle.dumps(cache))
+        self.assertEqual((copy.directory, copy.memory_entries), (cache.directory, 4))
+        self.assertEqual(len(copy._memory), 0)
+        self.assertIsNotNone(copy.get("a" * 64))
+
+    def test_lru_eviction(self):
+        """Least recently used entries should be evicted first."""
+        self.cache.max_size = 2500
+        asm = self.root / "big.s"
+        asm.write_text("x" * 1000)
+
+        self.cache.put("a" * 64, str(asm), [], [])
+        os.utime(self.cache._path("a" * 64), (1, 1))
+        self.cache.put("b" * 64, str(asm), [], [])
+        os.utime(self.cache._path("b" * 64), (2, 2))
+        self.cache.get("a" * 64)  # refresh a
+        self.cache.put("c" * 64, str(asm), [], [])
+
+        self.assertIsNotNone(self.cache.get("a" * 64))
+        self.assertIsNone(self.cache.get("b" * 64))
+        self.assertFalse(os.path.exists(self.cache._path("b" * 64)[:-5] + ".s"))
+        self.assertIsNotNone(self.cache.get("c" * 64))
+
+    def test_put_cleans_up_on_failure(self):
+        """A failed put should leave no temporary files behind."""
+        self.cache.put("a" * 64, str(self.root / "missing.s"), [], [])
+
+        entries = Path(self.cache.entries_directory)
+        self.assertEqual([p.name for p in entries.rglob("*") if p.is_file()], [])
+        self.assertIsNone(self.cache.get("a" * 64))
+
+    def test_put_scans_only_past_the_limit(self):
+        """put() should walk the cache once, then only when its size count passes the limit."""
+        asm = self.root / "big.s"
+        asm.write_text("x" * 1000)
+        self.cache.max_size = 3500
+        scans = []
+        entries = self.cache._entries
+
+        def counted():
+            scans.append(1)
+            return entries()
+
+        self.cache._entries = counted
+        for key in "abc":
+            self.cache.put(key * 64, str(asm), [], [])
+        self.assertEqual(len(scans), 1)
+
+        self.cache.put("d" * 64, str(asm), [], [])
+        self.assertEqual(len(scans), 2)
+        self.assertIsNone(self.cache.get("a" * 64))
+
+    def test_evict_keeps_other_files(self):
+        """Eviction and clear() should only remove entries, not the rest of the directory."""
+        cache_dir = self.root / "cache"
+        registry = cache_dir / "toolchains.json"
+        assets = cache_dir / "dotnet" / "0123" / "obj" / "project.assets.json"
+        assets.parent.mkdir(parents=True)
+        for path in (registry, assets):
+            path.write_text("{}")
+
+        self.cache.max_size = 0
+        asm = self.root / "crypto.s"
+        asm.write_text("f:\n")
+        self.cache.put("a" * 64, str(asm), [], [])
+        self.cache.put("b" * 64, str(asm), [], [])
+        self.cache.clear()
+
+        self.assertIsNone(self.cache.get("b" * 64))
+        self.assertTrue(registry.exists())
+        self.assertTrue(assets.exists())
+
+    def test_analyze_source_uses_cache(self):
+        """A repeat analysis should be served from the cache with identical results."""
+        try:
+            subprocess.run(["gcc", "--version"], capture_output=True, check=True)
+        except (subprocess.CalledProcessError, FileNotFoundError):
+            self.skipTest("gcc not available")
+
+        first = analyze_source(str(self.source), compiler="gcc", cache=self.cache)
+        second = analyze_source(str(self.source), compiler="gcc", cache=self.cache)
+        with_warnings = analyze_source(
+            str(self.source), compiler="gcc", include_warnings=True, cache=self.cache
+        )
+        uncached = analyze_source(str(self.source), compiler="gcc", include_warnings=True)
+
+        self.assertEqual(self.cache.misses, 1)
+        self.assertEqual(self.cache.hits, 2)
+        self.assertEqual(first.violations, second.violations)
+        self.assertEqual(with_warnings.violations, uncached.violations)
+        self.assertGreater(first.error_count, 0)
+
+
 if __name__ == "__main__":
     unittest.main(verbosity=2)
@@ -0,0 +1,610 @@
+"""
+Performance benchmarks for the constant-time analyzer.
+
+The parsers are measured on synthetic corpora at several sizes, one per
+architecture and one per bytecode dump format, in lines per second and peak
+RSS. The analyze_source phases (compile, parse, cold and cached analysis) are
+timed on the test_samples files. Results are compared with the baselines in
+benchmark_baselines.json; a throughput drop or a time or memory increase
+beyond the tolerance fails the benchmark.
+
+Wall-clock figures differ from host to host, so throughput and phase times
+are gated relative to a reference loop timed in the same run (a split and a
+set lookup per line, which follows the interpreter and CPU but not the
+analyzer). Absolute lines/s and seconds are recorded for reading only. Peak
+RSS is gated only against baselines recorded on the same host.
+
+The suite is skipped unless CT_ANALYZER_BENCHMARK is set:
+
+    CT_ANALYZER_BENCHMARK=1 python3 ct_analyzer/tests/test_benchmarks.py
+    CT_ANALYZER_BENCHMARK=update python3 ct_analyzer/tests/test_benchmarks.py
+
+"update" records the measurements as the new baselines.
+CT_ANALYZER_BENCHMARK_TOLERANCE sets the allowed regression (default 0.3).
+"""
+
+import gc
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import unittest
+from pathlib import Path
+
+# Add parent directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from analyzer import (
+    DANGEROUS_INSTRUCTIONS,
+    analyze_source,
+    detect_language,
+    get_compiler,
+    get_native_arch,
+    get_parser,
+    is_bytecode_language,
+)
+from cache import AnalysisCache
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+MODE = os.environ.get("CT_ANALYZER_BENCHMARK", "")
+TOLERANCE = float(os.environ.get("CT_ANALYZER_BENCHMARK_TOLERANCE", "0.3"))
+BASELINES = Path(__file__).parent / "benchmark_baselines.json"
+SAMPLES = Path(__file__).parent / "test_samples"
+
+# Corpus sizes, in functions
+SIZES = {"small": 100, "medium": 1000, "large": 5000}
+REPEATS = 5
+# Small corpora repeat until the parses add up to this many seconds
+MIN_PARSE_SECONDS = 0.5
+
+# Noise floors below which a difference is not a regression
+RSS_SLACK_KIB = 1024
+TIME_SLACK = 0.05
+
+# Register-only instructions that are never flagged, per architecture
+FILLER = {
+    "x86_64": ("movq\t%rdi, %rax", "addq\t$1, %rax"),
+    "i386": ("movl\t%ecx, %eax", "addl\t$1, %eax"),
+    "arm64": ("mov\tx0, x1", "add\tx0, x0, #1"),
+    "arm": ("mov\tr0, r1", "add\tr0, r0, #1"),
+    "riscv64": ("mv\ta0, a1", "addi\ta0, a0, 1"),
+    "ppc64le": ("mr\t3, 4", "addi\t3, 3, 1"),
+    "s390x": ("lgr\t%r1, %r2", "aghi\t%r1, 1"),
+}
+
+# Suffix of the assembly corpora in disassembly form
+DISASSEMBLY = "-disassembly"
+
+results: dict[str, dict] = {"parsers": {}, "phases": {}}
+
+
+def assembly_corpus(arch: str, functions: int) -> str:
+    """GNU assembler output with one dangerous instruction per function."""
+    table = DANGEROUS_INSTRUCTIONS[arch]
+    dangerous = sorted(table["errors"]) + sorted(table["warnings"])
+    move, add = FILLER[arch]
+    operands = move.split("\t")[1]
+    lines = ["\t.text", '\t.file\t"bench.c"']
+    for i in range(functions):
+        lines += [
+            f"\t.globl\tfn_{i}",
+            f"\t.type\tfn_{i}, @function",
+            f"fn_{i}:",
+            f"\t.loc\t1 {i + 1} 0",
+        ]
+        for _ in range(10):
+            lines += [f"\t{move}", f"\t{add}"]
+        lines += [
+            f"\t{dangerous[i % len(dangerous)]}\t{operands}",
+            f".L{i}:",
+            "\tret",
+            f"\t.size\tfn_{i}, .-fn_{i}",
+        ]
+    return "\n".join(lines) + "\n"
+
+
+def disassembly_corpus(arch: str, functions: int) -> str:
+    """
+    assembly_corpus as `go tool objdump` prints it: each instruction after
+    its file:line, address and raw bytes.
+    """
+    lines = []
+    address = 0x1000
+    for line in assembly_corpus(arch, functions).splitlines():
+        if line.startswith("\t."):
+            continue
+        if line.startswith("\t"):
+            raw = f"{address * 2654435761 & 0xFFFFFFFF:08x}"
+            line = f"  bench.go:{len(lines)}\t0x{address:x}\t{raw}{line}"
+            address += 4
+        lines.append(line)
+    return "\n".join(lines) + "\n"
+
+
+def _assembly_arch(name: str) -> str | None:
+    """The architecture of an assembly corpus ("arm64", "arm64-disassembly"), or None."""
+    arch = name.removesuffix(DISASSEMBLY)
+    return arch if arch in DANGEROUS_INSTRUCTIONS else None
+
+
+def vld_corpus(functions: int) -> str:
+    rule = "-" * 85
+    lines = []
+    for i in range(functions):
+        lines += [
+            "filename:       /bench/crypto.php",
+            f"function name:  fn_{i}",
+            "number of ops:  23",
+            "compiled vars:  !0 = $value, !1 = $modulus",
+            "line     #* E I O op                           fetch          ext  return  operands",
+            rule,
+            f"{i + 1:>4}     0  E >   RECV                                             !0",
+        ]
+        for op in range(1, 21):
+            lines.append(f"{'':>4}     {op:<3}      ADD{'':>45}~{op}      !0, !1")
+        lines += [
+            f"{'':>4}     21       {('DIV', 'MOD')[i % 2]}{'':>45}~21     !0, !1",
+            f"{'':>4}     22     > RETURN{'':>51}null",
+            "",
+        ]
+    return "\n".join(lines) + "\n"
+
+
+def v8_corpus(functions: int) -> str:
+    lines = []
+    for i in range(functions):
+        lines += [
+            f"[generated bytecode for function: fn_{i} (0x{i:x})]",
+            "Bytecode length: 46",
+            "Parameter count 3",
+            "Register count 2",
+            "Frame size 16",
+        ]
+        for op in range(10):
+            lines += [f"{op * 4:>10} : Ldar a0", f"{op * 4 + 2:>10} : Add a1, [0]"]
+        lines += [f"{40:>10} : {('Div', 'Mod')[i % 2]} r0, [1]", f"{44:>10} : Return", ""]
+    return "\n".join(lines) + "\n"
+
+
+def dis_corpus(functions: int) -> str:
+    lines = []
+    for i in range(functions):
+        lines += [f"Disassembly of <code object fn_{i} at 0x{i:x}>:", f"{i + 1:>3}           0 RESUME  0"]
+        offset = 2
+        for _ in range(10):
+            lines.append(f"              {offset} LOAD_FAST                0 (value)")
+            lines.append(f"              {offset + 2} BINARY_OP                0 (+)")
+            offset += 4
+        lines += [
+            f"              {offset} BINARY_OP               {(11, 6)[i % 2]} ({('/', '%')[i % 2]})",
+            f"              {offset + 2} RETURN_VALUE",
+            "",
+        ]
+    return "\n".join(lines) + "\n"
+
+
+def python_corpus(functions: int) -> str:
+    """Python source for the in-process analysis, shaped like dis_corpus."""
+    lines = []
+    for i in range(functions):
+        lines.append(f"def fn_{i}(value, modulus):")
+        lines += ["    value = value + modulus"] * 10
+        lines += [f"    return value {('/', '%')[i % 2]} modulus", ""]
+    return "\n".join(lines) + "\n"
+
+
+def js_source_corpus(functions: int) -> str:
+    """JavaScript source for the source-level pattern scan."""
+    lines = []
+    for i in range(functions):
+        lines.append(f"function fn_{i}(value, modulus) {{")
+        lines += ["    value = value + modulus;", "    // add the modulus again"] * 5
+        call = ("Math.random()", "key.indexOf(value)")[i % 2]
+        lines += [f"    return {call} + value;", "}", ""]
+    return "\n".join(lines) + "\n"
+
+
+def yarv_corpus(functions: int) -> str:
+    lines = []
+    for i in range(functions):
+        lines.append(f"== disasm: #<ISeq:fn_{i}@bench.rb:{i + 1} ({i + 1},0)-({i + 3},3)>")
+        for op in range(10):
+            lines.append(f"{op * 4:04} getlocal_WC_0                          value@0")
+            lines.append(f"{op * 4 + 2:04} opt_plus                               <calldata!mid:+>")
+        op = ("opt_div", "opt_mod")[i % 2]
+        lines += [f"0040 {op:<38} <calldata!mid:/, argc:1>", "0042 leave", ""]
+    return "\n".join(lines) + "\n"
+
+
+def javap_corpus(functions: int, class_name: str = "Bench") -> str:
+    lines = [f"public class {class_name} {{"]
+    for i in range(functions):
+        lines += [f"  public int fn_{i}(int, int);", "    Code:"]
+        for op in range(10):
+            lines += [f"{op * 2:>8}: iload_1", f"{op * 2 + 1:>8}: iadd"]
+        lines += [
+            f"{20:>8}: {('idiv', 'irem')[i % 2]}",
+            f"{21:>8}: ireturn",
+            "    LineNumberTable:",
+            f"      line {i + 1}: 0",
+        ]
+    lines.append("}")
+    return "\n".join(lines) + "\n"
+
+
+def il_corpus(functions: int) -> str:
+    lines = []
+    for i in range(functions):
+        lines += [
+            f".method public hidebysig static int32 Fn{i}(int32, int32) cil managed",
+            "{",
+            "  .maxstack 2",
+        ]
+        for op in range(10):
+            lines += [f"  IL_{op * 2:04x}: ldarg.0", f"  IL_{op * 2 + 1:04x}: add"]
+        lines += [f"  IL_0014: {('div', 'rem')[i % 2]}", "  IL_0015: ret", "}"]
+    return "\n".join(lines) + "\n"
+
+
+def _script_parsers() -> dict:
+    """Dump format -> (corpus generator, parse function)."""
+    from script_analyzers import (
+        CSharpAnalyzer,
+        JavaAnalyzer,
+        JavaScriptAnalyzer,
+        KotlinAnalyzer,
+        PHPAnalyzer,
+        PythonAnalyzer,
+        RubyAnalyzer,
+    )
+
+    from source_index import SourceIndex
+
+    php = PHPAnalyzer()
+    python = PythonAnalyzer()
+    js_patterns = JavaScriptAnalyzer._source_patterns(True)
+
+    def scan_js_source(text):
+        # Source scans report no functions; count each match as one
+        found = JavaScriptAnalyzer._scan_source("bench.js", SourceIndex(text), js_patterns)
+        return found, found
+
+    return {
+        "php-vld": (vld_corpus, lambda text: php._parse_vld_output(text, True)),
+        "php-opcache": (vld_corpus, lambda text: php._parse_opcache_output(text, True)),
+        "v8": (
+            v8_corpus,
+            lambda text: JavaScriptAnalyzer()._parse_v8_bytecode(text, "bench.js", True),
+        ),
+        "js-source": (js_source_corpus, scan_js_source),
+        "python-dis": (
+            dis_corpus,
+            lambda text: python._parse_dis_output(text, "bench.py", True),
+        ),
+        # Compiles and walks the code objects; lines are source lines
+        "python": (
+            python_corpus,
+            lambda text: python._analyze_code(compile(text, "bench.py", "exec"), "bench.py", True),
+        ),
+        "yarv": (
+            yarv_corpus,
+            lambda text: RubyAnalyzer()._parse_yarv_output(text, "bench.rb", True),
+        ),
+        "javap": (
+            javap_corpus,
+            lambda text: JavaAnalyzer()._parse_javap_output(text, "Bench.java", True),
+        ),
+        "kotlin-javap": (
+            lambda n: javap_corpus(n, "BenchKt"),
+            lambda text: KotlinAnalyzer()._parse_javap_output(text, "Bench.kt", True),
+        ),
+        "cil": (
+            il_corpus,
+            lambda text: CSharpAnalyzer()._parse_il_output(text, "Bench.cs", True),
+        ),
+    }
+
+
+def _peak_rss_kib() -> int | None:
+    # VmHWM is reset on exec; ru_maxrss may still include the parent's
+    # footprint from before the fork
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1])
+    except OSError:
+        pass
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports KiB, macOS bytes
+    return peak // 1024 if sys.platform == "darwin" else peak
+
+
+def generate_corpus(name: str, functions: int) -> str:
+    if name in DANGEROUS_INSTRUCTIONS:
+        return assembly_corpus(name, functions)
+    if _assembly_arch(name):
+        return disassembly_corpus(_assembly_arch(name), functions)
+    generate, _parse = _script_parsers()[name]
+    return generate(functions)
+
+
+def measure_parser(name: str, corpus: str) -> dict:
+    """
+    Parse a corpus file; meant to run in a fresh process so that peak RSS
+    covers the interpreter, the analyzer modules and this parse only.
+    Assembly is streamed from the file as the analyzer does; bytecode dumps
+    are read into memory first, as the script analyzers receive them.
+    """
+    if _assembly_arch(name):
+        parser = get_parser(_assembly_arch(name), "unknown")
+
+        def parse():
+            with open(corpus) as f:
+                return parser.parse(f, True)
+    else:
+        text = Path(corpus).read_text()
+        parse_text = _script_parsers()[name][1]
+
+        def parse():
+            return parse_text(text)
+
+    with open(corpus) as f:
+        lines = f.read().splitlines()
+    # Alternate with the reference loop so both see the same host load, and
+    # collect between passes rather than inside them, as timeit does
+    best = float("inf")
+    ratios = []
+    total = 0
+    while len(ratios) < REPEATS or total < MIN_PARSE_SECONDS:
+        gc.collect()
+        gc.disable()
+        try:
+            start = time.perf_counter()
+            parsed, violations = parse()
+            elapsed = time.perf_counter() - start
+            reference = _reference_time(lines)
+        finally:
+            gc.enable()
+        best = min(best, elapsed)
+        ratios.append(reference / elapsed)
+        total += elapsed
+
+    return {
+        "lines": len(lines),
+        "lines_per_sec": round(len(lines) / best),
+        "relative_throughput": round(statistics.median(ratios), 4),
+        "peak_rss_kib": _peak_rss_kib(),
+        "functions": len(parsed),
+        "violations": len(violations),
+    }
+
+
+def _best_time(function) -> float:
+    best = float("inf")
+    for _ in range(REPEATS):
+        start = time.perf_counter()
+        function()
+        best = min(best, time.perf_counter() - start)
+    return round(best, 4)
+
+
+def _reference_time(lines: list[str]) -> float:
+    """Time of one pass of the reference loop over lines, in seconds."""
+    known = frozenset(("mov", "add", "ret"))
+    start = time.perf_counter()
+    hits = 0
+    for line in lines:
+        fields = line.split()
+        if fields and fields[0] in known:
+            hits += 1
+    return time.perf_counter() - start
+
+
+def _reference_seconds() -> float:
+    """The reference loop over a fixed corpus, to scale phase times by."""
+    lines = assembly_corpus("x86_64", 1000).splitlines()
+    return round(min(_reference_time(lines) for _ in range(REPEATS)), 6)
+
+
+def _host() -> dict:
+    return {
+        "host": platform.node(),
+        "machine": platform.machine(),
+        "python": platform.python_version(),
+    }
+
+
+def _sample_compiler(language: str):
+    """The first available compiler for a compiled sample, or None."""
+    names = {"c": ["clang", "gcc"], "cpp": ["clang", "gcc"]}.get(language, [None])
+    for name in names:
+        compiler = get_compiler(name, language)
+        if compiler.is_available():
+            return compiler
+    return None
+
+
+def _load_baselines() -> dict:
+    try:
+        return json.loads(BASELINES.read_text())
+    except (OSError, ValueError):
+        return {"parsers": {}, "phases": {}}
+
+
+def tearDownModule():
+    if MODE == "update" and (results["parsers"] or results["phases"]):
+        baselines = _load_baselines()
+        for group, measured in results.items():
+            baselines.setdefault(group, {}).update(measured)
+        baselines["recorded_on"] = _host()
+        BASELINES.write_text(json.dumps(baselines, indent=2, sort_keys=True) + "\n")
+        print(f"\nBaselines written to {BASELINES}", file=sys.stderr)
+
+
+@unittest.skipUnless(MODE, "set CT_ANALYZER_BENCHMARK=1 to run benchmarks")
+class BenchmarkCase(unittest.TestCase):
+    """Compares measurements with the stored baselines."""
+
+    @classmethod
+    def setUpClass(cls):
+        cls.baselines = _load_baselines()
+        # Absolute figures only compare on the host that recorded them
+        cls.same_host = cls.baselines.get("recorded_on") == _host()
+
+    def check(self, group: str, key: str, measured: dict) -> None:
+        results[group][key] = measured
+        print(f"\n{key}: {measured}", file=sys.stderr, end="")
+        baseline = self.baselines.get(group, {}).get(key)
+        if MODE == "update" or baseline is None:
+            return
+
+        if "relative_throughput" in measured and "relative_throughput" in baseline:
+            expected = baseline["relative_throughput"]
+            self.assertGreaterEqual(
+                measured["relative_throughput"],
+                expected * (1 - TOLERANCE),
+                f"{key}: throughput regressed from {expected}x the reference loop",
+            )
+        if (
+            self.same_host
+            and measured.get("peak_rss_kib") is not None
+            and baseline.get("peak_rss_kib") is not None
+        ):
+            ceiling = baseline["peak_rss_kib"] * (1 + TOLERANCE) + RSS_SLACK_KIB
+            self.assertLessEqual(
+                measured["peak_rss_kib"],
+                ceiling,
+                f"{key}: peak RSS grew from {baseline['peak_rss_kib']} KiB",
+            )
+        if "reference_seconds" in measured and "reference_seconds" in baseline:
+            reference = measured["reference_seconds"]
+            for phase, seconds in measured.items():
+                if phase in baseline and phase.endswith("_seconds") and phase != "reference_seconds":
+                    expected = baseline[phase] / baseline["reference_seconds"]
+                    ceiling = expected * (1 + TOLERANCE) + TIME_SLACK / reference
+                    self.assertLessEqual(
+                        seconds / reference,
+                        ceiling,
+                        f"{key}: {phase} regressed from {expected:.2f}x the reference loop",
+                    )
+
+
+class TestParserBenchmarks(BenchmarkCase):
+    """Parser throughput and memory on synthetic corpora."""
+
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def _run(self, name: str) -> None:
+        for size, functions in SIZES.items():
+            with self.subTest(parser=name, size=size):
+                corpus = os.path.join(self.tmpdir.name, f"{name}-{size}.txt")
+                Path(corpus).write_text(generate_corpus(name, functions))
+                output = subprocess.run(
+                    [sys.executable, __file__, "--measure", name, corpus],
+                    capture_output=True,
+                    text=True,
+                    check=True,
+                ).stdout
+                measured = json.loads(output)
+                # A generator that drifted from the dump format would benchmark nothing
+                self.assertGreaterEqual(measured["functions"], functions)
+                self.assertGreaterEqual(measured["violations"], functions // 2)
+                self.check("parsers", f"{name}/{size}", measured)
+
+    def test_assembly_parsers(self):
+        for arch in DANGEROUS_INSTRUCTIONS:
+            self._run(arch)
+            self._run(arch + DISASSEMBLY)
+
+    def test_script_parsers(self):
+        for name in _script_parsers():
+            self._run(name)
+
+
+class TestAnalysisPhaseBenchmarks(BenchmarkCase):
+    """analyze_source phases on the test_samples files."""
+
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def _compiled_phases(self, sample: Path, compiler) -> dict:
+        arch = get_native_arch()
+        asm = os.path.join(self.tmpdir.name, sample.stem + ".s")
+
+        def compile_sample():
+            success, error = compiler.compile_to_assembly(str(sample), asm, arch, "O2")
+            self.assertTrue(success, error)
+
+        def parse():
+            with open(asm, errors="replace") as f:
+                get_parser(arch, compiler.name).parse(f, True)
+
+        cache = AnalysisCache(os.path.join(self.tmpdir.name, "cache"))
+        phases = {
+            "reference_seconds": _reference_seconds(),
+            "compile_seconds": _best_time(compile_sample),
+            "parse_seconds": _best_time(parse),
+            "analyze_seconds": _best_time(
+                lambda: analyze_source(str(sample), arch, compiler, include_warnings=True)
+            ),
+        }
+        analyze_source(str(sample), arch, compiler, cache=cache)
+        phases["cached_seconds"] = _best_time(
+            lambda: analyze_source(str(sample), arch, compiler, cache=cache)
+        )
+        return phases
+
+    def test_analyze_source_phases(self):
+        from script_analyzers import get_script_analyzer
+
+        for sample in sorted(SAMPLES.iterdir()):
+            if not sample.is_file():
+                continue
+            language = detect_language(str(sample))
+            with self.subTest(sample=sample.name):
+                if is_bytecode_language(language):
+                    script_analyzer = get_script_analyzer(language)
+                    if script_analyzer is None or not script_analyzer.is_available():
+                        self.skipTest(f"no runtime for {language}")
+                    try:
+                        analyze_source(str(sample))
+                    except RuntimeError as e:
+                        # e.g. Node.js without the TypeScript compiler
+                        self.skipTest(str(e))
+                    phases = {
+                        "reference_seconds": _reference_seconds(),
+                        "analyze_seconds": _best_time(
+                            lambda: analyze_source(str(sample), include_warnings=True)
+                        ),
+                    }
+                else:
+                    compiler = _sample_compiler(language)
+                    if compiler is None:
+                        self.skipTest(f"no compiler for {language}")
+                    phases = self._compiled_phases(sample, compiler)
+                self.check("phases", sample.name, phases)
+
+
+if __name__ == "__main__":
+    if len(sys.argv) == 4 and sys.argv[1] == "--measure":
+        print(json.dumps(measure_parser(sys.argv[2], sys.argv[3])))
+    else:
+        unittest.main()
@@ -0,0 +1,294 @@
+"""
+Toolchain registry for the constant-time analyzer.
+
+Compilers and runtimes are probed once (`<tool> --version` or equivalent) and
+the result - resolved path, exit status and version banner - is kept in
+memory and persisted to a JSON file in the cache directory. A persisted entry
+is reused as long as the command still resolves to the same binary with the
+same modification time, so later runs and worker processes do not spawn any
+probe subprocesses at all.
+
+Version-manager shims (rustup proxies, pyenv/rbenv/asdf shims) never change
+when the selected toolchain does, so a shim is first resolved to the binary
+it would run (`rustup which`, `pyenv which`, ...) and the entry is keyed on
+that binary instead.
+
+The registry also records which cross-compilation targets work with each
+compiler on this machine (see analyzer.probe_cross_targets). Only working
+targets are persisted: a missing target is often installed moments later.
+"""
+
+import json
+import os
+import re
+import shutil
+import subprocess
+import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict, dataclass
+from pathlib import Path
+
+try:
+    from .profiling import phase
+except ImportError:
+    from profiling import phase
+
+# Bump when the entry layout changes
+REGISTRY_FORMAT = 2
+
+# `exec "<manager>" exec "$program"` line of pyenv, rbenv and asdf shims
+SHIM_EXEC_PATTERN = re.compile(rb'exec\s+"?([^"\s]+)"?\s+exec\b')
+
+# Commands probed by discover(), with the arguments that print their version
+KNOWN_TOOLS = {
+    "gcc": ["--version"],
+    "clang": ["--version"],
+    "go": ["version"],
+    "rustc": ["--version"],
+    "swiftc": ["--version"],
+    "php": ["--version"],
+    "node": ["--version"],
+    "tsc": ["--version"],
+    "python3": ["--version"],
+    "ruby": ["--version"],
+    "javac": ["-version"],
+    "javap": ["-version"],
+    "kotlinc": ["-version"],
+    "dotnet": ["--version"],
+}
+
+
+def default_cache_dir() -> str:
+    """Cache directory: $CT_ANALYZER_CACHE_DIR, else the XDG user cache directory."""
+    env_dir = os.environ.get("CT_ANALYZER_CACHE_DIR")
+    if env_dir:
+        return env_dir
+    xdg_dir = os.environ.get("XDG_CACHE_HOME") or os.path.join(Path.home(), ".cache")
+    return os.path.join(xdg_dir, "ct-analyzer")
+
+
+@dataclass
+class Toolchain:
+    """The result of probing one command."""
+
+    command: str
+    args: list[str]
+    path: str | None
+    mtime: int | None
+    returncode: int | None
+    version: str
+    target: str | None = None
+
+    @property
+    def available(self) -> bool:
+        return self.path is not None and self.returncode == 0
+
+
+def _shim_manager(path: str) -> list[str] | None:
+    """The `<manager> which` command behind a version-manager shim, or None."""
+    real = os.path.realpath(path)
+    # rustc, cargo, ... are links to the rustup binary, which proxies them
+    proxy = os.path.basename(real).startswith("rustup")
+    if proxy and not os.path.basename(path).startswith("rustup"):
+        return [real, "which"]
+    try:
+        with open(real, "rb") as f:
+            head = f.read(4096)
+    except OSError:
+        return None
+    match = SHIM_EXEC_PATTERN.search(head) if head.startswith(b"#!") else None
+    return [match.group(1).decode(), "which"] if match else None
+
+
+# (shim path, working directory) -> resolved binary, for this process only:
+# the selected toolchain can depend on the directory and environment
+_shim_targets: dict[tuple[str, str], str | None] = {}
+
+
+def _shim_target(path: str) -> str | None:
+    """The binary a version-manager shim runs (None when path is not a shim)."""
+    key = (path, os.getcwd())
+    if key not in _shim_targets:
+        manager = _shim_manager(path)
+        target = None
+        if manager is not None:
+            try:
+                result = subprocess.run(
+                    [*manager, os.path.basename(path)],
+                    capture_output=True,
+                    text=True,
+                    timeout=60,
+                    check=False,
+                )
+                if result.returncode == 0 and result.stdout.strip():
+                    target = result.stdout.strip().splitlines()[-1]
+            except (OSError, subprocess.TimeoutExpired):
+                pass
+        _shim_targets[key] = target
+    return _shim_targets[key]
+
+
+def _resolve(command: str) -> tuple[str | None, str | None, int | None]:
+    """
+    Resolve a command to (absolute path, shim target, mtime in ns).
+
+    The mtime is that of the shim target when the path is a version-manager
+    shim; (None, None, None) when the command cannot be found.
+    """
+    path = shutil.which(command)
+    if path is None:
+        return None, None, None
+    target = _shim_target(path)
+    try:
+        return path, target, os.stat(target or path).st_mtime_ns
+    except OSError:
+        return None, None, None
+
+
+def _probe(command: str, args: list[str]) -> Toolchain:
+    path, target, mtime = _resolve(command)
+    if path is None:
+        return Toolchain(command, list(args), None, None, None, "")
+
+    try:
+        result = subprocess.run([path, *args], capture_output=True, text=True, timeout=60)
+    except (OSError, subprocess.TimeoutExpired):
+        return Toolchain(command, list(args), path, mtime, None, "", target)
+
+    # Some tools (javac -version, older kotlinc) print their banner on stderr
+    banner = result.stdout.strip() or result.stderr.strip()
+    return Toolchain(command, list(args), path, mtime, result.returncode, banner, target)
+
+
+class ToolchainRegistry:
+    """Thread-safe registry of probed toolchains, persisted between runs."""
+
+    def __init__(self, registry_file: str | None = None):
+        self.registry_file = registry_file or os.path.join(default_cache_dir(), "toolchains.json")
+        self._lock = threading.Lock()
+        self._entries: dict[str, Toolchain] = {}
+        self._targets: dict[str, dict] = {}
+        self._failed_targets: set[tuple[str, str, str | None, int | None]] = set()
+        self._dirty = False
+        self._load()
+
+    @staticmethod
+    def _key(command: str, args: list[str]) -> str:
+        return " ".join([command, *args])
+
+    def _load(self) -> None:
+        try:
+            with open(self.registry_file) as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return
+        if data.get("format") != REGISTRY_FORMAT:
+            return
+        for key, entry in data.get("tools", {}).items():
+            self._entries[key] = Toolchain(**entry)
+        self._targets = data.get("targets", {})
+
+    def save(self) -> None:
+        """Persist the registry if it changed (best effort)."""
+        with self._lock:
+            if not self._dirty:
+                return
+            data = {
+                "format": REGISTRY_FORMAT,
+                "tools": {key: asdict(entry) for key, entry in self._entries.items()},
+                "targets": self._targets,
+            }
+            self._dirty = False
+
+        try:
+            directory = os.path.dirname(self.registry_file)
+            os.makedirs(directory, exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+            with os.fdopen(fd, "w") as f:
+                json.dump(data, f, indent=2)
+            os.replace(tmp_path, self.registry_file)
+        except OSError:
+            pass
+
+    def _is_fresh(self, entry: Toolchain) -> bool:
+        """An entry is fresh while its command resolves to the same, unmodified binary."""
+        path, target, mtime = _resolve(entry.command)
+        return path == entry.path and target == entry.target and mtime == entry.mtime
+
+    def lookup(self, command: str, args: list[str] | None = None) -> Toolchain:
+        """Return the probe result for a command, probing it only if needed."""
+        if args is None:
+            args = KNOWN_TOOLS.get(os.path.basename(command), ["--version"])
+        key = self._key(command, args)
+
+        with self._lock:
+            entry = self._entries.get(key)
+        if entry is not None and self._is_fresh(entry):
+            return entry
+
+        with phase("probe"):
+            entry = _probe(command, args)
+        with self._lock:
+            self._entries[key] = entry
+            self._dirty = True
+        self.save()
+        return entry
+
+    def is_available(self, command: str, args: list[str] | None = None) -> bool:
+        return self.lookup(command, args).available
+
+    def version(self, command: str, args: list[str] | None = None) -> str:
+        """Resolved binary and version banner of a command (stable identity for cache keys)."""
+        entry = self.lookup(command, args)
+        return f"{entry.target or entry.path or command}\n{entry.version}"
+
+    def discover(self, commands: dict[str, list[str]] | None = None) -> dict[str, Toolchain]:
+        """Probe several commands in parallel (default: KNOWN_TOOLS)."""
+        commands = commands or KNOWN_TOOLS
+        with ThreadPoolExecutor(max_workers=min(8, len(commands))) as pool:
+            entries = pool.map(lambda item: self.lookup(*item), commands.items())
+            return dict(zip(commands, entries))
+
+    def target_works(self, compiler: str, arch: str, probe) -> bool:
+        """
+        Whether a compiler can build for an architecture on this machine.
+
+        probe() performs the actual trial compilation. A working target is
+        persisted until the compiler binary changes; a failed one is only
+        remembered for this process, since installing the missing target
+        (rustup target add, a cross libc) does not touch the compiler.
+        """
+        key = f"{compiler}:{arch}"
+        toolchain = self.lookup(compiler)
+        identity = (toolchain.target, toolchain.mtime)
+        with self._lock:
+            cached = self._targets.get(key, {})
+            failed = (key, *identity) in self._failed_targets
+        if failed:
+            return False
+        if toolchain.mtime and identity == (cached.get("target"), cached.get("mtime")):
+            return True
+
+        if not (toolchain.available and probe()):
+            with self._lock:
+                self._failed_targets.add((key, *identity))
+            return False
+        with self._lock:
+            self._targets[key] = {"target": toolchain.target, "mtime": toolchain.mtime}
+            self._dirty = True
+        self.save()
+        return True
+
+
+_REGISTRY: ToolchainRegistry | None = None
+_REGISTRY_LOCK = threading.Lock()
+
+
+def get_registry() -> ToolchainRegistry:
+    """Return the process-wide registry, creating it on first use."""
+    global _REGISTRY
+    with _REGISTRY_LOCK:
+        if _REGISTRY is None:
+            _REGISTRY = ToolchainRegistry()
+        return _REGISTRY